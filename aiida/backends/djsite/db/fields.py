@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Custom Django model fields.
+
+The version of Django in use does not ship a field for the PostgreSQL JSONB type, therefore it is defined here.
+Values are serialized and deserialized as in the SQLAlchemy backend: datetimes are stored as strings in ISO format,
+and strings in that format are converted back to datetimes when loaded (see :py:func:`register_jsonb_loads`).
+"""
+from django.db import models as m
+
+from aiida.backends.sqlalchemy.utils import dumps_json, loads_json
+
+
+def register_jsonb_loads():
+    """
+    Make psycopg2 deserialize the JSONB values with the same function used by the SQLAlchemy backend.
+
+    This is done globally, such that it also applies to the queries of the QueryBuilder, which go through the same
+    connection. To be called once the database environment is loaded.
+    """
+    from psycopg2.extras import register_default_jsonb
+    register_default_jsonb(globally=True, loads=loads_json)
+
+
+class JSONBField(m.Field):
+    """
+    A field storing a JSON-serializable python object (typically a dictionary) in a PostgreSQL JSONB column
+    """
+    description = 'A JSON object stored as PostgreSQL JSONB'
+
+    def db_type(self, connection):
+        return 'jsonb'
+
+    def to_python(self, value):
+        if isinstance(value, basestring):
+            return loads_json(value)
+        return value
+
+    def get_prep_value(self, value):
+        from psycopg2.extras import Json
+
+        if value is None:
+            return None
+        return Json(value, dumps=dumps_json)
+
+    def value_to_string(self, obj):
+        return dumps_json(self._get_val_from_obj(obj))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from aiida.backends.djsite.db.migrations import update_schema_version
+
+
+SCHEMA_VERSION = "1.0.13"
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0012_drop_dblock'),
+    ]
+
+    operations = [
+        # The process state, exit status and scheduler state of calculations are mirrored from the attributes
+        # into indexed columns of the node table, such that they can be queried without joining the attributes
+        migrations.AddField(
+            model_name='dbnode',
+            name='process_state',
+            field=models.CharField(max_length=255, db_index=True, null=True)
+        ),
+        migrations.AddField(
+            model_name='dbnode',
+            name='exit_status',
+            field=models.IntegerField(db_index=True, null=True)
+        ),
+        migrations.AddField(
+            model_name='dbnode',
+            name='scheduler_state',
+            field=models.CharField(max_length=255, db_index=True, null=True)
+        ),
+        # Fill the new columns from the existing attributes of the calculations
+        migrations.RunSQL("""
+            UPDATE db_dbnode SET process_state = db_dbattribute.tval
+            FROM db_dbattribute
+            WHERE db_dbattribute.dbnode_id = db_dbnode.id AND db_dbattribute.key = 'process_state'
+                AND db_dbnode.type LIKE 'calculation.%';
+            UPDATE db_dbnode SET exit_status = db_dbattribute.ival
+            FROM db_dbattribute
+            WHERE db_dbattribute.dbnode_id = db_dbnode.id AND db_dbattribute.key = 'exit_status'
+                AND db_dbnode.type LIKE 'calculation.%';
+            UPDATE db_dbnode SET scheduler_state = db_dbattribute.tval
+            FROM db_dbattribute
+            WHERE db_dbattribute.dbnode_id = db_dbnode.id AND db_dbattribute.key = 'scheduler_state'
+                AND db_dbnode.type LIKE 'calculation.%';
+        """),
+        update_schema_version(SCHEMA_VERSION)
+    ]
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from aiida.backends.djsite.db.fields import JSONBField
+from aiida.backends.djsite.db.migrations import update_schema_version
+
+
+SCHEMA_VERSION = "1.0.14"
+
+# Number of nodes whose attributes and extras are converted at a time
+BATCH_SIZE = 1000
+
+
+def _get_node_values(cursor, table, node_pks):
+    """
+    Read and deserialize the attributes (or extras) of the given nodes from the old key-value table
+
+    :param cursor: a database cursor
+    :param table: either 'db_dbattribute' or 'db_dbextra'
+    :param node_pks: a tuple of node pks
+    :return: a dictionary with the deserialized values of each node that has at least one entry in the table
+    """
+    from collections import defaultdict
+    from aiida.backends.djsite.db.models import deserialize_attributes
+    from aiida.backends.utils import AIIDA_ATTRIBUTE_SEP
+
+    data = defaultdict(dict)
+    cursor.execute(
+        'SELECT dbnode_id, key, datatype, tval, fval, ival, bval, dval FROM {} WHERE dbnode_id IN %s'.format(table),
+        [node_pks])
+    for dbnode_id, key, datatype, tval, fval, ival, bval, dval in cursor.fetchall():
+        data[dbnode_id][key] = {
+            'datatype': datatype,
+            'tval': tval,
+            'fval': fval,
+            'ival': ival,
+            'bval': bval,
+            'dval': dval,
+        }
+
+    return {pk: deserialize_attributes(values, sep=AIIDA_ATTRIBUTE_SEP) for pk, values in data.iteritems()}
+
+
+def migrate_attributes_and_extras(apps, schema_editor):
+    """
+    Copy the attributes and extras of all nodes from the DbAttribute and DbExtra tables to the JSONB columns
+    """
+    from psycopg2.extras import Json
+    from aiida.backends.sqlalchemy.utils import dumps_json
+    from aiida.common.utils import grouper
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT id FROM db_dbnode ORDER BY id')
+        node_pks = [row[0] for row in cursor.fetchall()]
+
+        for batch in grouper(BATCH_SIZE, node_pks):
+            attributes = _get_node_values(cursor, 'db_dbattribute', batch)
+            extras = _get_node_values(cursor, 'db_dbextra', batch)
+            cursor.executemany(
+                'UPDATE db_dbnode SET attributes = %s, extras = %s WHERE id = %s',
+                [(Json(attributes.get(pk, {}), dumps=dumps_json), Json(extras.get(pk, {}), dumps=dumps_json), pk)
+                 for pk in batch if pk in attributes or pk in extras])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0013_process_state_columns'),
+    ]
+
+    operations = [
+        # The attributes and extras of the nodes are moved from the DbAttribute and DbExtra key-value tables, where
+        # dictionaries and lists are unpacked in one row per element, to JSONB columns of the node table
+        migrations.AddField(
+            model_name='dbnode',
+            name='attributes',
+            field=JSONBField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='dbnode',
+            name='extras',
+            field=JSONBField(default=dict),
+        ),
+        migrations.RunPython(migrate_attributes_and_extras),
+        migrations.DeleteModel(
+            name='DbAttribute',
+        ),
+        migrations.DeleteModel(
+            name='DbExtra',
+        ),
+        update_schema_version(SCHEMA_VERSION)
+    ]
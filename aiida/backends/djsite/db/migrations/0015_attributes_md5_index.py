@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import unicode_literals
+
+from django.db import migrations
+from aiida.backends.djsite.db.migrations import update_schema_version
+
+
+SCHEMA_VERSION = "1.0.15"
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0014_attributes_extras_jsonb'),
+    ]
+
+    operations = [
+        # Nodes are looked up by the md5 of their file (e.g. CifData and UpfData), which only these nodes have,
+        # hence the partial index. The expression is the one of the QueryBuilder filters on 'attributes.md5'
+        migrations.RunSQL(
+            """
+            CREATE INDEX ix_db_dbnode_attributes_md5 ON db_dbnode ((attributes #>> '{md5}'))
+            WHERE (attributes #>> '{md5}') IS NOT NULL;
+            """,
+            reverse_sql="DROP INDEX ix_db_dbnode_attributes_md5;"),
+        update_schema_version(SCHEMA_VERSION)
+    ]
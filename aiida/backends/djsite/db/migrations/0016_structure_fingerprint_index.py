@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import unicode_literals
+
+from django.db import migrations
+from aiida.backends.djsite.db.migrations import update_schema_version
+
+
+SCHEMA_VERSION = "1.0.16"
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0015_attributes_md5_index'),
+    ]
+
+    operations = [
+        # Structures are looked up by their fingerprint (see StructureData.find_equivalent), which only
+        # structures have, hence the partial index. The expression is the one of the QueryBuilder filters
+        # on 'extras._aiida_structure_fingerprint'
+        migrations.RunSQL(
+            """
+            CREATE INDEX ix_db_dbnode_extras_structure_fingerprint
+            ON db_dbnode ((extras #>> '{_aiida_structure_fingerprint}'))
+            WHERE (extras #>> '{_aiida_structure_fingerprint}') IS NOT NULL;
+            """,
+            reverse_sql="DROP INDEX ix_db_dbnode_extras_structure_fingerprint;"),
+        update_schema_version(SCHEMA_VERSION)
+    ]
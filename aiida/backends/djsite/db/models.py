@@ -25,6 +25,7 @@ from aiida.common.exceptions import (
 from aiida.backends.settings import AIIDANODES_UUID_VERSION
 from aiida.backends.djsite.settings.settings import AUTH_USER_MODEL
 import aiida.backends.djsite.db.migrations as migrations
+from aiida.backends.djsite.db.fields import JSONBField
 from aiida.backends.utils import AIIDA_ATTRIBUTE_SEP
 
 # This variable identifies the schema version of this file.
@@ -117,15 +118,12 @@ class DbNode(m.Model):
     * C is 'output' of A.
 
     Internal attributes, that define the node itself,
-    are stored in the DbAttribute table; further user-defined attributes,
-    called 'extra', are stored in the DbExtra table (same schema and methods
-    of the DbAttribute table, but the code does not rely on the content of the
-    table, therefore the user can use it at his will to tag or annotate nodes.
-
-    :note: Attributes in the DbAttribute table have to be thought as belonging
-       to the DbNode, (this is the reason for which there is no 'user' field
-       in the DbAttribute field). Moreover, Attributes define uniquely the
-       Node so should be immutable
+    are stored as a JSON dictionary in the 'attributes' column; further
+    user-defined attributes, called 'extras', are stored in the 'extras'
+    column, but the code does not rely on their content, therefore the user
+    can use them at his will to tag or annotate nodes.
+
+    :note: Attributes define uniquely the Node so should be immutable
     """
     uuid = UUIDField(auto=True, version=AIIDANODES_UUID_VERSION, db_index=True)
     # in the form data.upffile., data.structure., calculation., ...
@@ -135,6 +133,9 @@ class DbNode(m.Model):
     # max_length required for index by MySql
     type = m.CharField(max_length=255, db_index=True)
     process_type = m.CharField(max_length=255, db_index=True, null=True)
+    process_state = m.CharField(max_length=255, db_index=True, null=True)
+    exit_status = m.IntegerField(db_index=True, null=True)
+    scheduler_state = m.CharField(max_length=255, db_index=True, null=True)
     label = m.CharField(max_length=255, db_index=True, blank=True)
     description = m.TextField(blank=True)
     # creation time
@@ -161,10 +162,28 @@ class DbNode(m.Model):
     # For the API: whether this node
     public = m.BooleanField(default=False)
 
+    attributes = JSONBField(default=dict)
+    extras = JSONBField(default=dict)
+
     objects = m.Manager()
     # Return aiida Node instances or their subclasses instead of DbNode instances
     aiidaobjects = AiidaObjectManager()
 
+    # These columns are only written by dedicated updates once the node is stored: the attributes and extras,
+    # and the columns mirroring some of the attributes (see Node._column_attributes), updated together with them
+    _json_fields = ('attributes', 'extras', 'process_state', 'exit_status', 'scheduler_state')
+
+    def save(self, *args, **kwargs):
+        """
+        Save the node. If it was already stored, the attributes and extras, and the columns mirroring attributes,
+        are not written: they are modified in place by the aiida Node class, while the copy in memory may be
+        outdated and overwrite concurrent changes.
+        """
+        if self.pk is not None and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in self._json_fields]
+        super(DbNode, self).save(*args, **kwargs)
+
     def get_aiida_class(self):
         """
         Return the corresponding aiida instance of class aiida.orm.Node or a
@@ -205,20 +224,6 @@ class DbNode(m.Model):
             thistype = thistype[:-1]  # Strip final dot
             return thistype.rpartition('.')[2]
 
-    @property
-    def attributes(self):
-        """
-        Return all attributes of the given node as a single dictionary.
-        """
-        return DbAttribute.get_all_values_for_node(self)
-
-    @property
-    def extras(self):
-        """
-        Return all extras of the given node as a single dictionary.
-        """
-        return DbExtra.get_all_values_for_node(self)
-
     def __str__(self):
         simplename = self.get_simple_name(invalid_result="Unknown")
         # node pk + type
@@ -579,7 +584,7 @@ class DbMultipleValueAttributeBaseClass(m.Model):
         unique_together = (('key',),)
 
     # There are no subspecifiers. If instead you want to group attributes
-    # (e.g. by node, as it is done in the DbAttributeBaseClass), specify here
+    # (e.g. by some other foreign key), specify here
     # the field name
     _subspecifier_field_name = None
 
@@ -632,8 +637,7 @@ class DbMultipleValueAttributeBaseClass(m.Model):
         :param value: the value to store (a basic data type or a list or a dict)
         :param subspecifier_value: must be None if this class has no
           subspecifier set (e.g., the DbSetting class).
-          Must be the value of the subspecifier (e.g., the dbnode) for classes
-          that define it (e.g. DbAttribute and DbExtra)
+          Must be the value of the subspecifier for classes that define it
         :param with_transaction: True if you want this function to be managed
           with transactions. Set to False if you already have a manual
           management of transactions in the block where you are calling this
@@ -705,8 +709,8 @@ class DbMultipleValueAttributeBaseClass(m.Model):
                      other_attribs={}):
         """
         Create a new list of attributes, without storing them, associated
-        with the current key/value pair (and to the given subspecifier,
-        e.g. the DbNode for DbAttributes and DbExtras).
+        with the current key/value pair (and to the given subspecifier, if
+        any).
 
         :note: No hits are done on the DB, in particular no check is done
           on the existence of the given nodes.
@@ -717,8 +721,7 @@ class DbMultipleValueAttributeBaseClass(m.Model):
         :param value: the value to store (a basic data type or a list or a dict)
         :param subspecifier_value: must be None if this class has no
           subspecifier set (e.g., the DbSetting class).
-          Must be the value of the subspecifier (e.g., the dbnode) for classes
-          that define it (e.g. DbAttribute and DbExtra)
+          Must be the value of the subspecifier for classes that define it
         :param other_attribs: a dictionary of other parameters, to store
           only on the level-zero attribute (e.g. for description in DbSetting).
 
@@ -987,8 +990,7 @@ class DbMultipleValueAttributeBaseClass(m.Model):
           entry itself.
         :param subspecifier_value: must be None if this class has no
           subspecifier set (e.g., the DbSetting class).
-          Must be the value of the subspecifier (e.g., the dbnode) for classes
-          that define it (e.g. DbAttribute and DbExtra)
+          Must be the value of the subspecifier for classes that define it
         """
         from django.db.models import Q
 
@@ -1016,215 +1018,6 @@ class DbMultipleValueAttributeBaseClass(m.Model):
         cls.objects.filter(query).delete()
 
 
-@python_2_unicode_compatible
-class DbAttributeBaseClass(DbMultipleValueAttributeBaseClass):
-    """
-    Abstract base class for tables storing element-attribute-value data.
-    Element is the dbnode; attribute is the key name.
-    Value is the specific value to store.
-
-    This table had different SQL columns to store different types of data, and
-    a datatype field to know the actual datatype.
-
-    Moreover, this class unpacks dictionaries and lists when possible, so that
-    it is possible to query inside recursive lists and dicts.
-    """
-    # In this way, the related name for the DbAttribute inherited class will be
-    # 'dbattributes' and for 'dbextra' will be 'dbextras'
-    # Moreover, automatically destroy attributes and extras if the parent
-    # node is deleted
-    dbnode = m.ForeignKey('DbNode', related_name='%(class)ss', on_delete=m.CASCADE)
-    # max_length is required by MySql to have indexes and unique constraints
-
-    _subspecifier_field_name = 'dbnode'
-
-    class Meta:
-        unique_together = (("dbnode", "key"))
-        abstract = True
-
-    @classmethod
-    def list_all_node_elements(cls, dbnode):
-        """
-        Return a django queryset with the attributes of the given node,
-        only at deepness level zero (i.e., keys not containing the separator).
-        """
-        from django.db.models import Q
-
-        # This node, and does not contain the separator
-        # (=> show only level-zero entries)
-        query = Q(dbnode=dbnode) & ~Q(key__contains=cls._sep)
-        return cls.objects.filter(query)
-
-    @classmethod
-    def get_value_for_node(cls, dbnode, key):
-        """
-        Get an attribute from the database for the given dbnode.
-
-        :return: the value stored in the Db table, correctly converted
-            to the right type.
-        :raise AttributeError: if no key is found for the given dbnode
-        """
-        try:
-            attr = cls.objects.get(dbnode=dbnode, key=key)
-        except ObjectDoesNotExist:
-            raise AttributeError("{} with key {} for node {} not found "
-                                 "in db".format(cls.__name__, key, dbnode.pk))
-        return attr.getvalue()
-
-    @classmethod
-    def get_all_values_for_node(cls, dbnode):
-        """
-        Return a dictionary with all attributes for the given dbnode.
-
-        :return: a dictionary where each key is a level-0 attribute
-            stored in the Db table, correctly converted
-            to the right type.
-        """
-        return cls.get_all_values_for_nodepk(dbnode.pk)
-
-    @classmethod
-    def get_all_values_for_nodepk(cls, dbnodepk):
-        """
-        Return a dictionary with all attributes for the dbnode with given PK.
-
-        :return: a dictionary where each key is a level-0 attribute
-            stored in the Db table, correctly converted
-            to the right type.
-        """
-        dballsubvalues = cls.objects.filter(dbnode__id=dbnodepk).values_list(
-            'key', 'datatype', 'tval', 'fval',
-            'ival', 'bval', 'dval')
-
-        data = {_[0]: {
-            "datatype": _[1],
-            "tval": _[2],
-            "fval": _[3],
-            "ival": _[4],
-            "bval": _[5],
-            "dval": _[6],
-        } for _ in dballsubvalues
-        }
-        try:
-            return deserialize_attributes(data, sep=cls._sep,
-                                          original_class=cls,
-                                          original_pk=dbnodepk)
-        except DeserializationException as e:
-            exc = DbContentError(e.message)
-            exc.original_exception = e
-            raise exc
-
-    @classmethod
-    def reset_values_for_node(cls, dbnode, attributes, with_transaction=True,
-                              return_not_store=False):
-        from django.db import transaction
-
-        # cls.validate_key(key)
-
-        nodes_to_store = []
-
-        try:
-            if with_transaction:
-                sid = transaction.savepoint()
-
-            if isinstance(dbnode, (int, long)):
-                dbnode_node = DbNode(id=dbnode)
-            else:
-                dbnode_node = dbnode
-
-            # create_value returns a list of nodes to store
-            for k, v in attributes.iteritems():
-                nodes_to_store.extend(
-                    cls.create_value(k, v,
-                                     subspecifier_value=dbnode_node,
-                                     ))
-
-            if return_not_store:
-                return nodes_to_store
-            else:
-                # Reset. For set, use also a filter for key__in=attributes.keys()
-                cls.objects.filter(dbnode=dbnode_node).delete()
-
-                if nodes_to_store:
-                    cls.objects.bulk_create(nodes_to_store)
-
-            if with_transaction:
-                transaction.savepoint_commit(sid)
-        except:
-            if with_transaction:
-                transaction.savepoint_rollback(sid)
-            raise
-
-    @classmethod
-    def set_value_for_node(cls, dbnode, key, value, with_transaction=True,
-                           stop_if_existing=False):
-        """
-        This is the raw-level method that accesses the DB. No checks are done
-        to prevent the user from (re)setting a valid key.
-        To be used only internally.
-
-        :todo: there may be some error on concurrent write;
-           not checked in this unlucky case!
-
-        :param dbnode: the dbnode for which the attribute should be stored;
-          in an integer is passed, this is used as the PK of the dbnode,
-          without any further check (for speed reasons)
-        :param key: the key of the attribute to store; must be a level-zero
-          attribute (i.e., no separators in the key)
-        :param value: the value of the attribute to store
-        :param with_transaction: if True (default), do this within a transaction,
-           so that nothing gets stored if a subitem cannot be created.
-           Otherwise, if this parameter is False, no transaction management
-           is performed.
-        :param stop_if_existing: if True, it will stop with an
-           UniquenessError exception if the key already exists
-           for the given node. Otherwise, it will
-           first delete the old value, if existent. The use with True is
-           useful if you want to use a given attribute as a "locking" value,
-           e.g. to avoid to perform an action twice on the same node.
-           Note that, if you are using transactions, you may get the error
-           only when the transaction is committed.
-
-        :raise ValueError: if the key contains the separator symbol used
-            internally to unpack dictionaries and lists (defined in cls._sep).
-        """
-        if isinstance(dbnode, (int, long)):
-            dbnode_node = DbNode(id=dbnode)
-        else:
-            dbnode_node = dbnode
-
-        cls.set_value(key, value, with_transaction=with_transaction,
-                      subspecifier_value=dbnode_node,
-                      stop_if_existing=stop_if_existing)
-
-    @classmethod
-    def del_value_for_node(cls, dbnode, key):
-        """
-        Delete an attribute from the database for the given dbnode.
-
-        :note: no exception is raised if no attribute with the given key is
-          found in the DB.
-
-        :param dbnode: the dbnode for which you want to delete the key.
-        :param key: the key to delete.
-        """
-        cls.del_value(key, subspecifier_value=dbnode)
-
-    @classmethod
-    def has_key(cls, dbnode, key):
-        """
-        Return True if the given dbnode has an attribute with the given key,
-        False otherwise.
-        """
-        return bool(cls.objects.filter(dbnode=dbnode, key=key))
-
-    def __str__(self):
-        return "[{} ({})].{} ({})".format(
-            self.dbnode.get_simple_name(invalid_result="Unknown node"),
-            self.dbnode.pk,
-            self.key,
-            self.datatype, )
-
-
 @python_2_unicode_compatible
 class DbSetting(DbMultipleValueAttributeBaseClass):
     """
@@ -1239,26 +1032,6 @@ class DbSetting(DbMultipleValueAttributeBaseClass):
         return "'{}'={}".format(self.key, self.getvalue())
 
 
-class DbAttribute(DbAttributeBaseClass):
-    """
-    This table stores attributes that uniquely define the content of the
-    node. Therefore, their modification corrupts the data.
-    """
-    pass
-
-
-class DbExtra(DbAttributeBaseClass):
-    """
-    This table stores extra data, still in the key-value format,
-    that the user can attach to a node.
-    Therefore, their modification simply changes the user-defined data,
-    but does not corrupt the node (it will still be loadable without errors).
-    Could be useful to add "duplicate" information for easier querying, or
-    for tagging nodes.
-    """
-    pass
-
-
 class DbCalcState(m.Model):
     """
     Store the state of calculations.
@@ -1760,8 +1533,8 @@ class DbWorkflowStep(m.Model):
         if (state == None):
             return JobCalculation.query(workflow_step=self)
         else:
-            return JobCalculation.query(workflow_step=self).filter(
-                dbattributes__key="state", dbattributes__tval=state)
+            return JobCalculation.query(workflow_step=self).extra(
+                where=["db_dbnode.attributes ->> 'state' = %s"], params=[state])
 
     def remove_calculations(self):
         self.calculations.all().delete()
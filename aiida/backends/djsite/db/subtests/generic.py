@@ -146,18 +146,18 @@ class TestGroupsDjango(AiidaTestCase):
 
 class TestDbExtrasDjango(AiidaTestCase):
     """
-    Test DbAttributes.
+    Test the extras, stored in the JSONB column of DbNode.
     """
 
     def test_replacement_1(self):
-        from aiida.backends.djsite.db.models import DbExtra
+        from aiida.backends.djsite.db.models import DbNode
 
         n1 = Node().store()
         n2 = Node().store()
 
-        DbExtra.set_value_for_node(n1._dbnode, "pippo", [1, 2, 'a'])
-        DbExtra.set_value_for_node(n1._dbnode, "pippobis", [5, 6, 'c'])
-        DbExtra.set_value_for_node(n2._dbnode, "pippo2", [3, 4, 'b'])
+        n1.set_extra("pippo", [1, 2, 'a'])
+        n1.set_extra("pippobis", [5, 6, 'c'])
+        n2.set_extra("pippo2", [3, 4, 'b'])
 
         self.assertEquals(n1.get_extras(), {'pippo': [1, 2, 'a'],
                                             'pippobis': [5, 6, 'c'],
@@ -169,12 +169,29 @@ class TestDbExtrasDjango(AiidaTestCase):
 
         new_attrs = {"newval1": "v", "newval2": [1, {"c": "d", "e": 2}]}
 
-        DbExtra.reset_values_for_node(n1._dbnode, attributes=new_attrs)
+        n1.reset_extras(new_attrs)
         self.assertEquals(n1.get_extras(), new_attrs)
         self.assertEquals(n2.get_extras(), {'pippo2': [3, 4, 'b'], '_aiida_hash': n2.get_hash()})
 
-        DbExtra.del_value_for_node(n1._dbnode, key='newval2')
+        n1.del_extra('newval2')
         del new_attrs['newval2']
         self.assertEquals(n1.get_extras(), new_attrs)
+        self.assertEquals(DbNode.objects.get(pk=n1.pk).extras, new_attrs)
         # Also check that other nodes were not damaged
         self.assertEquals(n2.get_extras(), {'pippo2': [3, 4, 'b'], '_aiida_hash': n2.get_hash()})
+
+    def test_concurrent_modification(self):
+        """
+        Modifications of different keys through different instances of the same node are not lost
+        """
+        from aiida.orm import load_node
+
+        n1 = Node().store()
+        n1_copy = load_node(n1.pk)
+
+        n1.set_extra('first', 1)
+        n1_copy.set_extra('second', 2)
+        n1.label = 'label'
+
+        self.assertEquals(n1.get_extra('second'), 2)
+        self.assertEquals(load_node(n1.pk).get_extras(), {'first': 1, 'second': 2, '_aiida_hash': n1.get_hash()})
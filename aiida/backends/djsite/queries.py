@@ -43,7 +43,7 @@ class QueryManagerDjango(AbstractQueryManager):
         :return: a list of calculation objects matching the filters.
         """
         # I assume that calc_states are strings. If this changes in the future,
-        # update the filter below from dbattributes__tval to the correct field.
+        # update the filter below, that compares the attribute as text.
         from aiida.orm import Computer
         from aiida.common.exceptions import InputValidationError
         from aiida.orm.implementation.django.calculation.job import JobCalculation
@@ -65,10 +65,8 @@ class QueryManagerDjango(AbstractQueryManager):
         if only_enabled:
             kwargs['dbcomputer__enabled'] = True
 
-        queryresults = JobCalculation.query(
-            dbattributes__key='state',
-            dbattributes__tval=state,
-            **kwargs)
+        queryresults = JobCalculation.query(**kwargs).extra(
+            where=["db_dbnode.attributes ->> 'state' = %s"], params=[state])
 
         if only_computer_user_pairs:
             computer_users_ids = queryresults.values_list(
@@ -176,7 +174,6 @@ class QueryManagerDjango(AbstractQueryManager):
         """
         Returns bands and closest parent structure     
         """
-        from collections import defaultdict
         from django.db.models import Q
         from aiida.common.utils import grouper
         from aiida.backends.djsite.db import models
@@ -217,25 +214,7 @@ class QueryManagerDjango(AbstractQueryManager):
             struc_pks = [structure_dict[pk] for pk in pks]
 
             # query for the attributes needed for the structure formula
-            attr_query = Q(key__startswith='kinds') | Q(key__startswith='sites')
-            attrs = models.DbAttribute.objects.filter(attr_query,
-                                                      dbnode__in=struc_pks).values_list(
-                'dbnode__pk', 'key', 'datatype', 'tval', 'fval',
-                'ival', 'bval', 'dval')
-
-            results = defaultdict(dict)
-            for attr in attrs:
-                results[attr[0]][attr[1]] = {"datatype": attr[2],
-                                             "tval": attr[3],
-                                             "fval": attr[4],
-                                             "ival": attr[5],
-                                             "bval": attr[6],
-                                             "dval": attr[7]}
-            # organize all of it in a dictionary
-            deser_data = {}
-            for k in results:
-                deser_data[k] = models.deserialize_attributes(results[k],
-                                                              sep=models.DbAttribute._sep)
+            deser_data = dict(models.DbNode.objects.filter(pk__in=struc_pks).values_list('pk', 'attributes'))
 
             # prepare the printout
             for ((bid, blabel, bdate), struc_pk) in zip(this_chunk, struc_pks):
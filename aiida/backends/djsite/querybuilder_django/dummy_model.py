@@ -97,32 +97,6 @@ class DbCalcState(Base):
         UniqueConstraint('dbnode_id', 'state'),
     )
 
-class DbAttribute(Base):
-    __tablename__ = "db_dbattribute"
-    id  = Column(Integer, primary_key = True)
-    dbnode_id = Column(Integer, ForeignKey('db_dbnode.id'))
-    key = Column(String(255))
-    datatype = Column(String(10))
-    tval = Column(String, default='')
-    fval = Column(Float, default=None, nullable=True)
-    ival = Column(Integer, default=None, nullable=True)
-    bval = Column(Boolean, default=None, nullable=True)
-    dval = Column(DateTime, default=None, nullable = True)
-
-
-
-class DbExtra(Base):
-    __tablename__ = "db_dbextra"
-    id  = Column(Integer, primary_key = True)
-    dbnode_id = Column(Integer, ForeignKey('db_dbnode.id'))
-    key = Column(String(255))
-    datatype = Column(String(10))
-    tval = Column(String, default='')
-    fval = Column(Float, default=None, nullable=True)
-    ival = Column(Integer, default=None, nullable=True)
-    bval = Column(Boolean, default=None, nullable=True)
-    dval = Column(DateTime, default=None, nullable = True)
-
 
 class DbComputer(Base):
     __tablename__ = "db_dbcomputer"
@@ -251,6 +225,9 @@ class DbNode(Base):
     uuid = Column(UUID(as_uuid=True), default=uuid_func)
     type = Column(String(255), index=True)
     process_type = Column(String(255), index=True)
+    process_state = Column(String(255), index=True)
+    exit_status = Column(Integer, index=True)
+    scheduler_state = Column(String(255), index=True)
     label = Column(String(255), index=True, nullable=True)
     description = Column(Text(), nullable=True)
     ctime = Column(DateTime(timezone=True), default=timezone.now)
@@ -275,8 +252,8 @@ class DbNode(Base):
 
     nodeversion = Column(Integer, default=1)
 
-    attributes = relationship('DbAttribute', uselist=True, backref='dbnode')
-    extras = relationship('DbExtra', uselist=True, backref='dbnode')
+    attributes = Column(JSONB)
+    extras = Column(JSONB)
 
 
 
@@ -310,9 +287,11 @@ class DbNode(Base):
         # and instantiate an object that has the same attributes as self.
         from aiida.backends.djsite.db.models import DbNode as DjangoSchemaDbNode
         dbnode = DjangoSchemaDbNode(
-            id=self.id, type=self.type, process_type=self.process_type, uuid=self.uuid, ctime=self.ctime,
+            id=self.id, type=self.type, process_type=self.process_type, process_state=self.process_state,
+            exit_status=self.exit_status, scheduler_state=self.scheduler_state, uuid=self.uuid, ctime=self.ctime,
             mtime=self.mtime, label=self.label, description=self.description, dbcomputer_id=self.dbcomputer_id,
-            user_id=self.user_id, public=self.public, nodeversion=self.nodeversion
+            user_id=self.user_id, public=self.public, nodeversion=self.nodeversion, attributes=self.attributes,
+            extras=self.extras
         )
         return dbnode.get_aiida_class()
 
@@ -41,6 +41,9 @@ def _load_dbenv_noschemacheck(profile):
     os.environ['DJANGO_SETTINGS_MODULE'] = 'aiida.backends.djsite.settings.settings'
     django.setup()
 
+    from aiida.backends.djsite.db.fields import register_jsonb_loads
+    register_jsonb_loads()
+
 
 def get_log_messages(obj):
     from aiida.backends.djsite.db.models import DbLog
@@ -172,6 +175,41 @@ def delete_nodes_and_connections_django(pks_to_delete):
         models.DbNode.objects.filter(pk__in=pks_to_delete).delete()
 
 
+def set_extra_for_nodes_django(key, values):
+    """
+    Set the same extra on many nodes with a single (executemany) UPDATE statement.
+
+    :param key: the key of the extra
+    :param values: a dictionary mapping the pk of each node to the value to set
+    """
+    from django.db import connection, transaction
+    from psycopg2.extras import Json
+    from aiida.backends.sqlalchemy.utils import dumps_json
+
+    if not values:
+        return
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "UPDATE db_dbnode SET extras = extras || %s, nodeversion = nodeversion + 1 WHERE id = %s",
+                [(Json({key: value}, dumps=dumps_json), pk) for pk, value in values.iteritems()])
+
+
+def store_nodes_django(nodes):
+    """
+    Store many new nodes in a single transaction.
+
+    :param nodes: a list of unstored nodes
+    :return: the list of the pks of the stored nodes
+    """
+    from django.db import transaction
+    with transaction.atomic():
+        for node in nodes:
+            node.store(with_transaction=False, use_cache=False)
+    return [node.pk for node in nodes]
+
+
 def pass_to_django_manage(argv, profile=None):
     """
     Call the corresponding django manage.py command
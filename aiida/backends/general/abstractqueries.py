@@ -51,7 +51,8 @@ class AbstractQueryManager(object):
         :return: a list of calculation objects matching the filters.
         """
         # I assume that calc_states are strings. If this changes in the future,
-        # update the filter below from dbattributes__tval to the correct field.
+        # update the filter below on the state, that is compared as a string in
+        # the JSONB attributes column.
         from aiida.orm.computer import Computer
         from aiida.orm.calculation.job import JobCalculation
         from aiida.orm.querybuilder import QueryBuilder
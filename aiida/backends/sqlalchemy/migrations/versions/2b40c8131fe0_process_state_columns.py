@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Add the process_state, exit_status and scheduler_state columns to DbNode
+
+Revision ID: 2b40c8131fe0
+Revises: 59edaf8a8b79
+Create Date: 2018-06-04 10:41:27.512073
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import text
+
+
+# revision identifiers, used by Alembic.
+revision = '2b40c8131fe0'
+down_revision = '59edaf8a8b79'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('db_dbnode',
+        sa.Column('process_state', sa.VARCHAR(length=255), autoincrement=False, nullable=True),
+    )
+    op.add_column('db_dbnode',
+        sa.Column('exit_status', sa.INTEGER(), autoincrement=False, nullable=True),
+    )
+    op.add_column('db_dbnode',
+        sa.Column('scheduler_state', sa.VARCHAR(length=255), autoincrement=False, nullable=True),
+    )
+    op.create_index('ix_db_dbnode_process_state', 'db_dbnode', ['process_state'])
+    op.create_index('ix_db_dbnode_exit_status', 'db_dbnode', ['exit_status'])
+    op.create_index('ix_db_dbnode_scheduler_state', 'db_dbnode', ['scheduler_state'])
+
+    # Fill the new columns from the existing attributes of the calculations
+    conn = op.get_bind()
+    statement = text("""
+        UPDATE db_dbnode SET
+            process_state = attributes->>'process_state',
+            exit_status = (attributes->>'exit_status')::integer,
+            scheduler_state = attributes->>'scheduler_state'
+        WHERE type LIKE 'calculation.%';
+    """)
+    conn.execute(statement)
+
+
+def downgrade():
+    op.drop_index('ix_db_dbnode_scheduler_state', table_name='db_dbnode')
+    op.drop_index('ix_db_dbnode_exit_status', table_name='db_dbnode')
+    op.drop_index('ix_db_dbnode_process_state', table_name='db_dbnode')
+    op.drop_column('db_dbnode', 'scheduler_state')
+    op.drop_column('db_dbnode', 'exit_status')
+    op.drop_column('db_dbnode', 'process_state')
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Add an index on the fingerprint extra of the structures
+
+Revision ID: 3f8d2a9c61b4
+Revises: 7ca08c391c49
+Create Date: 2018-06-19 10:24:17.305172
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8d2a9c61b4'
+down_revision = '7ca08c391c49'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only the structures have a fingerprint (see StructureData.find_equivalent), so the index is partial.
+    # The expression is the one of the QueryBuilder filters on the extra, or the index would not be used
+    op.execute("""
+        CREATE INDEX ix_db_dbnode_extras_structure_fingerprint
+        ON db_dbnode ((extras #>> '{_aiida_structure_fingerprint}'))
+        WHERE (extras #>> '{_aiida_structure_fingerprint}') IS NOT NULL;
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_db_dbnode_extras_structure_fingerprint', table_name='db_dbnode')
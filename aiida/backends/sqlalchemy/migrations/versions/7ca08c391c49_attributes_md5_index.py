@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Add an index on the md5 attribute of the nodes
+
+Revision ID: 7ca08c391c49
+Revises: 2b40c8131fe0
+Create Date: 2018-06-12 15:02:41.813244
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7ca08c391c49'
+down_revision = '2b40c8131fe0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only the nodes of files (e.g. CifData and UpfData) have an md5 attribute, so the index is partial.
+    # The expression is the one of the QueryBuilder filters on 'attributes.md5', or the index would not be used
+    op.execute("""
+        CREATE INDEX ix_db_dbnode_attributes_md5 ON db_dbnode ((attributes #>> '{md5}'))
+        WHERE (attributes #>> '{md5}') IS NOT NULL;
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_db_dbnode_attributes_md5', table_name='db_dbnode')
@@ -74,6 +74,9 @@ class DbNode(Base):
     uuid = Column(UUID(as_uuid=True), default=uuid_func)
     type = Column(String(255), index=True)
     process_type = Column(String(255), index=True)
+    process_state = Column(String(255), index=True)
+    exit_status = Column(Integer, index=True)
+    scheduler_state = Column(String(255), index=True)
     label = Column(String(255), index=True, nullable=True,
                    default="")  # Does it make sense to be nullable and have a default?
     description = Column(Text(), nullable=True, default="")
@@ -190,10 +193,17 @@ class DbNode(Base):
         flag_modified(self, "attributes")
         self.save()
 
-    def set_extra(self, key, value):
+    def set_attrs(self, attributes, reset=False):
+        if reset:
+            self.attributes.clear()
+        self.attributes.update(attributes)
+        flag_modified(self, "attributes")
+        self.save()
+
+    def set_extra(self, key, value, commit=True):
         DbNode._set_attr(self.extras, key, value)
         flag_modified(self, "extras")
-        self.save()
+        self.save(commit=commit)
 
     def reset_extras(self, new_extras):
         self.extras.clear()
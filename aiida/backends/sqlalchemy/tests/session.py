@@ -294,3 +294,51 @@ class TestSessionSqla(AiidaTestCase):
         dbnode_reloaded.extras['test_extras'] = 'Boo!'
         custom_session.commit()
         self.assertDictEqual(node._attributes(), dbnode_reloaded.attributes)
+
+
+class TestEngineSqla(AiidaTestCase):
+    """
+    Test the configuration of the engine and the cache of the schema version check.
+    """
+
+    def test_engine_pool_options(self):
+        """
+        Check that no connection is pooled when an external pool is used
+        """
+        from sqlalchemy.pool import NullPool
+        from aiida.backends.sqlalchemy.utils import get_engine_pool_options
+        from aiida.common.setup import del_property, exists_property, get_property, set_property
+
+        self.assertEquals(get_engine_pool_options()['pool_size'], get_property('db.pool_size'))
+
+        was_set = exists_property('db.external_pool')
+        previous = get_property('db.external_pool')
+        set_property('db.external_pool', True)
+        try:
+            self.assertEquals(get_engine_pool_options(), {'poolclass': NullPool})
+        finally:
+            if was_set:
+                set_property('db.external_pool', previous)
+            else:
+                del_property('db.external_pool')
+
+    def test_schema_version_check_cache(self):
+        """
+        Check that the cached result of the schema version check is only used
+        if the version stored in the database did not change
+        """
+        from aiida.backends.sqlalchemy import utils
+
+        schema_version = utils._get_stored_db_schema_version()
+        self.assertIsNotNone(schema_version)
+
+        try:
+            utils.cache_schema_version_check('0000000000')
+            self.assertFalse(utils.is_schema_version_check_cached())
+        finally:
+            utils.cache_schema_version_check(schema_version)
+
+        self.assertTrue(utils.is_schema_version_check_cached())
+
+        # The check passes, through the cache
+        utils.check_schema_version()
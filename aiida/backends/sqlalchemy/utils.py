@@ -32,15 +32,18 @@ from alembic.runtime.environment import EnvironmentContext
 from alembic.script import ScriptDirectory
 from dateutil import parser
 from sqlalchemy import create_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import scoped_session
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.expression import Insert
 
 from aiida.backends import sqlalchemy as sa, settings
 from aiida.common.exceptions import ConfigurationError
-from aiida.common.setup import (get_profile_config)
+from aiida.common.setup import (get_profile_config, get_property)
 
 ALEMBIC_FILENAME = "alembic.ini"
 ALEMBIC_REL_PATH = "migrations"
+SCHEMA_VERSION_CACHE_FILENAME = "schema_version_cache.json"
 
 
 def recreate_after_fork(engine):
@@ -54,13 +57,35 @@ def recreate_after_fork(engine):
     sa.scopedsessionclass = scoped_session(sessionmaker(bind=sa.engine, expire_on_commit=True))
 
 
+def get_engine_pool_options():
+    """
+    Return the keyword arguments of create_engine that configure the pool
+    of database connections, according to the db.* properties.
+
+    If the database is accessed through an external pool (e.g. pgbouncer),
+    connections are not pooled but closed as soon as they are returned.
+    """
+    from sqlalchemy.pool import NullPool
+
+    if get_property('db.external_pool'):
+        return {'poolclass': NullPool}
+
+    return {
+        'pool_size': get_property('db.pool_size'),
+        'max_overflow': get_property('db.max_overflow'),
+        'pool_recycle': get_property('db.pool_recycle'),
+    }
+
+
 def reset_session(config):
     """
     :param config: the configuration of the profile from the
        configuration file
 
     Resets (global) engine and sessionmaker classes, to create a new one
-    (or creates a new one from scratch if not already available)
+    (or creates a new one from scratch if not already available).
+    An existing engine is reused, together with its pooled connections,
+    if it connects to the same database with the same pool options.
     """
     from multiprocessing.util import register_after_fork
 
@@ -68,12 +93,16 @@ def reset_session(config):
         "postgresql://{AIIDADB_USER}:{AIIDADB_PASS}@"
         "{AIIDADB_HOST}{sep}{AIIDADB_PORT}/{AIIDADB_NAME}"
         ).format(sep=':' if config['AIIDADB_PORT'] else '', **config)
+    pool_options = get_engine_pool_options()
+
+    if sa.engine is None or getattr(sa.engine, '_aiida_engine_key', None) != (engine_url, pool_options):
+        sa.engine = create_engine(engine_url, json_serializer=dumps_json,
+                                  json_deserializer=loads_json, **pool_options)
+        sa.engine._aiida_engine_key = (engine_url, pool_options)
+        register_after_fork(sa.engine, recreate_after_fork)
 
-    sa.engine = create_engine(engine_url, json_serializer=dumps_json,
-                              json_deserializer=loads_json)
     sa.scopedsessionclass = scoped_session(sessionmaker(bind=sa.engine,
                                                         expire_on_commit=True))
-    register_after_fork(sa.engine, recreate_after_fork)
 
 
 def load_dbenv(profile=None, connection=None):
@@ -377,8 +406,14 @@ def check_schema_version(force_migration=False, alembic_cfg=None):
         return
 
     # If an alembic configuration file is given then use that one.
+    # The cached result of the check is only valid for the default one.
     if alembic_cfg is None:
+        if is_schema_version_check_cached():
+            return
         alembic_cfg = get_alembic_conf()
+        cache_check = True
+    else:
+        cache_check = False
 
     # Getting the version of the code and the database
     # Reusing the existing engine (initialized by AiiDA)
@@ -387,7 +422,10 @@ def check_schema_version(force_migration=False, alembic_cfg=None):
         code_schema_version = get_migration_head(alembic_cfg)
         db_schema_version = get_db_schema_version(alembic_cfg)
 
-    if code_schema_version != db_schema_version:
+    if code_schema_version == db_schema_version:
+        if cache_check:
+            cache_schema_version_check(db_schema_version)
+    else:
         if db_schema_version is None:
             print("It is time to perform your first SQLAlchemy migration.")
         else:
@@ -401,12 +439,111 @@ def check_schema_version(force_migration=False, alembic_cfg=None):
             with sa.engine.begin() as connection:
                 alembic_cfg.attributes['connection'] = connection
                 command.upgrade(alembic_cfg, "head")
+            if cache_check:
+                cache_schema_version_check(code_schema_version)
         else:
             print("No migration is performed. Exiting since database is out "
                   "of sync with the code.")
             sys.exit(1)
 
 
+def _get_schema_version_cache_path():
+    """
+    Return the path of the file where the results of the schema version checks are cached
+    """
+    import os
+    from aiida.common.setup import get_aiida_dir
+
+    return os.path.join(get_aiida_dir(), SCHEMA_VERSION_CACHE_FILENAME)
+
+
+def _get_migrations_fingerprint():
+    """
+    Return a string identifying the migrations of the code, without loading
+    them: the names of the migration scripts, which start with their revision.
+    """
+    import hashlib
+    import os
+
+    versions_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), ALEMBIC_REL_PATH, 'versions')
+    scripts = sorted(filename for filename in os.listdir(versions_dir)
+                     if filename.endswith('.py') and not filename.startswith('__'))
+    return hashlib.md5('\n'.join(scripts)).hexdigest()
+
+
+def _get_stored_db_schema_version():
+    """
+    Return the schema version stored in the database with a single query,
+    or None if it cannot be read (e.g. before the first migration).
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+
+    try:
+        with sa.engine.begin() as connection:
+            return connection.execute("SELECT version_num FROM alembic_version").scalar()
+    except SQLAlchemyError:
+        return None
+
+
+def _load_schema_version_cache():
+    import json
+
+    try:
+        with open(_get_schema_version_cache_path()) as handle:
+            return json.load(handle)
+    except (IOError, ValueError):
+        return {}
+
+
+def is_schema_version_check_cached():
+    """
+    Return whether a previous check found the schema version of the database of
+    the current profile to match the code, with the same version stored in the
+    database and the same migrations in the code as now.
+    """
+    if not get_property('db.cache_schema_version_check'):
+        return False
+
+    cached = _load_schema_version_cache().get(settings.AIIDADB_PROFILE)
+    if cached is None or cached.get('migrations') != _get_migrations_fingerprint():
+        return False
+
+    db_schema_version = _get_stored_db_schema_version()
+    return db_schema_version is not None and cached.get('schema_version') == db_schema_version
+
+
+def cache_schema_version_check(schema_version):
+    """
+    Remember that the schema version of the database of the current profile
+    matches the code.
+
+    :param schema_version: the schema version of the database and of the code
+    """
+    import json
+    import os
+    import tempfile
+
+    if not get_property('db.cache_schema_version_check') or settings.AIIDADB_PROFILE is None:
+        return
+
+    cache = _load_schema_version_cache()
+    cache[settings.AIIDADB_PROFILE] = {
+        'schema_version': schema_version,
+        'migrations': _get_migrations_fingerprint(),
+    }
+
+    # Replace the file atomically, since many processes may load the database environment at the same time
+    cache_path = _get_schema_version_cache_path()
+    try:
+        handle, temporary_path = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+        with os.fdopen(handle, 'w') as temporary_file:
+            json.dump(cache, temporary_file)
+        os.rename(temporary_path, cache_path)
+    except (IOError, OSError):
+        # The cache is only an optimisation: the check is simply repeated next time
+        pass
+
+
 def get_migration_head(config):
     """
     This function returns the head of the migration scripts.
@@ -526,3 +663,80 @@ def delete_nodes_and_connections_sqla(pks_to_delete):
         raise e
     finally:
         session.close()
+
+
+def set_extra_for_nodes_sqla(key, values):
+    """
+    Set the same extra on many nodes with a single (executemany) UPDATE statement.
+
+    :param key: the key of the extra
+    :param values: a dictionary mapping the pk of each node to the value to set
+    """
+    from sqlalchemy import bindparam, cast, func
+    from sqlalchemy.dialects.postgresql import JSONB
+    from aiida.backends import sqlalchemy as sa
+    from aiida.backends.sqlalchemy.models.node import DbNode
+
+    if not values:
+        return
+
+    table = DbNode.__table__
+    stmt = table.update().where(table.c.id == bindparam('_pk')).values(
+        extras=func.coalesce(table.c.extras, cast('{}', JSONB)).op('||')(bindparam('_extras', type_=JSONB)),
+        nodeversion=table.c.nodeversion + 1,
+    )
+
+    session = sa.get_scoped_session()
+    try:
+        session.execute(stmt, [{'_pk': pk, '_extras': {key: value}} for pk, value in values.iteritems()])
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+def store_nodes_sqla(nodes):
+    """
+    Store many new nodes in a single transaction.
+
+    :param nodes: a list of unstored nodes
+    :return: the list of the pks of the stored nodes
+    """
+    from aiida.backends import sqlalchemy as sa
+
+    session = sa.get_scoped_session()
+    try:
+        for node in nodes:
+            node.store(with_transaction=False, use_cache=False)
+        # Get the pks before committing, which would expire the nodes
+        session.flush()
+        pks = [node.pk for node in nodes]
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return pks
+
+
+class _InsertIgnoringConflicts(Insert):
+    """
+    INSERT statement skipping the rows that would violate a unique constraint (PostgreSQL 9.5+).
+    """
+
+
+@compiles(_InsertIgnoringConflicts, 'postgresql')
+def _compile_insert_ignoring_conflicts(element, compiler, **kw):
+    return compiler.visit_insert(element, **kw) + ' ON CONFLICT DO NOTHING'
+
+
+def insert_from_select_ignoring_conflicts(table, names, select):
+    """
+    Build an ``INSERT INTO table (names) SELECT ... ON CONFLICT DO NOTHING`` statement.
+
+    :param table: the table to insert into
+    :param names: the names of the columns that are filled
+    :param select: a select statement returning one column for each of the given names
+    :return: the insert statement, to be executed by a session or a connection
+    """
+    return _InsertIgnoringConflicts(table).from_select(names, select)
@@ -77,12 +77,15 @@ db_test_list = {
         'cmdline.params.types.plugin': ['aiida.backends.tests.cmdline.params.types.test_plugin'],
         'cmdline.params.types.workflow': ['aiida.backends.tests.cmdline.params.types.test_workflow'],
         'control.computer': ['aiida.backends.tests.control.test_computer_ctrl'],
+        'daemon.autoscaler': ['aiida.backends.tests.daemon.test_autoscaler'],
         'daemon.client': ['aiida.backends.tests.daemon.test_client'],
+        'daemon.execmanager': ['aiida.backends.tests.daemon.test_execmanager'],
         'orm.data.frozendict': ['aiida.backends.tests.orm.data.frozendict'],
         'orm.data.remote': ['aiida.backends.tests.orm.data.remote'],
         'orm.log': ['aiida.backends.tests.orm.log'],
         'orm.mixins': ['aiida.backends.tests.orm.mixins'],
         'orm.utils.loaders': ['aiida.backends.tests.orm.utils.loaders'],
+        'orm.utils.graph': ['aiida.backends.tests.orm.utils.graph'],
         'work.class_loader': ['aiida.backends.tests.work.class_loader'],
         'work.daemon': ['aiida.backends.tests.work.daemon'],
         'work.futures': ['aiida.backends.tests.work.test_futures'],
@@ -65,6 +65,12 @@ class TestBackupScriptUnit(AiidaTestCase):
         '"days_to_backup": null, ' \
         '"backup_dir": "/scratch/./aiida_user////backup//"}'
 
+    _json_test_input_7 = '{"backup_length_threshold": 2, "periodicity": 2,' + \
+        ' "oldest_object_backedup": "2014-07-18 13:54:53.688484+00:00", ' + \
+        '"end_date_of_backup": null, "days_to_backup": null, "backup_dir": ' +\
+        '"/scratch/aiida_user/backupScriptDest", "num_threads": 8, ' + \
+        '"snapshots": true}'
+
     def setUp(self):
         super(TestBackupScriptUnit, self).setUp()
         if not is_dbenv_loaded():
@@ -261,6 +267,169 @@ class TestBackupScriptUnit(AiidaTestCase):
 
         self.check_full_deserialization_serialization(input_string, backup_inst)
 
+    def test_full_deserialization_serialization_5(self):
+        """
+        This method tests the correct deserialization / serialization of the
+        optional variables of the incremental backup.
+        """
+        input_string = self._json_test_input_7
+        backup_inst = self._backup_setup_inst
+
+        self.check_full_deserialization_serialization(input_string, backup_inst)
+
+        self.assertEqual(backup_inst._num_threads, 8)
+        self.assertEqual(backup_inst._snapshots, True)
+
+    def test_incremental_backup(self):
+        """
+        This method tests that only the new or changed directories are copied,
+        and that the unchanged directories are hardlinked in the snapshots.
+        """
+        import logging
+        import os
+        import time
+        from aiida.common.utils import are_dir_trees_equal
+
+        temp_folder = tempfile.mkdtemp()
+        try:
+            repository_path = os.path.join(temp_folder, "repo")
+            relative_dirs = ["repository/node/{}/{}".format(i % 2, i)
+                             for i in range(5)]
+            for relative_dir in relative_dirs:
+                os.makedirs(os.path.join(repository_path, relative_dir, "path"))
+                with open(os.path.join(repository_path, relative_dir, "path",
+                                       "file"), 'w') as f:
+                    f.write(relative_dir)
+
+            backup_inst = self._backup_setup_inst
+            backup_inst._logger.setLevel(logging.WARNING)
+            backup_inst._backup_dir = os.path.join(temp_folder, "backup")
+            backup_inst._num_threads = 2
+            backup_inst._get_repository_path = lambda: repository_path
+            backup_inst._get_query_set_length = len
+            backup_inst._get_query_set_iterator = iter
+            backup_inst._get_source_directory = (
+                lambda item: os.path.join(repository_path, item))
+
+            for snapshots in [None, True]:
+                backup_inst._snapshots = snapshots
+                backup_inst._snapshot_dir = None
+                backup_inst._backup_needed_files([relative_dirs])
+                first_dir = backup_inst._snapshot_dir or backup_inst._backup_dir
+                if snapshots:
+                    # The snapshot is marked as complete at the end of the run
+                    self.assertTrue(first_dir.endswith(
+                        backup_inst.SNAPSHOT_IN_PROGRESS_SUFFIX))
+                    backup_inst._finish_snapshot()
+                    first_dir = first_dir[
+                        :-len(backup_inst.SNAPSHOT_IN_PROGRESS_SUFFIX)]
+                    self.assertIsNone(backup_inst._snapshot_dir)
+                self.assertTrue(are_dir_trees_equal(
+                    os.path.join(repository_path, "repository"),
+                    os.path.join(first_dir, "repository")))
+
+                # Change the file of one directory, with another modification time
+                changed_file = os.path.join(repository_path, relative_dirs[0],
+                                            "path", "file")
+                with open(changed_file, 'w') as f:
+                    f.write("changed {}".format(snapshots))
+                os.utime(changed_file, (time.time() + 10, time.time() + 10))
+                unchanged_file = os.path.join(relative_dirs[1], "path", "file")
+                unchanged_inode = os.stat(
+                    os.path.join(first_dir, unchanged_file)).st_ino
+
+                backup_inst._snapshot_dir = None
+                backup_inst._backup_needed_files([relative_dirs])
+                second_dir = backup_inst._snapshot_dir or backup_inst._backup_dir
+                self.assertTrue(are_dir_trees_equal(
+                    os.path.join(repository_path, "repository"),
+                    os.path.join(second_dir, "repository")))
+                # The unchanged directories were not copied again
+                self.assertEqual(os.stat(
+                    os.path.join(second_dir, unchanged_file)).st_ino,
+                                 unchanged_inode)
+
+            # The previous snapshot was not changed
+            with open(os.path.join(first_dir, relative_dirs[0], "path",
+                                   "file")) as f:
+                self.assertEqual(f.read(), "changed None")
+            self.assertNotEqual(first_dir, second_dir)
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+    def test_interrupted_snapshot(self):
+        """
+        This method tests that the manifest of a snapshot is only written once
+        its directories are copied, so that a snapshot interrupted while
+        copying is not used as the previous snapshot.
+        """
+        import logging
+        import os
+        import mock
+
+        temp_folder = tempfile.mkdtemp()
+        try:
+            repository_path = os.path.join(temp_folder, "repo")
+            relative_dirs = ["repository/node/{}".format(i) for i in range(3)]
+            for relative_dir in relative_dirs:
+                os.makedirs(os.path.join(repository_path, relative_dir))
+
+            backup_inst = self._backup_setup_inst
+            backup_inst._logger.setLevel(logging.WARNING)
+            backup_inst._backup_dir = os.path.join(temp_folder, "backup")
+            backup_inst._snapshots = True
+            backup_inst._get_repository_path = lambda: repository_path
+            backup_inst._get_query_set_length = len
+            backup_inst._get_query_set_iterator = iter
+            backup_inst._get_source_directory = (
+                lambda item: os.path.join(repository_path, item))
+
+            backup_inst._snapshot_dir = None
+            backup_inst._backup_needed_files([relative_dirs])
+            first_dir = backup_inst._snapshot_dir
+            backup_inst._finish_snapshot()
+            first_dir = first_dir[:-len(backup_inst.SNAPSHOT_IN_PROGRESS_SUFFIX)]
+
+            with mock.patch.object(backup_inst, '_backup_directory',
+                                   side_effect=RuntimeError):
+                with self.assertRaises(RuntimeError):
+                    backup_inst._backup_needed_files([relative_dirs])
+            interrupted_dir = backup_inst._snapshot_dir
+            self.assertFalse(os.path.exists(os.path.join(
+                interrupted_dir, backup_inst.MANIFEST_FILENAME)))
+
+            # The next run links the directories of the complete snapshot
+            backup_inst._snapshot_dir = None
+            with mock.patch.object(backup_inst, '_read_manifest',
+                                   wraps=backup_inst._read_manifest) as read:
+                backup_inst._backup_needed_files([relative_dirs])
+            read.assert_called_once_with(first_dir)
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+    def test_backup_directory_error(self):
+        """
+        This method tests that an error removing the previous copy of a
+        directory is returned, and does not stop the backup.
+        """
+        import errno
+        import os
+        import mock
+
+        temp_folder = tempfile.mkdtemp()
+        try:
+            source_dir = os.path.join(temp_folder, "source")
+            destination_dir = os.path.join(temp_folder, "destination")
+            os.mkdir(source_dir)
+            os.mkdir(destination_dir)
+
+            with mock.patch.object(shutil, 'rmtree', side_effect=OSError(errno.EACCES, "Permission denied")):
+                digest, copied, error = self._backup_setup_inst._backup_directory(source_dir, destination_dir, None)
+            self.assertEqual((digest, copied), (None, False))
+            self.assertEqual(error.errno, errno.EACCES)
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
     def test_timezone_addition_and_dir_correction(self):
         """
         This method tests if the timezone is added correctly to timestamps
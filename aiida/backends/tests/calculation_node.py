@@ -90,6 +90,18 @@ class TestCalcNode(AiidaTestCase):
         with self.assertRaises(ModificationNotAllowed):
             a._del_attr('bool')
 
+        # The same holds when setting many attributes at once
+        a._set_attrs({Calculation.PROCESS_STATE_KEY: 'FINISHED'})
+        self.assertEquals(a.get_attr(Calculation.PROCESS_STATE_KEY), 'FINISHED')
+
+        with self.assertRaises(ModificationNotAllowed):
+            a._set_attrs({Calculation.PROCESS_STATE_KEY: 'FINISHED', 'bool': False})
+
+        with self.assertRaises(ModificationNotAllowed):
+            a._set_attrs({Calculation.PROCESS_STATE_KEY: 'FINISHED'}, reset=True)
+
+        self.assertEquals(a.get_attr('bool'), self.boolval)
+
         a.seal()
 
         # After sealing, even updatable attributes should be immutable
@@ -97,4 +109,57 @@ class TestCalcNode(AiidaTestCase):
             a._set_attr(Calculation.PROCESS_STATE_KEY, 'FINISHED')
 
         with self.assertRaises(ModificationNotAllowed):
-            a._del_attr(Calculation.PROCESS_STATE_KEY)
\ No newline at end of file
+            a._set_attrs({Calculation.PROCESS_STATE_KEY: 'FINISHED'})
+
+        with self.assertRaises(ModificationNotAllowed):
+            a._del_attr(Calculation.PROCESS_STATE_KEY)
+
+    def test_process_state_columns(self):
+        """
+        Check that the process state and exit status are mirrored in the columns of the node table
+        """
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.work import ProcessState
+
+        calculation = Calculation()
+        calculation._set_process_state(ProcessState.RUNNING)
+        calculation.store()
+
+        builder = QueryBuilder().append(Calculation, filters={'id': calculation.pk}, project=['process_state'])
+        self.assertEquals(builder.one()[0], ProcessState.RUNNING.value)
+
+        calculation._set_process_state(ProcessState.FINISHED)
+        calculation._set_exit_status(3)
+
+        builder = QueryBuilder().append(Calculation, filters={
+            'process_state': ProcessState.FINISHED.value,
+            'exit_status': {'>': 0}
+        }, project=['id'])
+        self.assertEquals([pk for pk, in builder.all()], [calculation.pk])
+
+        # Deleting the attribute also clears the column
+        calculation._del_attr(Calculation.EXIT_STATUS_KEY)
+        builder = QueryBuilder().append(Calculation, filters={'id': calculation.pk}, project=['exit_status'])
+        self.assertIsNone(builder.one()[0])
+
+    def test_process_state_columns_stale_instance(self):
+        """
+        Check that saving the label of an instance loaded before the process state changed does not revert the columns
+        """
+        from aiida.orm import load_node
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.work import ProcessState
+
+        calculation = Calculation()
+        calculation._set_process_state(ProcessState.RUNNING)
+        calculation.store()
+        stale = load_node(calculation.pk)
+
+        calculation._set_process_state(ProcessState.FINISHED)
+        calculation._set_exit_status(0)
+        stale.label = 'relabelled'
+
+        builder = QueryBuilder().append(Calculation, filters={'id': calculation.pk},
+                                        project=['label', 'process_state', 'exit_status'])
+        self.assertEquals(builder.one(), ['relabelled', ProcessState.FINISHED.value, 0])
+        self.assertEquals(load_node(calculation.pk).process_state, ProcessState.FINISHED)
@@ -827,6 +827,23 @@ class TestVerdiDataStructure(AiidaTestCase, TestVerdiDataListable,
                 'The string "Usage: " was not found in the output'
                 ' of verdi data show --help')
 
+    def test_dedupe(self):
+        from aiida.orm.group import Group
+
+        # The BaTiO3 structure of the class, with the origin on the Ti site
+        alat = 4.
+        struc = StructureData(cell=[[alat, 0., 0.], [0., alat, 0.], [0., 0., alat]])
+        struc.append_atom(position=(0., 0., 0.), symbols='Ti')
+        struc.append_atom(position=(alat / 2., alat / 2., alat / 2.), symbols='Ba')
+        struc.append_atom(position=(0., 0., alat / 2.), symbols='O')
+        struc.append_atom(position=(0., alat / 2., 0.), symbols='O')
+        struc.append_atom(position=(alat / 2., 0., 0.), symbols='O')
+        struc.store()
+
+        res = self.cli_runner.invoke(cmd_structure.dedupe, ['-G', 'structure_duplicates'], catch_exceptions=False)
+        self.assertIn('{}: {}'.format(self.ids[TestVerdiDataListable.NODE_ID_STR], struc.pk), res.output_bytes)
+        self.assertEquals([node.pk for node in Group.get(name='structure_duplicates').nodes], [struc.pk])
+
     def test_list(self):
         self.data_listing_test(StructureData, 'BaO3Ti', self.ids)
 
@@ -948,6 +965,34 @@ class TestVerdiDataCif(AiidaTestCase, TestVerdiDataListable,
                 'The string "imported uuid" was not found in the output'
                 ' of verdi data import.')
 
+    def test_import_bulk(self):
+        folder = tempfile.mkdtemp()
+        try:
+            os.mkdir(os.path.join(folder, 'sub'))
+            # Two identical files, a new one and one that cannot be parsed
+            for filename, content in [('first.cif', self.valid_sample_cif_str),
+                                      (os.path.join('sub', 'same.CIF'), self.valid_sample_cif_str),
+                                      ('other.cif', self.valid_sample_cif_str.replace('C O2', 'C2 O4')),
+                                      ('broken.cif', 'data_broken\nloop_\n_a\n_b\n1\n'), ('ignored.txt', '')]:
+                with open(os.path.join(folder, filename), 'w') as handle:
+                    handle.write(content)
+
+            for options in [[], ['--parallel', '2', '--batch-size', '1']]:
+                res = self.cli_runner.invoke(cmd_cif.import_bulk, [folder, '--group', 'bulk_cifs'] + options,
+                                             catch_exceptions=False)
+                self.assertIn('CIF files found: 4', res.output_bytes)
+                self.assertIn('Failed: 1', res.output_bytes)
+                self.assertIn('broken.cif', res.output_bytes)
+
+            group = Group.get(name='bulk_cifs')
+            nodes = list(group.nodes)
+            self.assertEquals(len(nodes), 2)
+            self.assertEquals(sorted(node.get_formulae()[0] for node in nodes), ['C O2', 'C2 O4'])
+            # The file identical to the node of the setup is not imported again
+            self.assertIn(self.ids[TestVerdiDataListable.NODE_ID_STR], [node.pk for node in nodes])
+        finally:
+            shutil.rmtree(folder)
+
     def test_export(self):
         """
         This method checks if the Cif export works as expected with all
@@ -999,6 +1044,17 @@ class TestVerdiDataUpf(AiidaTestCase):
                                          catch_exceptions=False)
 
 
+    def test_uploadfamily_parallel(self):
+        options = [self.this_folder+'/'+self.pseudos_dir,
+                "test_group_parallel",
+                "test description",
+                "--parallel", "2"]
+        res = self.cli_runner.invoke(cmd_upf.uploadfamily, options,
+                                     catch_exceptions=False)
+        self.assertIn('UPF files found: 3', res.output_bytes)
+        self.assertEquals(len(list(Group.get(name="test_group_parallel").nodes)), 3)
+
+
     def test_exportfamilyhelp(self):
         output = sp.check_output(['verdi', 'data', 'upf', 'exportfamily', '--help'])
         self.assertIn(
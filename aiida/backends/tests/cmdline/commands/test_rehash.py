@@ -97,3 +97,40 @@ class TestVerdiRehash(AiidaTestCase):
         options = ['-e', 'aiida.data.structure']
         result = self.runner.invoke(cmd_rehash.rehash, options)
         self.assertIsNotNone(result.exception)
+
+    def test_rehash_checkpoint(self):
+        """Rehashing with a checkpoint stores the hashes and the last pk, and resuming skips the processed nodes."""
+        import os
+        import tempfile
+        from aiida.orm import load_node
+        from aiida.utils.rehash import read_checkpoint
+
+        self.node_int.clear_hash()
+        handle, checkpoint = tempfile.mkstemp()
+        os.close(handle)
+        os.remove(checkpoint)
+        try:
+            options = ['-b', '2', '-c', checkpoint]
+            result = self.runner.invoke(cmd_rehash.rehash, options)
+            self.assertIsNone(result.exception)
+            self.assertTrue('5 nodes re-hashed' in result.output)
+
+            node = load_node(self.node_int.pk)
+            self.assertEqual(node.get_extra('_aiida_hash'), node.get_hash())
+            self.assertEqual(read_checkpoint(checkpoint), max(
+                n.pk for n in (self.node_base, self.node_bool_true, self.node_bool_false, self.node_float,
+                               self.node_int)))
+
+            # All nodes were processed, so the resumed run has nothing left to do
+            result = self.runner.invoke(cmd_rehash.rehash, options)
+            self.assertIsNone(result.exception)
+            self.assertTrue('0 nodes re-hashed' in result.output)
+
+            # The checkpoint cannot resume the rehashing of another selection of nodes
+            for other_options in (['-e', 'aiida.data:bool'], [str(self.node_int.pk)]):
+                result = self.runner.invoke(cmd_rehash.rehash, options + other_options)
+                self.assertIsNotNone(result.exception)
+                self.assertTrue('another selection' in result.output)
+        finally:
+            if os.path.exists(checkpoint):
+                os.remove(checkpoint)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from aiida.backends.testbase import AiidaTestCase
+from aiida.daemon.autoscaler import DaemonAutoscaler, compute_target_workers
+
+
+class FakeAutoscaler(DaemonAutoscaler):
+    """
+    Autoscaler that manages a fake list of workers instead of those of circus, and receives no messages over RMQ
+    """
+
+    def __init__(self, **kwargs):
+        super(FakeAutoscaler, self).__init__(client=object(), tasks_per_worker=10, drain_timeout=3600, **kwargs)
+        self.queue_depth = 0
+        self.workers = []
+        self.active = {}
+        self.drained = set()
+        self._next_pid = 100
+        self.increase_workers(1)
+
+    def get_worker_pids(self):
+        return list(self.workers)
+
+    def get_queue_depth(self):
+        return self.queue_depth
+
+    def get_worker_status(self, pid):
+        return {'active_processes': self.active.get(pid, 0), 'draining': pid in self.drained}
+
+    def increase_workers(self, number):
+        for _ in range(number):
+            self.workers.append(self._next_pid)
+            self._next_pid += 1
+
+    def decrease_workers(self, number):
+        # Circus stops the oldest workers
+        for pid in self.workers[:number]:
+            self.drained.discard(pid)
+        self.workers = self.workers[number:]
+
+    def drain_worker(self, pid):
+        self.drained.add(pid)
+
+    def resume_worker(self, pid):
+        self.drained.discard(pid)
+
+
+class TestDaemonAutoscaler(AiidaTestCase):
+
+    def test_compute_target_workers(self):
+        self.assertEquals(compute_target_workers(0, 0, 20, 1, 4), 1)
+        self.assertEquals(compute_target_workers(21, 0, 20, 1, 4), 2)
+        self.assertEquals(compute_target_workers(10, 30, 20, 1, 4), 2)
+        self.assertEquals(compute_target_workers(1000, 0, 20, 1, 4), 4)
+        self.assertEquals(compute_target_workers(0, 0, 20, 0, 4), 0)
+
+    def test_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            FakeAutoscaler(min_workers=3, max_workers=2)
+
+    def test_scale_up_and_down(self):
+        autoscaler = FakeAutoscaler(min_workers=1, max_workers=3)
+
+        # A burst of tasks: scale up immediately, within the bounds
+        autoscaler.queue_depth = 100
+        self.assertEquals(autoscaler.tick(), 2)
+        self.assertEquals(autoscaler.workers, [100, 101, 102])
+
+        # The tasks are taken by the workers, which stay busy
+        autoscaler.queue_depth = 0
+        autoscaler.active = {100: 10, 101: 10, 102: 5}
+        self.assertEquals(autoscaler.tick(), 0)
+
+        # The load decreases: the oldest worker is drained only after a few intervals
+        autoscaler.active = {100: 2, 101: 3, 102: 5}
+        for _ in range(DaemonAutoscaler._SCALE_DOWN_INTERVALS - 1):  # pylint: disable=protected-access
+            self.assertEquals(autoscaler.tick(), 0)
+        self.assertEquals(autoscaler.tick(), -2)
+        self.assertEquals(autoscaler.drained, {100, 101})
+        self.assertEquals(autoscaler.workers, [100, 101, 102])
+
+        # The draining workers are not stopped while they have active processes
+        autoscaler.active = {100: 1, 101: 0, 102: 5}
+        autoscaler.tick()
+        self.assertEquals(autoscaler.workers, [100, 101, 102])
+
+        # Once they are idle, they are stopped
+        autoscaler.active = {100: 0, 101: 0, 102: 5}
+        autoscaler.tick()
+        self.assertEquals(autoscaler.workers, [102])
+        self.assertEquals(autoscaler.drained, set())
+
+    def test_resume_draining_workers(self):
+        autoscaler = FakeAutoscaler(min_workers=1, max_workers=3)
+        autoscaler.queue_depth = 30
+        autoscaler.tick()
+        self.assertEquals(autoscaler.workers, [100, 101, 102])
+
+        autoscaler.queue_depth = 0
+        autoscaler.active = {100: 1, 101: 1, 102: 1}
+        for _ in range(DaemonAutoscaler._SCALE_DOWN_INTERVALS):  # pylint: disable=protected-access
+            autoscaler.tick()
+        self.assertEquals(autoscaler.drained, {100, 101})
+
+        # A new burst resumes the youngest draining worker before starting new ones
+        autoscaler.queue_depth = 10
+        self.assertEquals(autoscaler.tick(), 1)
+        self.assertEquals(autoscaler.drained, {100})
+        self.assertEquals(autoscaler.workers, [100, 101, 102])
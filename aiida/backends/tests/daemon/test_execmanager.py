@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+import json
+import os
+import shutil
+import tempfile
+
+import mock
+
+from aiida.backends.testbase import AiidaTestCase
+from aiida.common.exceptions import RemoteOperationError
+from aiida.common.folders import Folder
+from aiida.daemon import execmanager
+from aiida.scheduler import SchedulerError
+from aiida.scheduler.datastructures import JobInfo, JobTemplate, JOB_STATES
+from aiida.scheduler.plugins.slurm import SlurmScheduler
+from aiida.transport.plugins.local import LocalTransport
+
+
+class FakeScheduler(SlurmScheduler):
+    """
+    Slurm scheduler that records the submitted scripts and killed jobs instead of running sbatch and scancel,
+    and whose last job is running until it is set as finished
+    """
+
+    def __init__(self):
+        super(FakeScheduler, self).__init__()
+        self.submitted = []
+        self.killed = []
+        self.finished = False
+
+    def submit_from_script(self, working_directory, submit_script):
+        self.submitted.append((working_directory, submit_script))
+        return str(len(self.submitted))
+
+    def getJobs(self, jobs=None, user=None, as_dict=False):
+        if self.finished:
+            return {}
+        job_id = str(len(self.submitted))
+        info = JobInfo()
+        info.job_id = job_id
+        info.job_state = JOB_STATES.RUNNING
+        return {job_id: info}
+
+    def get_detailed_jobinfo(self, jobid):
+        return ''
+
+    def kill(self, jobid):
+        self.killed.append(jobid)
+        return True
+
+
+class FakeComputer(object):
+    """
+    Computer with a FakeScheduler and the given submit mode
+    """
+
+    def __init__(self, submit_mode='single', bundle_options=None):
+        self.uuid = 'fake-computer'
+        self.name = 'fake'
+        self.scheduler = FakeScheduler()
+        self.submit_mode = submit_mode
+        self.bundle_options = bundle_options or {}
+
+    def is_enabled(self):
+        return True
+
+    def get_scheduler(self):
+        return self.scheduler
+
+    def get_submit_mode(self):
+        return self.submit_mode
+
+    def get_bundle_options(self):
+        return self.bundle_options
+
+
+class FakeCalculation(object):
+    """
+    Job calculation whose working directory already exists, uploaded by fake_upload_calculation
+    """
+
+    def __init__(self, pk, computer, workdir):
+        self.pk = pk
+        self.computer = computer
+        self.job_id = None
+        self.scheduler_state = None
+        self.retrieve_list = None
+        self.remote_workdir = None
+        self.uploads = 0
+        self.resources = {'num_machines': 1, 'num_mpiprocs_per_machine': 1}
+        self.job_tmpl = JobTemplate()
+        self.job_tmpl.job_resource = computer.scheduler.create_job_resource(**self.resources)
+        self.job_tmpl.working_directory = workdir
+        self.job_tmpl.max_wallclock_seconds = 600
+
+    def get_computer(self):
+        return self.computer
+
+    def get_job_id(self):
+        return self.job_id
+
+    def _set_job_id(self, job_id):
+        self.job_id = job_id
+
+    def get_resources(self, full=False):
+        return self.resources
+
+    def _get_remote_workdir(self):
+        return self.remote_workdir
+
+    @property
+    def _raw_input_folder(self):
+        return Folder(self.job_tmpl.working_directory)
+
+    def _get_retrieve_list(self):
+        return self.retrieve_list
+
+    def _set_retrieve_list(self, retrieve_list):
+        self.retrieve_list = retrieve_list
+
+    def _set_scheduler_state(self, state):
+        self.scheduler_state = state
+
+    def _set_last_jobinfo(self, job_info):
+        pass
+
+    def _get_last_jobinfo(self):
+        return None
+
+
+def fake_upload_calculation(calculation, transport):
+    # The job template is serialized in the raw input folder, as by JobCalculation._presubmit
+    os.mkdir(os.path.join(calculation.job_tmpl.working_directory, '.aiida'))
+    with open(os.path.join(calculation.job_tmpl.working_directory, '.aiida', 'job_tmpl.json'), 'w') as handle:
+        json.dump(calculation.job_tmpl, handle)
+    calculation.remote_workdir = calculation.job_tmpl.working_directory
+    calculation.uploads += 1
+    return '_aiidasubmit.sh', calculation.job_tmpl
+
+
+@mock.patch.object(execmanager, 'upload_calculation', fake_upload_calculation)
+class TestSubmitCalculations(AiidaTestCase):
+    """
+    Test the submission of the calculations that are ready at the same time, according to the submit mode
+    """
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.transport = LocalTransport()
+        self.transport.open()
+
+    def tearDown(self):
+        self.transport.close()
+        shutil.rmtree(self.workdir)
+
+    def get_calculations(self, computer, number):
+        calculations = []
+        for index in range(number):
+            workdir = os.path.join(self.workdir, str(index))
+            os.mkdir(workdir)
+            calculations.append(FakeCalculation(index, computer, workdir))
+        return calculations
+
+    def test_single(self):
+        computer = FakeComputer('single')
+        calculations = self.get_calculations(computer, 3)
+
+        execmanager.submit_calculations(calculations, self.transport)
+
+        self.assertEqual([calculation.job_id for calculation in calculations], ['1', '2', '3'])
+        self.assertEqual([script for _, script in computer.scheduler.submitted], ['_aiidasubmit.sh'] * 3)
+
+    def test_array(self):
+        computer = FakeComputer('array')
+        calculations = self.get_calculations(computer, 3)
+
+        execmanager.submit_calculations(calculations, self.transport)
+
+        # The array is submitted from the working directory of the first calculation
+        self.assertEqual(computer.scheduler.submitted, [(calculations[0].job_tmpl.working_directory,
+                                                         execmanager._ARRAY_SCRIPT_FILENAME)])
+        self.assertEqual([calculation.job_id for calculation in calculations], ['1_0', '1_1', '1_2'])
+        with open(os.path.join(calculations[0].job_tmpl.working_directory,
+                               execmanager._ARRAY_SCRIPT_FILENAME)) as handle:
+            script = handle.read()
+        for calculation in calculations:
+            self.assertIn(calculation.job_tmpl.working_directory, script)
+
+    def test_array_incompatible(self):
+        """
+        Test that the calculations that request different resources are not in the same array
+        """
+        computer = FakeComputer('array')
+        calculations = self.get_calculations(computer, 3)
+        calculations[1].job_tmpl.job_resource = computer.scheduler.create_job_resource(
+            num_machines=1, num_mpiprocs_per_machine=2)
+
+        execmanager.submit_calculations(calculations, self.transport)
+
+        self.assertEqual([calculation.job_id for calculation in calculations], ['1_0', '2', '1_1'])
+
+    def test_array_submission_failed(self):
+        """
+        Test that the calculations uploaded by a submission that failed are not uploaded again by the next one
+        """
+        computer = FakeComputer('array')
+        calculations = self.get_calculations(computer, 3)
+
+        with mock.patch.object(computer.scheduler, 'submit_from_script', side_effect=SchedulerError):
+            with self.assertRaises(SchedulerError):
+                execmanager.submit_calculations(calculations, self.transport)
+        self.assertEqual([calculation.job_id for calculation in calculations], [None] * 3)
+
+        execmanager.submit_calculations(calculations, self.transport)
+
+        self.assertEqual([calculation.uploads for calculation in calculations], [1] * 3)
+        self.assertEqual([calculation.job_id for calculation in calculations], ['1_0', '1_1', '1_2'])
+
+    def test_bundle(self):
+        computer = FakeComputer('bundle', {'resources': {'num_machines': 1, 'num_mpiprocs_per_machine': 2}})
+        calculations = self.get_calculations(computer, 3)
+        calculations[1].retrieve_list = ['aiida.out']
+
+        execmanager.submit_calculations(calculations, self.transport)
+
+        self.assertEqual(computer.scheduler.submitted, [(calculations[0].job_tmpl.working_directory,
+                                                         execmanager._BUNDLE_SCRIPT_FILENAME)])
+        self.assertEqual([calculation.job_id for calculation in calculations], ['1'] * 3)
+        # The status file is retrieved also if the calculation had no retrieve list
+        self.assertEqual(calculations[0].retrieve_list, [execmanager.BUNDLE_STATUS_FILENAME])
+        self.assertEqual(calculations[1].retrieve_list, ['aiida.out', execmanager.BUNDLE_STATUS_FILENAME])
+
+    def test_single_calculation_not_bundled(self):
+        computer = FakeComputer('bundle', {'resources': {'num_machines': 1, 'num_mpiprocs_per_machine': 2}})
+        calculations = self.get_calculations(computer, 1)
+
+        execmanager.submit_calculations(calculations, self.transport)
+
+        self.assertEqual(computer.scheduler.submitted, [(calculations[0].job_tmpl.working_directory,
+                                                         '_aiidasubmit.sh')])
+        self.assertIs(calculations[0].retrieve_list, None)
+
+    def test_update_bundled_calculation(self):
+        """
+        Test that a calculation of a bundle is done as soon as it recorded its end time, while the bundle still runs
+        """
+        computer = FakeComputer('bundle', {'resources': {'num_machines': 1, 'num_mpiprocs_per_machine': 2}})
+        calculations = self.get_calculations(computer, 2)
+        execmanager.submit_calculations(calculations, self.transport)
+
+        self.assertFalse(execmanager.update_calculation(calculations[0], self.transport))
+
+        status_path = os.path.join(calculations[0].job_tmpl.working_directory, execmanager.BUNDLE_STATUS_FILENAME)
+        with open(status_path, 'w') as handle:
+            handle.write('start_time=100\n')
+        self.assertFalse(execmanager.update_calculation(calculations[0], self.transport))
+        self.assertEqual(calculations[0].scheduler_state, JOB_STATES.RUNNING)
+
+        with open(status_path, 'a') as handle:
+            handle.write('exit_status=0\nend_time=160\n')
+        self.assertTrue(execmanager.update_calculation(calculations[0], self.transport))
+        self.assertEqual(calculations[0].scheduler_state, JOB_STATES.DONE)
+        self.assertFalse(execmanager.update_calculation(calculations[1], self.transport))
+
+    def test_update_interrupted_bundled_calculation(self):
+        """
+        Test that a calculation of a bundle that did not record its end time when the bundle ended is not done
+        """
+        computer = FakeComputer('bundle', {'resources': {'num_machines': 1, 'num_mpiprocs_per_machine': 2}})
+        calculations = self.get_calculations(computer, 2)
+        execmanager.submit_calculations(calculations, self.transport)
+
+        for calculation, status in zip(calculations, ['start_time=100\nexit_status=0\nend_time=160\n',
+                                                      'start_time=100\n']):
+            with open(os.path.join(calculation.job_tmpl.working_directory,
+                                   execmanager.BUNDLE_STATUS_FILENAME), 'w') as handle:
+                handle.write(status)
+        computer.scheduler.finished = True
+
+        self.assertTrue(execmanager.update_calculation(calculations[0], self.transport))
+        self.assertEqual(calculations[0].scheduler_state, JOB_STATES.DONE)
+        with self.assertRaises(RemoteOperationError):
+            execmanager.update_calculation(calculations[1], self.transport)
+        self.assertIsNot(calculations[1].scheduler_state, JOB_STATES.DONE)
+
+    def test_kill_bundled_calculation(self):
+        """
+        Test that killing a calculation of a bundle does not kill the bundle job
+        """
+        computer = FakeComputer('bundle', {'resources': {'num_machines': 1, 'num_mpiprocs_per_machine': 2}})
+        calculations = self.get_calculations(computer, 2)
+        execmanager.submit_calculations(calculations, self.transport)
+
+        execmanager.kill_calculation(calculations[0], self.transport)
+
+        self.assertEqual(computer.scheduler.killed, [])
+        self.assertEqual(calculations[0].scheduler_state, JOB_STATES.DONE)
+        self.assertEqual([os.path.exists(os.path.join(calculation.job_tmpl.working_directory,
+                                                      execmanager.BUNDLE_KILL_FILENAME))
+                          for calculation in calculations], [True, False])
+
+    def test_parse_bundle_status(self):
+        self.assertEqual(execmanager.parse_bundle_status('start_time=100\nexit_status=1\nend_time=160\n'),
+                         {'start_time': 100, 'exit_status': 1, 'end_time': 160})
+        self.assertEqual(execmanager.parse_bundle_status('start_time=100\nexit_status=\n'), {'start_time': 100})
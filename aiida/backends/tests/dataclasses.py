@@ -139,6 +139,56 @@ class TestSinglefileData(AiidaTestCase):
             self.assertEquals(f.read(), file_content)
 
 
+class TestParameterData(AiidaTestCase):
+    """
+    Test the ParameterData class.
+    """
+
+    def test_set_and_update_dict(self):
+        from aiida.common.exceptions import ValidationError
+        from aiida.orm.data.base import Int
+        from aiida.orm.data.parameter import ParameterData
+
+        params = ParameterData(dict={'a': 1, 'b': [1, 2]})
+        params.update_dict({'b': Int(3), 'c': {'d': 4}})
+        self.assertEquals(params.get_dict(), {'a': 1, 'b': 3, 'c': {'d': 4}})
+
+        params.set_dict({'e': 5})
+        self.assertEquals(params.get_dict(), {'e': 5})
+
+        # An invalid key leaves the dictionary unchanged
+        for method in [params.set_dict, params.update_dict]:
+            with self.assertRaises(ValidationError):
+                method({'f': 6, 'g.h': 7})
+            self.assertEquals(params.get_dict(), {'e': 5})
+
+    def test_stored(self):
+        from aiida.common.exceptions import ModificationNotAllowed
+        from aiida.orm.data.parameter import ParameterData
+
+        params = ParameterData(dict={'a': 1, 'b': {'c': 2}}).store()
+        with self.assertRaises(ModificationNotAllowed):
+            params.set_dict({'a': 2})
+        with self.assertRaises(ModificationNotAllowed):
+            params.update_dict({'a': 2})
+
+        # The snapshot is returned as a copy, also of the nested values
+        dictionary = params.get_dict()
+        dictionary['a'] = 3
+        dictionary['b']['c'] = 3
+        self.assertEquals(params.get_dict(), {'a': 1, 'b': {'c': 2}})
+        self.assertEquals(load_node(params.pk).get_dict(), {'a': 1, 'b': {'c': 2}})
+
+        # The snapshot is discarded when the attributes change
+        params._set_attr('d', 4, stored_check=False)
+        self.assertEquals(params.get_dict(), {'a': 1, 'b': {'c': 2}, 'd': 4})
+        params._set_attrs({'a': 5}, stored_check=False)
+        self.assertEquals(params.get_dict(), {'a': 5, 'b': {'c': 2}, 'd': 4})
+        params._set_attrs({'e': 6}, stored_check=False, reset=True)
+        self.assertEquals(params.get_dict(), {'e': 6})
+        self.assertEquals(load_node(params.pk).get_dict(), {'e': 6})
+
+
 class TestCifData(AiidaTestCase):
     """
     Tests for CifData class.
@@ -833,6 +883,61 @@ _tag   {}
             self.assertIsNot(lazy._values, None)
 
 
+    @unittest.skipIf(not has_pycifrw(), "Unable to import PyCifRW")
+    def test_metadata_attributes(self):
+        """
+        Test that the metadata is stored in the attributes, read without parsing and usable in queries.
+        """
+        import tempfile
+        from aiida.orm import load_node
+        from aiida.orm.data.cif import CifData
+        from aiida.orm.querybuilder import QueryBuilder
+
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(self.valid_sample_cif_str)
+            f.flush()
+
+            eager = CifData(file=f.name).store()
+
+            # the first parse of an unstored lazy node sets the metadata
+            lazy = CifData(file=f.name, parse_policy='lazy')
+            self.assertIs(lazy.get_attr('attached_hydrogens'), None)
+            self.assertEquals(lazy.has_attached_hydrogens, False)
+            self.assertIsNot(lazy._values, None)
+            lazy.store()
+
+            never_parsed = CifData(file=f.name, parse_policy='lazy').store()
+
+        for node in [eager, lazy]:
+            loaded = load_node(node.pk)
+            self.assertEquals(loaded.get_formulae(), ['C O2'])
+            self.assertEquals(loaded.get_spacegroup_numbers(), [None])
+            self.assertEquals(loaded.has_partial_occupancies, False)
+            self.assertEquals(loaded.has_attached_hydrogens, False)
+            # this should not parse the cif
+            self.assertIs(loaded._values, None)
+
+        loaded = load_node(never_parsed.pk)
+        self.assertEquals(loaded.get_formulae(), ['C O2'])
+        self.assertIsNot(loaded._values, None)
+
+        builder = QueryBuilder()
+        builder.append(CifData, filters={'attributes.attached_hydrogens': False}, project=['id'])
+        self.assertEquals(sorted(pk for pk, in builder.all()), sorted([eager.pk, lazy.pk]))
+
+    def test_partial_occupancies_placeholders(self):
+        """
+        Test that the unknown and inapplicable occupancies are not partial occupancies.
+        """
+        from aiida.orm.data.cif import get_partial_occupancies_from_values
+
+        def get_values(occupancies):
+            return {'block': {'_atom_site_occupancy': occupancies}}
+
+        self.assertEquals(get_partial_occupancies_from_values(get_values(['1.0', '?', '.'])), False)
+        self.assertEquals(get_partial_occupancies_from_values(get_values(['1.000(2)', '.'])), False)
+        self.assertEquals(get_partial_occupancies_from_values(get_values(['?', '0.5(1)'])), True)
+
     @unittest.skipIf(not has_pycifrw(), "Unable to import PyCifRW")
     def test_set_file(self):
         """
@@ -875,6 +980,111 @@ _tag   {}
 
         self.assertNotEquals(f1, f2)
 
+
+class TestUpfFamily(AiidaTestCase):
+    """
+    Test the lookup of the pseudos of a UpfFamily.
+    """
+
+    def setUp(self):
+        import os
+        import aiida
+        from aiida.orm.data.upf import upload_upf_family, clear_family_index_cache
+
+        clear_family_index_cache()
+        self.pseudos_dir = os.path.join(os.path.split(aiida.__file__)[0], os.pardir, 'examples', 'testdata',
+                                        'qepseudos')
+        self.family_name = 'test_family_{}'.format(self.id())
+        upload_upf_family(self.pseudos_dir, self.family_name, 'test family', stop_if_existing=False)
+
+    def get_structure(self, symbols):
+        from aiida.orm.data.structure import StructureData
+
+        structure = StructureData(cell=((4., 0., 0.), (0., 4., 0.), (0., 0., 4.)))
+        for index, symbol in enumerate(symbols):
+            structure.append_atom(position=(index, index, index), symbols=symbol, name='{}{}'.format(symbol, index))
+        return structure
+
+    def test_get_pseudos(self):
+        from aiida.orm.data.upf import get_pseudos_from_structure, get_pseudos_dict, get_family_index, UpfData
+
+        _, index = get_family_index(self.family_name)
+        self.assertEquals(sorted(index.keys()), ['Ba', 'O', 'Ti'])
+
+        pseudos = get_pseudos_from_structure(self.get_structure(['Ba', 'Ti', 'O', 'O']), self.family_name)
+        self.assertEquals(sorted(pseudos.keys()), ['Ba0', 'O2', 'O3', 'Ti1'])
+        for kind_name, pseudo in pseudos.iteritems():
+            self.assertIsInstance(pseudo, UpfData)
+            self.assertEquals(pseudo.element, kind_name[:-1])
+            self.assertEquals(pseudo.pk, index[pseudo.element])
+        self.assertEquals(pseudos['O2'].pk, pseudos['O3'].pk)
+
+        self.assertEquals({kind: pseudo.pk for kind, pseudo in pseudos.iteritems()},
+                          {kind: pseudo.pk for kind, pseudo in get_pseudos_dict(
+                              self.get_structure(['Ba', 'Ti', 'O', 'O']), self.family_name).iteritems()})
+
+    def test_membership_changes(self):
+        from aiida.common.exceptions import NotExistent, MultipleObjectsError
+        from aiida.orm.data.upf import get_pseudos_from_structure, get_family_index, UpfData
+
+        family = UpfData.get_upf_group(self.family_name)
+        structure = self.get_structure(['Ba', 'O'])
+        oxygen = get_pseudos_from_structure(structure, self.family_name)['O1']
+
+        # Removing a pseudo invalidates the index
+        family.remove_nodes(oxygen)
+        self.assertNotIn('O', get_family_index(self.family_name)[1])
+        with self.assertRaises(NotExistent):
+            get_pseudos_from_structure(structure, self.family_name)
+
+        family.add_nodes(oxygen)
+        self.assertEquals(get_pseudos_from_structure(structure, self.family_name)['O1'].pk, oxygen.pk)
+
+        # A second pseudo for the same element
+        other = UpfData(file=oxygen.get_file_abs_path())
+        other.store()
+        family.add_nodes(other)
+        with self.assertRaises(MultipleObjectsError):
+            get_pseudos_from_structure(structure, self.family_name)
+
+    def test_stale_index(self):
+        from aiida.orm.data.parameter import ParameterData
+        from aiida.orm.data.upf import get_pseudos_from_structure, get_family_index
+        from aiida.orm.data.upf import _family_index_cache
+
+        structure = self.get_structure(['Ti'])
+        titanium = get_pseudos_from_structure(structure, self.family_name)['Ti0']
+        family_pk, index = get_family_index(self.family_name)
+
+        # The changes that were not made in this process are detected when an element is missing,
+        # or when the pseudo of an element is not in the family anymore
+        _family_index_cache[self.family_name] = (family_pk, {})
+        self.assertEquals(get_pseudos_from_structure(structure, self.family_name)['Ti0'].pk, titanium.pk)
+
+        _family_index_cache[self.family_name] = (family_pk, dict(index, Ti=ParameterData().store().pk))
+        self.assertEquals(get_pseudos_from_structure(structure, self.family_name)['Ti0'].pk, titanium.pk)
+        self.assertEquals(get_family_index(self.family_name)[1], index)
+
+    def test_create_node_from_parsed_file(self):
+        import os
+        from aiida.common.exceptions import ValidationError
+        from aiida.orm.data.upf import UpfData
+        from aiida.utils import ingest
+
+        filename = os.path.join(self.pseudos_dir, sorted(os.listdir(self.pseudos_dir))[0])
+        parsed = ingest.parse_file((ingest.UPF, filename))
+        node = ingest.create_node(UpfData, parsed)
+        self.assertEquals(node.element, parsed.attributes['element'])
+        self.assertEquals(node.md5sum, parsed.md5)
+        node.store()
+        self.assertEquals(node.md5sum, parsed.md5)
+
+        # The md5 computed by the worker is still validated when the node is stored
+        node = ingest.create_node(UpfData, parsed._replace(md5='0' * 32))
+        with self.assertRaises(ValidationError):
+            node.store()
+
+
 class TestKindValidSymbols(AiidaTestCase):
     """
     Tests the symbol validation of the
@@ -2166,6 +2376,70 @@ class TestStructureDataLock(AiidaTestCase):
         b.pbc = [True, True, True]
 
 
+class TestStructureDataEquivalence(AiidaTestCase):
+    """
+    Tests the fingerprints of the structures and the search of the equivalent structures.
+    """
+
+    @staticmethod
+    def get_structure(cell, positions, symbols):
+        from aiida.orm.data.structure import StructureData
+
+        structure = StructureData(cell=cell)
+        for position, symbol in zip(positions, symbols):
+            structure.append_atom(position=position, symbols=symbol)
+        return structure
+
+    def test_find_equivalent(self):
+        """
+        A structure in another cell and with another origin is equivalent, a distorted one is not.
+        """
+        import numpy as np
+        from aiida.orm.data.structure import FINGERPRINT_EXTRA_KEY
+
+        cell = np.array([[4.1, 0.3, 0.2], [0.7, 5.3, 0.1], [0.4, 0.9, 6.2]])
+        fractional = np.array([[0., 0., 0.], [0.45, 0.5, 0.55], [0.5, 0.5, 0.], [0.5, 0., 0.5], [0., 0.5, 0.5]])
+        symbols = ['Ba', 'Ti', 'O', 'O', 'O']
+
+        original = self.get_structure(cell, fractional.dot(cell), symbols).store()
+
+        other_cell = np.array([[1, 1, 0], [0, 1, 0], [0, 1, 1]]).dot(cell)
+        shifted_positions = ((fractional + 0.2) % 1.).dot(cell) + np.arange(5)[:, np.newaxis] * 1e-3
+        shifted = self.get_structure(other_cell, shifted_positions[::-1], symbols[::-1])
+        shifted.store()
+
+        distorted_fractional = fractional.copy()
+        distorted_fractional[1] += 0.1
+        distorted = self.get_structure(cell, distorted_fractional.dot(cell), symbols).store()
+
+        self.assertEquals(original.get_extra(FINGERPRINT_EXTRA_KEY), original.get_fingerprint())
+        self.assertEquals(original.get_fingerprint(), shifted.get_fingerprint())
+        self.assertTrue(original.is_equivalent(shifted))
+        self.assertFalse(original.is_equivalent(distorted))
+
+        self.assertEquals([node.pk for node in original.find_equivalent()], [shifted.pk])
+        self.assertEquals([node.pk for node in distorted.find_equivalent()], [])
+        unstored = self.get_structure(cell, fractional.dot(cell), symbols)
+        self.assertEquals([node.pk for node in unstored.find_equivalent()], [original.pk, shifted.pk])
+        self.assertEquals([node.pk for node in original.find_equivalent(length_tolerance=1e-4)], [])
+
+    def test_not_periodic(self):
+        """
+        Structures that are not periodic in three dimensions have no fingerprint and cannot be compared.
+        """
+        import numpy as np
+        from aiida.orm.data.structure import FINGERPRINT_EXTRA_KEY
+
+        structure = self.get_structure(np.eye(3) * 10., [[0., 0., 0.], [1., 0., 0.]], ['H', 'H'])
+        structure.pbc = [True, True, False]
+        structure.store()
+
+        self.assertIsNone(structure.get_fingerprint())
+        self.assertIsNone(structure.get_extra(FINGERPRINT_EXTRA_KEY, None))
+        with self.assertRaises(ValueError):
+            structure.find_equivalent()
+
+
 class TestStructureDataReload(AiidaTestCase):
     """
     Tests the creation of StructureData, converting it to a raw format and
@@ -3461,6 +3735,62 @@ class TestTrajectoryData(AiidaTestCase):
                     if os.path.exists(file):
                         os.remove(file)
 
+    def test_subtrajectory_and_frames(self):
+        """
+        Check the stepid map, the extraction of a strided sub-trajectory and the export step by step.
+        """
+        import StringIO
+        import numpy
+        from aiida.orm.data.array.trajectory import TrajectoryData
+
+        numsteps = 10
+        stepids = numpy.arange(numsteps) * 10
+        stepids[5] = stepids[2]
+        times = numpy.arange(numsteps) * 0.5
+        cells = numpy.array([numpy.eye(3) * (3. + i) for i in range(numsteps)])
+        symbols = numpy.array(['H', 'O'])
+        positions = numpy.arange(numsteps * 2 * 3, dtype=float).reshape(numsteps, 2, 3) / 10.
+
+        n = TrajectoryData()
+        n.set_trajectory(stepids=stepids, cells=cells, symbols=symbols, positions=positions, times=times)
+        n._set_attr('units|positions', 'A')
+        n.store()
+
+        # The first index of a duplicate stepid is returned
+        self.assertEqual(n.get_index_from_stepid(20), 2)
+        self.assertEqual(n.get_index_from_stepid(90), 9)
+        with self.assertRaises(ValueError):
+            n.get_index_from_stepid(50)
+
+        data = n.get_step_data(3)
+        self.assertEqual(data[0], 30)
+        self.assertTrue(numpy.array_equal(data[2], cells[3]))
+        self.assertTrue(numpy.array_equal(data[4], positions[3]))
+        self.assertIsNone(data[5])
+
+        sub = n.get_subtrajectory(1, None, 3)
+        self.assertFalse(sub.is_stored)
+        self.assertEqual(sub.numsteps, 3)
+        self.assertTrue(numpy.array_equal(sub.get_stepids(), stepids[1::3]))
+        self.assertTrue(numpy.array_equal(sub.get_times(), times[1::3]))
+        self.assertTrue(numpy.array_equal(sub.get_cells(), cells[1::3]))
+        self.assertTrue(numpy.array_equal(sub.get_positions(), positions[1::3]))
+        self.assertEqual(sub.get_symbols().tolist(), symbols.tolist())
+        self.assertIsNone(sub.get_velocities())
+        self.assertEqual(sub.get_attr('units|positions'), 'A')
+
+        for fileformat in ['xsf', 'xyz']:
+            handle = StringIO.StringIO()
+            n.write_frames(handle, fileformat)
+            self.assertEqual(handle.getvalue(), n._exportstring(fileformat)[0])
+
+        handle = StringIO.StringIO()
+        n.write_frames(handle, 'xyz', indices=[1, 4, 7])
+        self.assertEqual(handle.getvalue(), sub._exportstring('xyz')[0])
+
+        with self.assertRaises(ValueError):
+            n.write_frames(StringIO.StringIO(), 'tcod')
+
 
 class TestKpointsData(AiidaTestCase):
     """
@@ -3731,6 +4061,55 @@ class TestKpointsData(AiidaTestCase):
         # try to set points with a spacing
         get_explicit_kpoints_path(structure, method='legacy', kpoint_distance=0.1)
 
+    def test_explicit_kpoints_path_legacy(self):
+        """
+        Test the points and the labels of an explicit path of the legacy implementation, in particular
+        that the point shared by consecutive segments is not repeated
+        """
+        import numpy
+        from aiida.tools.data.array.kpoints.legacy import get_explicit_kpoints_path
+
+        value = [('G', (0., 0., 0.), 'X', (0.5, 0., 0.), 3),
+                 ('X', (0.5, 0., 0.), 'M', (0.5, 0.5, 0.), 3),
+                 ('R', (0.5, 0.5, 0.5), 'G', (0., 0., 0.), 2)]
+        _, path, _, explicit_kpoints, labels = get_explicit_kpoints_path(value=value)
+
+        self.assertEqual(path, [('G', 'X'), ('X', 'M'), ('R', 'G')])
+        self.assertTrue(numpy.array_equal(explicit_kpoints, [
+            (0., 0., 0.), (0.25, 0., 0.), (0.5, 0., 0.), (0.5, 0.25, 0.), (0.5, 0.5, 0.),
+            (0.5, 0.5, 0.5), (0., 0., 0.)]))
+        self.assertEqual(labels, [(0, 'G'), (2, 'X'), (4, 'M'), (5, 'R'), (6, 'G')])
+
+    def test_cell_analysis_cache(self):
+        """
+        Test that the analysis of a cell is computed once, and that it is not modified through the returned values
+        """
+        import numpy
+        from aiida.tools.data.array.kpoints import legacy
+
+        alat = 4.
+        cell = numpy.array([
+            [alat, 0., 0.],
+            [0., alat, 0.],
+            [0., 0., alat / 2.],
+        ])
+        legacy.clear_cell_analysis_cache()
+
+        bravais_info = legacy.find_bravais_info(cell, [True, True, True])
+        bravais_info['short_name'] = 'modified'
+        analysis = legacy.analyze_cell(cell, [True, True, True])
+        analysis['reciprocal_cell'][0, 0] = 0.
+        hits = legacy._cell_analysis_cache.hits  # pylint: disable=protected-access
+
+        self.assertEqual(legacy.find_bravais_info(cell + 1e-12, [True, True, True])['short_name'], 'tet')
+        self.assertTrue(numpy.allclose(
+            legacy.analyze_cell(cell, [True, True, True])['reciprocal_cell'], 2. * numpy.pi * numpy.linalg.inv(cell).T))
+        self.assertEqual(legacy._cell_analysis_cache.hits, hits + 2)  # pylint: disable=protected-access
+
+        # The pbc are part of the key
+        self.assertEqual(legacy.find_bravais_info(cell, [True, True, False])['short_name'], 'sq')
+        self.assertEqual(legacy.find_bravais_info(cell, [True, False, False])['short_name'], '1D')
+
 
     def test_tetra_x(self):
         """
@@ -4012,6 +4391,62 @@ class TestSpglibTupleConversion(AiidaTestCase):
                     np.array([_.position for _ in roundtrip_struc.sites]))), 0.)
 
 
+class TestStructureBatchConversion(AiidaTestCase):
+    """
+    Tests the batch conversion of structures.
+    """
+    from aiida.orm.data.structure import has_spglib
+
+    @unittest.skipIf(not has_spglib(), "Unable to import spglib")
+    def test_symmetry_and_resume(self):
+        from aiida.common.links import LinkType
+        from aiida.orm.calculation.inline import InlineCalculation
+        from aiida.orm.data.parameter import ParameterData
+        from aiida.orm.data.structure import StructureData
+        from aiida.orm.group import Group
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.tools.data.structure import batch
+
+        cubic = StructureData(cell=((4., 0., 0.), (0., 4., 0.), (0., 0., 4.)))
+        cubic.append_atom(position=(0., 0., 0.), symbols='Ba')
+        cubic.append_atom(position=(2., 2., 2.), symbols='Ti')
+        cubic.store()
+        # Two kinds of the same element are not equivalent
+        magnetic = StructureData(cell=((4., 0., 0.), (0., 4., 0.), (0., 0., 4.)))
+        magnetic.append_atom(position=(0., 0., 0.), symbols='Fe', name='Fe1')
+        magnetic.append_atom(position=(2., 2., 2.), symbols='Fe', name='Fe2')
+        magnetic.store()
+        slab = StructureData(cell=((4., 0., 0.), (0., 4., 0.), (0., 0., 4.)), pbc=(True, True, False))
+        slab.append_atom(position=(0., 0., 0.), symbols='Fe')
+        slab.store()
+
+        group, _ = Group.get_or_create(name='test_batch_conversion')
+        results = batch.convert_nodes(batch.STRUCTURE_TO_SYMMETRY, [cubic.pk, magnetic.pk], group=group, batch_size=1)
+        self.assertEquals([(result.source_pk, result.created, result.error) for result in results],
+                          [(cubic.pk, True, None), (magnetic.pk, True, None)])
+        self.assertEquals(set(node.pk for node in group.nodes), set(result.pk for result in results))
+
+        for result in results:
+            node = load_node(result.pk)
+            self.assertIsInstance(node, ParameterData)
+            self.assertEquals(node.get_dict()['spacegroup_number'], 221)
+            # The result is created by a calculation whose input is the source node
+            calculation = node.get_inputs_dict(link_type=LinkType.CREATE)['symmetry']
+            self.assertIsInstance(calculation, InlineCalculation)
+            self.assertTrue(calculation.is_sealed)
+            self.assertEquals(calculation.get_inputs_dict(link_type=LinkType.INPUT)['structure'].pk, result.source_pk)
+
+        # The structures that were converted are skipped, the others are reported
+        builder = QueryBuilder()
+        builder.append(StructureData, filters={'id': {'in': [cubic.pk, magnetic.pk, slab.pk]}}, project='id')
+        builder.order_by({StructureData: 'id'})
+        resumed = batch.convert_nodes(batch.STRUCTURE_TO_SYMMETRY, builder, num_workers=2)
+        self.assertEquals([(result.source_pk, result.pk, result.created) for result in resumed[:2]],
+                          [(result.source_pk, result.pk, False) for result in results])
+        self.assertEquals(resumed[2].pk, None)
+        self.assertIn('periodic', resumed[2].error)
+
+
 class TestSeekpathExplicitPath(AiidaTestCase):
 
     @unittest.skipIf(not has_seekpath(), "No seekpath available")
@@ -4279,3 +4714,58 @@ class TestBandsData(AiidaTestCase):
                 for file in files_created:
                     if os.path.exists(file):
                         os.remove(file)
+
+    def test_dat_blocks(self):
+        """
+        Check the text of the dat_blocks export
+        """
+        import numpy
+        from aiida.orm.data.array.bands import BandsData
+
+        b = BandsData()
+        b.set_cell(numpy.eye(3))
+        b.set_kpoints([[0., 0., 0.], [0.5, 0., 0.], [0.5, 0.5, 0.]])
+        b.labels = [(0, 'G'), (2, 'M')]
+        b.set_bands([[-1., 2.], [-0.5, 2.5], [0., 3.]], units='eV')
+
+        text, _ = b._exportstring('dat_blocks', comments=False)
+        x = [0., 2. * numpy.pi * 0.5, 2. * numpy.pi]
+        lines = ["{:.8f}\t{:.8f}".format(*point) for point in zip(x, [-1., -0.5, 0.])] + ["", ""]
+        lines += ["{:.8f}\t{:.8f}".format(*point) for point in zip(x, [2., 2.5, 3.])] + ["", ""]
+        self.assertEquals(text, "\n".join(lines))
+
+    def test_find_bandgap(self):
+        """
+        Check the band gap analysis of single and many BandsData
+        """
+        import numpy
+        from aiida.orm.data.array.bands import BandsData, find_bandgap, find_bandgap_many
+
+        insulator = BandsData()
+        insulator.set_kpoints([[0., 0., 0.], [0.5, 0., 0.]])
+        insulator.set_bands([[0., 1.5, 3.], [0.5, 1., 2.5]], occupations=[[2., 0., 0.], [2., 0., 0.]])
+
+        metal = BandsData()
+        metal.set_kpoints([[0., 0., 0.], [0.5, 0., 0.]])
+        metal.set_bands([[0., 1.5, 3.], [0.5, 1., 2.5]], occupations=[[2., 0., 0.], [2., 2., 0.]])
+
+        self.assertEquals(find_bandgap(insulator), (True, 0.5))
+        self.assertEquals(find_bandgap(insulator, number_electrons=2), (True, 0.5))
+        self.assertEquals(find_bandgap(insulator, number_electrons=3), (False, None))
+        self.assertEquals(find_bandgap(insulator, fermi_energy=0.75), (True, 0.5))
+        self.assertEquals(find_bandgap(insulator, fermi_energy=1.2), (False, None))
+        self.assertEquals(find_bandgap(metal), (False, None))
+        with self.assertRaises(ValueError):
+            find_bandgap(insulator, fermi_energy=4.)
+        with self.assertRaises(ValueError):
+            find_bandgap(insulator, number_electrons=6)
+
+        results = list(find_bandgap_many([insulator, metal, insulator], fermi_energy=[None, None, 0.75]))
+        self.assertEquals([result.is_insulator for result in results], [True, False, True])
+        self.assertEquals([result.gap for result in results], [0.5, None, 0.5])
+        self.assertEquals([result.fermi_energy for result in results], [0.5, 1., 0.75])
+        # The top of the valence band is at the second kpoint, the bottom of the conduction band at the first one
+        self.assertEquals([result.is_direct for result in results], [False, None, False])
+
+        results = list(find_bandgap_many([insulator], number_electrons=2))
+        self.assertEquals(results[0][1:], (True, 0.5, 0.5, False))
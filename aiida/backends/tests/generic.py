@@ -310,6 +310,60 @@ class TestGroups(AiidaTestCase):
         # Cleanup
         g.delete()
 
+    def test_add_remove_nodes_bulk(self):
+        """
+        Test adding and removing nodes given as pks, generators and QueryBuilders,
+        and iterating over the nodes in batches
+        """
+        from aiida.orm.group import Group
+        from aiida.orm.querybuilder import QueryBuilder
+
+        nodes = [Node() for _ in range(7)]
+        for i, n in enumerate(nodes):
+            n._set_attr('bulk_index', i)
+            n.store()
+        pks = [n.pk for n in nodes]
+
+        g = Group(name='test_add_remove_nodes_bulk').store()
+        # Iterate over the nodes in several batches
+        g._NODES_BATCH_SIZE = 3
+
+        # Node pks, with duplicates
+        g.add_nodes([pks[0], pks[1], pks[1]])
+        self.assertEquals(set(pks[:2]), set([_.pk for _ in g.nodes]))
+
+        # A generator, with nodes already in the group
+        g.add_nodes(n for n in nodes[:4])
+        self.assertEquals(set(pks[:4]), set([_.pk for _ in g.nodes]))
+
+        # A QueryBuilder projecting the nodes
+        qb = QueryBuilder().append(Node, filters={'attributes.bulk_index': {'>=': 3}, 'id': {'in': pks}})
+        g.add_nodes(qb)
+        self.assertEquals(pks, [_.pk for _ in g.nodes])
+        self.assertEquals(len(g.nodes), 7)
+
+        # A QueryBuilder projecting the ids
+        qb = QueryBuilder().append(Node, filters={'attributes.bulk_index': {'<': 2}, 'id': {'in': pks}}, project='id')
+        g.remove_nodes(qb)
+        self.assertEquals(pks[2:], [_.pk for _ in g.nodes])
+
+        g.remove_nodes(iter(pks[2:4]))
+        self.assertEquals(pks[4:], [_.pk for _ in g.nodes])
+
+        # Anything else than a node or its id cannot be projected
+        with self.assertRaises(ValueError):
+            g.add_nodes(QueryBuilder().append(Node, filters={'id': {'in': pks}}, project='uuid'))
+
+        # The nodes are added in a single transaction: nothing is added if one of them is invalid
+        with self.assertRaises(ValueError):
+            g.add_nodes([pks[0], Node()])
+        with self.assertRaises(TypeError):
+            g.add_nodes([pks[0], 'not a node'])
+        self.assertEquals(pks[4:], [_.pk for _ in g.nodes])
+
+        # Cleanup
+        g.delete()
+
     def test_creation_from_dbgroup(self):
         from aiida.orm.group import Group
 
@@ -494,46 +494,6 @@ class TestNodeBasic(AiidaTestCase):
         self.assertEquals(a.get_attr('list'), [1, 2, 3, 4])
         self.assertEquals(mylist, [1, 2, 3])
 
-    # pylint: disable=no-self-use,unused-argument,unused-variable,no-member
-    def DISABLED(self):
-        """
-        This test routine is disabled for the time being; I will re-enable
-        when I have time to implement the check of the length of the 'key'.
-        """
-
-        def test_very_deep_attributes(self):
-            """
-            Test attributes where the total length of the key, including the
-            separators, would be longer than the field length in the DB.
-            """
-            from aiida.backends.djsite.db import models
-
-            n = Node()
-
-            semi_long_string = "abcdefghijklmnopqrstuvwxyz"
-            value = "some value"
-
-            attribute = {semi_long_string: value}
-            key_len = len(semi_long_string)
-
-            max_len = models.DbAttribute._meta.get_field_by_name('key')[
-                0].max_length
-
-            while key_len < 2 * max_len:
-                # Create a deep, recursive attribute
-                attribute = {semi_long_string: attribute}
-                key_len += len(semi_long_string) + len(models.DbAttribute._sep)
-
-            n._set_attr(semi_long_string, attribute)
-
-            n.store()
-
-            all_keys = models.DbAttribute.objects.filter(
-                dbnode=n.dbnode).values_list(
-                'key', flat=True)
-
-            print max(len(i) for i in all_keys)
-
     def test_datetime_attribute(self):
         from aiida.utils.timezone import (get_current_timezone, is_naive,
                                           make_aware, now)
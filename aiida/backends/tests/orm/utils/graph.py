@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from aiida.backends.testbase import AiidaTestCase
+from aiida.common.links import LinkType
+from aiida.orm.utils.graph import ProvenanceGraph, BOTH, INCOMING
+
+
+class TestProvenanceGraph(AiidaTestCase):
+
+    def setUp(self):
+        super(TestProvenanceGraph, self).setUp()
+        # Two workflows calling a calculation, which creates a data node used by another calculation
+        self.graph = ProvenanceGraph.from_links([
+            (1, 2, LinkType.INPUT),
+            (2, 3, LinkType.CREATE),
+            (3, 4, LinkType.INPUT),
+            (4, 5, LinkType.CREATE),
+            (6, 2, LinkType.CALL),
+            (2, 6, LinkType.RETURN),
+            (10, 11, 'inputlink'),
+        ], pks=[20])
+
+    def test_neighbours(self):
+        """
+        Test the size of the snapshot and the inputs and outputs of the nodes
+        """
+        self.assertEquals(len(self.graph), 9)
+        self.assertEquals(self.graph.number_of_links, 7)
+        self.assertIn(20, self.graph)
+        self.assertNotIn(7, self.graph)
+        self.assertEquals(self.graph.outputs(2).tolist(), [3, 6])
+        self.assertEquals(self.graph.outputs(2, [LinkType.CREATE]).tolist(), [3])
+        self.assertEquals(self.graph.inputs(2).tolist(), [1, 6])
+        self.assertEquals(self.graph.inputs(20).tolist(), [])
+
+        with self.assertRaises(ValueError):
+            self.graph.inputs(7)
+
+        with self.assertRaises(ValueError):
+            ProvenanceGraph.from_links([(1, 2, 'wronglink')])
+
+    def test_traversals(self):
+        """
+        Test the breadth-first search, the closures and the shortest paths
+        """
+        levels = self.graph.bfs([1], link_types=[LinkType.INPUT, LinkType.CREATE])
+        self.assertEquals([level.tolist() for level in levels], [[1], [2], [3], [4], [5]])
+
+        levels = self.graph.bfs([5], INCOMING, max_depth=2)
+        self.assertEquals([level.tolist() for level in levels], [[5], [4], [3]])
+
+        self.assertEquals(self.graph.descendants([1]).tolist(), [2, 3, 4, 5, 6])
+        self.assertEquals(self.graph.descendants([3], max_depth=1).tolist(), [4])
+        self.assertEquals(self.graph.ancestors([4]).tolist(), [1, 2, 3, 6])
+        self.assertEquals(self.graph.ancestors([4], [LinkType.INPUT, LinkType.CREATE]).tolist(), [1, 2, 3])
+        self.assertEquals(self.graph.ancestors([1]).tolist(), [])
+
+        self.assertEquals(self.graph.shortest_path(1, 5), [1, 2, 3, 4, 5])
+        self.assertEquals(self.graph.shortest_path(6, 4), [6, 2, 3, 4])
+        self.assertIsNone(self.graph.shortest_path(5, 1))
+        self.assertEquals(self.graph.shortest_path(5, 1, BOTH), [5, 4, 3, 2, 1])
+        self.assertIsNone(self.graph.shortest_path(1, 10, BOTH))
+
+    def test_components(self):
+        """
+        Test the connected components, ignoring the direction of the links
+        """
+        components = self.graph.connected_components()
+        self.assertEquals([component.tolist() for component in components], [[1, 2, 3, 4, 5, 6], [10, 11], [20]])
+
+        components = self.graph.connected_components([LinkType.CALL, LinkType.RETURN])
+        self.assertEquals([component.tolist() for component in components][0], [2, 6])
+        self.assertEquals(len(components), 8)
+
+        self.assertEquals(self.graph.component(11).tolist(), [10, 11])
+
+    def test_from_database(self):
+        """
+        Test loading the snapshot from the database, also for a subgraph
+        """
+        from aiida.orm.calculation import Calculation
+        from aiida.orm.data import Data
+
+        data = Data().store()
+        calc = Calculation()
+        calc.add_link_from(data, 'input', link_type=LinkType.INPUT)
+        calc.store()
+        output = Data()
+        output.add_link_from(calc, 'output', link_type=LinkType.CREATE)
+        output.store()
+
+        graph = ProvenanceGraph.from_database()
+        self.assertEquals(graph.descendants([data.pk]).tolist(), [calc.pk, output.pk])
+
+        graph = ProvenanceGraph.from_database(link_types=[LinkType.INPUT])
+        self.assertEquals(graph.descendants([data.pk]).tolist(), [calc.pk])
+
+        graph = ProvenanceGraph.from_database(pks=[calc.pk, output.pk])
+        self.assertEquals(len(graph), 2)
+        self.assertEquals(graph.ancestors([output.pk]).tolist(), [calc.pk])
@@ -486,7 +486,126 @@ class TestQueryHelp(AiidaTestCase):
         qb = QueryBuilder().append(cls=(Computer,))
         self.assertEqual(qb.count(), 1)
 
-            
+
+class TestCompiledQueryCache(AiidaTestCase):
+    def test_same_shape_different_values(self):
+        """
+        Queries of the same shape reuse the compiled statement, but with their own parameter values.
+        """
+        from aiida.orm.data.parameter import ParameterData
+        from aiida.orm.querybuilder import QueryBuilder, get_compiled_query_cache
+
+        nodes = []
+        for value in range(3):
+            node = ParameterData()
+            node._set_attr('cache-test', value)
+            nodes.append(node.store())
+
+        cache = get_compiled_query_cache()
+        cache.clear()
+
+        for value, node in enumerate(nodes):
+            qb = QueryBuilder().append(
+                ParameterData,
+                filters={'attributes.cache-test': value, 'id': {'in': [n.pk for n in nodes]}},
+                project=['id', 'uuid']
+            )
+            self.assertEqual(qb.all(), [[node.pk, node.uuid]])
+            self.assertEqual(qb.dict(), [{'ParameterData_1': {'id': node.pk, 'uuid': node.uuid}}])
+
+        # One statement for the shape, and one entry with the parameters of each queryhelp:
+        # all() misses the queryhelp, and misses the shape only the first time, dict() hits the queryhelp
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual(cache.hits, 5)
+
+        # Different types of values lead to different statements
+        qb = QueryBuilder().append(ParameterData, filters={'attributes.cache-test': '1'}, project='id')
+        self.assertEqual(qb.all(), [])
+        self.assertEqual(len(cache), 6)
+
+        # Queries returning ORM instances, or modified after building, are not cached
+        qb = QueryBuilder().append(ParameterData, filters={'id': nodes[0].pk})
+        self.assertEqual(qb.one()[0].uuid, nodes[0].uuid)
+        qb = QueryBuilder().append(ParameterData, filters={'id': nodes[0].pk}, project='id').distinct()
+        self.assertEqual(qb.all(), [[nodes[0].pk]])
+        self.assertEqual(len(cache), 6)
+
+    def test_same_queryhelp(self):
+        """
+        A query with the same queryhelp as an earlier one is executed without being built.
+        """
+        from aiida.orm.data.parameter import ParameterData
+        from aiida.orm.querybuilder import QueryBuilder, get_compiled_query_cache
+
+        node = ParameterData()
+        node._set_attr('cache-test', 'same')
+        node.store()
+        get_compiled_query_cache().clear()
+
+        def get_builder():
+            return QueryBuilder().append(ParameterData, filters={'attributes.cache-test': 'same'}, project=['id'])
+
+        qb = get_builder()
+        self.assertEqual(qb.all(), [[node.pk]])
+        self.assertIsNotNone(qb._hash)
+
+        qb = get_builder()
+        self.assertEqual(qb.all(), [[node.pk]])
+        self.assertEqual(qb.dict(), [{'ParameterData_1': {'id': node.pk}}])
+        # get_query was never called
+        self.assertIsNone(qb._hash)
+
+        # After distinct, the query is not the one described by the queryhelp
+        qb = get_builder()
+        qb.distinct()
+        self.assertIsNone(qb._get_compiled_query_by_queryhelp())
+        self.assertEqual(qb.all(), [[node.pk]])
+
+    def test_query_shape(self):
+        from aiida.orm.data.parameter import ParameterData
+        from aiida.orm.querybuilder import QueryBuilder
+
+        qb1 = QueryBuilder().append(ParameterData, filters={'id': {'in': [1, 2]}}, project='id')
+        qb2 = QueryBuilder().append(ParameterData, filters={'id': {'in': [3, 4]}}, project='id')
+        qb3 = QueryBuilder().append(ParameterData, filters={'id': {'in': [3, 4, 5]}}, project='id')
+        self.assertEqual(qb1.get_query_shape(), qb2.get_query_shape())
+        self.assertNotEqual(qb1.get_query_shape(), qb3.get_query_shape())
+
+
+class TestStreaming(AiidaTestCase):
+    def test_stream_with_commits(self):
+        """
+        Streaming results from a server-side cursor is not affected by commits during the iteration.
+        """
+        from aiida.orm.data.parameter import ParameterData
+        from aiida.orm.querybuilder import QueryBuilder
+
+        pks = []
+        for value in range(5):
+            node = ParameterData()
+            node._set_attr('stream-test', value)
+            pks.append(node.store().pk)
+
+        qb = QueryBuilder().append(ParameterData, filters={'attributes.stream-test': {'>=': 0}})
+        qb.order_by({ParameterData: 'id'})
+        streamed = []
+        for node, in qb.iterall(batch_size=2, stream=True):
+            streamed.append(node.pk)
+            # Setting an extra commits, and new nodes are not seen by the running iteration
+            node.set_extra('streamed', True)
+            new_node = ParameterData()
+            new_node._set_attr('stream-test', 100)
+            new_node.store()
+        self.assertEqual(streamed, pks)
+
+        qb = QueryBuilder().append(
+            ParameterData, filters={'id': {'in': pks}, 'extras.streamed': True}, project=['id'])
+        self.assertEqual(sorted(pk for pk, in qb.iterall(stream=True)), pks)
+        self.assertEqual(
+            sorted(d['ParameterData_1']['id'] for d in qb.iterdict(stream=True)), pks)
+
+
 class TestQueryBuilderCornerCases(AiidaTestCase):
     """
     In this class corner cases of QueryBuilder are added.
@@ -1,7 +1,7 @@
 from tornado.gen import coroutine, Return
 
 from aiida.backends.testbase import AiidaTestCase
-from aiida.work.transports import TransportQueue
+from aiida.work.transports import TransportQueue, TransportExecutor
 
 
 class TestTransportQueue(AiidaTestCase):
@@ -131,3 +131,75 @@ class TestTransportQueue(AiidaTestCase):
 
         finally:
             transport_class._DEFAULT_SAFE_OPEN_INTERVAL = original_interval
+
+
+class TestTransportExecutor(AiidaTestCase):
+    """ Tests for the transport executor """
+
+    def test_submit(self):
+        """ Test that tasks run outside the loop thread and their results and exceptions come back to the loop """
+        import threading
+        import tornado.ioloop
+
+        loop = tornado.ioloop.IOLoop()
+        executor = TransportExecutor(loop)
+        loop_thread = threading.current_thread()
+
+        def task(value):
+            self.assertIsNot(threading.current_thread(), loop_thread)
+            return value * 2
+
+        def broken_task():
+            raise RuntimeError('task failed')
+
+        @coroutine
+        def test():
+            results = yield [executor.submit('first', task, 1), executor.submit('second', task, 2)]
+            self.assertEqual(results, [2, 4])
+            with self.assertRaises(RuntimeError):
+                yield executor.submit('first', broken_task)
+
+        try:
+            loop.run_sync(test)
+        finally:
+            executor.shutdown()
+
+        metrics = executor.get_metrics()
+        self.assertEqual(metrics['first']['submitted'], 2)
+        self.assertEqual(metrics['first']['completed'], 2)
+        self.assertEqual(metrics['second']['completed'], 1)
+        self.assertGreaterEqual(metrics['second']['duration_max'], 0.)
+
+    def test_tasks_of_a_key_are_serial(self):
+        """ Test that the tasks of the same key, which share a transport, never run at the same time """
+        import threading
+        import time
+        import tornado.ioloop
+
+        loop = tornado.ioloop.IOLoop()
+        executor = TransportExecutor(loop)
+        lock = threading.Lock()
+        running = {'first': 0, 'second': 0}
+        overlaps = []
+
+        def task(key):
+            with lock:
+                running[key] += 1
+                overlaps.append(running[key] > 1)
+            time.sleep(0.01)
+            with lock:
+                running[key] -= 1
+            return threading.current_thread()
+
+        @coroutine
+        def test():
+            threads = yield [executor.submit(key, task, key) for key in ['first', 'second'] * 5]
+            self.assertEqual(len(set(threads[0::2])), 1)
+            self.assertEqual(len(set(threads[1::2])), 1)
+
+        try:
+            loop.run_sync(test)
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(overlaps, [False] * 10)
@@ -37,6 +37,19 @@ def validate_attribute_key(key):
             AIIDA_ATTRIBUTE_SEP))
 
 
+def validate_attribute_keys(keys):
+    """
+    Validate many keys at once, see :py:func:`validate_attribute_key`.
+
+    :param keys: an iterable of keys
+    :return: None if all the keys are valid
+    :raise ValidationError: if one of the keys is not valid
+    """
+    for key in keys:
+        if not isinstance(key, basestring) or not key or AIIDA_ATTRIBUTE_SEP in key:
+            validate_attribute_key(key)
+
+
 def QueryFactory():
     if settings.BACKEND == BACKEND_SQLA:
         from aiida.backends.sqlalchemy.queries import QueryManagerSQLA as QueryManager
@@ -247,6 +260,66 @@ def delete_nodes_and_connections(pks):
     delete_nodes_backend(pks)
 
 
+def set_extra_for_nodes(key, values):
+    """
+    Set the same extra on many nodes in a single transaction.
+
+    :param key: the key of the extra; must be a level-zero key (no separators)
+    :param values: a dictionary mapping the pk of each node to the (already cleaned) value to set
+    """
+    if settings.BACKEND == BACKEND_DJANGO:
+        from aiida.backends.djsite.utils import set_extra_for_nodes_django as set_extra_backend
+    elif settings.BACKEND == BACKEND_SQLA:
+        from aiida.backends.sqlalchemy.utils import set_extra_for_nodes_sqla as set_extra_backend
+    else:
+        raise Exception("unknown backend {}".format(settings.BACKEND))
+
+    set_extra_backend(key, values)
+
+
+def close_connections():
+    """
+    Close the database connections of this process, e.g. such that processes forked
+    afterwards do not share them. They are opened again when needed.
+    """
+    if settings.BACKEND == BACKEND_SQLA:
+        from aiida.backends import sqlalchemy as sa
+        sa.get_scoped_session().close()
+        sa.engine.dispose()
+    elif settings.BACKEND == BACKEND_DJANGO:
+        from django.db import connections
+        for connection in connections.all():
+            connection.close()
+
+
+def store_nodes(nodes, extras=None):
+    """
+    Store many new nodes in a single transaction, without looking for equivalent nodes in the cache.
+    If storing one of them fails, none of them is stored in the database.
+
+    :param nodes: a list of unstored nodes
+    :param extras: if given, a list with a dictionary of extras for each node, which are inserted together with
+        the node (otherwise, the extras of a node can only be set once it is stored, with one query for each node)
+    :return: the list of the pks of the stored nodes
+    """
+    if extras is not None:
+        from aiida.orm.implementation.general.node import clean_value
+
+        for node, node_extras in zip(nodes, extras):
+            validate_attribute_keys(node_extras)
+            # The extras of the model of an unstored node are written when the node is inserted
+            node.dbnode.extras.update(clean_value(node_extras))
+
+    if settings.BACKEND == BACKEND_DJANGO:
+        from aiida.backends.djsite.utils import store_nodes_django as store_nodes_backend
+    elif settings.BACKEND == BACKEND_SQLA:
+        from aiida.backends.sqlalchemy.utils import store_nodes_sqla as store_nodes_backend
+    else:
+        raise Exception("unknown backend {}".format(settings.BACKEND))
+
+    return store_nodes_backend(nodes)
+
+
 def _get_column(colname, alias):
     """
     Return the column for a given projection. Needed by the QueryBuilder
@@ -90,8 +90,8 @@ def calculation_list(calculations, past_days, groups, all_entries, calculation_s
         process_state = None
         calculation_state = None
 
-    PROCESS_STATE_KEY = 'attributes.{}'.format(JobCalculation.PROCESS_STATE_KEY)
-    EXIT_STATUS_KEY = 'attributes.{}'.format(JobCalculation.EXIT_STATUS_KEY)
+    PROCESS_STATE_KEY = JobCalculation.PROCESS_STATE_KEY
+    EXIT_STATUS_KEY = JobCalculation.EXIT_STATUS_KEY
 
     filters = {}
 
@@ -393,9 +393,10 @@ def calculation_cleanworkdir(calculations, past_days, older_than, computers, for
     If both are specified, a logical AND is done between the two, i.e. the calculations that will be cleaned have been
     modified AFTER [-p option] days from now, but BEFORE [-o option] days from now.
     """
+    from concurrent.futures import ThreadPoolExecutor
     from aiida.orm.backend import construct_backend
     from aiida.orm.utils.loaders import ComputerEntityLoader, IdentifierType
-    from aiida.orm.utils.remote import clean_remote, get_calculation_remote_paths
+    from aiida.orm.utils.remote import clean_remote_many, get_calculation_remote_paths, mark_remote_folders_cleaned
 
     if calculations:
         if (past_days is not None and older_than is not None):
@@ -418,15 +419,34 @@ def calculation_cleanworkdir(calculations, past_days, older_than, computers, for
     backend = construct_backend()
     user = backend.users.get_automatic_user()
 
-    for computer_uuid, paths in path_mapping.items():
+    def clean_computer(computer_name, transport, paths):
+        """Remove the remote folders of a single computer, reporting the progress."""
+        progress = {'cleaned': 0}
+
+        def report(cleaned_paths):
+            progress['cleaned'] += len(cleaned_paths)
+            echo.echo_info('{}: {}/{} remote folders cleaned'.format(computer_name, progress['cleaned'], len(paths)))
+
+        with transport:
+            return clean_remote_many(transport, paths, callback=report)
 
-        counter = 0
+    jobs = []
+    for computer_uuid, paths in path_mapping.items():
         computer = ComputerEntityLoader.load_entity(computer_uuid, identifier_type=IdentifierType.UUID)
         transport = backend.authinfos.get(computer, user).get_transport()
+        jobs.append((computer, transport, paths))
 
-        with transport:
-            for path in paths:
-                clean_remote(transport, path)
-                counter += 1
+    # The different computers are cleaned concurrently, while the database is only accessed from this thread
+    with ThreadPoolExecutor(max_workers=max(len(jobs), 1)) as executor:
+        futures = [(computer, executor.submit(clean_computer, computer.name, transport, paths))
+                   for computer, transport, paths in jobs]
+
+        for computer, future in futures:
+            try:
+                cleaned_paths = future.result()
+            except Exception as exception:  # pylint: disable=broad-except
+                echo.echo_error('cleaning remote folders on {} failed: {}'.format(computer.name, exception))
+                continue
 
-        echo.echo_success('{} remote folders cleaned on {}'.format(counter, computer.name))
+            mark_remote_folders_cleaned(computer, cleaned_paths)
+            echo.echo_success('{} remote folders cleaned on {}'.format(len(cleaned_paths), computer.name))
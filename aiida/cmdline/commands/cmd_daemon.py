@@ -21,7 +21,7 @@ from aiida.cmdline.utils import decorators
 from aiida.cmdline.utils.common import get_env_with_venv_bin
 from aiida.cmdline.utils.daemon import get_daemon_status, print_client_response_status
 from aiida.common.profile import get_current_profile_name
-from aiida.common.setup import get_profiles_list
+from aiida.common.setup import get_profiles_list, get_property
 from aiida.daemon.client import DaemonClient
 
 
@@ -237,6 +237,20 @@ def _start_circus(foreground):
         }]
     } # yapf: disable
 
+    if get_property('daemon.autoscale'):
+        arbiter_config['watchers'].append({
+            'name': client.autoscaler_name,
+            'cmd': client.autoscaler_cmd_string,
+            'virtualenv': client.virtualenv,
+            'copy_env': True,
+            'singleton': True,
+            'stdout_stream': {
+                'class': 'FileStream',
+                'filename': client.daemon_log_file,
+            },
+            'env': get_env_with_venv_bin(),
+        })
+
     if not foreground:
         daemonize()
 
@@ -147,6 +147,55 @@ def importfile(filename):
         echo.echo_critical(err)
 
 
+@cif.command('import-bulk')
+@decorators.with_dbenv()
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, resolve_path=True))
+@click.option('-G', '--group', 'group_name', type=click.STRING, help="Add the CifData nodes to the group with this "
+              "name, which is created if it does not exist.")
+@click.option(
+    '-p',
+    '--parallel',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes that hash and parse the files.")
+@click.option(
+    '-b',
+    '--batch-size',
+    type=click.IntRange(min=1),
+    default=1000,
+    show_default=True,
+    help="Number of files that are looked up and stored in the database at a time.")
+def import_bulk(paths, group_name, parallel, batch_size):
+    """
+    Import many CIF files into CifData objects
+
+    Directories are scanned recursively for files with the .cif extension. A file identical to an existing CifData
+    is not imported again: the existing node is added to the group instead.
+    """
+    from aiida.orm import Group
+    from aiida.utils import ingest
+
+    filenames = ingest.find_files(paths, '.cif')
+    group = None
+    if group_name is not None:
+        group, _ = Group.get_or_create(name=group_name, type_string='')
+
+    def report(batch, nprocessed, elapsed):
+        for result in batch:
+            if result.error is not None:
+                echo.echo_warning("could not import {}: {}".format(result.filename, result.error))
+        echo.echo_info("processed {} of {} files in {:.1f} s".format(nprocessed, len(filenames), elapsed))
+
+    results = ingest.import_files(
+        ingest.CIF, filenames, group=group, num_workers=parallel, batch_size=batch_size, progress=report)
+
+    ncreated = len([result for result in results if result.created])
+    nfailed = len([result for result in results if result.error is not None])
+    echo.echo_success("CIF files found: {}. New CifData created: {}. Failed: {}".format(
+        len(filenames), ncreated, nfailed))
+
+
 @cif.command('deposit')
 @decorators.with_dbenv()
 @deposit_options
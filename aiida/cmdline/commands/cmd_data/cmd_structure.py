@@ -214,6 +214,49 @@ def deposit(**kwargs):
     echo.echo(deposit_tcod(node, deposition_type, parameter_data, **kwargs))
 
 
+@structure.command('dedupe')
+@decorators.with_dbenv()
+@click.option('-G', '--group', 'group_name', type=click.STRING, help="Add the duplicates (all the equivalent "
+              "structures but the oldest) to the group with this name, which is created if it does not exist.")
+@click.option(
+    '--length-tolerance',
+    type=click.FLOAT,
+    help="Tolerance on the lengths of the cell vectors and on the positions of the sites, in angstrom.")
+@click.option('--angle-tolerance', type=click.FLOAT, help="Tolerance on the angles of the cell, in degrees.")
+@click.option(
+    '-b',
+    '--batch-size',
+    type=click.IntRange(min=1),
+    default=1000,
+    show_default=True,
+    help="Number of structures that are read from the database at a time.")
+def dedupe(group_name, length_tolerance, angle_tolerance, batch_size):
+    """
+    Find the equivalent StructureData nodes
+
+    Prints each set of equivalent structures as the pk of the oldest one followed by the pks of its duplicates.
+    Only structures periodic in three dimensions are compared.
+    """
+    from aiida.orm import Group
+    from aiida.tools.data.structure.dedupe import find_duplicates
+
+    def report(nprocessed, total, elapsed):
+        echo.echo_info("processed {} of {} structures in {:.1f} s".format(nprocessed, total, elapsed))
+
+    duplicates = find_duplicates(
+        length_tolerance=length_tolerance, angle_tolerance=angle_tolerance, batch_size=batch_size, progress=report)
+
+    for pks in duplicates:
+        echo.echo("{}: {}".format(pks[0], " ".join(str(pk) for pk in pks[1:])))
+
+    if group_name is not None and duplicates:
+        group, _ = Group.get_or_create(name=group_name, type_string='')
+        group.add_nodes(pk for pks in duplicates for pk in pks[1:])
+
+    echo.echo_success("Sets of equivalent structures found: {}. Duplicates: {}".format(
+        len(duplicates), sum(len(pks) - 1 for pks in duplicates)))
+
+
 def _import_xyz(filename, **kwargs):
     """
     Imports an XYZ-file.
@@ -97,7 +97,7 @@ def show(**kwargs):
         raise NotImplementedError("The format {} is not yet implemented".format(given_format))
 
 
-SUPPORTED_FORMATS = ['cif', 'tcod', 'xsf']
+SUPPORTED_FORMATS = ['cif', 'tcod', 'xsf', 'xyz']
 
 
 @trajectory.command('export')
@@ -35,7 +35,14 @@ def upf():
     is_flag=True,
     default=False,
     help='Interrupt pseudos import if a pseudo was already present in the AiiDA database')
-def uploadfamily(folder, group_name, group_description, stop_if_existing):
+@click.option(
+    '-p',
+    '--parallel',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help='Number of processes that hash and parse the files')
+def uploadfamily(folder, group_name, group_description, stop_if_existing, parallel):
     """
     Upload a new pseudopotential family.
 
@@ -44,7 +51,8 @@ def uploadfamily(folder, group_name, group_description, stop_if_existing):
     Call without parameters to get some help.
     """
     import aiida.orm.data.upf as upf_
-    files_found, files_uploaded = upf_.upload_upf_family(folder, group_name, group_description, stop_if_existing)
+    files_found, files_uploaded = upf_.upload_upf_family(
+        folder, group_name, group_description, stop_if_existing, num_workers=parallel)
     echo.echo_success("UPF files found: {}. New files uploaded: {}".format(files_found, files_uploaded))
 
 
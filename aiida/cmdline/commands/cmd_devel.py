@@ -164,6 +164,14 @@ def devel_run_daemon():
     start_daemon()
 
 
+@verdi_devel.command('run_autoscaler')
+@decorators.with_dbenv()
+def devel_run_autoscaler():
+    """Run the autoscaler of the daemon workers in the current interpreter."""
+    from aiida.daemon.autoscaler import start_autoscaler
+    start_autoscaler()
+
+
 @verdi_devel.command('tests')
 @click.argument('paths', nargs=-1, type=TestModuleParamType(), required=False)
 @options.VERBOSE(help='Print the class and function name for each test.')
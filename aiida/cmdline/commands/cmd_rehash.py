@@ -24,33 +24,45 @@ from aiida.cmdline.utils import decorators, echo
     type=PluginParamType(group=('node', 'calculations', 'data'), load=True),
     default='node',
     help='Only include nodes that are class or sub class of the class identified by this entry point.')
+@click.option(
+    '-w', '--workers', type=click.IntRange(min=1), default=1, show_default=True,
+    help='Number of worker processes, each with its own database connection.')
+@click.option(
+    '-b', '--batch-size', type=click.IntRange(min=1), default=1000, show_default=True,
+    help='Number of nodes hashed and updated at a time.')
+@click.option(
+    '-c', '--checkpoint', type=click.Path(dir_okay=False),
+    help='File where the last processed pk is stored after each batch. '
+    'If it exists, only nodes with a larger pk are rehashed, which resumes an interrupted run '
+    'with the same nodes and entry point.')
 @decorators.with_dbenv()
-def rehash(nodes, entry_point):
+def rehash(nodes, entry_point, workers, batch_size, checkpoint):
     """Recompute the hash for nodes in the database
 
     The set of nodes that will be rehashed can be filtered by their identifier and/or based on their class.
     """
     from aiida.orm.querybuilder import QueryBuilder
+    from aiida.utils.rehash import rehash_nodes
 
     if nodes:
-        to_hash = [(node,) for node in nodes if isinstance(node, entry_point)]
+        pks = [node.pk for node in nodes if isinstance(node, entry_point)]
+        num_nodes = len(pks)
     else:
-        builder = QueryBuilder()
-        builder.append(entry_point, tag='node')
-        to_hash = builder.all()
+        pks = None
+        num_nodes = QueryBuilder().append(entry_point).count()
 
-    if not to_hash:
+    if not num_nodes:
         echo.echo_critical('no matching nodes found')
 
-    count = 0
-
-    for i, (node,) in enumerate(to_hash):
-
-        if i % 100 == 0:
-            echo.echo('.', nl=False)
+    def report_progress(count, elapsed):
+        echo.echo_info('{}/{} nodes re-hashed ({:.1f} nodes/s)'.format(
+            count, num_nodes, count / elapsed if elapsed > 0 else 0.))
 
-        node.rehash()
-        count += 1
+    try:
+        count = rehash_nodes(
+            entry_point, pks=pks, num_workers=workers, batch_size=batch_size, checkpoint=checkpoint,
+            progress=report_progress)
+    except ValueError as exception:
+        echo.echo_critical(str(exception))
 
-    echo.echo('')
     echo.echo_success('{} nodes re-hashed'.format(count))
@@ -79,9 +79,11 @@ class CalculationProjectionMapper(ProjectionMapper):
         sealed_key = 'attributes.{}'.format(Sealable.SEALED_KEY)
         process_paused_key = 'attributes.{}'.format(Calculation.PROCESS_PAUSED_KEY)
         process_label_key = 'attributes.{}'.format(Calculation.PROCESS_LABEL_KEY)
-        process_state_key = 'attributes.{}'.format(Calculation.PROCESS_STATE_KEY)
         process_status_key = 'attributes.{}'.format(Calculation.PROCESS_STATUS_KEY)
-        exit_status_key = 'attributes.{}'.format(Calculation.EXIT_STATUS_KEY)
+
+        # The process state and exit status are mirrored in indexed columns of the node table
+        process_state_key = Calculation.PROCESS_STATE_KEY
+        exit_status_key = Calculation.EXIT_STATUS_KEY
 
         default_labels = {
             'pk': 'PK',
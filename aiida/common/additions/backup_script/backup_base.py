@@ -7,6 +7,7 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+import hashlib
 import json
 import datetime
 import shutil
@@ -20,6 +21,47 @@ from aiida.utils import timezone as dtimezone
 from pytz import timezone as ptimezone
 
 
+def get_folder_digest(folder):
+    """
+    Compute the digest of a folder from the relative paths, sizes and
+    modification times of its contents (as the quick check of rsync), without
+    reading the files.
+
+    :param folder: the path of the folder
+    :return: the hexadecimal digest, or None if the folder does not exist
+    """
+    if not os.path.isdir(folder):
+        return None
+
+    digest = hashlib.md5()
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            stat = os.lstat(path)
+            digest.update("{}\0{}\0{!r}\0".format(
+                os.path.relpath(path, folder), stat.st_size, stat.st_mtime))
+    return digest.hexdigest()
+
+
+def link_tree(source_dir, destination_dir):
+    """
+    Recreate a directory tree, with hardlinks to the files of the source
+    (symbolic links are copied as such).
+    """
+    for dirpath, _, filenames in os.walk(source_dir):
+        target_dirpath = os.path.join(destination_dir,
+                                      os.path.relpath(dirpath, source_dir))
+        if not os.path.isdir(target_dirpath):
+            os.makedirs(target_dirpath)
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            target_path = os.path.join(target_dirpath, filename)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), target_path)
+            else:
+                os.link(path, target_path)
+        shutil.copystat(dirpath, target_dirpath)
 
 
 class AbstractBackup(object):
@@ -30,6 +72,12 @@ class AbstractBackup(object):
     oldest node/workflow object found and it will periodically backup
     (in periods of *periodicity* days) until the ending date of the backup
     specified by *end_date_of_backup* or *days_to_backup*.
+
+    The backup is incremental: a manifest keeps the digest (see
+    :py:func:`get_folder_digest`) of every backed-up directory, and only the
+    new or changed directories are copied, by *num_threads* threads. With
+    *snapshots*, every run backs up to a new snapshot directory, where the
+    unchanged directories of the previous snapshot are hardlinked.
     """
 
     __metaclass__ = ABCMeta
@@ -41,6 +89,18 @@ class AbstractBackup(object):
     END_DATE_OF_BACKUP_KEY = "end_date_of_backup"
     PERIODICITY_KEY = "periodicity"
     BACKUP_LENGTH_THRESHOLD_KEY = "backup_length_threshold"
+    NUM_THREADS_KEY = "num_threads"
+    SNAPSHOTS_KEY = "snapshots"
+
+    # The manifest of the backed-up directories, in the backup directory
+    # (or in every snapshot directory) and the directory of the snapshots
+    MANIFEST_FILENAME = "backup_manifest.json"
+    SNAPSHOTS_DIRNAME = "snapshots"
+    # The suffix of the directory of a snapshot until its run is complete
+    SNAPSHOT_IN_PROGRESS_SUFFIX = ".in_progress"
+
+    # The number of directories handed to the threads at a time
+    _directories_batch_size = 1000
 
     # Backup parameters that will be populated by the JSON file
 
@@ -70,6 +130,15 @@ class AbstractBackup(object):
 
     _ignore_backup_dir_existence_check = False
 
+    # The number of threads copying the directories (1 if not set)
+    _num_threads = None
+
+    # Whether every run backs up to a new snapshot directory
+    _snapshots = None
+
+    # The snapshot directory of the current run
+    _snapshot_dir = None
+
     def __init__(self, backup_info_filepath, additional_back_time_mins):
 
         # The path to the JSON file with the backup information
@@ -231,6 +300,18 @@ class AbstractBackup(object):
                                "an integer")
             raise
 
+        # Parse the (optional) number of threads
+        try:
+            num_threads = backup_variables.get(self.NUM_THREADS_KEY)
+            self._num_threads = (None if num_threads is None
+                                 else int(num_threads))
+        except ValueError:
+            self._logger.error("The number of threads should be an integer")
+            raise
+
+        # Parse the (optional) snapshots flag
+        self._snapshots = backup_variables.get(self.SNAPSHOTS_KEY)
+
     def _dictionarize_backup_info(self):
         """
         This dictionarises the backup information and returns the dictionary.
@@ -248,6 +329,12 @@ class AbstractBackup(object):
                 int((self._backup_length_threshold.total_seconds() / 3600))
         }
 
+        # The optional variables are only written if they were set
+        if self._num_threads is not None:
+            backup_variables[self.NUM_THREADS_KEY] = self._num_threads
+        if self._snapshots is not None:
+            backup_variables[self.SNAPSHOTS_KEY] = self._snapshots
+
         return backup_variables
 
     def _store_backup_info(self, backup_info_file_name):
@@ -335,86 +422,224 @@ class AbstractBackup(object):
 
         return REPOSITORY_PATH
 
+    @staticmethod
+    def _read_manifest(destination_dir):
+        """
+        Read the manifest of the backed-up directories of a destination
+        directory, mapping their relative paths to their digests.
+        """
+        manifest_path = os.path.join(destination_dir,
+                                     AbstractBackup.MANIFEST_FILENAME)
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, 'r') as manifest_file:
+            return json.load(manifest_file)
+
+    @staticmethod
+    def _write_manifest(destination_dir, manifest):
+        """
+        Write the manifest of a destination directory, replacing the previous
+        one only once it is completely written.
+        """
+        manifest_path = os.path.join(destination_dir,
+                                     AbstractBackup.MANIFEST_FILENAME)
+        with open(manifest_path + '.tmp', 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.rename(manifest_path + '.tmp', manifest_path)
+
+    def _get_destination_dir(self, executor):
+        """
+        Return the directory where the repository is backed up, with its
+        manifest.
+
+        Without snapshots, this is the backup directory. With snapshots, this
+        is a new directory in the snapshots directory (the same for all the
+        rounds of a run), in which the directories of the last snapshot are
+        first hardlinked, with the threads of the executor. Its name ends
+        with SNAPSHOT_IN_PROGRESS_SUFFIX until the run is complete (see
+        :py:meth:`_finish_snapshot`), and its manifest is only written once
+        the directories of a round are copied.
+        """
+        if not self._snapshots:
+            return self._backup_dir, self._read_manifest(self._backup_dir)
+
+        if self._snapshot_dir is not None:
+            return self._snapshot_dir, self._read_manifest(self._snapshot_dir)
+
+        snapshots_dir = os.path.join(self._backup_dir, self.SNAPSHOTS_DIRNAME)
+        # A snapshot without manifest was interrupted before the end of its
+        # first round. The manifest of a snapshot still in progress lists the
+        # directories of the rounds that were completed.
+        previous_snapshots = [] if not os.path.isdir(snapshots_dir) else [
+            name for name in sorted(os.listdir(snapshots_dir)) if
+            os.path.exists(os.path.join(snapshots_dir, name,
+                                        self.MANIFEST_FILENAME))]
+
+        snapshot_dir = os.path.join(
+            snapshots_dir,
+            datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f") +
+            self.SNAPSHOT_IN_PROGRESS_SUFFIX)
+        os.makedirs(snapshot_dir)
+
+        manifest = {}
+        if previous_snapshots:
+            previous_dir = os.path.join(snapshots_dir, previous_snapshots[-1])
+            manifest = self._read_manifest(previous_dir)
+            self._logger.info("Linking {} directories of the snapshot "
+                              "{}".format(len(manifest), previous_dir))
+            list(executor.map(lambda relative_dir: link_tree(
+                os.path.join(previous_dir, relative_dir),
+                os.path.join(snapshot_dir, relative_dir)), manifest))
+
+        self._snapshot_dir = snapshot_dir
+        return snapshot_dir, manifest
+
+    def _finish_snapshot(self):
+        """
+        Mark the snapshot of the current run, if any, as complete, removing
+        the in-progress suffix from its name.
+        """
+        if self._snapshot_dir is None:
+            return
+
+        snapshot_dir = self._snapshot_dir[
+            :-len(self.SNAPSHOT_IN_PROGRESS_SUFFIX)]
+        os.rename(self._snapshot_dir, snapshot_dir)
+        self._snapshot_dir = None
+        self._logger.info("Snapshot {} complete".format(snapshot_dir))
+
+    @staticmethod
+    def _backup_directory(source_dir, destination_dir, backed_up_digest):
+        """
+        Copy a directory, unless it was not changed since it was backed up.
+        This is the task run by the threads.
+
+        :return: a tuple with the digest of the directory (None if the
+            directory could not be copied), whether it was copied and
+            the error that prevented the copy, if any
+        """
+        digest = get_folder_digest(source_dir)
+        if (digest is not None and digest == backed_up_digest and
+                os.path.isdir(destination_dir)):
+            return digest, False, None
+
+        try:
+            # Remove the destination directory if it already exists
+            if os.path.exists(destination_dir):
+                shutil.rmtree(destination_dir)
+            shutil.copytree(source_dir, destination_dir, True, None)
+        except EnvironmentError as e:
+            return None, False, e
+
+        return digest, True, None
+
     def _backup_needed_files(self, query_sets):
+        from concurrent.futures import ThreadPoolExecutor
+
         REPOSITORY_PATH = self._get_repository_path()
         repository_path = os.path.normpath(REPOSITORY_PATH)
 
         parent_dir_set = set()
         copy_counter = 0
+        unchanged_counter = 0
+        dir_counter = 0
 
         dir_no_to_copy = 0
 
         for query_set in query_sets:
             dir_no_to_copy += self._get_query_set_length(query_set)
 
-        self._logger.info("Start copying {} directories".format(dir_no_to_copy))
-
-        last_progress_print = datetime.datetime.now()
-        percent_progress = 0
-
-        for query_set in query_sets:
-            iterator = self._get_query_set_iterator(query_set)
-
-            for item in iterator:
-                source_dir = self._get_source_directory(item)
-
-                # Get the relative directory without the / which
-                # separates the repository_path from the relative_dir.
-                relative_dir = source_dir[(len(repository_path) + 1):]
-                destination_dir = os.path.join(self._backup_dir, relative_dir)
-
-                # Remove the destination directory if it already exists
-                if os.path.exists(destination_dir):
-                    shutil.rmtree(destination_dir)
-
-                # Copy the needed directory
-                try:
-                    shutil.copytree(source_dir, destination_dir, True, None)
-                except EnvironmentError as e:
-                    self._logger.warning(
-                        "Problem copying directory {} ".format(source_dir) +
-                        "to {}. ".format(destination_dir) +
-                        "More information: {} (Error no: {})".format(
-                            e.strerror,
-                            e.errno))
-                    # Raise envEr
-
-                # Extract the needed parent directories
-                AbstractBackup._extract_parent_dirs(relative_dir, parent_dir_set)
-                copy_counter += 1
-
-                if (self._logger.getEffectiveLevel() <= logging.INFO and
-                            (datetime.datetime.now() -
-                                 last_progress_print).seconds > 60):
-                    last_progress_print = datetime.datetime.now()
-                    percent_progress = (copy_counter * 100 / dir_no_to_copy)
-                    self._logger.info(
-                        "Copied {} ".format(copy_counter) +
-                        "directories [{}]".format(item.__class__.__name__, ) +
-                        " ({}/100)".format(percent_progress))
-
-                if (self._logger.getEffectiveLevel() <= logging.INFO and
-                            percent_progress < (
-                                        copy_counter * 100 / dir_no_to_copy)):
-                    percent_progress = (copy_counter * 100 / dir_no_to_copy)
-                    last_progress_print = datetime.datetime.now()
-                    self._logger.info(
-                        "Copied {} ".format(copy_counter) +
-                        "directories [{}]".format(item.__class__.__name__, ) +
-                        " ({}/100)".format(percent_progress))
-
-        self._logger.info("{} directories copied".format(copy_counter))
+        executor = ThreadPoolExecutor(max_workers=self._num_threads or 1)
+        try:
+            destination_root, manifest = self._get_destination_dir(executor)
+
+            self._logger.info("Start copying {} directories".format(
+                dir_no_to_copy))
+
+            last_progress_print = datetime.datetime.now()
+            percent_progress = 0
+
+            for query_set in query_sets:
+                iterator = self._get_query_set_iterator(query_set)
+
+                while True:
+                    # Get the relative directories without the / which
+                    # separates the repository_path from the relative_dir.
+                    relative_dirs = []
+                    for item in iterator:
+                        source_dir = self._get_source_directory(item)
+                        relative_dirs.append(
+                            source_dir[(len(repository_path) + 1):])
+                        if len(relative_dirs) == self._directories_batch_size:
+                            break
+                    if not relative_dirs:
+                        break
+
+                    # The threads do not access the manifest, which is
+                    # updated here
+                    results = executor.map(
+                        self._backup_directory,
+                        [os.path.join(repository_path, relative_dir)
+                         for relative_dir in relative_dirs],
+                        [os.path.join(destination_root, relative_dir)
+                         for relative_dir in relative_dirs],
+                        [manifest.get(relative_dir)
+                         for relative_dir in relative_dirs])
+
+                    for relative_dir, (digest, copied, e) in zip(
+                            relative_dirs, results):
+                        if e is not None:
+                            self._logger.warning(
+                                "Problem copying directory {} ".format(
+                                    os.path.join(repository_path,
+                                                 relative_dir)) +
+                                "to {}. ".format(os.path.join(
+                                    destination_root, relative_dir)) +
+                                "More information: {} (Error no: {})".format(
+                                    e.strerror,
+                                    e.errno))
+                            manifest.pop(relative_dir, None)
+                        elif digest is not None:
+                            manifest[relative_dir] = digest
+
+                        # Extract the needed parent directories
+                        AbstractBackup._extract_parent_dirs(relative_dir,
+                                                            parent_dir_set)
+                        dir_counter += 1
+                        if copied:
+                            copy_counter += 1
+                        elif e is None:
+                            unchanged_counter += 1
+
+                    if (self._logger.getEffectiveLevel() <= logging.INFO and
+                            ((datetime.datetime.now() -
+                              last_progress_print).seconds > 60 or
+                             percent_progress <
+                             (dir_counter * 100 / dir_no_to_copy))):
+                        last_progress_print = datetime.datetime.now()
+                        percent_progress = (dir_counter * 100 / dir_no_to_copy)
+                        self._logger.info(
+                            "Backed up {} directories, ".format(dir_counter) +
+                            "copied {}".format(copy_counter) +
+                            " ({}/100)".format(percent_progress))
+        finally:
+            executor.shutdown()
+
+        self._write_manifest(destination_root, manifest)
+
+        self._logger.info("{} directories copied, {} unchanged".format(
+            copy_counter, unchanged_counter))
 
         self._logger.info("Start setting permissions")
         perm_counter = 0
         for tempRelPath in parent_dir_set:
             try:
                 shutil.copystat(os.path.join(repository_path, tempRelPath),
-                                os.path.join(self._backup_dir, tempRelPath))
+                                os.path.join(destination_root, tempRelPath))
             except OSError as e:
                 self._logger.warning(
                     "Problem setting permissions to directory " +
-                    "{}.".format(os.path.join(self._backup_dir,
+                    "{}.".format(os.path.join(destination_root,
                                               tempRelPath)))
                 self._logger.warning(os.path.join(repository_path, tempRelPath))
                 self._logger.warning("More information: " +
@@ -458,6 +683,8 @@ class AbstractBackup(object):
                                   "Backed up one round and exiting.")
                 break
 
+        self._finish_snapshot()
+
     @abstractmethod
     def _query_first_workflow(self):
         """
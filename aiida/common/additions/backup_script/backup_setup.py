@@ -167,6 +167,23 @@ class BackupSetup(object):
 
  * ``backup_dir``: The destination directory of the backup. e.g.
    ``"backup_dir": "/scratch/aiida_user/backup_script_dest"``
+
+ * ``num_threads`` (optional, default 1): The number of threads that copy the
+   directories of the repository. E.g. ``"num_threads": 8``
+
+ * ``snapshots`` (optional, default false): If true, every run of the backup
+   creates a new snapshot of the repository in the ``snapshots`` folder of
+   the destination directory, in which the files that did not change since
+   the previous snapshot are hardlinks to those of the previous snapshot.
+   Old snapshots can be deleted without affecting the other ones. The name
+   of a snapshot ends with ``.in_progress`` until its run is complete.
+   E.g. ``"snapshots": true``
+
+The backup is incremental: the destination directory (or every snapshot)
+contains a manifest (``backup_manifest.json``) with a digest of every
+backed-up directory, computed from the names, sizes and modification times
+of its files. A directory of a node or workflow that was modified is only
+copied again if its digest changed.
 """
         sys.stdout.write(info_str)
 
@@ -7,6 +7,7 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+import errno
 import os
 import shutil
 import fnmatch
@@ -360,7 +361,7 @@ class Folder(object):
             os.makedirs(self.abspath, mode=self.mode_dir)
 
 
-    def replace_with_folder(self, srcdir, move=False, overwrite=False):
+    def replace_with_folder(self, srcdir, move=False, overwrite=False, link=False):
         """
         This routine copies or moves the source folder 'srcdir' to the local
         folder pointed by this Folder object.
@@ -368,11 +369,17 @@ class Folder(object):
         :param srcdir: the source folder on the disk; this must be a string with
                 an absolute path
         :param move: if True, the srcdir is moved to the repository. Otherwise, it
-                is only copied.
+                is only copied. If srcdir is on the same filesystem (e.g. a
+                SandboxFolder in the repository), every file is renamed and
+                not copied. Symbolic links are moved as they are.
         :param overwrite: if True, the folder will be erased first.
                 if False, a IOError is raised if the folder already exists.
                 Whatever the value of this flag, parent directories will be
                 created, if needed.
+        :param link: if True, the files are hardlinked instead of copied, which
+                does not duplicate their content. Files that cannot be hardlinked
+                (e.g. because srcdir is on another filesystem) are copied.
+                Note that the source files share the mode set on the new files.
 
         :Raises:
             OSError or IOError: in case of problems accessing or writing
@@ -382,6 +389,8 @@ class Folder(object):
         """
         if not os.path.isabs(srcdir):
             raise ValueError('srcdir must be an absolute path')
+        if move and link:
+            raise ValueError('only one of move and link can be True')
         if overwrite:
             self.erase()
         elif self.exists():
@@ -393,10 +402,15 @@ class Folder(object):
         if not os.path.exists(pardir):
             os.makedirs(pardir, mode=self.mode_dir)
 
+        # The modes are set while creating the tree
+        if link:
+            self._link_tree(srcdir)
+            return
         if move:
-            shutil.move(srcdir, self.abspath)
-        else:
-            shutil.copytree(srcdir, self.abspath)
+            self._move_tree(srcdir)
+            return
+
+        shutil.copytree(srcdir, self.abspath)
 
         # Set the mode also for the current dir, recursively
         for dirpath, dirnames, filenames in os.walk(self.abspath,
@@ -412,6 +426,67 @@ class Folder(object):
                 if not os.path.islink(full_file_path):
                     os.chmod(full_file_path, self.mode_file)
 
+    def _move_tree(self, srcdir):
+        """
+        Recreate the tree of srcdir in this folder, renaming the files into it,
+        and remove srcdir. Files and symbolic links that cannot be renamed
+        (because srcdir is on another filesystem) are copied and removed.
+
+        :param srcdir: the absolute path of the source folder
+        """
+        for dirpath, dirnames, filenames in os.walk(srcdir):
+            target_dir = os.path.normpath(os.path.join(self.abspath, os.path.relpath(dirpath, srcdir)))
+            os.mkdir(target_dir)
+            os.chmod(target_dir, self.mode_dir)
+            # Symbolic links to directories are moved as they are, and not walked
+            links = [dirname for dirname in dirnames if os.path.islink(os.path.join(dirpath, dirname))]
+            dirnames[:] = [dirname for dirname in dirnames if dirname not in links]
+            for filename in filenames + links:
+                source = os.path.join(dirpath, filename)
+                target = os.path.join(target_dir, filename)
+                try:
+                    os.rename(source, target)
+                except OSError as exception:
+                    if exception.errno != errno.EXDEV:
+                        raise
+                    if os.path.islink(source):
+                        os.symlink(os.readlink(source), target)
+                    else:
+                        shutil.copy(source, target)
+                    os.remove(source)
+                # do not change permissions of symlinks (this would
+                # actually change permissions of the linked file/dir)
+                if not os.path.islink(target):
+                    os.chmod(target, self.mode_file)
+        # Only the empty directories are left
+        shutil.rmtree(srcdir)
+
+    def _link_tree(self, srcdir):
+        """
+        Recreate the tree of srcdir in this folder, hardlinking the files.
+        As for shutil.copytree, symbolic links are followed and their content is copied.
+        Files that cannot be hardlinked are copied.
+
+        :param srcdir: the absolute path of the source folder
+        """
+        for dirpath, dirnames, filenames in os.walk(srcdir, followlinks=True):
+            target_dir = os.path.normpath(os.path.join(self.abspath, os.path.relpath(dirpath, srcdir)))
+            os.mkdir(target_dir)
+            os.chmod(target_dir, self.mode_dir)
+            for filename in filenames:
+                source = os.path.join(dirpath, filename)
+                target = os.path.join(target_dir, filename)
+                if os.path.islink(source):
+                    shutil.copy(source, target)
+                else:
+                    try:
+                        os.link(source, target)
+                    except OSError as exception:
+                        if exception.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                            raise
+                        shutil.copy(source, target)
+                os.chmod(target, self.mode_file)
+
 
 class SandboxFolder(Folder):
     """
@@ -10,7 +10,7 @@
 import os, tempfile
 
 def draw_graph(origin_node, ancestor_depth=None, descendant_depth=None, format='dot',
-        include_calculation_inputs=False, include_calculation_outputs=False):
+        include_calculation_inputs=False, include_calculation_outputs=False, graph=None):
     """
     The algorithm starts from the original node and goes both input-ward and output-ward via a breadth-first algorithm.
 
@@ -18,6 +18,8 @@ def draw_graph(origin_node, ancestor_depth=None, descendant_depth=None, format='
     :param int ancestor_depth: The maximum depth of the ancestors drawn. If left to None, we recurse until the graph is fully explored
     :param int descendant_depth: The maximum depth of the descendants drawn. If left to None, we recurse until the graph is fully explored
     :param str format: The format, by default dot
+    :param graph: An optional :class:`aiida.orm.utils.graph.ProvenanceGraph` snapshot. If given, the graph is
+        explored in memory and the nodes and links are then loaded with a few queries, instead of two queries per node.
 
     :returns: The exit_status of the os.system call that produced the valid file
     :returns: The file name of the final output
@@ -89,7 +91,13 @@ def draw_graph(origin_node, ancestor_depth=None, descendant_depth=None, format='
     # whereas these should not be used for the recursion:
     additional_nodes = {}
 
-    last_nodes = [origin_node] # Put the nodes whose links have not been scanned yet
+    if graph is not None:
+        _explore_snapshot(graph, origin_node, ancestor_depth, descendant_depth, include_calculation_inputs,
+                          include_calculation_outputs, links, nodes, additional_nodes, draw_node_settings,
+                          draw_link_settings)
+        last_nodes = []
+    else:
+        last_nodes = [origin_node] # Put the nodes whose links have not been scanned yet
 
     # Go through the graph on-ward (i.e. look at inputs)
     depth = 0
@@ -137,7 +145,7 @@ def draw_graph(origin_node, ancestor_depth=None, descendant_depth=None, format='
 
 
     # Go through the graph down-ward (i.e. look at outputs)
-    last_nodes = [origin_node]
+    last_nodes = [origin_node] if graph is None else []
     depth = 0
     while last_nodes:
         depth += 1
@@ -189,3 +197,64 @@ def draw_graph(origin_node, ancestor_depth=None, descendant_depth=None, format='
     # cleaning up by removing the temporary file
     os.remove(fname)
     return exit_status, output_file_name
+
+
+def _explore_snapshot(graph, origin_node, ancestor_depth, descendant_depth, include_calculation_inputs,
+                      include_calculation_outputs, links, nodes, additional_nodes, draw_node_settings,
+                      draw_link_settings):
+    """
+    Fill the links, nodes and additional_nodes dictionaries of draw_graph, exploring the graph in memory.
+
+    The same nodes and links are drawn as when querying for the inputs and outputs of every node: the breadth-first
+    searches are done on the snapshot, and the nodes and links found are then loaded with one query each.
+    """
+    from aiida.orm.calculation import Calculation
+    from aiida.orm.node import Node
+    from aiida.orm.querybuilder import QueryBuilder
+    from aiida.orm.utils.graph import INCOMING, OUTGOING, get_nodes
+
+    ancestor_levels = graph.bfs([origin_node.pk], INCOMING, max_depth=ancestor_depth)
+    descendant_levels = graph.bfs([origin_node.pk], OUTGOING, max_depth=descendant_depth)
+
+    # The nodes whose links are scanned are those that were not found at the maximum depth
+    scanned_ancestors = set(pk for level in ancestor_levels[:ancestor_depth] for pk in level.tolist())
+    scanned_descendants = set(pk for level in descendant_levels[:descendant_depth] for pk in level.tolist())
+    node_pks = set(pk for level in ancestor_levels + descendant_levels for pk in level.tolist())
+
+    loaded_nodes = get_nodes(node_pks)
+    loaded_nodes[origin_node.pk] = origin_node
+
+    link_pairs = set()
+    for pk in scanned_ancestors:
+        link_pairs.update((inp, pk) for inp in graph.inputs(pk).tolist())
+    for pk in scanned_descendants:
+        link_pairs.update((pk, out) for out in graph.outputs(pk).tolist())
+
+    additional_pks = set()
+    for pk in scanned_ancestors:
+        if include_calculation_outputs and isinstance(loaded_nodes[pk], Calculation):
+            outputs = graph.outputs(pk).tolist()
+            link_pairs.update((pk, out) for out in outputs)
+            additional_pks.update(outputs)
+    for pk in scanned_descendants:
+        if include_calculation_inputs and isinstance(loaded_nodes[pk], Calculation):
+            inputs = graph.inputs(pk).tolist()
+            link_pairs.update((inp, pk) for inp in inputs)
+            additional_pks.update(inputs)
+    additional_pks.difference_update(node_pks)
+
+    for pk, node in loaded_nodes.iteritems():
+        if pk not in nodes:
+            nodes[pk] = draw_node_settings(node)
+    for pk, node in get_nodes(additional_pks).iteritems():
+        additional_nodes[pk] = draw_node_settings(node)
+
+    # Load the labels of the links between all the drawn nodes, and keep those that were found
+    all_pks = list(node_pks.union(additional_pks))
+    link_query = QueryBuilder()
+    link_query.append(Node, filters={'id': {'in': all_pks}}, project='id', tag='inp')
+    link_query.append(Node, output_of='inp', filters={'id': {'in': all_pks}}, project='id',
+                      edge_project=('id', 'label', 'type'))
+    for inp_id, out_id, link_id, link_label, link_type in link_query.iterall():
+        if (inp_id, out_id) in link_pairs:
+            links[link_id] = draw_link_settings(inp_id, out_id, link_label, link_type)
@@ -883,7 +883,90 @@ _property_table = {
         "bool",
         "Boolean whether to print deprecation warnings",
         False,
-        None)
+        None),
+    "daemon.transport_task_threads": (
+        "daemon_transport_task_threads",
+        "bool",
+        "Whether to run the transport tasks (submit, update, retrieve and kill of job calculations) "
+        "outside of the event loop of a runner, in a thread per authinfo; the tasks of an authinfo "
+        "run one after the other, since they share the same transport",
+        False,
+        None),
+    "daemon.autoscale": (
+        "daemon_autoscale",
+        "bool",
+        "Whether to start the daemon with an autoscaler, which adds or removes daemon workers "
+        "depending on the number of tasks waiting in the launch queue and running in the workers",
+        False,
+        None),
+    "daemon.autoscale_min_workers": (
+        "daemon_autoscale_min_workers",
+        "int",
+        "Minimum number of daemon workers kept running by the autoscaler",
+        1,
+        None),
+    "daemon.autoscale_max_workers": (
+        "daemon_autoscale_max_workers",
+        "int",
+        "Maximum number of daemon workers started by the autoscaler",
+        4,
+        None),
+    "daemon.autoscale_interval": (
+        "daemon_autoscale_interval",
+        "int",
+        "Interval in seconds between two scaling decisions of the daemon autoscaler",
+        30,
+        None),
+    "daemon.autoscale_drain_timeout": (
+        "daemon_autoscale_drain_timeout",
+        "int",
+        "Maximum time in seconds that the autoscaler waits for a draining daemon worker to complete its "
+        "processes before stopping it; the processes that are still running are then continued by the other workers",
+        600,
+        None),
+    "db.pool_size": (
+        "db_pool_size",
+        "int",
+        "Number of connections to the database that every process using the SQLAlchemy backend keeps "
+        "open for reuse; ignored if db.external_pool is set",
+        5,
+        None),
+    "db.max_overflow": (
+        "db_max_overflow",
+        "int",
+        "Number of connections to the database that can be opened beyond db.pool_size when all the "
+        "pooled ones are in use; they are closed when returned",
+        10,
+        None),
+    "db.pool_recycle": (
+        "db_pool_recycle",
+        "int",
+        "Time in seconds after which a pooled database connection is replaced, e.g. to avoid using "
+        "connections closed by the server after being idle; set to -1 to never replace them",
+        -1,
+        None),
+    "db.external_pool": (
+        "db_external_pool",
+        "bool",
+        "Whether the database is accessed through an external connection pool such as pgbouncer; "
+        "the SQLAlchemy backend then does not keep connections open, but closes them after every use",
+        False,
+        None),
+    "db.cache_schema_version_check": (
+        "db_cache_schema_version_check",
+        "bool",
+        "Whether to remember, for every profile, that the schema version of the database matches the "
+        "migrations of the code, such that loading the database environment of the SQLAlchemy backend "
+        "only reads the version stored in the database instead of running the alembic machinery",
+        True,
+        None),
+    "querybuilder.compiled_cache_size": (
+        "querybuilder_compiled_cache_size",
+        "int",
+        "Maximum number of compiled SQL statements that the QueryBuilder keeps "
+        "in memory to reuse for queries of the same shape; set to 0 to disable",
+        256,
+        None),
 }
 
 
@@ -46,3 +46,82 @@ class FoldersTest(unittest.TestCase):
         # Should not raise any exception
         self.assertEquals(fd.get_abs_path('test_file.txt'),
                           '/tmp/test_file.txt')
+
+    def _create_source_tree(self):
+        import os, tempfile
+
+        source = tempfile.mkdtemp()
+        os.mkdir(os.path.join(source, 'sub'))
+        with open(os.path.join(source, 'a.txt'), 'w') as f:
+            f.write("a")
+        with open(os.path.join(source, 'sub', 'b.txt'), 'w') as f:
+            f.write("b")
+        return source
+
+    def _check_destination_tree(self, folder):
+        import os, stat
+
+        with open(folder.get_abs_path('a.txt')) as f:
+            self.assertEquals(f.read(), "a")
+        with open(folder.get_abs_path(os.path.join('sub', 'b.txt'))) as f:
+            self.assertEquals(f.read(), "b")
+        for dirname in ['.', 'sub']:
+            mode = stat.S_IMODE(os.stat(folder.get_abs_path(dirname, check_existence=True)).st_mode)
+            self.assertEquals(mode, folder.mode_dir)
+        for filename in ['a.txt', os.path.join('sub', 'b.txt')]:
+            mode = stat.S_IMODE(os.stat(folder.get_abs_path(filename)).st_mode)
+            self.assertEquals(mode, folder.mode_file)
+
+    def test_replace_with_folder_move(self):
+        from aiida.common.folders import Folder
+        import os, shutil, tempfile
+
+        source = self._create_source_tree()
+        parent = tempfile.mkdtemp()
+        try:
+            folder = Folder(os.path.join(parent, 'destination'))
+            folder.replace_with_folder(source, move=True)
+            self.assertFalse(os.path.exists(source))
+            self._check_destination_tree(folder)
+        finally:
+            shutil.rmtree(parent)
+
+    def test_replace_with_folder_move_symlinks(self):
+        from aiida.common.folders import Folder
+        import os, shutil, tempfile
+
+        source = self._create_source_tree()
+        os.symlink('a.txt', os.path.join(source, 'link.txt'))
+        os.symlink('sub', os.path.join(source, 'link'))
+        parent = tempfile.mkdtemp()
+        try:
+            folder = Folder(os.path.join(parent, 'destination'))
+            folder.replace_with_folder(source, move=True)
+            self.assertFalse(os.path.exists(source))
+            self._check_destination_tree(folder)
+            # The symbolic links are moved, not followed
+            self.assertEquals(os.readlink(folder.get_abs_path('link.txt')), 'a.txt')
+            self.assertEquals(os.readlink(folder.get_abs_path('link')), 'sub')
+        finally:
+            shutil.rmtree(parent)
+
+    def test_replace_with_folder_link(self):
+        from aiida.common.folders import Folder
+        import os, shutil, tempfile
+
+        source = self._create_source_tree()
+        parent = tempfile.mkdtemp()
+        try:
+            folder = Folder(os.path.join(parent, 'destination'))
+            folder.replace_with_folder(source, link=True)
+            self._check_destination_tree(folder)
+            # The source is still there and the files are shared
+            self.assertTrue(os.path.samefile(os.path.join(source, 'a.txt'), folder.get_abs_path('a.txt')))
+
+            with self.assertRaises(IOError):
+                folder.replace_with_folder(source, link=True)
+            with self.assertRaises(ValueError):
+                folder.replace_with_folder(source, move=True, link=True, overwrite=True)
+        finally:
+            shutil.rmtree(parent)
+            shutil.rmtree(source)
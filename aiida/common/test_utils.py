@@ -155,3 +155,29 @@ class UniqueTest(unittest.TestCase):
             answer = ""
             utils.raw_input = lambda x: answer if x == question else "y"
             self.assertEqual(utils.ask_question(question, int, True), None)
+
+
+class LRUCacheTest(unittest.TestCase):
+    """
+    Tests for the LRUCache class.
+    """
+
+    def test_eviction_order(self):
+        cache = utils.LRUCache(maxsize=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        # Reading 'a' makes 'b' the least recently used entry
+        self.assertEqual(cache.get('a'), 1)
+        cache['c'] = 3
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('b', 'missing'), 'missing')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_disabled(self):
+        cache = utils.LRUCache(maxsize=0)
+        cache['a'] = 1
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get('a'))
@@ -1288,3 +1288,77 @@ class HiddenPrints:
 def type_check(what, of_type):
     if not isinstance(what, of_type):
         raise TypeError("Got object of type '{}', expecting '{}'".format(type(what), of_type))
+
+
+class LRUCache(object):
+    """
+    A thread-safe, size-bounded dictionary that evicts the least recently
+    used entry when full. Reading an entry with :meth:`get` marks it as the
+    most recently used one. Usage::
+
+        cache = LRUCache(maxsize=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache.get('a')
+        cache['c'] = 3   # evicts 'b'
+
+    :param int maxsize: the maximum number of entries; if zero (or negative),
+        nothing is ever stored.
+    """
+
+    def __init__(self, maxsize=128):
+        import threading
+        from collections import OrderedDict
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the value stored for key, or default if there is none.
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def pop(self, key, default=None):
+        """
+        Remove key from the cache and return its value, or default if it is not cached.
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """
+        Remove all entries and reset the hit and miss counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Autoscaler of the daemon workers.
+
+At regular intervals, the autoscaler compares the load, i.e. the number of tasks waiting in the launch queue plus
+the number of processes active in the workers, with the capacity of the workers, i.e. the number of tasks that each
+worker takes at most from the queue. Workers are added as soon as the load exceeds the capacity, and removed when the
+load has been low for a few consecutive intervals, always within the configured bounds.
+
+Workers are removed gracefully: circus always stops the oldest workers first, so the oldest workers are first asked
+to drain, i.e. to stop taking new tasks, and are only stopped once they have completed their active processes, or
+after a timeout. The processes that are still active when a worker is stopped are continued by the other workers.
+"""
+import logging
+import math
+import time
+
+from aiida.daemon.client import DaemonClient
+from aiida.work import rmq
+
+logger = logging.getLogger(__name__)
+
+
+def compute_target_workers(queue_depth, active_processes, tasks_per_worker, min_workers, max_workers):
+    """
+    Compute the number of workers needed for a given load
+
+    :param queue_depth: the number of tasks waiting in the launch queue
+    :param active_processes: the total number of processes active in the workers
+    :param tasks_per_worker: the maximum number of tasks that a worker takes from the queue
+    :param min_workers: the minimum number of workers
+    :param max_workers: the maximum number of workers
+    :returns: the number of workers, within the bounds, such that the load does not exceed their capacity
+    """
+    load = queue_depth + active_processes
+    target = int(math.ceil(float(load) / tasks_per_worker))
+    return max(min_workers, min(max_workers, target))
+
+
+class DaemonAutoscaler(object):
+    """
+    Add or remove the circus-managed workers of the daemon of a profile, depending on the load
+    """
+
+    # Number of consecutive intervals with a low load after which the workers are scaled down
+    _SCALE_DOWN_INTERVALS = 3
+
+    def __init__(self, client=None, control_panel=None, min_workers=1, max_workers=4, tasks_per_worker=None,
+                 drain_timeout=600):
+        """
+        :param client: the DaemonClient of the daemon, by default the one of the current profile
+        :param control_panel: a blocking control panel to communicate with the workers
+        :param min_workers: the minimum number of workers
+        :param max_workers: the maximum number of workers
+        :param tasks_per_worker: the maximum number of tasks that a worker takes from the queue, by default the task
+            prefetch count of the workers
+        :param drain_timeout: the maximum time in seconds to wait for a draining worker to become idle
+        """
+        if min_workers < 0 or max_workers < min_workers:
+            raise ValueError('invalid bounds for the number of workers: {} - {}'.format(min_workers, max_workers))
+
+        self._client = client if client is not None else DaemonClient()
+        self._control_panel = control_panel
+        self._min_workers = min_workers
+        self._max_workers = max_workers
+        if tasks_per_worker is None:
+            tasks_per_worker = rmq.get_rmq_config(self._client.rmq_prefix)['task_prefetch_count']
+        self._tasks_per_worker = tasks_per_worker
+        self._drain_timeout = drain_timeout
+        self._low_load_intervals = 0
+        # The pids of the draining workers, mapped to the time at which they started draining
+        self._draining = {}
+
+    def get_worker_pids(self):
+        """
+        :returns: the pids of the workers, the oldest first
+        """
+        response = self._client.get_worker_info()
+        if response.get('status') != 'ok':
+            raise RuntimeError('could not retrieve the daemon workers: {}'.format(response.get('status')))
+
+        started = {}
+        for pid, info in response['info'].items():
+            # Workers that were just stopped are reported with a string instead of their info
+            if isinstance(info, dict):
+                started[int(pid)] = info['started']
+
+        return sorted(started, key=lambda pid: (started[pid], pid))
+
+    def get_queue_depth(self):
+        """
+        :returns: the number of tasks waiting in the launch queue
+        """
+        return rmq.get_launch_queue_depth(self._client.rmq_prefix)
+
+    def get_worker_status(self, pid):
+        """
+        :param pid: the pid of the worker
+        :returns: the status dictionary of the worker, or None if it did not reply (e.g. because it is still starting)
+        """
+        try:
+            return self._control_panel.request_worker_status(pid)
+        except (rmq.TimeoutError, rmq.RemoteException, rmq.DeliveryFailed) as exception:
+            logger.debug('no status from daemon worker {}: {}'.format(pid, exception))
+            return None
+
+    def increase_workers(self, number):
+        self._client.increase_workers(number)
+
+    def decrease_workers(self, number):
+        self._client.decrease_workers(number)
+
+    def drain_worker(self, pid):
+        self._control_panel.drain_worker(pid)
+
+    def resume_worker(self, pid):
+        self._control_panel.resume_worker(pid)
+
+    def tick(self):
+        """
+        Take a single scaling decision
+
+        :returns: the change in the number of workers that are accepting tasks
+        """
+        pids = self.get_worker_pids()
+
+        for pid in list(self._draining):
+            if pid not in pids:
+                del self._draining[pid]
+
+        statuses = {pid: self.get_worker_status(pid) for pid in pids}
+        active = {pid: status['active_processes'] for pid, status in statuses.items() if status is not None}
+
+        stopped = self._stop_drained_workers(pids, active)
+        pids = [pid for pid in pids if pid not in stopped]
+
+        accepting = [pid for pid in pids if pid not in self._draining]
+        queue_depth = self.get_queue_depth()
+        target = compute_target_workers(queue_depth, sum(active.values()), self._tasks_per_worker,
+                                        self._min_workers, self._max_workers)
+
+        logger.debug('autoscaler: {} tasks queued, {} processes active, {} workers accepting tasks, {} draining, '
+                     'target {}'.format(queue_depth, sum(active.values()), len(accepting), len(self._draining), target))
+
+        if target > len(accepting):
+            self._low_load_intervals = 0
+            return self._scale_up(target - len(accepting), pids, queue_depth)
+
+        if target < len(accepting):
+            self._low_load_intervals += 1
+            if self._low_load_intervals >= self._SCALE_DOWN_INTERVALS:
+                self._low_load_intervals = 0
+                return -self._scale_down(accepting[:len(accepting) - target], queue_depth)
+        else:
+            self._low_load_intervals = 0
+
+        return 0
+
+    def _scale_up(self, number, pids, queue_depth):
+        """
+        Add workers, first resuming the draining workers, the youngest first, such that the remaining draining
+        workers are still the oldest ones.
+        """
+        resumed = [pid for pid in reversed(pids) if pid in self._draining][:number]
+        for pid in resumed:
+            self.resume_worker(pid)
+            del self._draining[pid]
+
+        added = number - len(resumed)
+        if added:
+            self.increase_workers(added)
+
+        logger.info('autoscaler: {} tasks queued, resumed {} draining workers and started {} new workers'.format(
+            queue_depth, len(resumed), added))
+
+        return number
+
+    def _scale_down(self, pids, queue_depth):
+        """
+        Ask the given workers to drain, they will be stopped once idle.
+        """
+        for pid in pids:
+            self.drain_worker(pid)
+            self._draining[pid] = time.time()
+
+        logger.info('autoscaler: {} tasks queued, draining workers {}'.format(queue_depth, pids))
+
+        return len(pids)
+
+    def _stop_drained_workers(self, pids, active):
+        """
+        Stop the draining workers once they are all idle, or their drain timeout expired.
+
+        Circus stops the oldest workers, so this is only done if the draining workers are the oldest ones.
+
+        :returns: the pids of the stopped workers
+        """
+        if not self._draining:
+            return []
+
+        oldest = pids[:len(self._draining)]
+        if set(oldest) != set(self._draining):
+            logger.warning('autoscaler: the draining workers {} are not the oldest, resuming them'.format(
+                sorted(self._draining)))
+            for pid in self._draining:
+                self.resume_worker(pid)
+            self._draining = {}
+            return []
+
+        now = time.time()
+        for pid, since in self._draining.items():
+            if active.get(pid, 0) > 0 and now - since < self._drain_timeout:
+                return []
+
+        remaining = sum(active.get(pid, 0) for pid in self._draining)
+        logger.info('autoscaler: stopping drained workers {} ({} processes still active will be continued by the '
+                    'other workers)'.format(sorted(self._draining), remaining))
+        self.decrease_workers(len(self._draining))
+        stopped = list(self._draining)
+        self._draining = {}
+
+        return stopped
+
+    def run(self, interval):
+        """
+        Take a scaling decision every interval seconds, until interrupted
+
+        :param interval: the interval in seconds between two decisions
+        """
+        logger.info('autoscaler: scaling the daemon workers between {} and {}'.format(
+            self._min_workers, self._max_workers))
+
+        while True:
+            try:
+                self.tick()
+            except Exception as exception:  # pylint: disable=broad-except
+                logger.exception('autoscaler: scaling decision failed: {}'.format(exception))
+            time.sleep(interval)
+
+
+def start_autoscaler():
+    """
+    Start the autoscaler of the daemon of the currently configured profile
+    """
+    from aiida.common.log import configure_logging
+    from aiida.common.setup import get_property
+
+    client = DaemonClient()
+    configure_logging(daemon=True, daemon_log_file=client.daemon_log_file)
+
+    with rmq.new_blocking_control_panel(timeout=get_property('daemon.timeout')) as control_panel:
+        autoscaler = DaemonAutoscaler(
+            client=client,
+            control_panel=control_panel,
+            min_workers=get_property('daemon.autoscale_min_workers'),
+            max_workers=get_property('daemon.autoscale_max_workers'),
+            drain_timeout=get_property('daemon.autoscale_drain_timeout'))
+        try:
+            autoscaler.run(get_property('daemon.autoscale_interval'))
+        except KeyboardInterrupt:
+            logger.info('Daemon autoscaler stopped')
@@ -62,11 +62,31 @@ class DaemonClient(ProfileConfig):
         """
         Return the command string to start the AiiDA daemon
         """
+        return self._get_devel_cmd_string('run_daemon')
+
+    @property
+    def autoscaler_name(self):
+        """
+        Get the name of the circus watcher of the daemon autoscaler
+        """
+        return '{}-autoscaler'.format(self.daemon_name)
+
+    @property
+    def autoscaler_cmd_string(self):
+        """
+        Return the command string to start the daemon autoscaler
+        """
+        return self._get_devel_cmd_string('run_autoscaler')
+
+    def _get_devel_cmd_string(self, command):
+        """
+        Return the command string to run a 'verdi devel' command for this profile
+        """
         from aiida.common.exceptions import ConfigurationError
         if VERDI_BIN is None:
             raise ConfigurationError("Unable to find 'verdi' in the path. Make sure that you are working "
                 "in a virtual environment, or that at least the 'verdi' executable is on the PATH")
-        return '{} -p {} devel run_daemon'.format(VERDI_BIN, self.profile_name)
+        return '{} -p {} devel {}'.format(VERDI_BIN, self.profile_name, command)
 
     @property
     def loglevel(self):
@@ -28,6 +28,19 @@ from aiida.scheduler.datastructures import JOB_STATES
 
 execlogger = aiidalogger.getChild('execmanager')
 
+# Name of the submit script of job arrays, see submit_calculations_as_array
+_ARRAY_SCRIPT_FILENAME = '_aiidasubmit_array.sh'
+
+# Names of the submit script of bundles, of its scheduler output files, of the
+# file where each calculation of a bundle records its exit status and timings
+# and of the file that requests the kill of a calculation of a bundle,
+# see submit_calculations_as_bundle
+_BUNDLE_SCRIPT_FILENAME = '_aiidasubmit_bundle.sh'
+_BUNDLE_SCHED_OUTPUT_FILE = '_scheduler-bundle-stdout.txt'
+_BUNDLE_SCHED_ERROR_FILE = '_scheduler-bundle-stderr.txt'
+BUNDLE_STATUS_FILENAME = '_aiida_bundle_status.txt'
+BUNDLE_KILL_FILENAME = '_aiida_bundle_kill'
+
 
 def submit_calculation(calculation, transport):
     """
@@ -36,15 +49,291 @@ def submit_calculation(calculation, transport):
     :param calculation: the instance of JobCalculation to submit.
     :param transport: an already opened transport to use to submit the calculation.
     """
+    computer = calculation.get_computer()
+
+    if not computer.is_enabled():
+        return
+
+    script_filename, job_tmpl = _upload_calculation_once(calculation, transport)
+
+    s = computer.get_scheduler()
+    s.set_transport(transport)
+
+    job_id = s.submit_from_script(job_tmpl.working_directory, script_filename)
+    calculation._set_job_id(job_id)
+
+
+def submit_calculations(calculations, transport):
+    """
+    Submit a list of calculations that are ready to be submitted at the same
+    time, according to the submit mode of their computer (see
+    :py:meth:`aiida.orm.Computer.get_submit_mode`): one job per calculation with
+    :py:func:`submit_calculation`, job arrays with
+    :py:func:`submit_calculations_as_array` or a bundle with
+    :py:func:`submit_calculations_as_bundle`. A single calculation is always
+    submitted on its own.
+
+    :param calculations: a list of JobCalculation instances to submit, all on the
+        computer of the transport
+    :param transport: an already opened transport to use to submit the calculations.
+    """
+    if not calculations:
+        return
+
+    computer = calculations[0].get_computer()
+    submit_mode = computer.get_submit_mode()
+
+    if submit_mode == 'array' and len(calculations) > 1:
+        submit_calculations_as_array(calculations, transport)
+    elif submit_mode == 'bundle' and len(calculations) > 1:
+        submit_calculations_as_bundle(calculations, transport, **computer.get_bundle_options())
+    else:
+        for calculation in calculations:
+            submit_calculation(calculation, transport)
+
+
+def submit_calculations_as_array(calculations, transport):
+    """
+    Submit a list of calculations, grouping those with compatible scheduler
+    resources and options in job arrays, one task per calculation.
+
+    Each calculation is uploaded to its own working directory as done by
+    :py:func:`submit_calculation`, and all of them are uploaded before the arrays
+    are submitted: if the submission fails, the calculations that were uploaded
+    are not uploaded again by the next attempt. The submit script of each array is written in
+    the working directory of its first calculation, and each task of the array
+    runs the submit script of its calculation in that calculation's working
+    directory. Calculations that cannot be grouped with any other, or that run on
+    a scheduler that does not support job arrays, are submitted on their own.
+    The job id set for each calculation is the one of its task, so that
+    :py:func:`update_calculation` works unchanged.
+
+    :param calculations: a list of JobCalculation instances to submit, all on the
+        computer of the transport
+    :param transport: an already opened transport to use to submit the calculations.
+    """
+    from collections import OrderedDict
+    import StringIO
+
+    if not calculations:
+        return
+
+    computer = calculations[0].get_computer()
+
+    if not computer.is_enabled():
+        return
+
+    s = computer.get_scheduler()
+    s.set_transport(transport)
+
+    groups = OrderedDict()
+    for calculation in calculations:
+        if calculation.get_computer().uuid != computer.uuid:
+            raise ValueError("All the calculations of a job array must run on the same computer, but calculation {} "
+                             "runs on '{}' instead of '{}'".format(calculation.pk, calculation.get_computer().name,
+                                                                   computer.name))
+
+        script_filename, job_tmpl = _upload_calculation_once(calculation, transport)
+        key = s.get_array_compatibility_key(job_tmpl)
+        groups.setdefault(key, []).append((calculation, script_filename, job_tmpl))
+
+    can_submit_job_arrays = s._features.get('can_submit_job_arrays', False)
+
+    for group in groups.itervalues():
+
+        if len(group) == 1 or not can_submit_job_arrays:
+            for calculation, script_filename, job_tmpl in group:
+                job_id = s.submit_from_script(job_tmpl.working_directory, script_filename)
+                calculation._set_job_id(job_id)
+            continue
+
+        # The name of the submit script is the same for all calculations
+        script_filename = group[0][1]
+        job_tmpls = [job_tmpl for _, _, job_tmpl in group]
+        array_workdir = job_tmpls[0].working_directory
+        array_script_content = s.get_submit_script_array(job_tmpls, script_filename)
+
+        with SandboxFolder() as folder:
+            folder.create_file_from_filelike(StringIO.StringIO(array_script_content), _ARRAY_SCRIPT_FILENAME)
+            transport.put(folder.get_abs_path(_ARRAY_SCRIPT_FILENAME),
+                          os.path.join(array_workdir, _ARRAY_SCRIPT_FILENAME))
+
+        job_ids = s.submit_array_from_script(array_workdir, _ARRAY_SCRIPT_FILENAME, len(group))
+
+        for (calculation, _, _), job_id in zip(group, job_ids):
+            execlogger.debug("[submission of calculation {}] submitted as task {} of a job array".format(
+                calculation.pk, job_id), extra=get_dblogger_extra(calculation))
+            calculation._set_job_id(job_id)
+
+
+def submit_calculations_as_bundle(calculations, transport, resources, max_wallclock_seconds=None,
+                                  max_concurrent=None):
+    """
+    Submit a list of calculations as a single scheduler job, a bundle, that runs
+    all of them within one allocation.
+
+    Each calculation is uploaded to its own working directory as done by
+    :py:func:`submit_calculation`; the submit script of the bundle is written in
+    the working directory of the first calculation and runs the submit script of
+    each calculation in its working directory, with at most ``max_concurrent``
+    calculations running at the same time (see
+    :py:meth:`aiida.scheduler.Scheduler.get_submit_script_bundle`). All the
+    calculations get the job id of the bundle, so that
+    :py:func:`update_calculation` works unchanged.
+
+    Each calculation records its exit status and start and end times in the file
+    ``BUNDLE_STATUS_FILENAME`` of its working directory, that is added to its
+    retrieve list, so that it is retrieved together with the other outputs.
+    A calculation of a bundle is killed alone, by :py:func:`kill_calculation`,
+    through the file ``BUNDLE_KILL_FILENAME`` of its working directory.
+
+    :param calculations: a list of JobCalculation instances to submit, all on the
+        computer of the transport
+    :param transport: an already opened transport to use to submit the calculations.
+    :param resources: a dictionary with the resources of the whole bundle, in the
+        format accepted by the job resource class of the scheduler
+    :param max_wallclock_seconds: the wallclock time of the bundle. If None, it is
+        estimated from the wallclock times of the calculations, if all of them
+        define one, as the sum of the largest wallclock time of each group of
+        calculations that run at the same time.
+    :param max_concurrent: the maximum number of calculations to run at the same
+        time. If None, as many calculations as fit in the resources of the bundle.
+    """
+    import StringIO
+
+    if not calculations:
+        return
+
+    computer = calculations[0].get_computer()
+
+    if not computer.is_enabled():
+        return
+
+    s = computer.get_scheduler()
+    s.set_transport(transport)
+
+    bundle_resource = s.create_job_resource(**resources)
+
+    uploaded = []
+    for calculation in calculations:
+        if calculation.get_computer().uuid != computer.uuid:
+            raise ValueError("All the calculations of a bundle must run on the same computer, but calculation {} "
+                             "runs on '{}' instead of '{}'".format(calculation.pk, calculation.get_computer().name,
+                                                                   computer.name))
+
+        script_filename, job_tmpl = _upload_calculation_once(calculation, transport)
+        retrieve_list = calculation._get_retrieve_list() or []
+        if BUNDLE_STATUS_FILENAME not in retrieve_list:
+            calculation._set_retrieve_list(retrieve_list + [BUNDLE_STATUS_FILENAME])
+        uploaded.append((calculation, job_tmpl))
+
+    job_tmpls = [job_tmpl for _, job_tmpl in uploaded]
+
+    if max_concurrent is None:
+        max_concurrent = s.get_bundle_max_concurrent(bundle_resource, job_tmpls)
+
+    if max_wallclock_seconds is None:
+        wallclocks = [job_tmpl.max_wallclock_seconds for job_tmpl in job_tmpls]
+        if all(wallclocks):
+            max_wallclock_seconds = sum(
+                max(wallclocks[i:i + max_concurrent]) for i in range(0, len(wallclocks), max_concurrent))
+
+    # The scheduler options of the bundle are those of the first calculation
+    bundle_tmpl = job_tmpls[0].copy()
+    bundle_tmpl.job_name = 'aiida-bundle'
+    bundle_tmpl.job_resource = bundle_resource
+    bundle_tmpl.max_wallclock_seconds = max_wallclock_seconds
+    bundle_tmpl.job_environment = None
+    bundle_tmpl.working_directory = None
+    bundle_tmpl.sched_output_path = _BUNDLE_SCHED_OUTPUT_FILE
+    bundle_tmpl.sched_error_path = _BUNDLE_SCHED_ERROR_FILE
+    bundle_tmpl.sched_join_files = False
+
+    # The name of the submit script is the same for all calculations
+    bundle_workdir = job_tmpls[0].working_directory
+    bundle_script_content = s.get_submit_script_bundle(
+        bundle_tmpl, job_tmpls, script_filename, BUNDLE_STATUS_FILENAME, max_concurrent=max_concurrent,
+        kill_filename=BUNDLE_KILL_FILENAME)
+
+    with SandboxFolder() as folder:
+        folder.create_file_from_filelike(StringIO.StringIO(bundle_script_content), _BUNDLE_SCRIPT_FILENAME)
+        transport.put(folder.get_abs_path(_BUNDLE_SCRIPT_FILENAME),
+                      os.path.join(bundle_workdir, _BUNDLE_SCRIPT_FILENAME))
+
+    job_id = s.submit_from_script(bundle_workdir, _BUNDLE_SCRIPT_FILENAME)
+
+    for calculation, _ in uploaded:
+        execlogger.debug("[submission of calculation {}] submitted in the bundle with job id {}".format(
+            calculation.pk, job_id), extra=get_dblogger_extra(calculation))
+        calculation._set_job_id(job_id)
+
+
+def parse_bundle_status(content):
+    """
+    Parse the content of the ``BUNDLE_STATUS_FILENAME`` file written by each
+    calculation of a bundle.
+
+    :param content: the content of the file, as a string
+    :return: a dictionary with the integer values of the keys 'start_time',
+        'exit_status' and 'end_time' that were found in the file
+    """
+    status = {}
+    for line in content.splitlines():
+        key, _, value = line.partition('=')
+        try:
+            status[key.strip()] = int(value)
+        except ValueError:
+            continue
+
+    return status
+
+
+def is_bundled(calculation):
+    """
+    :param calculation: the JobCalculation
+    :return: whether the calculation was submitted in a bundle
+    """
+    return BUNDLE_STATUS_FILENAME in (calculation._get_retrieve_list() or [])
+
+
+def get_bundle_status(calculation, transport):
+    """
+    Read the ``BUNDLE_STATUS_FILENAME`` file of a calculation that was submitted
+    in a bundle, from its working directory.
+
+    :param calculation: the JobCalculation
+    :param transport: an already opened transport
+    :return: the status parsed by :py:func:`parse_bundle_status`, empty if the
+        calculation did not start yet
+    """
+    remote_path = os.path.join(calculation._get_remote_workdir(), BUNDLE_STATUS_FILENAME)
+
+    if not transport.isfile(remote_path):
+        return {}
+
+    with SandboxFolder() as folder:
+        transport.getfile(remote_path, folder.get_abs_path(BUNDLE_STATUS_FILENAME))
+        with open(folder.get_abs_path(BUNDLE_STATUS_FILENAME)) as handle:
+            return parse_bundle_status(handle.read())
+
+
+def upload_calculation(calculation, transport):
+    """
+    Upload the input files of a calculation to a new working directory on its
+    computer, without submitting it to the scheduler
+
+    :param calculation: the instance of JobCalculation to upload.
+    :param transport: an already opened transport to use to upload the calculation.
+    :return: a tuple with the name of the submit script, relative to the working
+        directory, and the JobTemplate of the calculation, with the
+        ``working_directory`` field set to the remote working directory.
+    """
     from aiida.orm import Code
     from aiida.common.exceptions import InputValidationError
     from aiida.orm.data.remote import RemoteData
 
     computer = calculation.get_computer()
 
-    if not computer.is_enabled():
-        return
-
     logger_extra = get_dblogger_extra(calculation)
     transport._set_logger_extra(logger_extra)
 
@@ -71,8 +360,9 @@ def submit_calculation(calculation, transport):
                     "{} cannot run on computer {}".
                         format(code.pk, calculation.pk, computer.name))
 
-        # After this call, no modifications to the folder should be done
-        calculation._store_raw_input_folder(folder.abspath)
+        # After this call, no modifications to the folder should be done: the files
+        # are hardlinked, since the sandbox is still needed for the upload below
+        calculation._store_raw_input_folder(folder.abspath, link=True)
 
         # NOTE: some logic is partially replicated in the 'test_submit'
         # method of JobCalculation. If major logic changes are done
@@ -119,9 +409,6 @@ def submit_calculation(calculation, transport):
         transport.mkdir(calcinfo.uuid[4:])
         transport.chdir(calcinfo.uuid[4:])
         workdir = transport.getcwd()
-        # I store the workdir of the calculation for later file
-        # retrieval
-        calculation._set_remote_workdir(workdir)
 
         # I first create the code files, so that the code can put
         # default files to be overwritten by the plugin itself.
@@ -157,22 +444,16 @@ def submit_calculation(calculation, transport):
                     extra=logger_extra)
                 transport.put(src_abs_path, dest_rel_path)
 
+        # The remote copies and symlinks are done with as few transport operations as possible
         if remote_copy_list is not None:
+            to_copy = []
             for (remote_computer_uuid, remote_abs_path,
                  dest_rel_path) in remote_copy_list:
                 if remote_computer_uuid == computer.uuid:
                     execlogger.debug("[submission of calculation {}] "
                                      "copying {} remotely, directly on the machine "
                                      "{}".format(calculation.pk, dest_rel_path, computer.name))
-                    try:
-                        transport.copy(remote_abs_path, dest_rel_path)
-                    except (IOError, OSError):
-                        execlogger.warning("[submission of calculation {}] "
-                                           "Unable to copy remote resource from {} to {}! "
-                                           "Stopping.".format(calculation.pk,
-                                                              remote_abs_path, dest_rel_path),
-                                           extra=logger_extra)
-                        raise
+                    to_copy.append((remote_abs_path, dest_rel_path))
                 else:
                     # TODO: implement copy between two different
                     # machines!
@@ -180,34 +461,86 @@ def submit_calculation(calculation, transport):
                         "[presubmission of calculation {}] "
                         "Remote copy between two different machines is "
                         "not implemented yet".format(calculation.pk))
+            try:
+                transport.copy_many(to_copy)
+            except (IOError, OSError):
+                execlogger.warning("[submission of calculation {}] "
+                                   "Unable to copy remote resources {}! "
+                                   "Stopping.".format(calculation.pk, to_copy),
+                                   extra=logger_extra)
+                raise
 
         if remote_symlink_list is not None:
+            to_symlink = []
             for (remote_computer_uuid, remote_abs_path,
                  dest_rel_path) in remote_symlink_list:
                 if remote_computer_uuid == computer.uuid:
                     execlogger.debug("[submission of calculation {}] "
                                      "copying {} remotely, directly on the machine "
                                      "{}".format(calculation.pk, dest_rel_path, computer.name))
-                    try:
-                        transport.symlink(remote_abs_path, dest_rel_path)
-                    except (IOError, OSError):
-                        execlogger.warning("[submission of calculation {}] "
-                                           "Unable to create remote symlink from {} to {}! "
-                                           "Stopping.".format(calculation.pk,
-                                                              remote_abs_path, dest_rel_path),
-                                           extra=logger_extra)
-                        raise
+                    to_symlink.append((remote_abs_path, dest_rel_path))
                 else:
                     raise IOError("It is not possible to create a symlink "
                                   "between two different machines for "
                                   "calculation {}".format(calculation.pk))
+            try:
+                transport.symlink_many(to_symlink)
+            except (IOError, OSError):
+                execlogger.warning("[submission of calculation {}] "
+                                   "Unable to create remote symlinks {}! "
+                                   "Stopping.".format(calculation.pk, to_symlink),
+                                   extra=logger_extra)
+                raise
+
+        # I store the workdir of the calculation for later file
+        # retrieval. It is stored only once all the files are uploaded,
+        # such that a new attempt to submit the calculation reuses it only
+        # if it is complete (see _upload_calculation_once)
+        calculation._set_remote_workdir(workdir)
 
         remotedata = RemoteData(computer=computer, remote_path=workdir)
         remotedata.add_link_from(calculation, label='remote_folder', link_type=LinkType.CREATE)
         remotedata.store()
 
-        job_id = s.submit_from_script(transport.getcwd(), script_filename)
-        calculation._set_job_id(job_id)
+        job_tmpl = _load_job_template(calculation, folder, s)
+        job_tmpl.working_directory = workdir
+
+    return script_filename, job_tmpl
+
+
+def _load_job_template(calculation, folder, scheduler):
+    """
+    Load the JobTemplate of a calculation, serialized by its _presubmit method in the given folder.
+    The job resource has to be recreated as an instance of the job resource class of the scheduler.
+    """
+    import json
+
+    from aiida.scheduler.datastructures import JobTemplate
+
+    with folder.open(os.path.join('.aiida', 'job_tmpl.json')) as handle:
+        job_tmpl = JobTemplate(json.load(handle))
+    job_tmpl.job_resource = scheduler.create_job_resource(**calculation.get_resources(full=True))
+    return job_tmpl
+
+
+def _upload_calculation_once(calculation, transport):
+    """
+    Upload a calculation with :py:func:`upload_calculation`, unless a previous attempt to submit it
+    already uploaded it and failed afterwards, in which case its working directory is reused.
+
+    :return: the same tuple as :py:func:`upload_calculation`
+    """
+    from aiida.orm.implementation.general.calculation.job import SUBMIT_SCRIPT_FILENAME
+
+    workdir = calculation._get_remote_workdir()
+    if workdir is None:
+        return upload_calculation(calculation, transport)
+
+    execlogger.debug("[submission of calculation {}] already uploaded to {}".format(calculation.pk, workdir),
+                     extra=get_dblogger_extra(calculation))
+    job_tmpl = _load_job_template(calculation, calculation._raw_input_folder, calculation.get_computer().get_scheduler())
+    job_tmpl.working_directory = workdir
+    return SUBMIT_SCRIPT_FILENAME, job_tmpl
 
 
 def update_calculation(calculation, transport):
@@ -237,12 +570,27 @@ def update_calculation(calculation, transport):
     if info is None:
         # If the job is computed or not found assume it's done
         job_done = True
-        calculation._set_scheduler_state(JOB_STATES.DONE)
     else:
         update_job_calc_from_job_info(calculation, info)
 
         job_done = info.job_state == JOB_STATES.DONE
 
+    # The calculations of a bundle share its job, but each of them is done, and can be
+    # retrieved, as soon as it has recorded its end time. If the bundle ended first,
+    # the calculation was interrupted (e.g. by the wallclock limit of the bundle)
+    if is_bundled(calculation):
+        ended = 'end_time' in get_bundle_status(calculation, transport)
+        if job_done and not ended:
+            raise exceptions.RemoteOperationError(
+                'the bundle job {} ended before calculation {} recorded its end time: '
+                'the calculation was interrupted'.format(job_id, calculation.pk))
+        if ended and not job_done:
+            calculation._set_scheduler_state(JOB_STATES.DONE)
+            return True
+
+    if info is None:
+        calculation._set_scheduler_state(JOB_STATES.DONE)
+
     if job_done:
         # If the job is done, also get detailed job info
         try:
@@ -292,8 +640,9 @@ def retrieve_calculation(calculation, transport, retrieved_temporary_folder):
 
         with SandboxFolder() as folder:
             retrieve_files_from_list(calculation, transport, folder.abspath, retrieve_list)
-            # Here I retrieved everything; now I store them inside the calculation
-            retrieved_files.replace_with_folder(folder.abspath, overwrite=True)
+            # Here I retrieved everything; now I store them inside the calculation.
+            # The sandbox is in the repository, so it is moved with a rename rather than copied
+            retrieved_files.replace_with_folder(folder.abspath, overwrite=True, move=True)
 
         # Second, retrieve the singlefiles
         with SandboxFolder() as folder:
@@ -319,13 +668,25 @@ def retrieve_calculation(calculation, transport, retrieved_temporary_folder):
 
 def kill_calculation(calculation, transport):
     """
-    Kill the calculation through the scheduler
+    Kill the calculation through the scheduler. A calculation of a bundle is
+    killed alone, without killing the bundle job and the other calculations,
+    by creating the file ``BUNDLE_KILL_FILENAME`` in its working directory.
 
     :param calculation: the instance of JobCalculation to kill.
     :param transport: an already opened transport to use to address the scheduler
     """
+    import StringIO
+
     job_id = calculation.get_job_id()
 
+    if is_bundled(calculation):
+        with SandboxFolder() as folder:
+            folder.create_file_from_filelike(StringIO.StringIO(''), BUNDLE_KILL_FILENAME)
+            transport.put(folder.get_abs_path(BUNDLE_KILL_FILENAME),
+                          os.path.join(calculation._get_remote_workdir(), BUNDLE_KILL_FILENAME))
+        calculation._set_scheduler_state(JOB_STATES.DONE)
+        return
+
     # Get the scheduler plugin class and initialize it with the correct transport
     scheduler = calculation.get_computer().get_scheduler()
     scheduler.set_transport(transport)
@@ -26,12 +26,15 @@ class ArrayData(Data):
       is used thereafter.
       If too much RAM memory is used, you can clear the
       cache with the :py:meth:`.clear_internal_cache` method.
+      To read only a few entries of a large array, use
+      :py:meth:`.get_array_memmap` instead.
     """
     array_prefix = "array|"
 
     def __init__(self, *args, **kwargs):
         super(ArrayData, self).__init__(*args, **kwargs)
         self._cached_arrays = {}
+        self._cached_memmaps = {}
 
     def delete_array(self, name):
         """
@@ -112,6 +115,20 @@ class ArrayData(Data):
         for name in self.get_arraynames():
             yield (name, self.get_array(name))
 
+    def _get_array_path(self, name):
+        """
+        Return the absolute path of the file of an array stored in the node.
+
+        :param name: The name of the array.
+        :raise KeyError: if there is no array with this name.
+        """
+        fname = '{}.npy'.format(name)
+        if fname not in self.get_folder_list():
+            raise KeyError(
+                "Array with name '{}' not found in node pk= {}".format(
+                    name, self.pk))
+        return self.get_abs_path(fname)
+
     def get_array(self, name):
         """
         Return an array stored in the node
@@ -122,13 +139,7 @@ class ArrayData(Data):
 
         # raw function used only internally
         def get_array_from_file(self, name):
-            fname = '{}.npy'.format(name)
-            if fname not in self.get_folder_list():
-                raise KeyError(
-                    "Array with name '{}' not found in node pk= {}".format(
-                        name, self.pk))
-
-            array = numpy.load(self.get_abs_path(fname))
+            array = numpy.load(self._get_array_path(name))
             return array
 
         # Return with proper caching, but only after storing. Before, instead,
@@ -140,6 +151,36 @@ class ArrayData(Data):
                 self._cached_arrays[name] = get_array_from_file(self, name)
             return self._cached_arrays[name]
 
+    def get_array_memmap(self, name):
+        """
+        Return a read-only memory map of an array stored in the node: only the
+        entries that are accessed are read from disk, e.g. a single step of a
+        large trajectory. The returned array must not be modified.
+
+        If the array was already read with :py:meth:`.get_array`, the array
+        cached in memory is returned instead. Arrays of Python objects cannot
+        be memory-mapped, and are read with :py:meth:`.get_array`.
+
+        :param name: The name of the array to return.
+        """
+        import numpy
+
+        if name in self._cached_arrays:
+            return self._cached_arrays[name]
+        if name in self._cached_memmaps:
+            return self._cached_memmaps[name]
+
+        try:
+            array = numpy.load(self._get_array_path(name), mmap_mode='r')
+        except ValueError:
+            # Arrays of objects and empty arrays cannot be memory-mapped
+            return self.get_array(name)
+
+        # As for get_array, the memory map is kept only after storing
+        if self.is_stored:
+            self._cached_memmaps[name] = array
+        return array
+
     def clear_internal_cache(self):
         """
         Clear the internal memory cache where the arrays are stored after being
@@ -149,6 +190,7 @@ class ArrayData(Data):
         do not want to waste memory to cache the arrays in RAM.
         """
         self._cached_arrays = {}
+        self._cached_memmaps = {}
 
     def set_array(self, name, array):
         """
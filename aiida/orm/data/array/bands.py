@@ -12,6 +12,8 @@ This module defines the classes related to band structures or dispersions
 in a Brillouin zone, and how to operate on them.
 """
 
+import collections
+
 from aiida.orm.data.array.kpoints import KpointsData
 import numpy
 from string import Template
@@ -35,108 +37,84 @@ def prepare_header_comment(uuid, plot_info, comment_char='#'):
 
     return "\n".join("{} {}".format(comment_char, l) for l in filetext)
 
-# TODO: set and get bands could have more functionalities: how do I know the number of bands for example?
+def _format_table(table):
+    """
+    Format the rows of a 2D array as lines of tab-separated numbers with 8 decimals.
 
-def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
+    All the numbers are formatted with a single string operation, rather than
+    with one operation per number.
+
+    :return: the lines, separated (but not terminated) by newlines
     """
-    Tries to guess whether the bandsdata represent an insulator.
-    This method is meant to be used only for electronic bands (not phonons)
-    By default, it will try to use the occupations to guess the number of
-    electrons and find the Fermi Energy, otherwise, it can be provided
-    explicitely.
-    Also, there is an implicit assumption that the kpoints grid is
-    "sufficiently" dense, so that the bandsdata are not missing the
-    intersection between valence and conduction band if present.
-    Use this function with care!
+    table = numpy.asarray(table, dtype=float)
+    if not table.size:
+        return ""
+    line = "\t".join(["%.8f"] * table.shape[1])
+    return "\n".join([line] * table.shape[0]) % tuple(table.ravel().tolist())
 
-    :param number_electrons: (optional, float) number of electrons in the unit cell
-    :param fermi_energy: (optional, float) value of the fermi energy.
 
-    :note: By default, the algorithm uses the occupations array
-      to guess the number of electrons and the occupied bands. This is to be
-      used with care, because the occupations could be smeared so at a
-      non-zero temperature, with the unwanted effect that the conduction bands
-      might be occupied in an insulator.
-      Prefer to pass the number_of_electrons explicitly
+# TODO: set and get bands could have more functionalities: how do I know the number of bands for example?
 
-    :note: Only one between number_electrons and fermi_energy can be specified at the
-      same time.
+# The result of the band gap analysis of a BandsData, see find_bandgap_many
+BandgapResult = collections.namedtuple('BandgapResult', ['pk', 'is_insulator', 'gap', 'fermi_energy', 'is_direct'])
 
-    :return: (is_insulator, gap), where is_insulator is a boolean, and gap a
-             float. The gap is None in case of a metal, zero when the homo is
-             equal to the lumo (e.g. in semi-metals).
-    """
 
-    def nint(num):
-        """
-        Stable rounding function
-        """
-        if (num > 0):
-            return int(num + .5)
-        else:
-            return int(num - .5)
+def _merge_spins(array):
+    """
+    Put the bands (or occupations) of both spins of a nspins x nkpoints x num_bands array
+    on a single nkpoints x (nspins * num_bands) array.
+    """
+    if len(array.shape) == 3:
+        return numpy.concatenate(list(array), axis=1)
+    return array
 
-    if fermi_energy and number_electrons:
-        raise ValueError("Specify either the number of electrons or the "
-                         "Fermi energy, but not both")
 
-    try:
-        stored_bands = bandsdata.get_bands()
-    except KeyError:
-        raise KeyError("Cannot do much of a band analysis without bands")
+def _analyze_bandgap(stored_bands, stored_occupations=None, number_electrons=None, fermi_energy=None):
+    """
+    Find the band gap from the arrays of bands and occupations, see :py:func:`find_bandgap`.
 
-    if len(stored_bands.shape) == 3:
-        # I write the algorithm for the generic case of having both the
-        # spin up and spin down array
+    The analysis is done with operations on the whole arrays, rather than with loops
+    over the kpoints and the bands.
 
-        # put all spins on one band per kpoint
-        bands = numpy.concatenate([_ for _ in stored_bands], axis=1)
-    else:
-        bands = stored_bands
+    :param stored_bands: the bands, as returned by :py:meth:`BandsData.get_bands`
+    :param stored_occupations: the occupations, required if neither the number of
+        electrons nor the Fermi energy are given
+    :return: (is_insulator, gap, homo, lumo), where homo and lumo are the arrays of
+        the energies of the highest occupied and lowest unoccupied level at each kpoint,
+        or None if they are not determined.
+    """
+    bands = _merge_spins(stored_bands)
 
     # analysis on occupations:
     if fermi_energy is None:
 
         num_kpoints = len(bands)
+        rows = numpy.arange(num_kpoints)[:, numpy.newaxis]
 
         if number_electrons is None:
-            try:
-                _, stored_occupations = bandsdata.get_bands(also_occupations=True)
-            except KeyError:
-                raise KeyError("Cannot determine metallicity if I don't have "
-                               "either fermi energy, or occupations")
-
-            # put the occupations in the same order of bands, also in case of multiple bands
-            if len(stored_occupations.shape) == 3:
-                # I write the algorithm for the generic case of having both the
-                # spin up and spin down array
-
-                # put all spins on one band per kpoint
-                occupations = numpy.concatenate([_ for _ in stored_occupations], axis=1)
-            else:
-                occupations = stored_occupations
-
-            # now sort the bands by energy
-            # Note: I am sort of assuming that I have an electronic ground state
+            occupations = _merge_spins(stored_occupations)
 
             # sort the bands by energy, and reorder the occupations accordingly
-            # since after joining the two spins, I might have unsorted stuff
-            bands, occupations = [numpy.array(y) for y in zip(*[zip(*j) for j in
-                                                                [sorted(zip(i[0].tolist(), i[1].tolist()),
-                                                                        key=lambda x: x[0])
-                                                                 for i in zip(bands, occupations)]])]
-            number_electrons = int(round(sum([sum(i) for i in occupations]) / num_kpoints))
-
-            homo_indexes = [numpy.where(numpy.array([nint(_) for _ in x]) > 0)[0][-1] for x in occupations]
-            if len(set(homo_indexes)) > 1:  # there must be intersections of valence and conduction bands
-                return False, None
-            else:
-                homo = [_[0][_[1]] for _ in zip(bands, homo_indexes)]
-                try:
-                    lumo = [_[0][_[1] + 1] for _ in zip(bands, homo_indexes)]
-                except IndexError:
-                    raise ValueError("To understand if it is a metal or insulator, "
-                                     "need more bands than n_band=number_electrons")
+            # since after joining the two spins, I might have unsorted stuff.
+            # Note: I am sort of assuming that I have an electronic ground state
+            order = numpy.argsort(bands, axis=1, kind='mergesort')
+            bands = bands[rows, order]
+            occupations = occupations[rows, order]
+            number_electrons = int(round(occupations.sum() / num_kpoints))
+
+            # a level is occupied if its occupation rounds to a positive integer
+            occupied = occupations >= 0.5
+            if not occupied.any(axis=1).all():
+                raise IndexError("No occupied level found for some kpoints")
+            homo_indexes = occupied.shape[1] - 1 - numpy.argmax(occupied[:, ::-1], axis=1)
+            homo = bands[rows[:, 0], homo_indexes]
+            if len(numpy.unique(homo_indexes)) > 1:  # there must be intersections of valence and conduction bands
+                return False, None, homo, None
+            try:
+                lumo = bands[:, homo_indexes[0] + 1]
+            except IndexError:
+                raise ValueError("To understand if it is a metal or insulator, "
+                                 "need more bands than n_band=number_electrons")
 
         else:
             bands = numpy.sort(bands)
@@ -146,10 +124,10 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
             # calculation, 2 otherwise)
             number_electrons_per_band = 4 - len(stored_bands.shape)  # 1 or 2
             # gather the energies of the homo band, for every kpoint
-            homo = [i[number_electrons / number_electrons_per_band - 1] for i in bands]  # take the nth level
+            homo = bands[:, number_electrons // number_electrons_per_band - 1]  # take the nth level
             try:
                 # gather the energies of the lumo band, for every kpoint
-                lumo = [i[number_electrons / number_electrons_per_band] for i in bands]  # take the n+1th level
+                lumo = bands[:, number_electrons // number_electrons_per_band]  # take the n+1th level
             except IndexError:
                 raise ValueError("To understand if it is a metal or insulator, "
                                  "need more bands than n_band=number_electrons")
@@ -157,54 +135,153 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
         if number_electrons % 2 == 1 and len(stored_bands.shape) == 2:
             # if #electrons is odd and we have a non spin polarized calculation
             # it must be a metal and I don't need further checks
-            return False, None
+            return False, None, homo, None
 
         # if the nth band crosses the (n+1)th, it is an insulator
-        gap = min(lumo) - max(homo)
+        gap = lumo.min() - homo.max()
         if gap == 0.:
-            return False, 0.
+            return False, 0., homo, lumo
         elif gap < 0.:
-            return False, None
+            return False, None, homo, lumo
         else:
-            return True, gap
+            return True, gap, homo, lumo
 
     # analysis on the fermi energy
     else:
         # reorganize the bands, rather than per kpoint, per energy level
 
         # I need the bands sorted by energy
-        bands.sort()
-
-        levels = bands.transpose()
-        max_mins = [(max(i), min(i)) for i in levels]
+        bands = numpy.sort(bands)
+        maxs = bands.max(axis=0)
+        mins = bands.min(axis=0)
 
-        if fermi_energy > bands.max():
+        if fermi_energy > maxs.max():
             raise ValueError("The Fermi energy is above all band energies, "
                              "don't know what to do")
-        if fermi_energy < bands.min():
+        if fermi_energy < mins.min():
             raise ValueError("The Fermi energy is below all band energies, "
                              "don't know what to do.")
 
         # one band is crossed by the fermi energy
-        if any(i[1] < fermi_energy and fermi_energy < i[0] for i in max_mins):
-            return False, None
+        if numpy.any((mins < fermi_energy) & (fermi_energy < maxs)):
+            return False, None, None, None
 
         # case of semimetals, fermi energy at the crossing of two bands
         # this will only work if the dirac point is computed!
-        elif (any(i[0] == fermi_energy for i in max_mins) and
-                  any(i[1] == fermi_energy for i in max_mins)):
-            return False, 0.
+        elif numpy.any(maxs == fermi_energy) and numpy.any(mins == fermi_energy):
+            return False, 0., None, None
         # insulating case
         else:
+            below = maxs < fermi_energy
+            above = mins > fermi_energy
             # take the max of the band maxima below the fermi energy
-            homo = max([i[0] for i in max_mins if i[0] < fermi_energy])
+            homo = maxs[below].max()
             # take the min of the band minima above the fermi energy
-            lumo = min([i[1] for i in max_mins if i[1] > fermi_energy])
+            lumo = mins[above].min()
             gap = lumo - homo
             if gap <= 0.:
                 raise Exception("Something wrong has been implemented. "
                                 "Revise the code!")
-            return True, gap
+            return True, gap, bands[:, below].max(axis=1), bands[:, above].min(axis=1)
+
+
+def _get_bandgap_arrays(bandsdata, number_electrons=None, fermi_energy=None):
+    """
+    Return the arrays of bands and occupations of a BandsData needed by :py:func:`_analyze_bandgap`.
+    """
+    if fermi_energy and number_electrons:
+        raise ValueError("Specify either the number of electrons or the "
+                         "Fermi energy, but not both")
+
+    try:
+        stored_bands = bandsdata.get_bands()
+    except KeyError:
+        raise KeyError("Cannot do much of a band analysis without bands")
+
+    stored_occupations = None
+    if fermi_energy is None and number_electrons is None:
+        try:
+            _, stored_occupations = bandsdata.get_bands(also_occupations=True)
+        except KeyError:
+            raise KeyError("Cannot determine metallicity if I don't have "
+                           "either fermi energy, or occupations")
+
+    return stored_bands, stored_occupations
+
+
+def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
+    """
+    Tries to guess whether the bandsdata represent an insulator.
+    This method is meant to be used only for electronic bands (not phonons)
+    By default, it will try to use the occupations to guess the number of
+    electrons and find the Fermi Energy, otherwise, it can be provided
+    explicitely.
+    Also, there is an implicit assumption that the kpoints grid is
+    "sufficiently" dense, so that the bandsdata are not missing the
+    intersection between valence and conduction band if present.
+    Use this function with care!
+
+    :param number_electrons: (optional, float) number of electrons in the unit cell
+    :param fermi_energy: (optional, float) value of the fermi energy.
+
+    :note: By default, the algorithm uses the occupations array
+      to guess the number of electrons and the occupied bands. This is to be
+      used with care, because the occupations could be smeared so at a
+      non-zero temperature, with the unwanted effect that the conduction bands
+      might be occupied in an insulator.
+      Prefer to pass the number_of_electrons explicitly
+
+    :note: Only one between number_electrons and fermi_energy can be specified at the
+      same time.
+
+    :return: (is_insulator, gap), where is_insulator is a boolean, and gap a
+             float. The gap is None in case of a metal, zero when the homo is
+             equal to the lumo (e.g. in semi-metals).
+    """
+    stored_bands, stored_occupations = _get_bandgap_arrays(bandsdata, number_electrons, fermi_energy)
+    is_insulator, gap, _, _ = _analyze_bandgap(stored_bands, stored_occupations, number_electrons, fermi_energy)
+    return is_insulator, gap
+
+
+def find_bandgap_many(bands_nodes, number_electrons=None, fermi_energy=None):
+    """
+    Find the band gap of many BandsData, see :py:func:`find_bandgap`.
+
+    This is a generator: the arrays of each node are loaded only when its
+    result is requested, so that any number of nodes can be analyzed in
+    constant memory, e.g. iterating over the results of a QueryBuilder.
+
+    :param bands_nodes: an iterable of BandsData
+    :param number_electrons: (optional) the number of electrons, either the
+        same for all the nodes or a sequence with a value for each node
+    :param fermi_energy: (optional) the Fermi energy, either the same for all
+        the nodes or a sequence with a value for each node
+    :return: a generator of BandgapResult tuples, one per node, in the same order,
+        with the pk of the node, is_insulator and the gap as returned by
+        :py:func:`find_bandgap`, the Fermi energy (the given one, otherwise
+        the energy of the highest occupied level, or None if it could not be
+        determined) and is_direct (whether the top of the valence band and the
+        bottom of the conduction band are at the same kpoint, None for metals)
+    """
+    import itertools
+
+    if number_electrons is None or numpy.isscalar(number_electrons):
+        number_electrons = itertools.repeat(number_electrons)
+    if fermi_energy is None or numpy.isscalar(fermi_energy):
+        fermi_energy = itertools.repeat(fermi_energy)
+
+    for bandsdata, electrons, fermi in itertools.izip(bands_nodes, number_electrons, fermi_energy):
+        stored_bands, stored_occupations = _get_bandgap_arrays(bandsdata, electrons, fermi)
+        is_insulator, gap, homo, lumo = _analyze_bandgap(stored_bands, stored_occupations, electrons, fermi)
+
+        if fermi is None and homo is not None:
+            fermi = float(homo.max())
+
+        is_direct = None
+        if is_insulator:
+            is_direct = bool(numpy.any((homo == homo.max()) & (lumo == lumo.min())))
+
+        yield BandgapResult(bandsdata.pk, is_insulator, gap, fermi, is_direct)
 
 
 class BandsData(KpointsData):
@@ -478,10 +555,11 @@ class BandsData(KpointsData):
         # since I can have discontinuous paths, I set on those points the distance to zero
         # as a result, where there are discontinuities in the path,
         # I have two consecutive points with the same x coordinate
-        distances = [numpy.linalg.norm(kpoints[i] - kpoints[i - 1]) if not
-        (i in labels_indices and i - 1 in labels_indices) else 0.
-                     for i in range(1, len(kpoints))]
-        x = [float(sum(distances[:i])) for i in range(len(distances) + 1)]
+        is_label = numpy.zeros(len(kpoints), dtype=bool)
+        is_label[labels_indices] = True
+        distances = numpy.linalg.norm(numpy.diff(kpoints, axis=0), axis=1)
+        distances[is_label[1:] & is_label[:-1]] = 0.
+        x = numpy.concatenate([[0.], numpy.cumsum(distances)]).tolist()
 
         # transform the index of the labels in the coordinates of x
         raw_labels = [(x[i[0]], i[1]) for i in labels]
@@ -576,7 +654,7 @@ class BandsData(KpointsData):
         x_max_lim = max(x)
 
         # first prepare the xy coordinates of the sets
-        raw_data, _ = self._prepare_dat_blocks(plot_info)
+        raw_data = self._get_dat_blocks(plot_info, comments=True)
 
 
         ## Manually add the xy coordinates of the vertical lines - not needed! Use gridlines
@@ -668,9 +746,7 @@ class BandsData(KpointsData):
         if comments:
             return_text.append(prepare_header_comment(self.uuid, plot_info, comment_char="#"))
 
-        for i in zip(x, bands):
-            line = ["{:.8f}".format(i[0])] + ["{:.8f}".format(j) for j in i[1]]
-            return_text.append("\t".join(line))
+        return_text.append(_format_table(numpy.column_stack((x, bands))))
 
         return ("\n".join(return_text) + '\n').encode('utf-8'), {}
 
@@ -701,23 +777,24 @@ class BandsData(KpointsData):
             prettify_format=None,
             join_symbol="|")
 
-        bands = plot_info['y']
+        return self._get_dat_blocks(plot_info, comments=comments).encode('utf-8'), {}
+
+    def _get_dat_blocks(self, plot_info, comments=True):
+        """
+        Return the text of the dat_blocks format for the given plot data, see :py:meth:`_prepare_dat_blocks`.
+        """
         x = plot_info['x']
 
         return_text = []
         if comments:
             return_text.append(prepare_header_comment(self.uuid, plot_info, comment_char="#"))
 
-        the_bands = numpy.transpose(bands)
-
-        for b in the_bands:
-            for i in zip(x, b):
-                line = ["{:.8f}".format(i[0]), "{:.8f}".format(i[1])]
-                return_text.append("\t".join(line))
+        for band in numpy.transpose(plot_info['y']):
+            return_text.append(_format_table(numpy.column_stack((x, band))))
             return_text.append("")
             return_text.append("")
 
-        return ("\n".join(return_text)).encode('utf-8'), {}
+        return "\n".join(return_text)
 
     def _matplotlib_get_dict(self, main_file_name="", comments=True, title="", legend=None, legend2=None,
                             y_max_lim=None, y_min_lim=None,
@@ -944,7 +1021,7 @@ class BandsData(KpointsData):
         x_max_lim = max(x)
 
         # first prepare the xy coordinates of the sets
-        raw_data, _ = self._prepare_dat_blocks(plot_info, comments=comments)
+        raw_data = self._get_dat_blocks(plot_info, comments=comments)
 
         xtics_string = u", ".join(u'"{}" {}'.format(label, pos) for pos, label in
                                  plot_info['labels'])
@@ -1202,11 +1279,8 @@ class BandsData(KpointsData):
         # build the arrays with the xy coordinates
         all_sets = []
         for b in the_bands:
-            this_set = ""
-            for i in zip(x, b):
-                line = "{:.8f}".format(i[0]) + '\t' + "{:.8f}".format(i[1]) + "\n"
-                this_set += line
-            all_sets.append(this_set)
+            this_set = _format_table(numpy.column_stack((x, b)))
+            all_sets.append(this_set + "\n" if this_set else this_set)
 
         set_descriptions = ""
         for i, (this_set, band_type) in enumerate(zip(all_sets, plot_info['band_type_idx'])):
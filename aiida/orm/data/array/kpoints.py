@@ -166,9 +166,12 @@ class KpointsData(ArrayData):
     def _change_reference(self, kpoints, to_cartesian=True):
         """
         Change reference system, from cartesian to crystal coordinates (units of b1,b2,b3) or viceversa.
+        The inverse of the reciprocal cell is computed once for every cell.
         :param kpoints: a list of (3) point coordinates
         :return kpoints: a list of (3) point coordinates in the new reference
         """
+        from aiida.tools.data.array.kpoints.legacy import change_reference
+
         if not isinstance(kpoints, numpy.ndarray):
             raise ValueError("kpoints must be a numpy.array for method change_reference()")
 
@@ -179,15 +182,7 @@ class KpointsData(ArrayData):
             raise AttributeError(
                 "Cannot use cartesian coordinates without having defined a cell")
 
-        trec_cell = numpy.transpose(numpy.array(rec_cell))
-        if to_cartesian:
-            matrix = trec_cell
-        else:
-            matrix = numpy.linalg.inv(trec_cell)
-
-        # note: kpoints is a list Nx3, matrix is 3x3.
-        # hence, first transpose kpoints, then multiply, finally transpose it back
-        return numpy.transpose(numpy.dot(matrix, numpy.transpose(kpoints)))
+        return change_reference(rec_cell, kpoints, to_cartesian=to_cartesian)
 
     def set_cell_from_structure(self, structuredata):
         """
@@ -226,8 +221,9 @@ class KpointsData(ArrayData):
         """
         Sets the reciprocal cell in units of 1/Angstrom from the internally set cell
         """
-        the_cell = numpy.array(self.cell)
-        self.reciprocal_cell = 2. * numpy.pi * numpy.linalg.inv(the_cell).transpose()
+        from aiida.tools.data.array.kpoints.legacy import analyze_cell
+
+        self.reciprocal_cell = analyze_cell(self.cell)['reciprocal_cell']
 
     def set_kpoints_mesh(self, mesh, offset=[0., 0., 0.]):
         """
@@ -320,14 +316,15 @@ class KpointsData(ArrayData):
             # rec_cell = numpy.eye(3)
             raise AttributeError("Cannot define a mesh from a density without "
                                  "having defined a cell")
+        the_pbc = self.pbc
         # I first round to the fifth digit |b|/distance (to avoid that e.g.
         # 3.00000001 becomes 4)
         kpointsmesh = [
             max(int(numpy.ceil(round(numpy.linalg.norm(b) / distance, 5))), 1)
-            if pbc else 1 for pbc, b in zip(self.pbc, rec_cell)]
+            if pbc else 1 for pbc, b in zip(the_pbc, rec_cell)]
         if force_parity:
             kpointsmesh = [k + (k % 2) if pbc else 1
-                           for pbc, k in zip(self.pbc, kpointsmesh)]
+                           for pbc, k in zip(the_pbc, kpointsmesh)]
         self.set_kpoints_mesh(kpointsmesh, offset=offset)
 
     @property
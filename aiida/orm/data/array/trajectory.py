@@ -33,8 +33,20 @@ class TrajectoryData(ArrayData):
     """
     Stores a trajectory (a sequence of crystal structures with timestamps, and
     possibly with velocities).
+
+    :note: The data of single steps, the exported files and the
+      sub-trajectories are read from memory-mapped arrays (see
+      :py:meth:`~aiida.orm.data.array.ArrayData.get_array_memmap`), so that
+      only the steps that are needed are read from disk.
     """
 
+    # The formats that can be written step by step, with the methods that generate them
+    _frame_exporters = {'xsf': '_iter_xsf', 'xyz': '_iter_xyz', 'cif': '_iter_cif'}
+
+    def __init__(self, *args, **kwargs):
+        super(TrajectoryData, self).__init__(*args, **kwargs)
+        self._stepid_index = None
+
     def _internal_validate(self, stepids, cells, symbols, positions, times, velocities):
         """
         Internal function to validate the type and shape of the arrays. See
@@ -315,12 +327,48 @@ class TrajectoryData(ArrayData):
 
         :raises ValueError: if no step with the given value is found.
         """
+        try:
+            return self._get_stepid_index()[stepid]
+        except KeyError:
+            raise ValueError("{} not among the stepids".format(stepid))
+
+    def _get_stepid_index(self):
+        """
+        Return a dictionary that maps each stepid to the index of its first
+        occurrence. As for the arrays, it is computed only once after storing.
+        """
+        if self._stepid_index is not None:
+            return self._stepid_index
+
+        stepids = self.get_stepids().tolist()
+        # In reverse order, so that the first index of a duplicate stepid wins
+        stepid_index = dict(zip(reversed(stepids), range(len(stepids) - 1, -1, -1)))
+        if self.is_stored:
+            self._stepid_index = stepid_index
+        return stepid_index
+
+    def clear_internal_cache(self):
+        """
+        Clear the arrays cached in memory (see
+        :py:meth:`~aiida.orm.data.array.ArrayData.clear_internal_cache`) and
+        the map from the stepids to the indices.
+        """
+        super(TrajectoryData, self).clear_internal_cache()
+        self._stepid_index = None
+
+    def _get_step_array(self, name, index):
+        """
+        Return a copy of the entries of an array at the given index (or
+        slice), reading only those entries from disk, or None if the array
+        is not set.
+        """
         import numpy
 
         try:
-            return numpy.where(self.get_stepids() == stepid)[0][0]
-        except IndexError:
-            raise ValueError("{} not among the stepids".format(stepid))
+            array = self.get_array_memmap(name)
+        except (AttributeError, KeyError):
+            return None
+        return numpy.array(array[index])
 
     def get_step_data(self, index):
         r"""
@@ -348,14 +396,40 @@ class TrajectoryData(ArrayData):
             raise IndexError("You have only {} steps, but you are looking beyond"
                              " (index={})".format(self.numsteps, index))
 
-        vel = self.get_velocities()
-        if vel is not None:
-            vel = vel[index, :, :]
         time = self.get_times()
         if time is not None:
             time = time[index]
-        return (self.get_stepids()[index], time, self.get_cells()[index, :, :],
-                self.get_symbols(), self.get_positions()[index, :, :], vel)
+        return (self.get_stepids()[index], time, self._get_step_array('cells', index),
+                self.get_symbols(), self._get_step_array('positions', index),
+                self._get_step_array('velocities', index))
+
+    def get_subtrajectory(self, start=None, stop=None, step=None):
+        """
+        Return a new TrajectoryData (not stored yet!) with the steps selected
+        by the slice ``start:stop:step`` of the step indices, e.g.
+        ``get_subtrajectory(step=10)`` keeps one step every ten.
+        Only the selected steps are read from disk.
+
+        :param start: the index of the first step, by default 0.
+        :param stop: the index after the last step, by default the number of steps.
+        :param step: the stride between the selected steps, by default 1.
+        :return: a :py:class:`TrajectoryData`, with the same symbols and units.
+        """
+        index = slice(start, stop, step)
+
+        subtrajectory = TrajectoryData()
+        subtrajectory.set_trajectory(
+            stepids=self._get_step_array('steps', index),
+            cells=self._get_step_array('cells', index),
+            symbols=self.get_symbols(),
+            positions=self._get_step_array('positions', index),
+            times=self._get_step_array('times', index),
+            velocities=self._get_step_array('velocities', index))
+        for key, value in self.iterattrs():
+            if key.startswith('units|'):
+                subtrajectory._set_attr(key, value)
+
+        return subtrajectory
 
 
     def step_to_structure(self, index, custom_kinds=None):
@@ -427,68 +501,122 @@ class TrajectoryData(ArrayData):
 
         return struc
 
-    def _prepare_xsf(self, index=None, main_file_name=""):
+    def _get_export_indices(self, index=None):
         """
-        Write the given trajectory to a string of format XSF (for XCrySDen).
+        Return the list of the indices of the steps to export: all of them,
+        or only the given one.
+        """
+        if index is None:
+            return range(self.numsteps)
+        return [index]
+
+    def _iter_xsf(self, indices):
+        """
+        Generate the given steps of the trajectory in the XSF format (for
+        XCrySDen): first the header, then one string for each step.
         """
         from aiida.common.constants import elements
         _atomic_numbers = {data['symbol']: num for num, data in elements.iteritems()}
 
-        indices = range(self.numsteps)
-        if index is not None:
-            indices = [index]
-        return_string = "ANIMSTEPS {}\nCRYSTAL\n".format(len(indices))
         # Do the checks once and for all here:
         structure = self.get_step_structure(index=0)
         if structure.is_alloy() or structure.has_vacancies():
             raise NotImplementedError("XSF for alloys or systems with "
                                       "vacancies not implemented.")
-        cells = self.get_cells()
-        positions = self.get_positions()
+        cells = self.get_array_memmap('cells')
+        positions = self.get_array_memmap('positions')
         symbols = self.get_symbols()
         atomic_numbers_list = [_atomic_numbers[s] for s in symbols]
         nat = len(symbols)
 
+        yield "ANIMSTEPS {}\nCRYSTAL\n".format(len(indices))
         for idx in indices:
-            return_string += "PRIMVEC {}\n".format(idx+1)
-            #~ structure = self.get_step_structure(index=idx)
-            #~ sites = structure.sites
-            #~ if structure.is_alloy() or structure.has_vacancies():
-                #~ raise NotImplementedError("XSF for alloys or systems with "
-                                          #~ "vacancies not implemented.")
-            for cell_vector in cells[idx]:
-                return_string += " ".join(["{:18.5f}".format(i) for i in cell_vector])
-                return_string += "\n"
-            return_string += "PRIMCOORD {}\n".format(idx+1)
-            return_string += "{} 1\n" .format(nat)
-            for atn, pos in zip(atomic_numbers_list, positions[idx]):
-                try:
-                    return_string += "{} {:18.10f} {:18.10f} {:18.10f}\n".format(atn, pos[0], pos[1], pos[2] )
-                except:
-                    print atn, pos
-                    raise
-        return return_string.encode('utf-8'), {}
+            lines = ["PRIMVEC {}\n".format(idx + 1)]
+            for cell_vector in cells[idx].tolist():
+                lines.append(" ".join(["{:18.5f}".format(i) for i in cell_vector]))
+                lines.append("\n")
+            lines.append("PRIMCOORD {}\n".format(idx + 1))
+            lines.append("{} 1\n".format(nat))
+            for atn, pos in zip(atomic_numbers_list, positions[idx].tolist()):
+                lines.append("{} {:18.10f} {:18.10f} {:18.10f}\n".format(atn, pos[0], pos[1], pos[2]))
+            yield "".join(lines)
+
+    def _iter_xyz(self, indices):
+        """
+        Generate the given steps of the trajectory in the (extended) XYZ
+        format, one string for each step.
+        """
+        cells = self.get_array_memmap('cells')
+        positions = self.get_array_memmap('positions')
+        symbols = self.get_symbols()
 
-    def _prepare_cif(self, trajectory_index=None, main_file_name=""):
+        for idx in indices:
+            cell = cells[idx]
+            lines = ["{}".format(len(symbols)),
+                     'Lattice="{} {} {} {} {} {} {} {} {}" pbc="True True True"'.format(*cell.ravel().tolist())]
+            for symbol, pos in zip(symbols, positions[idx].tolist()):
+                lines.append("{:6s} {:18.10f} {:18.10f} {:18.10f}".format(symbol, pos[0], pos[1], pos[2]))
+            lines.append("")
+            yield "\n".join(lines)
+
+    def _iter_cif(self, indices):
         """
-        Write the given trajectory to a string of format CIF.
+        Generate the given steps of the trajectory in the CIF format, one
+        string (a CIF data block) for each step.
         """
         import CifFile
         from aiida.orm.data.cif \
             import ase_loops, cif_from_ase, pycifrw_from_cif
         from aiida.common.utils import HiddenPrints
 
-        cif = ""
-        indices = range(self.numsteps)
-        if trajectory_index is not None:
-            indices = [trajectory_index]
         for idx in indices:
             structure = self.get_step_structure(idx)
             ciffile = pycifrw_from_cif(cif_from_ase(structure.get_ase()),
                                        ase_loops)
             with HiddenPrints():
-                cif = cif + ciffile.WriteOut()
-        return cif.encode('utf-8'), {}
+                text = ciffile.WriteOut()
+            yield text
+
+    def write_frames(self, handle, fileformat, indices=None):
+        """
+        Write the trajectory to an open file one step at a time, so that
+        neither the arrays nor the text of the whole trajectory are held in
+        memory.
+
+        :param handle: a file-like object, open for writing.
+        :param fileformat: the format of the file: 'xsf', 'xyz' or 'cif'.
+        :param indices: the indices of the steps to write, e.g.
+            ``range(0, trajectory.numsteps, 10)``; by default all the steps.
+        :raise ValueError: if the format cannot be written step by step.
+        """
+        try:
+            iterator = getattr(self, self._frame_exporters[fileformat])
+        except KeyError:
+            raise ValueError("The format {} cannot be written step by step. Valid formats are: {}".format(
+                fileformat, ", ".join(sorted(self._frame_exporters))))
+
+        if indices is None:
+            indices = self._get_export_indices()
+        for text in iterator(list(indices)):
+            handle.write(text.encode('utf-8'))
+
+    def _prepare_xsf(self, index=None, main_file_name=""):
+        """
+        Write the given trajectory to a string of format XSF (for XCrySDen).
+        """
+        return "".join(self._iter_xsf(self._get_export_indices(index))).encode('utf-8'), {}
+
+    def _prepare_xyz(self, trajectory_index=None, main_file_name=""):
+        """
+        Write the given trajectory to a string of format XYZ.
+        """
+        return "".join(self._iter_xyz(self._get_export_indices(trajectory_index))).encode('utf-8'), {}
+
+    def _prepare_cif(self, trajectory_index=None, main_file_name=""):
+        """
+        Write the given trajectory to a string of format CIF.
+        """
+        return "".join(self._iter_cif(self._get_export_indices(trajectory_index))).encode('utf-8'), {}
 
     def _prepare_tcod(self, main_file_name="", **kwargs):
         """
@@ -619,12 +747,13 @@ class TrajectoryData(ArrayData):
 
         :todo: save to file?
         """
+        import numpy
         from ase.data import atomic_numbers
         from aiida.common.exceptions import InputValidationError
 
 
-        # Reading the arrays I need:
-        positions = self.get_positions()
+        # Reading the arrays I need (only the plotted steps of the positions are read from disk):
+        positions = self.get_array_memmap('positions')
         times = self.get_times()
         symbols = self.get_symbols()
 
@@ -685,7 +814,7 @@ class TrajectoryData(ArrayData):
 
         # Reducing array size based on stepsize variable
         T = times[::stepsize]
-        P = positions[::stepsize]
+        P = numpy.array(positions[::stepsize])
 
         # Calling
         plot_positions_XYZ(
@@ -712,19 +841,17 @@ class TrajectoryData(ArrayData):
         from ase.data import covalent_radii, atomic_numbers
         from aiida.common.exceptions import InputValidationError
 
-        def collapse_into_unit_cell(point, cell):
+        def collapse_into_unit_cell(points, cell):
             """
             Applies linear transformation to coordinate system based on crystal
             lattice, vectors. The inverse of that inverse transformation matrix with the
-            point given results in the point being given as a multiples of lattice vectors
+            points given (one per row) results in the points being given as a multiples of lattice vectors
             Than take the integer of the rows to find how many times you have to shift
-            the point back"""
-            invcell = np.matrix(cell).T.I
-            # point in crystal coordinates
-            points_in_crystal = np.dot(invcell,point).tolist()[0]
-            #point collapsed into unit cell
-            points_in_unit_cell = [i%1 for i in points_in_crystal]
-            return np.dot(cell.T, points_in_unit_cell).tolist()
+            the points back"""
+            invcell = np.linalg.inv(cell)
+            # points in crystal coordinates, collapsed into unit cell
+            points_in_unit_cell = np.dot(points, invcell) % 1
+            return np.dot(points_in_unit_cell, cell)
 
 
         elements = kwargs.pop('elements', None)
@@ -744,7 +871,8 @@ class TrajectoryData(ArrayData):
             maxindex = len(times)
         else:
             maxindex = np.argmin(times < maxtime)
-        positions = self.get_positions()[minindex:maxindex:stepsize]
+        # Only the selected steps are read from disk, in a new array that can be modified
+        positions = np.array(self.get_array_memmap('positions')[minindex:maxindex:stepsize])
 
 
         try:
@@ -758,18 +886,12 @@ class TrajectoryData(ArrayData):
         if elements is None:
             elements = set(symbols)
 
-        cell = np.array(self.get_cells()[0])
-        storage_dict = {s:{} for s in elements}
-        for ele in elements:
-                storage_dict[ele] = [np.array([]),np.array([]),np.array([])]
-        for iat, ele in enumerate(symbols):
-            if ele in elements:
-                for idim in range(3):
-                    storage_dict[ele][idim] = np.concatenate((storage_dict[ele][idim], positions[:,iat,idim].flatten()))
-
+        cell = np.array(self.get_array_memmap('cells')[0])
+        storage_dict = {}
         for ele in elements:
-            storage_dict[ele] = np.array(storage_dict[ele]).T
-            storage_dict[ele] = np.array([collapse_into_unit_cell(pos, cell) for pos in storage_dict[ele]]).T
+            # The positions of all the steps of each atom of the element, one atom after the other
+            element_positions = positions[:, symbols == ele, :].transpose(1, 0, 2).reshape(-1, 3)
+            storage_dict[ele] = collapse_into_unit_cell(element_positions, cell).T
 
         white = (1,1,1)
         mlab.figure(bgcolor=white, size=(1080, 720))
@@ -127,30 +127,25 @@ def _get_aiida_structure_ase_inline(cif, **kwargs):
     return {'structure': StructureData(ase=cif.get_ase(**parameters))}
 
 
-@optional_inline
-def _get_aiida_structure_pymatgen_inline(cif, **kwargs):
+def get_pymatgen_structure_from_file(filename, **kwargs):
     """
-    Creates :py:class:`aiida.orm.data.structure.StructureData` using pymatgen.
+    Parse the first structure of a CIF file with pymatgen. This does not need a CifData node, such that it can be run
+    by worker processes without database access.
 
+    :param filename: the path of the CIF file
+    :param primitive_cell: if True, the primitive cell is returned, the conventional cell if False. Default False.
     :param occupancy_tolerance: If total occupancy of a site is between 1 and occupancy_tolerance,
         the occupancies will be scaled down to 1.
     :param site_tolerance: This tolerance is used to determine if two sites are sitting in the same position,
         in which case they will be combined to a single disordered site. Defaults to 1e-4.
+    :return: the pymatgen Structure
+    :raise InvalidOccupationsError: if the parsing failed because of occupations larger than the tolerance
 
     .. note:: requires pymatgen module.
     """
     from pymatgen.io.cif import CifParser
-    from aiida.orm.data.parameter import ParameterData
-    from aiida.orm.data.structure import StructureData
-
-    if 'parameters' in kwargs:
-        parameters = kwargs['parameters']
-    else:
-        parameters = {}
-
-    if isinstance(parameters, ParameterData):
-        parameters = parameters.get_dict()
 
+    parameters = dict(kwargs)
     constructor_kwargs = {}
 
     parameters['primitive'] = parameters.pop('primitive_cell', False)
@@ -159,7 +154,7 @@ def _get_aiida_structure_pymatgen_inline(cif, **kwargs):
         if argument in parameters:
             constructor_kwargs[argument] = parameters.pop(argument)
 
-    parser = CifParser(cif.get_file_abs_path(), **constructor_kwargs)
+    parser = CifParser(filename, **constructor_kwargs)
 
     try:
         structures = parser.get_structures(**parameters)
@@ -168,7 +163,7 @@ def _get_aiida_structure_pymatgen_inline(cif, **kwargs):
         # Verify whether the failure was due to wrong occupancy numbers
         try:
             constructor_kwargs['occupancy_tolerance'] = 1E10
-            parser = CifParser(cif.get_file_abs_path(), **constructor_kwargs)
+            parser = CifParser(filename, **constructor_kwargs)
             structures = parser.get_structures(**parameters)
         except ValueError:
             # If it still fails, the occupancies were not the reason for failure
@@ -178,7 +173,34 @@ def _get_aiida_structure_pymatgen_inline(cif, **kwargs):
             raise InvalidOccupationsError(
                 'detected atomic sites with an occupation number larger than the occupation tolerance')
 
-    return {'structure': StructureData(pymatgen_structure=structures[0])}
+    return structures[0]
+
+
+@optional_inline
+def _get_aiida_structure_pymatgen_inline(cif, **kwargs):
+    """
+    Creates :py:class:`aiida.orm.data.structure.StructureData` using pymatgen.
+
+    :param occupancy_tolerance: If total occupancy of a site is between 1 and occupancy_tolerance,
+        the occupancies will be scaled down to 1.
+    :param site_tolerance: This tolerance is used to determine if two sites are sitting in the same position,
+        in which case they will be combined to a single disordered site. Defaults to 1e-4.
+
+    .. note:: requires pymatgen module.
+    """
+    from aiida.orm.data.parameter import ParameterData
+    from aiida.orm.data.structure import StructureData
+
+    if 'parameters' in kwargs:
+        parameters = kwargs['parameters']
+    else:
+        parameters = {}
+
+    if isinstance(parameters, ParameterData):
+        parameters = parameters.get_dict()
+
+    return {'structure': StructureData(pymatgen_structure=get_pymatgen_structure_from_file(
+        cif.get_file_abs_path(), **parameters))}
 
 
 def cif_from_ase(ase, full_occupancies=False, add_fake_biso=False):
@@ -402,6 +424,129 @@ def parse_formula(formula):
     return contents
 
 
+def read_cif_values(filename, scan_type='standard'):
+    """
+    Parse a CIF file with PyCifRW.
+
+    :param filename: the path of the CIF file
+    :param scan_type: the scan type of PyCifRW, see :py:meth:`CifData.set_scan_type`
+    :return: the PyCifRW CifFile object
+
+    .. note:: requires PyCifRW module.
+    """
+    try:
+        import CifFile
+        from CifFile import CifBlock
+    except ImportError as e:
+        raise ImportError(str(e) + '. You need to install the PyCifRW package.')
+
+    values = CifFile.ReadCif(filename, scantype=scan_type)
+    for k, v in values.items():
+        values.dictionary[k] = CifBlock(v)
+    return values
+
+
+def get_formulae_from_values(values, mode='sum'):
+    """
+    Return the chemical formulae specified in each datablock of a parsed CIF file.
+
+    :param values: the PyCifRW CifFile object
+    :param mode: the formula tag to read, _chemical_formula_<mode>
+    :return: a list with a formula (or None) per datablock
+    """
+    formula_tag = "_chemical_formula_{}".format(mode)
+    formulae = []
+    for datablock in values.keys():
+        formula = None
+        if formula_tag in values[datablock].keys():
+            formula = values[datablock][formula_tag]
+        formulae.append(formula)
+
+    return formulae
+
+
+def get_spacegroup_numbers_from_values(values):
+    """
+    Return the international number of the spacegroup of each datablock of a parsed CIF file.
+
+    :param values: the PyCifRW CifFile object
+    :return: a list with a spacegroup number (or None) per datablock
+    """
+    spg_tags = ["_space_group.it_number", "_space_group_it_number", "_symmetry_int_tables_number"]
+    spacegroup_numbers = []
+    for datablock in values.keys():
+        spacegroup_number = None
+        correct_tags = [tag for tag in spg_tags if tag in values[datablock].keys()]
+        if correct_tags:
+            try:
+                spacegroup_number = int(values[datablock][correct_tags[0]])
+            except ValueError:
+                pass
+        spacegroup_numbers.append(spacegroup_number)
+
+    return spacegroup_numbers
+
+
+def get_partial_occupancies_from_values(values):
+    """
+    Check whether there are float values in the atomic occupancies of a parsed CIF file.
+
+    :param values: the PyCifRW CifFile object
+    :return: True if there are partial occupancies, False otherwise
+    """
+    epsilon = 1e-6
+    tag = '_atom_site_occupancy'
+    for datablock in values.keys():
+        if tag in values[datablock].keys():
+            for site in values[datablock][tag]:
+                # find the float number in the string, cutting the uncertainty in brackets
+                bracket = site.find('(')
+                if bracket != -1:
+                    site = site[0:bracket]
+                try:
+                    occupancy = float(site)
+                except ValueError:
+                    # the unknown ('?') and inapplicable ('.') occupancies are not partial
+                    continue
+                if abs(occupancy - 1) > epsilon:
+                    return True
+
+    return False
+
+
+def get_attached_hydrogens_from_values(values):
+    """
+    Check whether there are hydrogens without coordinates, specified as attached to the atoms, in a parsed CIF file.
+
+    :param values: the PyCifRW CifFile object
+    :return: True if there are attached hydrogens, False otherwise
+    """
+    tag = '_atom_site_attached_hydrogens'
+    for datablock in values.keys():
+        if tag in values[datablock].keys():
+            for value in values[datablock][tag]:
+                if value != '.' and value != '?' and value != '0':
+                    return True
+
+    return False
+
+
+def get_metadata_from_values(values):
+    """
+    Return the metadata of a parsed CIF file that CifData stores in its attributes, see :py:meth:`CifData.parse`.
+
+    :param values: the PyCifRW CifFile object
+    :return: a dictionary with the formulae, the spacegroup numbers and whether there are partial occupancies
+        and attached hydrogens
+    """
+    return {
+        'formulae': get_formulae_from_values(values),
+        'spacegroup_numbers': get_spacegroup_numbers_from_values(values),
+        'partial_occupancies': get_partial_occupancies_from_values(values),
+        'attached_hydrogens': get_attached_hydrogens_from_values(values),
+    }
+
+
 # pylint: disable=abstract-method
 # Note:  Method 'query' is abstract in class 'Node' but is not overridden
 class CifData(SinglefileData):
@@ -412,10 +557,16 @@ class CifData(SinglefileData):
         information, so all conversions are done through the physical file:
         when setting ``ase`` or ``values``, a physical CIF file is generated
         first, the values are updated from the physical CIF file.
+
+    .. note:: the metadata of the file (see :py:meth:`parse`) is stored in the attributes, such that
+        :py:meth:`get_formulae`, :py:meth:`get_spacegroup_numbers`, :py:attr:`has_partial_occupancies`
+        and :py:attr:`has_attached_hydrogens` do not parse the file again, and such that the CIF files
+        can be filtered in queries, e.g. with ``{'attributes.partial_occupancies': False}``.
     """
     _set_incompatibilities = [('ase', 'file'), ('ase', 'values'), ('file', 'values')]
     _scan_types = ['standard', 'flex']
     _parse_policies = ['eager', 'lazy']
+    _metadata_attributes = ['formulae', 'spacegroup_numbers', 'partial_occupancies', 'attached_hydrogens']
 
     @property
     def _set_defaults(self):
@@ -555,16 +706,7 @@ class CifData(SinglefileData):
         .. note:: requires PyCifRW module.
         """
         if self._values is None:
-            try:
-                import CifFile
-                from CifFile import CifBlock
-            except ImportError as e:
-                raise ImportError(str(e) + '. You need to install the PyCifRW package.')
-
-            c = CifFile.ReadCif(self.get_file_abs_path(), scantype=self.get_attr('scan_type'))
-            for k, v in c.items():
-                c.dictionary[k] = CifBlock(v)
-            self._values = c
+            self._values = read_cif_values(self.get_file_abs_path(), scan_type=self.get_attr('scan_type'))
         return self._values
 
     def set_values(self, values):
@@ -607,22 +749,46 @@ class CifData(SinglefileData):
         """
         Parses CIF file and sets attributes.
 
+        The metadata attributes are the formulae, the spacegroup numbers and whether there
+        are partial occupancies and attached hydrogens, see :py:func:`get_metadata_from_values`.
+
         :param scan_type:  See set_scan_type
         """
         if scan_type is not None:
             self.set_scan_type(scan_type)
 
         # Note: this causes parsing, if not already parsed
-        self._set_attr('formulae', self.get_formulae())
-        self._set_attr('spacegroup_numbers', self.get_spacegroup_numbers())
+        for key, value in get_metadata_from_values(self.values).iteritems():
+            self._set_attr(key, value)
+
+    def _get_metadata(self, key):
+        """
+        Return a metadata attribute, parsing the file only if it is not set yet.
+
+        The metadata of an unstored node is set on the first parse; the file of a node stored
+        without it (never parsed with the 'lazy' parse policy, or stored before) is parsed instead.
+        """
+        value = self.get_attr(key, None)
+        if value is None:
+            if self.is_stored:
+                return get_metadata_from_values(self.values)[key]
+            self.parse()
+            value = self.get_attr(key)
+        return value
 
     # pylint: disable=arguments-differ
     def store(self, *args, **kwargs):
         """
         Store the node.
+
+        If the file was already parsed, the metadata attributes that are not set yet are set,
+        without parsing the file again.
         """
         if not self.is_stored:
             self._set_attr('md5', self.generate_md5())
+            missing_metadata = any(self.get_attr(key, None) is None for key in self._metadata_attributes)
+            if self._values is not None and missing_metadata:
+                self.parse()
 
         return super(CifData, self).store(*args, **kwargs)
 
@@ -644,8 +810,8 @@ class CifData(SinglefileData):
 
         self._values = None
         self._ase = None
-        self._set_attr('formulae', None)
-        self._set_attr('spacegroup_numbers', None)
+        for key in self._metadata_attributes:
+            self._set_attr(key, None)
 
     def set_scan_type(self, scan_type):
         """
@@ -668,6 +834,9 @@ class CifData(SinglefileData):
 
         :param parse_policy: Either 'eager' (parse CIF file on set_file)
             or 'lazy' (defer parsing until needed)
+
+        With both, the metadata attributes (see :py:meth:`parse`) are set if the file is parsed before
+        the node is stored, such that the stored node does not need to be parsed again to read them.
         """
         if parse_policy in self._parse_policies:
             self._set_attr('parse_policy', parse_policy)
@@ -681,37 +850,15 @@ class CifData(SinglefileData):
         Note: This does not compute the formula, it only reads it from the
         appropriate tag. Use refine_inline to compute formulae.
         """
-        # note: If formulae are not None, they could be returned
-        # directly (but the function is very cheap anyhow).
-        formula_tag = "_chemical_formula_{}".format(mode)
-        formulae = []
-        for datablock in self.values.keys():
-            formula = None
-            if formula_tag in self.values[datablock].keys():
-                formula = self.values[datablock][formula_tag]
-            formulae.append(formula)
-
-        return formulae
+        if mode == 'sum':
+            return self._get_metadata('formulae')
+        return get_formulae_from_values(self.values, mode)
 
     def get_spacegroup_numbers(self):
         """
         Get the spacegroup international number.
         """
-        # note: If spacegroup_numbers are not None, they could be returned
-        # directly (but the function is very cheap anyhow).
-        spg_tags = ["_space_group.it_number", "_space_group_it_number", "_symmetry_int_tables_number"]
-        spacegroup_numbers = []
-        for datablock in self.values.keys():
-            spacegroup_number = None
-            correct_tags = [tag for tag in spg_tags if tag in self.values[datablock].keys()]
-            if correct_tags:
-                try:
-                    spacegroup_number = int(self.values[datablock][correct_tags[0]])
-                except ValueError:
-                    pass
-            spacegroup_numbers.append(spacegroup_number)
-
-        return spacegroup_numbers
+        return self._get_metadata('spacegroup_numbers')
 
     @property
     def has_partial_occupancies(self):
@@ -720,24 +867,7 @@ class CifData(SinglefileData):
 
         :returns: True if there are partial occupancies, False otherwise
         """
-        epsilon = 1e-6
-        tag = '_atom_site_occupancy'
-        partial_occupancies = False
-        for datablock in self.values.keys():
-            if tag in self.values[datablock].keys():
-                for site in self.values[datablock][tag]:
-                    # find the float number in the string
-                    bracket = site.find('(')
-                    if bracket == -1:
-                        # no bracket found
-                        if abs(float(site) - 1) > epsilon:
-                            partial_occupancies = True
-                    else:
-                        # bracket, cut string
-                        if abs(float(site[0:bracket]) - 1) > epsilon:
-                            partial_occupancies = True
-
-        return partial_occupancies
+        return self._get_metadata('partial_occupancies')
 
     @property
     def has_attached_hydrogens(self):
@@ -747,14 +877,7 @@ class CifData(SinglefileData):
 
         :returns: True if there are attached hydrogens, False otherwise.
         """
-        tag = '_atom_site_attached_hydrogens'
-        for datablock in self.values.keys():
-            if tag in self.values[datablock].keys():
-                for value in self.values[datablock][tag]:
-                    if value != '.' and value != '?' and value != '0':
-                        return True
-
-        return False
+        return self._get_metadata('attached_hydrogens')
 
     @property
     def has_atomic_sites(self):
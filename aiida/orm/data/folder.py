@@ -21,14 +21,17 @@ class FolderData(Data):
     No special attributes are set.
     """
 
-    def replace_with_folder(self, folder, overwrite=True):
+    def replace_with_folder(self, folder, overwrite=True, move=False):
         """
-        Replace the data with another folder, always copying and not moving the
-        original files.
+        Replace the data with another folder. By default the original files
+        are copied and not moved.
 
         Args:
             folder: the folder to copy from
             overwrite: if to overwrite the current content or not
+            move: if True, the folder is moved instead of copied; this is a
+                single rename if the folder is on the same filesystem as the
+                repository (e.g. a SandboxFolder), and the folder is gone afterwards
         """
 
         if not os.path.isabs(folder):
@@ -37,7 +40,7 @@ class FolderData(Data):
         # TODO: implement the logic on the folder? Or set a 'locked' flag on folders?
 
         if not self.is_stored:
-            self._get_folder_pathsubfolder.replace_with_folder(folder, move=False, overwrite=overwrite)
+            self._get_folder_pathsubfolder.replace_with_folder(folder, move=move, overwrite=overwrite)
         else:
             raise ModificationNotAllowed("You cannot change the files after the node has been stored")
 
@@ -7,6 +7,8 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+import copy
+
 from aiida.orm import Data
 from aiida.orm.data import to_aiida_type
 
@@ -23,31 +25,19 @@ class ParameterData(Data):
     usual methods of aiida.orm.Node
     """
 
+    # Snapshot of the dictionary of a stored node, see get_dict
+    _dict_snapshot = None
+
     def set_dict(self, dict):
         """
         Replace the current dictionary with another one.
 
+        All the keys are validated before any attribute is changed, such that
+        the current dictionary is kept if the new one is not valid.
+
         :param dict: The dictionary to set.
         """
-        import copy
-        from aiida.common.exceptions import ModificationNotAllowed
-
-        old_dict = copy.deepcopy(self.get_dict())
-
-        try:
-            # Delete existing attributes
-            self._del_all_attrs()
-            # I set the keys
-            self.update_dict(dict)
-        except ModificationNotAllowed:
-            # I reraise here to avoid to go in the generic 'except' below,
-            # that would raise again the same exception
-            raise
-        except:
-            # Try to restore the old data
-            self._del_all_attrs()
-            self.update_dict(old_dict)
-            raise
+        self._set_attrs(dict, reset=True)
 
     def update_dict(self, dict):
         """
@@ -56,14 +46,33 @@ class ParameterData(Data):
         :param dict: a dictionary with the keys to substitute. It works like
           dict.update(), adding new keys and overwriting existing keys.
         """
-        for k, v in dict.iteritems():
-            self._set_attr(k, v)
+        self._set_attrs(dict)
 
     def get_dict(self):
         """
         Return a dict with the parameters
+
+        The attributes of a stored node are read only once: the following calls
+        return a deep copy of the same snapshot, that can be modified freely.
         """
-        return dict(self.iterattrs())
+        if not self.is_stored:
+            return dict(self.iterattrs())
+
+        if self._dict_snapshot is None:
+            self._dict_snapshot = dict(self.iterattrs())
+        return copy.deepcopy(self._dict_snapshot)
+
+    def _set_attr(self, key, value, clean=True, stored_check=True):
+        self._dict_snapshot = None
+        super(ParameterData, self)._set_attr(key, value, clean=clean, stored_check=stored_check)
+
+    def _set_attrs(self, attributes, clean=True, stored_check=True, reset=False):
+        self._dict_snapshot = None
+        super(ParameterData, self)._set_attrs(attributes, clean=clean, stored_check=stored_check, reset=reset)
+
+    def _del_attr(self, key, stored_check=True):
+        self._dict_snapshot = None
+        super(ParameterData, self)._del_attr(key, stored_check=stored_check)
 
     def keys(self):
         """
@@ -19,6 +19,8 @@ class RemoteData(Data):
 
     Remember to pass a computer!
     """
+    # Extra set on the nodes whose remote folder has been cleaned
+    KEY_EXTRA_CLEANED = 'cleaned'
 
     def get_dbcomputer(self):
         return self.dbnode.dbcomputer
@@ -170,6 +172,8 @@ class RemoteData(Data):
         with transport:
             clean_remote(transport, remote_dir)
 
+        self.set_extra(self.KEY_EXTRA_CLEANED, True)
+
     def _validate(self):
         from aiida.common.exceptions import ValidationError
 
@@ -27,6 +27,14 @@ _mass_threshold = 1.e-3
 _sum_threshold = 1.e-6
 # Threshold used to check if the cell volume is not zero.
 _volume_threshold = 1.e-6
+# Relative width of the ranges of volume per site of the structure fingerprints
+_fingerprint_volume_width = 0.05
+# Default tolerances used to check if two structures are equivalent (in angstrom and degrees)
+_equivalence_length_tolerance = 0.05
+_equivalence_angle_tolerance = 0.5
+
+# Key of the extra storing the fingerprint of a structure, see get_structure_fingerprint
+FINGERPRINT_EXTRA_KEY = '_aiida_structure_fingerprint'
 
 # Element table
 from aiida.common.constants import elements
@@ -683,6 +691,212 @@ def ase_refine_cell(aseatoms, **kwargs):
                           'translations': sym_dataset['translations']}
 
 
+def get_structure_fingerprint(cell, pbc, sites, kinds):
+    """
+    Return the fingerprint of a structure, which is meant to find equivalent structures quickly.
+
+    The fingerprint is made of a hash of the composition (the number of sites of each species, where
+    a species is given by the symbols and weights of a kind, regardless of its name and mass) and of
+    the range of the volume per site, such that it does not depend on the choice of the cell, on the
+    order of the sites or on the origin. Equivalent structures have the same fingerprint, or that of
+    a neighbouring volume range (see :py:func:`get_neighbour_fingerprints`), but structures with
+    the same fingerprint are not necessarily equivalent, see :py:func:`are_equivalent_structures`.
+
+    :param cell: the cell, as stored in the attributes of a StructureData
+    :param pbc: the three periodic boundary conditions
+    :param sites: the raw sites, as stored in the attributes of a StructureData
+    :param kinds: the raw kinds, as stored in the attributes of a StructureData
+    :return: the fingerprint, a string, or None if the structure is not periodic in three
+        dimensions or has no sites
+    """
+    import hashlib
+    import json
+    import math
+    from collections import Counter
+
+    if not all(pbc) or not sites:
+        return None
+
+    species = {kind['name']: get_symbols_string(kind['symbols'], kind['weights']) for kind in kinds}
+    composition = sorted(Counter(species[site['kind_name']] for site in sites).items())
+    volume_range = int(math.floor(
+        math.log(calc_cell_volume(cell) / len(sites)) / math.log(1. + _fingerprint_volume_width)))
+
+    return '{}:{}'.format(hashlib.sha224(json.dumps(composition)).hexdigest(), volume_range)
+
+
+def get_neighbour_fingerprints(fingerprint):
+    """
+    Return the fingerprints of the structures that may be equivalent to a structure with the
+    given fingerprint: those with the same composition, in the same or a neighbouring range of
+    volume per site.
+
+    :param fingerprint: a fingerprint returned by :py:func:`get_structure_fingerprint`
+    :return: a list of three fingerprints, including the given one
+    """
+    composition, volume_range = fingerprint.rsplit(':', 1)
+    return ['{}:{}'.format(composition, int(volume_range) + offset) for offset in (-1, 0, 1)]
+
+
+def get_equivalence_data(cell, pbc, sites, kinds):
+    """
+    Return the data of a structure needed by :py:func:`are_equivalent_structures`.
+
+    :param cell: the cell, as stored in the attributes of a StructureData
+    :param pbc: the three periodic boundary conditions
+    :param sites: the raw sites, as stored in the attributes of a StructureData
+    :param kinds: the raw kinds, as stored in the attributes of a StructureData
+    :return: a tuple with the reduced cell (see :py:func:`get_reduced_cell`), the cartesian
+        positions and the species of the sites, or None if the structure is not periodic in
+        three dimensions or has no sites
+    """
+    import numpy
+
+    if not all(pbc) or not sites:
+        return None
+
+    species = {kind['name']: get_symbols_string(kind['symbols'], kind['weights']) for kind in kinds}
+    return (get_reduced_cell(cell), numpy.array([site['position'] for site in sites], dtype=float),
+            numpy.array([species[site['kind_name']] for site in sites]))
+
+
+def _gauss_reduce(vector1, vector2):
+    """
+    Lagrange-Gauss reduction of a two-dimensional lattice.
+
+    :return: the two shortest vectors of the lattice, the shortest first
+    """
+    if vector2.dot(vector2) < vector1.dot(vector1):
+        vector1, vector2 = vector2, vector1
+    while True:
+        vector2 = vector2 - round(vector1.dot(vector2) / vector1.dot(vector1)) * vector1
+        if vector2.dot(vector2) >= vector1.dot(vector1) * (1. - 1.e-12):
+            return vector1, vector2
+        vector1, vector2 = vector2, vector1
+
+
+def get_reduced_cell(cell):
+    """
+    Return the Minkowski-reduced cell of a lattice, whose vectors are the three shortest
+    independent lattice vectors. It is found with the greedy reduction algorithm, which is
+    exact in three dimensions.
+
+    :param cell: the cell, as three vectors
+    :return: the reduced cell, as a 3x3 numpy array: the vectors sorted from the shortest,
+        with a positive determinant
+    """
+    import numpy
+
+    cell = numpy.array(cell, dtype=float)
+    while True:
+        cell = cell[numpy.argsort(numpy.einsum('ij,ij->i', cell, cell), kind='mergesort')]
+        vector1, vector2 = _gauss_reduce(cell[0], cell[1])
+        vector3 = cell[2]
+
+        # Reduce the third vector by the closest point of the lattice of the first two
+        plane = numpy.array([vector1, vector2])
+        coordinates = numpy.linalg.lstsq(plane.T, vector3, rcond=None)[0]
+        points = (numpy.floor(coordinates) + list(itertools.product([-1, 0, 1, 2], repeat=2))).dot(plane)
+        differences = vector3 - points
+        reduced_vector3 = differences[numpy.argmin(numpy.einsum('ij,ij->i', differences, differences))]
+
+        if reduced_vector3.dot(reduced_vector3) >= vector3.dot(vector3) * (1. - 1.e-12):
+            cell = numpy.array([vector1, vector2, vector3])
+            if numpy.linalg.det(cell) < 0.:
+                cell = -cell
+            return cell
+        cell = numpy.array([vector1, vector2, reduced_vector3])
+
+
+_unimodular_matrices = []
+
+
+def _get_unimodular_matrices():
+    """
+    Return the integer matrices with determinant one and coefficients -1, 0 or 1, which relate
+    the Minkowski-reduced cells of a lattice with the same handedness.
+    """
+    import numpy
+
+    if not _unimodular_matrices:
+        matrices = numpy.array(list(itertools.product([-1, 0, 1], repeat=9))).reshape(-1, 3, 3)
+        _unimodular_matrices.append(matrices[numpy.rint(numpy.linalg.det(matrices)) == 1])
+    return _unimodular_matrices[0]
+
+
+def _get_lengths_and_angles(cells):
+    """
+    :param cells: an array of cells, with shape (..., 3, 3)
+    :return: the lengths of the vectors, with shape (..., 3) and the angles between the second
+        and third, first and third, and first and second vectors in degrees, with shape (..., 3)
+    """
+    import numpy
+
+    lengths = numpy.sqrt(numpy.einsum('...ij,...ij->...i', cells, cells))
+    cosines = [numpy.einsum('...i,...i->...', cells[..., i, :], cells[..., j, :]) / (lengths[..., i] * lengths[..., j])
+               for i, j in [(1, 2), (0, 2), (0, 1)]]
+    return lengths, numpy.degrees(numpy.arccos(numpy.clip(numpy.stack(cosines, axis=-1), -1., 1.)))
+
+
+def are_equivalent_structures(data1, data2, length_tolerance=_equivalence_length_tolerance,
+                              angle_tolerance=_equivalence_angle_tolerance):
+    """
+    Check whether two periodic structures are the same crystal, up to the choice of the cell
+    (among those with the same number of sites), the order of the sites, the origin and a rotation.
+    Mirror images of a chiral structure are not equivalent.
+
+    The reduced cells of the two structures are compared with the given tolerances, trying all the
+    reduced cells of the second structure, and the sorted fractional coordinates of the sites are
+    compared for all the choices of the origin on a site of the least frequent species.
+
+    :param data1: the data of the first structure, see :py:func:`get_equivalence_data`
+    :param data2: the data of the second structure, see :py:func:`get_equivalence_data`
+    :param float length_tolerance: the tolerance on the lengths of the cell vectors and on the
+        positions of the sites, in angstrom
+    :param float angle_tolerance: the tolerance on the angles of the cell, in degrees
+    :return: a boolean
+    """
+    import numpy
+
+    cell1, positions1, species1 = data1
+    cell2, positions2, species2 = data2
+
+    if sorted(species1) != sorted(species2):
+        return False
+    lengths1, angles1 = _get_lengths_and_angles(cell1)
+    if numpy.any(numpy.abs(_get_lengths_and_angles(cell2)[0] - lengths1) > length_tolerance):
+        return False
+
+    cells2 = numpy.einsum('kij,jl->kil', _get_unimodular_matrices(), cell2)
+    lengths2, angles2 = _get_lengths_and_angles(cells2)
+    cells2 = cells2[numpy.all(numpy.abs(lengths2 - lengths1) <= length_tolerance, axis=1) &
+                    numpy.all(numpy.abs(angles2 - angles1) <= angle_tolerance, axis=1)]
+
+    names, counts = numpy.unique(species1, return_counts=True)
+    origin_species = names[numpy.argmin(counts)]
+    fractional1 = numpy.linalg.solve(cell1.T, positions1.T).T
+    fractional1 -= fractional1[numpy.flatnonzero(species1 == origin_species)[0]]
+    origins2 = numpy.flatnonzero(species2 == origin_species)
+
+    for cell in cells2:
+        fractional2 = numpy.linalg.solve(cell.T, positions2.T).T
+        for origin in origins2:
+            shifted2 = fractional2 - fractional2[origin]
+            for name in names:
+                differences = shifted2[species2 == name][numpy.newaxis, :, :] - \
+                    fractional1[species1 == name][:, numpy.newaxis, :]
+                differences = (differences - numpy.rint(differences)).dot(cell1)
+                distances = numpy.sqrt(numpy.einsum('ijk,ijk->ij', differences, differences))
+                # Every site must have a site of the same species within the tolerance in the other structure
+                if numpy.any(distances.min(axis=0) > length_tolerance) or \
+                        numpy.any(distances.min(axis=1) > length_tolerance):
+                    break
+            else:
+                return True
+
+    return False
+
+
 @optional_inline
 def _get_cif_ase_inline(struct, parameters):
     """
@@ -937,6 +1151,87 @@ class StructureData(Data):
                                   "are no sites with that kind: {}".format(
                 list(kinds_without_sites)))
 
+    def _db_store(self, *args, **kwargs):
+        """
+        Store the node, together with the fingerprint of the structure in its extras,
+        such that the equivalent structures can be found quickly with :py:meth:`find_equivalent`.
+        This is called by :py:meth:`store` once the node was validated.
+        """
+        fingerprint = self.get_fingerprint()
+        if fingerprint is not None:
+            # The extras of the model of an unstored node are written when the node is inserted
+            self.dbnode.extras[FINGERPRINT_EXTRA_KEY] = fingerprint
+
+        return super(StructureData, self)._db_store(*args, **kwargs)
+
+    def get_fingerprint(self):
+        """
+        Return the fingerprint of the structure, see :py:func:`get_structure_fingerprint`.
+
+        :return: a string, or None if the structure is not periodic in three dimensions or has no sites
+        """
+        return get_structure_fingerprint(self.cell, self.pbc, self.get_attr('sites', []), self.get_attr('kinds', []))
+
+    def _get_equivalence_data(self):
+        data = get_equivalence_data(self.cell, self.pbc, self.get_attr('sites', []), self.get_attr('kinds', []))
+        if data is None:
+            raise ValueError("Only structures periodic in three dimensions and with sites can be compared")
+        return data
+
+    def is_equivalent(self, structure, length_tolerance=_equivalence_length_tolerance,
+                      angle_tolerance=_equivalence_angle_tolerance):
+        """
+        Check whether this structure and another one are the same crystal, see
+        :py:func:`are_equivalent_structures`.
+
+        :param structure: a StructureData
+        :param float length_tolerance: the tolerance on the lengths of the cell vectors and on the
+            positions of the sites, in angstrom
+        :param float angle_tolerance: the tolerance on the angles of the cell, in degrees
+        :return: a boolean
+        :raise ValueError: if one of the structures is not periodic in three dimensions or has no sites
+        """
+        return are_equivalent_structures(self._get_equivalence_data(), structure._get_equivalence_data(),
+                                         length_tolerance=length_tolerance, angle_tolerance=angle_tolerance)
+
+    def find_equivalent(self, length_tolerance=_equivalence_length_tolerance,
+                        angle_tolerance=_equivalence_angle_tolerance):
+        """
+        Find the stored structures that are equivalent to this one, see :py:meth:`is_equivalent`.
+
+        The structures with the same or a neighbouring fingerprint are found with a single
+        query on the (indexed) fingerprint extra, and then compared with this one.
+
+        :param float length_tolerance: the tolerance on the lengths of the cell vectors and on the
+            positions of the sites, in angstrom
+        :param float angle_tolerance: the tolerance on the angles of the cell, in degrees
+        :return: the list of the equivalent StructureData nodes, sorted by pk, excluding this one
+        :raise ValueError: if the structure is not periodic in three dimensions or has no sites
+        """
+        from aiida.orm import load_node
+        from aiida.orm.querybuilder import QueryBuilder
+
+        data = self._get_equivalence_data()
+
+        fingerprints = get_neighbour_fingerprints(self.get_fingerprint())
+        filters = {'extras.{}'.format(FINGERPRINT_EXTRA_KEY): {'in': fingerprints}}
+        if self.is_stored:
+            filters['id'] = {'!==': self.pk}
+
+        builder = QueryBuilder()
+        builder.append(StructureData, filters=filters,
+                       project=['id', 'attributes.cell', 'attributes.sites', 'attributes.kinds'])
+
+        pks = []
+        for pk, cell, sites, kinds in builder.iterall():
+            # Only the structures periodic in three dimensions have a fingerprint
+            other_data = get_equivalence_data(cell, (True, True, True), sites, kinds)
+            if are_equivalent_structures(data, other_data, length_tolerance=length_tolerance,
+                                         angle_tolerance=angle_tolerance):
+                pks.append(pk)
+
+        return [load_node(pk) for pk in sorted(pks)]
+
     def _prepare_xsf(self, main_file_name=""):
         """
         Write the given structure to a string of format XSF (for XCrySDen).
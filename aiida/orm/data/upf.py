@@ -15,6 +15,7 @@ import re
 import aiida.orm.user
 from aiida.orm.data.singlefile import SinglefileData
 from aiida.common.utils import classproperty
+from aiida.orm.implementation.general.group import add_membership_listener
 
 
 UPFGROUP_TYPE = 'data.upf.family'
@@ -45,34 +46,123 @@ _element_v2_regexp = re.compile(
    """, re.VERBOSE)
 
 
+# Cache of the family indices of this process: family name -> (group pk, {element: UpfData pk})
+_family_index_cache = {}
+
+
+def _invalidate_family_index(group_pk):
+    """
+    Remove the index of a family from the cache, after the nodes of its group changed.
+    """
+    for family_name, (family_pk, _) in _family_index_cache.items():
+        if family_pk == group_pk:
+            del _family_index_cache[family_name]
+
+
+add_membership_listener(_invalidate_family_index)
+
+
+def clear_family_index_cache():
+    """
+    Clear the cache of the family indices, e.g. after the pseudos of a family were changed in another process.
+    """
+    _family_index_cache.clear()
+
+
+def get_family_index(family_name, use_cache=True):
+    """
+    Return the index of a family of pseudopotentials, mapping each element to the pk of its UpfData.
+
+    The index is built with a single query, and memoized for each process: it is invalidated whenever
+    nodes are added to or removed from the group in this process.
+
+    :param family_name: the name of the UpfFamily group
+    :param use_cache: if False, the index is rebuilt from the database
+    :return: a tuple with the pk of the group and the dictionary {element: pk}
+    :raise NotExistent: if the family does not exist
+    :raise MultipleObjectsError: if more than one UPF for the same element is
+       found in the group.
+    """
+    from aiida.common.exceptions import MultipleObjectsError
+    from aiida.orm.querybuilder import QueryBuilder
+    from aiida.orm.group import Group
+
+    if use_cache and family_name in _family_index_cache:
+        return _family_index_cache[family_name]
+
+    family = UpfData.get_upf_group(family_name)
+    qb = QueryBuilder()
+    qb.append(Group, filters={'id': family.pk}, tag='group')
+    qb.append(UpfData, member_of='group', project=['attributes.element', 'id'])
+
+    family_pseudos = {}
+    for element, pk in qb.iterall():
+        if element in family_pseudos:
+            raise MultipleObjectsError(
+                "More than one UPF for element {} found in "
+                "family {}".format(element, family_name))
+        family_pseudos[element] = pk
+
+    _family_index_cache[family_name] = (family.pk, family_pseudos)
+    return _family_index_cache[family_name]
+
+
+def _load_family_pseudos(family_pk, family_name, pks):
+    """
+    Load the UpfData nodes with the given pks, with a single query, if they are still in the family.
+
+    :return: a dictionary {pk: UpfData}, without the nodes that are not in the family anymore
+    """
+    from aiida.orm.querybuilder import QueryBuilder
+    from aiida.orm.group import Group
+
+    if not pks:
+        return {}
+
+    qb = QueryBuilder()
+    qb.append(Group, filters={'id': family_pk, 'name': family_name}, tag='group')
+    qb.append(UpfData, member_of='group', filters={'id': {'in': list(pks)}})
+    return {pseudo.pk: pseudo for pseudo, in qb.iterall()}
+
+
 def get_pseudos_from_structure(structure, family_name):
     """
     Given a family name (a UpfFamily group in the DB) and a AiiDA
     structure, return a dictionary associating each kind name with its
     UpfData object.
 
+    The pseudos are looked up in the cached index of the family, see :py:func:`get_family_index`,
+    and loaded with a single query.
+
     :raise MultipleObjectsError: if more than one UPF for the same element is
        found in the group.
     :raise NotExistent: if no UPF for an element in the group is
        found in the group.
     """
-    from aiida.common.exceptions import NotExistent, MultipleObjectsError
+    from aiida.common.exceptions import NotExistent
 
-    family_pseudos = {}
-    family = UpfData.get_upf_group(family_name)
-    for node in family.nodes:
-        if isinstance(node, UpfData):
-            if node.element in family_pseudos:
-                raise MultipleObjectsError(
-                    "More than one UPF for element {} found in "
-                    "family {}".format(node.element, family_name))
-            family_pseudos[node.element] = node
+    symbols = set(kind.symbol for kind in structure.kinds)
+    family_pk, family_pseudos = get_family_index(family_name)
+
+    # A missing element, or a pseudo that left the family, may be due to a change in another process:
+    # the index is then rebuilt once before failing
+    pseudos = None
+    if symbols.issubset(family_pseudos):
+        pks = set(family_pseudos[symbol] for symbol in symbols)
+        pseudos = _load_family_pseudos(family_pk, family_name, pks)
+        if len(pseudos) != len(pks):
+            pseudos = None
+
+    if pseudos is None:
+        family_pk, family_pseudos = get_family_index(family_name, use_cache=False)
+        pseudos = _load_family_pseudos(family_pk, family_name, set(
+            family_pseudos[symbol] for symbol in symbols if symbol in family_pseudos))
 
     pseudo_list = {}
     for kind in structure.kinds:
         symbol = kind.symbol
         try:
-            pseudo_list[kind.name] = family_pseudos[symbol]
+            pseudo_list[kind.name] = pseudos[family_pseudos[symbol]]
         except KeyError:
             raise NotExistent("No UPF for element {} found in family {}".format(
                 symbol, family_name))
@@ -114,7 +204,7 @@ def get_pseudos_dict(structure, family_name):
 
 
 def upload_upf_family(folder, group_name, group_description,
-                      stop_if_existing=True):
+                      stop_if_existing=True, num_workers=1):
     """
     Upload a set of UPF files in a given group.
 
@@ -127,15 +217,18 @@ def upload_upf_family(folder, group_name, group_description,
     :param stop_if_existing: if True, check for the md5 of the files and,
         if the file already exists in the DB, raises a MultipleObjectsError.
         If False, simply adds the existing UPFData node to the group.
+    :param num_workers: the number of processes hashing and parsing the files.
     """
     import os
 
-    import aiida.common
     from aiida.common import aiidalogger
     from aiida.orm import Group
-    from aiida.common.exceptions import UniquenessError, NotExistent
+    from aiida.common.exceptions import UniquenessError, NotExistent, ParsingError
+    from aiida.backends.utils import store_nodes
     from aiida.orm.backend import construct_backend
     from aiida.orm.querybuilder import QueryBuilder
+    from aiida.utils import ingest
+
     if not os.path.isdir(folder):
         raise ValueError("folder must be a directory")
 
@@ -169,44 +262,52 @@ def upload_upf_family(folder, group_name, group_description,
 
     # NOTE: GROUP SAVED ONLY AFTER CHECKS OF UNICITY
 
-    pseudo_and_created = []
+    # Hash and parse the files, then look up all the md5 at once
+    parsed_files = list(ingest.parse_files(ingest.UPF, files, num_workers=num_workers))
+    existing_pks = ingest.get_pks_by_md5(UpfData, [parsed.md5 for parsed in parsed_files if parsed.md5 is not None])
 
-    for f in files:
-        md5sum = aiida.common.utils.md5_file(f)
-        qb = QueryBuilder()
-        qb.append(UpfData, filters={'attributes.md5':{'==':md5sum}})
-        existing_upf = qb.first()
-
-        #~ existing_upf = UpfData.query(dbattributes__key="md5",
-                                     #~ dbattributes__tval=md5sum)
-
-        if existing_upf is None:
-            # return the upfdata instances, not stored
-            pseudo, created = UpfData.get_or_create(f, use_first=True,
-                                                    store_upf=False)
-            # to check whether only one upf per element exists
-            # NOTE: actually, created has the meaning of "to_be_created"
-            pseudo_and_created.append((pseudo, created))
-        else:
-            if stop_if_existing:
+    if stop_if_existing:
+        for parsed in parsed_files:
+            if parsed.md5 in existing_pks:
                 raise ValueError(
                         "A UPF with identical MD5 to "
                         " {} cannot be added with stop_if_existing"
-                        "".format(f)
+                        "".format(parsed.filename)
                     )
-            existing_upf = existing_upf[0]
-            pseudo_and_created.append((existing_upf, False))
+
+    # Files identical to an existing UPF do not need to be parsed
+    failed = [parsed for parsed in parsed_files
+              if parsed.error is not None and parsed.md5 not in existing_pks]
+    if failed:
+        raise ParsingError("Unable to parse the UPF files: {}".format(
+            "; ".join(parsed.error for parsed in failed)))
+
+    existing_pseudos = {}
+    if existing_pks:
+        qb = QueryBuilder()
+        qb.append(UpfData, filters={'id': {'in': existing_pks.values()}})
+        existing_pseudos = {pseudo.md5sum: pseudo for pseudo, in qb.iterall()}
+
+    # return the upfdata instances, not stored, once per md5
+    # NOTE: created has the meaning of "to_be_created"
+    pseudo_and_created = []
+    new_pseudos = {}
+    for parsed in parsed_files:
+        if parsed.md5 in existing_pks:
+            pseudo_and_created.append((existing_pseudos[parsed.md5], False))
+        elif parsed.md5 not in new_pseudos:
+            new_pseudos[parsed.md5] = ingest.create_node(UpfData, parsed)
+            pseudo_and_created.append((new_pseudos[parsed.md5], True))
 
     # check whether pseudo are unique per element
     elements = [(i[0].element, i[0].md5sum) for i in pseudo_and_created]
     # If group already exists, check also that I am not inserting more than
     # once the same element
     if not group_created:
-        for aiida_n in group.nodes:
-            # Skip non-pseudos
-            if not isinstance(aiida_n, UpfData):
-                continue
-            elements.append((aiida_n.element, aiida_n.md5sum))
+        qb = QueryBuilder()
+        qb.append(Group, filters={'id': group.pk}, tag='group')
+        qb.append(UpfData, member_of='group', project=['attributes.element', 'attributes.md5'])
+        elements.extend(qb.all())
 
     elements = set(elements)  # Discard elements with the same MD5, that would
     # not be stored twice
@@ -223,11 +324,11 @@ def upload_upf_family(folder, group_name, group_description,
     if group_created:
         group.store()
 
-    # save the upf in the database, and add them to group
+    # save the new upf in the database in a single transaction
+    store_nodes([pseudo for pseudo, created in pseudo_and_created if created])
+
     for pseudo, created in pseudo_and_created:
         if created:
-            pseudo.store()
-
             aiidalogger.debug("New node {} created for file {}".format(
                 pseudo.uuid, pseudo.filename))
         else:
@@ -383,7 +484,7 @@ class UpfData(SinglefileData):
     def store(self, *args, **kwargs):
         """
         Store the node, reparsing the file so that the md5 and the element
-        are correctly reset.
+        are correctly reset, unless they were set by set_file.
         """
         from aiida.common.exceptions import ParsingError, ValidationError
         import aiida.common.utils
@@ -395,6 +496,11 @@ class UpfData(SinglefileData):
         if not upf_abspath:
             raise ValidationError("No valid UPF was passed!")
 
+        # set_file parses the file when it is copied in the repository folder
+        # (or sets the values parsed by the workers of a bulk import)
+        if self.get_attr('element', None) is not None and self.get_attr('md5', None) is not None:
+            return super(UpfData, self).store(*args, **kwargs)
+
         parsed_data = parse_upf(upf_abspath)
         md5sum = aiida.common.utils.md5_file(upf_abspath)
 
@@ -423,15 +529,23 @@ class UpfData(SinglefileData):
         qb.append(cls, filters={'attributes.md5': {'==': md5}})
         return [_ for [_] in qb.all()]
 
-    def set_file(self, filename):
+    def set_file(self, filename, parsed_attributes=None):
         """
         I pre-parse the file to store the attributes.
+
+        :param parsed_attributes: if given, a dictionary with the element and the md5 of
+            the file, already parsed (e.g. by the workers of a bulk import), such that
+            the file is not parsed and hashed again
         """
         from aiida.common.exceptions import ParsingError
         import aiida.common.utils
 
-        parsed_data = parse_upf(filename)
-        md5sum = aiida.common.utils.md5_file(filename)
+        if parsed_attributes is None:
+            parsed_data = parse_upf(filename)
+            md5sum = aiida.common.utils.md5_file(filename)
+        else:
+            parsed_data = parsed_attributes
+            md5sum = parsed_attributes['md5']
 
         try:
             element = parsed_data['element']
@@ -462,7 +576,7 @@ class UpfData(SinglefileData):
         return self.get_attr('md5', None)
 
     def _validate(self):
-        from aiida.common.exceptions import ValidationError, ParsingError
+        from aiida.common.exceptions import ValidationError
         import aiida.common.utils
 
         super(UpfData, self)._validate()
@@ -471,21 +585,10 @@ class UpfData(SinglefileData):
         if not upf_abspath:
             raise ValidationError("No valid UPF was passed!")
 
-        try:
-            parsed_data = parse_upf(upf_abspath)
-        except ParsingError:
-            raise ValidationError("The file '{}' could not be "
-                                  "parsed".format(upf_abspath))
         md5 = aiida.common.utils.md5_file(upf_abspath)
 
         try:
-            element = parsed_data['element']
-        except KeyError:
-            raise ValidationError("No 'element' could be parsed in the UPF "
-                                  "file {}".format(upf_abspath))
-
-        try:
-            attr_element = self.get_attr('element')
+            self.get_attr('element')
         except AttributeError:
             raise ValidationError("attribute 'element' not set.")
 
@@ -494,11 +597,8 @@ class UpfData(SinglefileData):
         except AttributeError:
             raise ValidationError("attribute 'md5' not set.")
 
-        if attr_element != element:
-            raise ValidationError("Attribute 'element' says '{}' but '{}' was "
-                                  "parsed instead.".format(
-                attr_element, element))
-
+        # The element is parsed together with the md5 (see set_file and store),
+        # hence it is correct if the md5 is
         if attr_md5 != md5:
             raise ValidationError("Attribute 'md5' says '{}' but '{}' was "
                                   "parsed instead.".format(
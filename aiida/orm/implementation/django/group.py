@@ -143,44 +143,42 @@ class Group(AbstractGroup):
 
     def add_nodes(self, nodes):
         from aiida.backends.djsite.db.models import DbNode
+        from aiida.backends.djsite.querybuilder_django import dummy_model
         if not self.is_stored:
             raise ModificationNotAllowed("Cannot add nodes to a group before "
                                          "storing")
 
-        # First convert to a list
-        if isinstance(nodes, (Node, DbNode)):
-            nodes = [nodes]
-
-        if isinstance(nodes, basestring) or not isinstance(nodes, collections.Iterable):
-            raise TypeError("Invalid type passed as the 'nodes' parameter to "
-                            "add_nodes, can only be a Node, DbNode, or a list "
-                            "of such objects, it is instead {}".format(
-                str(type(nodes))))
-
-        list_pk = []
-        for node in nodes:
-            if not isinstance(node, (Node, DbNode)):
-                raise TypeError("Invalid type of one of the elements passed "
-                                "to add_nodes, it should be either a Node or "
-                                "a DbNode, it is instead {}".format(
-                    str(type(node))))
-            if node.pk is None:
-                raise ValueError("At least one of the provided nodes is "
-                                 "unstored, stopping...")
-            list_pk.append(node.pk)
-
-        self._dbgroup.dbnodes.add(*list_pk)
+        # The statements are executed through aldjemy, on the connection (and
+        # within the transaction) of django
+        with transaction.atomic():
+            session = dummy_model.get_aldjemy_session()
+            for statement in self._get_add_nodes_statements(
+                    nodes, (Node, DbNode), dummy_model.DbNode.__table__, dummy_model.table_groups_nodes):
+                session.execute(statement)
+        self._notify_membership_change()
 
     @property
     def nodes(self):
         class iterator(object):
-            def __init__(self, dbnodes):
+            def __init__(self, dbnodes, batch_size):
                 self.dbnodes = dbnodes
+                self.batch_size = batch_size
                 self.generator = self._genfunction()
 
             def _genfunction(self):
-                for n in self.dbnodes:
-                    yield n.get_aiida_class()
+                # Load the nodes in batches, paginating on the pk, such that
+                # the memory used does not depend on the size of the group
+                last_pk = None
+                while True:
+                    batch = self.dbnodes.order_by('pk')
+                    if last_pk is not None:
+                        batch = batch.filter(pk__gt=last_pk)
+                    batch = list(batch[:self.batch_size])
+                    for n in batch:
+                        yield n.get_aiida_class()
+                    if len(batch) < self.batch_size:
+                        break
+                    last_pk = batch[-1].pk
 
             def __iter__(self):
                 return self
@@ -195,46 +193,28 @@ class Group(AbstractGroup):
             def next(self):
                 return next(self.generator)
 
-        return iterator(self._dbgroup.dbnodes.all())
+        return iterator(self._dbgroup.dbnodes.all(), self._NODES_BATCH_SIZE)
 
     def remove_nodes(self, nodes):
         from aiida.backends.djsite.db.models import DbNode
+        from aiida.backends.djsite.querybuilder_django import dummy_model
         if not self.is_stored:
             raise ModificationNotAllowed("Cannot remove nodes from a group "
                                          "before storing")
 
-        # First convert to a list
-        if isinstance(nodes, (Node, DbNode)):
-            nodes = [nodes]
-
-        if isinstance(nodes, basestring) or not isinstance(
-                nodes, collections.Iterable):
-            raise TypeError("Invalid type passed as the 'nodes' parameter to "
-                            "remove_nodes, can only be a Node, DbNode, or a "
-                            "list of such objects, it is instead {}".format(
-                str(type(nodes))))
-
-        list_pk = []
-        for node in nodes:
-            if not isinstance(node, (Node, DbNode)):
-                raise TypeError("Invalid type of one of the elements passed "
-                                "to add_nodes, it should be either a Node or "
-                                "a DbNode, it is instead {}".format(
-                    str(type(node))))
-            if node.pk is None:
-                raise ValueError("At least one of the provided nodes is "
-                                 "unstored, stopping...")
-            list_pk.append(node.pk)
-
-        self._dbgroup.dbnodes.remove(*list_pk)
+        with transaction.atomic():
+            session = dummy_model.get_aldjemy_session()
+            for statement in self._get_remove_nodes_statements(
+                    nodes, (Node, DbNode), dummy_model.DbNode.__table__, dummy_model.table_groups_nodes):
+                session.execute(statement)
+        self._notify_membership_change()
 
     @classmethod
     def query(cls, name=None, type_string="", pk=None, uuid=None, nodes=None,
               user=None, node_attributes=None, past_days=None,
               name_filters=None, **kwargs):
 
-        from aiida.backends.djsite.db.models import (DbGroup, DbNode,
-                                                     DbAttribute)
+        from aiida.backends.djsite.db.models import DbGroup, DbNode
 
         # Analyze args and kwargs to create the query
         queryobject = Q()
@@ -289,24 +269,15 @@ class Group(AbstractGroup):
                     vlist = [vlist]
 
                 for v in vlist:
-                    # This will be a dictionary of the type
-                    # {'datatype': 'txt', 'tval': 'xxx') for instance, if
-                    # the passed data is a string
-                    base_query_dict = DbAttribute.get_query_dict(v)
-                    # prepend to the key the right django string to SQL-join
-                    # on the right table
-                    query_dict = {'dbnodes__dbattributes__{}'.format(k2): v2
-                                  for k2, v2 in base_query_dict.iteritems()}
+                    # The nodes having the attribute k equal to v, compared
+                    # as JSONB values
+                    nodes_with_attribute = DbNode.objects.extra(
+                        where=['db_dbnode.attributes -> %s = %s'],
+                        params=[k, DbNode._meta.get_field('attributes').get_prep_value(v)]).values('pk')
 
                     # I narrow down the list of groups.
-                    # I had to do it in this way, with multiple DB hits and
-                    # not a single, complicated query because in SQLite
-                    # there is a maximum of 64 tables in a join.
-                    # Since typically one requires a small number of filters,
-                    # this should be ok.
                     groups_pk = groups_pk.intersection(DbGroup.objects.filter(
-                        pk__in=groups_pk, dbnodes__dbattributes__key=k,
-                        **query_dict).values_list('pk', flat=True))
+                        pk__in=groups_pk, dbnodes__in=nodes_with_attribute).values_list('pk', flat=True))
 
         retlist = []
         # Return sorted by pk
@@ -317,4 +288,6 @@ class Group(AbstractGroup):
 
     def delete(self):
         if self.pk is not None:
+            pk = self.pk
             self._dbgroup.delete()
+            self._notify_membership_change(pk)
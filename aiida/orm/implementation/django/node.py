@@ -326,69 +326,120 @@ class Node(AbstractNode):
         :param str key: key name
         :param value: its value
         """
-        from aiida.backends.djsite.db.models import DbAttribute
+        def set_attribute(attributes):
+            attributes[key] = value
 
-        DbAttribute.set_value_for_node(self._dbnode, key, value)
-        self._increment_version_number_db()
+        columns = {key: value} if key in self._column_attributes else {}
+        self._update_db_json_field('attributes', set_attribute, **columns)
+
+    def _set_db_attrs(self, attributes, reset=False):
+        def set_attributes(values):
+            if reset:
+                values.clear()
+            values.update(attributes)
+
+        columns = {key: attributes.get(key, None) for key in self._column_attributes if reset or key in attributes}
+        self._update_db_json_field('attributes', set_attributes, **columns)
 
     def _del_db_attr(self, key):
-        from aiida.backends.djsite.db.models import DbAttribute
-        if not DbAttribute.has_key(self._dbnode, key):
-            raise AttributeError("DbAttribute {} does not exist".format(
-                key))
-        DbAttribute.del_value_for_node(self._dbnode, key)
-        self._increment_version_number_db()
+        def del_attribute(attributes):
+            if key not in attributes:
+                raise AttributeError("Attribute {} does not exist".format(key))
+            del attributes[key]
+
+        columns = {key: None} if key in self._column_attributes else {}
+        self._update_db_json_field('attributes', del_attribute, **columns)
 
     def _get_db_attr(self, key):
-        from aiida.backends.djsite.db.models import DbAttribute
-        return DbAttribute.get_value_for_node(
-            dbnode=self._dbnode, key=key)
+        try:
+            return self._attributes()[key]
+        except KeyError:
+            raise AttributeError("Attribute with key {} for node {} not found "
+                                 "in db".format(key, self.pk))
 
     def _set_db_extra(self, key, value, exclusive=False):
-        from aiida.backends.djsite.db.models import DbExtra
+        def set_extra(extras):
+            if exclusive and key in extras:
+                raise UniquenessError("Extra with key {} already exists for node {}".format(key, self.pk))
+            extras[key] = value
 
-        DbExtra.set_value_for_node(self._dbnode, key, value,
-                                   stop_if_existing=exclusive)
-        self._increment_version_number_db()
+        self._update_db_json_field('extras', set_extra)
 
     def _reset_db_extras(self, new_extras):
-        raise NotImplementedError("Reset of extras has not been implemented"
-                                  "for Django backend.")
+        def reset_extras(extras):
+            extras.clear()
+            extras.update(new_extras)
+
+        self._update_db_json_field('extras', reset_extras)
 
     def _get_db_extra(self, key):
-        from aiida.backends.djsite.db.models import DbExtra
-        return DbExtra.get_value_for_node(dbnode=self._dbnode, key=key)
+        try:
+            return self._extras()[key]
+        except KeyError:
+            raise AttributeError("Extra with key {} for node {} not found "
+                                 "in db".format(key, self.pk))
 
     def _del_db_extra(self, key):
-        from aiida.backends.djsite.db.models import DbExtra
-        if not DbExtra.has_key(self._dbnode, key):
-            raise AttributeError("DbExtra {} does not exist".format(
-                key))
-        return DbExtra.del_value_for_node(self._dbnode, key)
-        self._increment_version_number_db()
+        def del_extra(extras):
+            if key not in extras:
+                raise AttributeError("Extra {} does not exist".format(key))
+            del extras[key]
+
+        self._update_db_json_field('extras', del_extra)
 
     def _db_iterextras(self):
-        from aiida.backends.djsite.db.models import DbExtra
-        extraslist = DbExtra.list_all_node_elements(self._dbnode)
-        for e in extraslist:
-            yield (e.key, e.getvalue())
+        for key, value in self._extras().iteritems():
+            yield (key, value)
 
     def _db_iterattrs(self):
-        from aiida.backends.djsite.db.models import DbAttribute
-
-        all_attrs = DbAttribute.get_all_values_for_node(self._dbnode)
-        for attr in all_attrs:
-            yield (attr, all_attrs[attr])
+        for key, value in self._attributes().iteritems():
+            yield (key, value)
 
     def _db_attrs(self):
-        # Note: I "duplicate" the code from iterattrs and reimplement it
-        # here, rather than
-        # calling iterattrs from here, because iterattrs is slow on each call
-        # since it has to call .getvalue(). To improve!
-        from aiida.backends.djsite.db.models import DbAttribute
-        attrlist = DbAttribute.list_all_node_elements(self._dbnode)
-        for attr in attrlist:
-            yield attr.key
+        for key in self._attributes().iterkeys():
+            yield key
+
+    def _attributes(self):
+        self._ensure_model_uptodate(['attributes'])
+        return self._dbnode.attributes
+
+    def _extras(self):
+        self._ensure_model_uptodate(['extras'])
+        return self._dbnode.extras
+
+    def _ensure_model_uptodate(self, field_names):
+        """
+        Reload the given fields of the stored node from the DB, as they may have been modified by other processes.
+        """
+        from aiida.backends.djsite.db.models import DbNode
+        if self.is_stored:
+            values = DbNode.objects.filter(pk=self._dbnode.pk).values(*field_names)[0]
+            for field_name, value in values.iteritems():
+                setattr(self._dbnode, field_name, value)
+
+    def _update_db_json_field(self, field_name, modify, **columns):
+        """
+        Modify the attributes or the extras of the stored node in the DB, and increment its version number.
+
+        The row of the node is locked until the end of the transaction, so that concurrent modifications of
+        different keys are not lost.
+
+        :param field_name: either 'attributes' or 'extras'
+        :param modify: a function that modifies in place the dictionary read from the DB
+        :param columns: further columns of the node to set to the given values
+        """
+        from aiida.backends.djsite.db.models import DbNode
+        from aiida.utils import timezone
+
+        with transaction.atomic():
+            value = DbNode.objects.select_for_update().filter(
+                pk=self._dbnode.pk).values_list(field_name, flat=True)[0]
+            modify(value)
+            columns[field_name] = value
+            DbNode.objects.filter(pk=self._dbnode.pk).update(
+                nodeversion=F('nodeversion') + 1, mtime=timezone.now(), **columns)
+
+        self._dbnode = DbNode.objects.get(pk=self._dbnode.pk)
 
     def add_comment(self, content, user=None):
         from aiida.backends.djsite.db.models import DbComment
@@ -615,7 +666,6 @@ class Node(AbstractNode):
         from django.db import transaction
         from aiida.common.utils import EmptyContextManager
         from aiida.common.exceptions import ValidationError
-        from aiida.backends.djsite.db.models import DbAttribute
         import aiida.orm.autogroup
 
         if with_transaction:
@@ -637,13 +687,11 @@ class Node(AbstractNode):
         # problems, especially with SQLite
         try:
             with context_man:
-                # Save the row
+                for key in self._column_attributes:
+                    setattr(self._dbnode, key, self._attrs_cache.get(key, None))
+                # Save the row, together with its attributes
+                self._dbnode.attributes = self._attrs_cache
                 self._dbnode.save()
-                # Save its attributes 'manually' without incrementing
-                # the version for each add.
-                DbAttribute.reset_values_for_node(self._dbnode,
-                                                  attributes=self._attrs_cache,
-                                                  with_transaction=False)
                 # This should not be used anymore: I delete it to
                 # possibly free memory
                 del self._attrs_cache
@@ -664,8 +712,8 @@ class Node(AbstractNode):
                 self._repository_folder.abspath, move=True, overwrite=True)
             raise
 
-        from aiida.backends.djsite.db.models import DbExtra
         # I store the hash without cleaning and without incrementing the nodeversion number
-        DbExtra.set_value_for_node(self._dbnode, _HASH_EXTRA_KEY, self.get_hash())
+        self._dbnode.extras[_HASH_EXTRA_KEY] = self.get_hash()
+        self._dbnode.save(update_fields=['extras'])
 
         return self
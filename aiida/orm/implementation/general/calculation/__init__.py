@@ -55,6 +55,13 @@ class AbstractCalculation(Sealable):
             cls.PROCESS_STATUS_KEY,
         )
 
+    @classproperty
+    def _column_attributes(cls):
+        return super(AbstractCalculation, cls)._column_attributes + (
+            cls.EXIT_STATUS_KEY,
+            cls.PROCESS_STATE_KEY,
+        )
+
     @classproperty
     def _use_methods(cls):
         """
@@ -30,12 +30,15 @@ from aiida.utils import timezone
 
 SEALED_KEY = 'attributes.{}'.format(Sealable.SEALED_KEY)
 CALCULATION_STATE_KEY = 'state'
-SCHEDULER_STATE_KEY = 'attributes.scheduler_state'
-PROCESS_STATE_KEY = 'attributes.{}'.format(AbstractCalculation.PROCESS_STATE_KEY)
-EXIT_STATUS_KEY = 'attributes.{}'.format(AbstractCalculation.EXIT_STATUS_KEY)
+# The scheduler state, process state and exit status are mirrored in indexed columns of the node table
+SCHEDULER_STATE_KEY = 'scheduler_state'
+PROCESS_STATE_KEY = AbstractCalculation.PROCESS_STATE_KEY
+EXIT_STATUS_KEY = AbstractCalculation.EXIT_STATUS_KEY
 DEPRECATION_DOCS_URL = 'http://aiida-core.readthedocs.io/en/latest/process/index.html#the-process-builder'
 
 _input_subfolder = 'raw_input'
+# The name of the submit script of a calculation, in its working directory
+SUBMIT_SCRIPT_FILENAME = '_aiidasubmit.sh'
 
 
 class JobCalculationExitStatus(enum.Enum):
@@ -86,6 +89,10 @@ class AbstractJobCalculation(AbstractCalculation):
             'retrieve_list', 'retrieve_temporary_list', 'retrieve_singlefile_list', 'state'
         )
 
+    @classproperty
+    def _column_attributes(cls):
+        return super(AbstractJobCalculation, cls)._column_attributes + ('scheduler_state',)
+
     @classproperty
     def _hash_ignored_attributes(cls):
         return super(AbstractJobCalculation, cls)._hash_ignored_attributes + (
@@ -242,13 +249,16 @@ class AbstractJobCalculation(AbstractCalculation):
         return super(AbstractJobCalculation, self)._linking_as_output(dest,
                                                                       link_type)
 
-    def _store_raw_input_folder(self, folder_path):
+    def _store_raw_input_folder(self, folder_path, link=False):
         """
         Copy the content of the folder internally, in a subfolder called
         'raw_input'
 
         :param folder_path: the path to the folder from which the content
                should be taken
+        :param link: if True, hardlink the files instead of copying them
+               (falling back to a copy if this is not possible). The files
+               must then not be modified in folder_path afterwards.
         """
         # This function can be called only if the state is SUBMITTING
         if self.get_state() != calc_states.SUBMITTING:
@@ -261,7 +271,7 @@ class AbstractJobCalculation(AbstractCalculation):
         _raw_input_folder = self.folder.get_subfolder(
             _input_subfolder, create=True)
         _raw_input_folder.replace_with_folder(
-            folder_path, move=False, overwrite=True)
+            folder_path, move=False, overwrite=True, link=link)
 
     @property
     def _raw_input_folder(self):
@@ -1225,7 +1235,8 @@ class AbstractJobCalculation(AbstractCalculation):
         :return: a list of calculation objects matching the filters.
         """
         # I assume that calc_states are strings. If this changes in the future,
-        # update the filter below from dbattributes__tval to the correct field.
+        # update the filter below on the state, that is compared as a string in
+        # the JSONB attributes column.
         from aiida.orm.computer import Computer
         from aiida.orm.querybuilder import QueryBuilder
 
@@ -1661,7 +1672,7 @@ class AbstractJobCalculation(AbstractCalculation):
             job_tmpl.max_memory_kb = max_memory_kb
 
         # TODO: give possibility to use a different name??
-        script_filename = '_aiidasubmit.sh'
+        script_filename = SUBMIT_SCRIPT_FILENAME
         script_content = s.get_submit_script(job_tmpl)
         folder.create_file_from_filelike(
             StringIO.StringIO(script_content), script_filename)
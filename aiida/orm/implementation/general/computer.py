@@ -40,6 +40,9 @@ class AbstractComputer(object):
     """
     _logger = logging.getLogger(__name__)
 
+    # The ways the daemon can submit the calculations on the computer, see get_submit_mode
+    _valid_submit_modes = ('single', 'array', 'bundle')
+
     def __int__(self):
         """
         Convert the class to an integer. This is needed to allow querying with Django.
@@ -514,6 +517,47 @@ class AbstractComputer(object):
                 raise TypeError("def_cpus_per_machine must be an integer (or None)")
         self._set_property("default_mpiprocs_per_machine", def_cpus_per_machine)
 
+    def get_submit_mode(self):
+        """
+        Return how the daemon submits the calculations on this computer that are
+        ready to be submitted at the same time on the same transport: 'single'
+        (the default) submits a job per calculation, 'array' groups them in job
+        arrays and 'bundle' runs them in a single job, with the options returned
+        by :py:meth:`get_bundle_options` (see
+        :py:func:`aiida.daemon.execmanager.submit_calculations`).
+        """
+        return self._get_property("submit_mode", "single")
+
+    def set_submit_mode(self, submit_mode):
+        """
+        Set how the daemon submits the calculations on this computer, see
+        :py:meth:`get_submit_mode`.
+        """
+        if submit_mode not in self._valid_submit_modes:
+            raise ValueError("the submit_mode must be one of {}".format(", ".join(self._valid_submit_modes)))
+        self._set_property("submit_mode", submit_mode)
+
+    def get_bundle_options(self):
+        """
+        Return the options of the bundles submitted on this computer when the
+        submit mode is 'bundle', i.e. the keyword arguments 'resources', and
+        optionally 'max_wallclock_seconds' and 'max_concurrent', of
+        :py:func:`aiida.daemon.execmanager.submit_calculations_as_bundle`.
+        """
+        return self._get_property("bundle_options", {})
+
+    def set_bundle_options(self, bundle_options):
+        """
+        Set the options of the bundles submitted on this computer, see
+        :py:meth:`get_bundle_options`.
+        """
+        if not isinstance(bundle_options, dict) or 'resources' not in bundle_options:
+            raise TypeError("the bundle_options must be a dictionary with at least the 'resources' key")
+        unknown = set(bundle_options) - set(['resources', 'max_wallclock_seconds', 'max_concurrent'])
+        if unknown:
+            raise ValueError("unknown bundle options: {}".format(", ".join(sorted(unknown))))
+        self._set_property("bundle_options", bundle_options)
+
     @abstractmethod
     def get_transport_params(self):
         pass
@@ -8,11 +8,27 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 
+import collections
 from abc import ABCMeta, abstractmethod, abstractproperty
 
 from aiida.common.exceptions import UniquenessError, NotExistent, MultipleObjectsError
 from aiida.common.utils import abstractclassmethod, abstractstaticmethod
 
+# Callables called with the pk of a group whenever nodes are added to or removed from it,
+# or it is deleted, in this process: they invalidate the caches of the contents of groups
+_membership_listeners = []
+
+
+def add_membership_listener(listener):
+    """
+    Register a callable that is called with the pk of a group whenever its nodes change in this process,
+    i.e. when nodes are added to or removed from it or when it is deleted.
+
+    :param listener: a callable accepting a group pk
+    """
+    if listener not in _membership_listeners:
+        _membership_listeners.append(listener)
+
 
 def get_group_type_mapping():
     """
@@ -40,6 +56,10 @@ class AbstractGroup(object):
 
     __metaclass__ = ABCMeta
 
+    # Number of nodes that are added to or removed from the group with a single statement,
+    # and that are loaded at a time when iterating over the nodes of the group
+    _NODES_BATCH_SIZE = 1000
+
     @abstractmethod
     def __init__(self, **kwargs):
         """
@@ -249,12 +269,19 @@ class AbstractGroup(object):
         """
         Add a node or a set of nodes to the group.
 
+        The nodes are added with set-based statements, each adding up to
+        ``_NODES_BATCH_SIZE`` nodes (or all the nodes returned by a QueryBuilder)
+        at once and skipping those that are already in the group. Iterables are
+        consumed lazily, such that also very large sets of nodes can be passed
+        with a generator. All the nodes are added in a single transaction.
+
         :note: The group must be already stored.
 
         :note: each of the nodes passed to add_nodes must be already stored.
 
         :param nodes: a Node or DbNode object to add to the group, or
-          a list of Nodes or DbNodes to add.
+          an iterable of Nodes, DbNodes or node pks to add, or a QueryBuilder
+          projecting either a node or its id.
         """
         pass
 
@@ -264,6 +291,8 @@ class AbstractGroup(object):
         Return a generator/iterator that iterates over all nodes and returns
         the respective AiiDA subclasses of Node, and also allows to ask for
         the number of nodes in the group using len().
+
+        The nodes are loaded ``_NODES_BATCH_SIZE`` at a time, in order of pk.
         """
         pass
 
@@ -272,15 +301,128 @@ class AbstractGroup(object):
         """
         Remove a node or a set of nodes to the group.
 
+        Nodes that are not in the group are ignored. As for :py:meth:`add_nodes`,
+        the nodes are removed in batches, within a single transaction.
+
         :note: The group must be already stored.
 
         :note: each of the nodes passed to add_nodes must be already stored.
 
-        :param nodes: a Node or DbNode object to add to the group, or
-          a list of Nodes or DbNodes to add.
+        :param nodes: a Node or DbNode object to remove from the group, or
+          an iterable of Nodes, DbNodes or node pks to remove, or a QueryBuilder
+          projecting either a node or its id.
         """
         pass
 
+    def _notify_membership_change(self, pk=None):
+        """
+        Call the membership listeners, after the nodes of the group changed.
+
+        :param pk: the pk of the group, if it is not stored anymore
+        """
+        for listener in _membership_listeners:
+            listener(self.pk if pk is None else pk)
+
+    def _get_node_pks(self, nodes, node_classes, method_name):
+        """
+        Generator of the pks of the nodes passed to add_nodes or remove_nodes.
+
+        :param nodes: a node, or an iterable of nodes or node pks
+        :param node_classes: the tuple of the Node and DbNode classes of the backend
+        :param method_name: the name of the calling method, for the error messages
+        :raise TypeError: if nodes, or one of its elements, is of the wrong type
+        :raise ValueError: if one of the nodes is not stored
+        """
+        if isinstance(nodes, node_classes + (int, long)):
+            nodes = [nodes]
+
+        if isinstance(nodes, basestring) or not isinstance(nodes, collections.Iterable):
+            raise TypeError("Invalid type passed as the 'nodes' parameter to "
+                            "{}, can only be a Node, DbNode, node pk, QueryBuilder "
+                            "or an iterable of such objects, it is instead {}".format(
+                method_name, str(type(nodes))))
+
+        for node in nodes:
+            if isinstance(node, (int, long)):
+                yield node
+                continue
+
+            if not isinstance(node, node_classes):
+                raise TypeError("Invalid type of one of the elements passed "
+                                "to {}, it should be either a Node, a DbNode or "
+                                "a node pk, it is instead {}".format(
+                    method_name, str(type(node))))
+            if node.pk is None:
+                raise ValueError("At least one of the provided nodes is "
+                                 "unstored, stopping...")
+            yield node.pk
+
+    @staticmethod
+    def _get_querybuilder_node_ids(querybuilder):
+        """
+        Return the statement selecting the ids of the nodes returned by a QueryBuilder.
+
+        :param querybuilder: a QueryBuilder projecting either a node or its id, and nothing else
+        :return: a select statement with the node id as only column
+        :raise ValueError: if the QueryBuilder projects anything else
+        """
+        from sqlalchemy import inspect
+
+        query = querybuilder.get_query()
+        projections = [(tag, key) for tag, keys in querybuilder.tag_to_projected_entity_dict.items() for key in keys]
+        if len(projections) != 1 or projections[0][1] not in ('*', 'id'):
+            raise ValueError("The QueryBuilder passed to add or remove nodes must project "
+                             "either a node or its id, and nothing else")
+
+        alias = querybuilder._tag_to_alias_map[projections[0][0]]  # pylint: disable=protected-access
+        if inspect(alias).mapper.class_ is not querybuilder._impl.Node:  # pylint: disable=protected-access
+            raise ValueError("The QueryBuilder passed to add or remove nodes must project nodes")
+
+        return query.with_entities(alias.id).statement
+
+    def _get_node_id_selects(self, nodes, node_classes, node_table, method_name):
+        """
+        Generator of the statements selecting the ids of the nodes passed to add_nodes or remove_nodes:
+        a single one for a QueryBuilder, otherwise one for every ``_NODES_BATCH_SIZE`` nodes.
+
+        :param node_table: the SQLAlchemy table of the nodes
+        """
+        from sqlalchemy import select
+        from aiida.common.utils import grouper
+        from aiida.orm.querybuilder import QueryBuilder
+
+        if isinstance(nodes, QueryBuilder):
+            yield self._get_querybuilder_node_ids(nodes)
+            return
+
+        for batch in grouper(self._NODES_BATCH_SIZE, self._get_node_pks(nodes, node_classes, method_name)):
+            yield select([node_table.c.id]).where(node_table.c.id.in_(batch))
+
+    def _get_add_nodes_statements(self, nodes, node_classes, node_table, group_node_table):
+        """
+        Generator of the statements adding the given nodes to the group, see :py:meth:`add_nodes`.
+
+        :param node_table: the SQLAlchemy table of the nodes
+        :param group_node_table: the SQLAlchemy table associating nodes to groups
+        """
+        from sqlalchemy import Integer, literal
+        from aiida.backends.sqlalchemy.utils import insert_from_select_ignoring_conflicts
+
+        for node_ids in self._get_node_id_selects(nodes, node_classes, node_table, 'add_nodes'):
+            yield insert_from_select_ignoring_conflicts(
+                group_node_table, ['dbnode_id', 'dbgroup_id'], node_ids.column(literal(self.pk, Integer)))
+
+    def _get_remove_nodes_statements(self, nodes, node_classes, node_table, group_node_table):
+        """
+        Generator of the statements removing the given nodes from the group, see :py:meth:`remove_nodes`.
+
+        :param node_table: the SQLAlchemy table of the nodes
+        :param group_node_table: the SQLAlchemy table associating nodes to groups
+        """
+        for node_ids in self._get_node_id_selects(nodes, node_classes, node_table, 'remove_nodes'):
+            yield group_node_table.delete().where(
+                (group_node_table.c.dbgroup_id == self.pk) & group_node_table.c.dbnode_id.in_(node_ids))
+
     @abstractclassmethod
     def query(cls, name=None, type_string="", pk=None, uuid=None, nodes=None,
               user=None, node_attributes=None, past_days=None, **kwargs):
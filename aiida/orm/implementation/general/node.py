@@ -20,7 +20,7 @@ try:
 except ImportError:
     import pathlib2 as pathlib
 
-from aiida.backends.utils import validate_attribute_key
+from aiida.backends.utils import validate_attribute_key, validate_attribute_keys
 from aiida.common.caching import get_use_cache
 from aiida.common.exceptions import InternalError, ModificationNotAllowed, UniquenessError, ValidationError
 from aiida.common.folders import SandboxFolder
@@ -131,6 +131,10 @@ class AbstractNode(object):
     # Requires Sealable mixin, but needs empty tuple for base class
     _updatable_attributes = tuple()
 
+    # A tuple of attribute names whose value is mirrored in the column with the same name of the node table,
+    # such that they can be queried efficiently. The attributes remain the reference for their value.
+    _column_attributes = tuple()
+
     # A tuple of attribute names that will be ignored when creating the hash.
     _hash_ignored_attributes = tuple()
 
@@ -236,6 +240,24 @@ class AbstractNode(object):
                 "help_text": "Process type",
                 "is_foreign_key": False,
                 "type": "str"
+            },
+            "process_state": {
+                "display_name": "Process state",
+                "help_text": "Process state",
+                "is_foreign_key": False,
+                "type": "str"
+            },
+            "exit_status": {
+                "display_name": "Exit status",
+                "help_text": "Exit status",
+                "is_foreign_key": False,
+                "type": "int"
+            },
+            "scheduler_state": {
+                "display_name": "Scheduler state",
+                "help_text": "Scheduler state",
+                "is_foreign_key": False,
+                "type": "str"
             }
         }
 
@@ -921,7 +943,7 @@ class AbstractNode(object):
 
     def _set_attr(self, key, value, clean=True, stored_check=True):
         """
-        Set a new attribute to the Node (in the DbAttribute table).
+        Set a new attribute to the Node (in the JSONB attributes column of its DbNode).
 
         :param key: key name
         :param value: its value
@@ -945,9 +967,41 @@ class AbstractNode(object):
         else:
             self._set_db_attr(key, clean_value(value))
 
+    def _set_attrs(self, attributes, clean=True, stored_check=True, reset=False):
+        """
+        Set many attributes at once, see :py:meth:`_set_attr`.
+
+        All the keys are validated and all the values cleaned before any attribute
+        is changed, and the attributes of a stored node are written with a single
+        operation of the backend.
+
+        :param attributes: a dictionary with the attributes
+        :param clean: whether to clean values.
+            WARNING: when set to False, storing will throw errors
+            for any data types not recognized by the db backend
+        :param stored_check: when set to False will disable the mutability check
+        :param reset: if True, the attributes that are not in the dictionary are deleted
+        :raise ModificationNotAllowed: if node is already stored
+        :raise ValidationError: if one of the keys is not valid
+        """
+        if stored_check and self.is_stored:
+            raise ModificationNotAllowed('Cannot change the attributes of a stored node')
+
+        validate_attribute_keys(attributes)
+
+        if clean or not self._to_be_stored:
+            attributes = clean_value(attributes)
+
+        if self._to_be_stored:
+            if reset:
+                self._attrs_cache.clear()
+            self._attrs_cache.update(attributes)
+        else:
+            self._set_db_attrs(attributes, reset)
+
     def _append_to_attr(self, key, value, clean=True):
         """
-        Append value to an attribute of the Node (in the DbAttribute table).
+        Append value to an attribute of the Node (in the JSONB attributes column of its DbNode).
 
         :param key: key name of "list-type" attribute
             If attribute doesn't exist, it is created.
@@ -988,6 +1042,19 @@ class AbstractNode(object):
         """
         pass
 
+    @abstractmethod
+    def _set_db_attrs(self, attributes, reset=False):
+        """
+        Set many values directly in the DB, with a single operation, without
+        checking if it is stored, or using the cache.
+
+        DO NOT USE DIRECTLY.
+
+        :param attributes: a dictionary with the attributes
+        :param reset: if True, the attributes that are not in the dictionary are deleted
+        """
+        pass
+
     def _del_attr(self, key, stored_check=True):
         """
         Delete an attribute.
@@ -1005,7 +1072,7 @@ class AbstractNode(object):
                 del self._attrs_cache[key]
             except KeyError:
                 raise AttributeError(
-                    "DbAttribute {} does not exist".format(key))
+                    "Attribute {} does not exist".format(key))
         else:
             self._del_db_attr(key)
 
@@ -1048,7 +1115,7 @@ class AbstractNode(object):
                     return self._attrs_cache[key]
                 except KeyError:
                     raise AttributeError(
-                        "DbAttribute '{}' does not exist".format(key))
+                        "Attribute '{}' does not exist".format(key))
             else:
                 return self._get_db_attr(key)
         except AttributeError:
@@ -1180,7 +1247,7 @@ class AbstractNode(object):
 
         try:
             if not self.is_stored:
-                raise AttributeError("DbExtra '{}' does not exist yet, the "
+                raise AttributeError("Extra '{}' does not exist yet, the "
                                      "node is not stored".format(key))
             else:
                 return self._get_db_extra(key)
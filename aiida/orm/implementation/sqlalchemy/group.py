@@ -149,68 +149,37 @@ class Group(AbstractGroup):
         return self
 
     def add_nodes(self, nodes):
-        from sqlalchemy.exc import IntegrityError
-
         if not self.is_stored:
             raise ModificationNotAllowed("Cannot add nodes to a group before "
                                          "storing")
         from aiida.orm.implementation.sqlalchemy.node import Node
-        from aiida.backends.sqlalchemy import get_scoped_session
-
-        # First convert to a list
-        if isinstance(nodes, (Node, DbNode)):
-            nodes = [nodes]
-
-        if isinstance(nodes, basestring) or not isinstance(
-                nodes, collections.Iterable):
-            raise TypeError("Invalid type passed as the 'nodes' parameter to "
-                            "add_nodes, can only be a Node, DbNode, or a list "
-                            "of such objects, it is instead {}".format(
-                str(type(nodes))))
 
-        with utils.disable_expire_on_commit(get_scoped_session()) as session:
-            # Get dbnodes here ONCE, otherwise each call to _dbgroup.dbnodes will
-            # re-read the current value in the database
-            dbnodes = self._dbgroup.dbnodes
-            for node in nodes:
-                if not isinstance(node, (Node, DbNode)):
-                    raise TypeError("Invalid type of one of the elements passed "
-                                    "to add_nodes, it should be either a Node or "
-                                    "a DbNode, it is instead {}".format(
-                        str(type(node))))
-
-                if node.id is None:
-                    raise ValueError("At least one of the provided nodes is "
-                                     "unstored, stopping...")
-                if isinstance(node, Node):
-                    to_add = node.dbnode
-                else:
-                    to_add = node
-
-                # Use pattern as suggested here:
-                # http://docs.sqlalchemy.org/en/latest/orm/session_transaction.html#using-savepoint
-                try:
-                    with session.begin_nested():
-                        dbnodes.append(to_add)
-                        session.flush()
-                except IntegrityError:
-                    # Duplicate entry, skip
-                    pass
-
-            # Commit everything as up till now we've just flushed
-            session.commit()
+        self._execute_statements(self._get_add_nodes_statements(
+            nodes, (Node, DbNode), DbNode.__table__, table_groups_nodes))
+        self._notify_membership_change()
 
     @property
     def nodes(self):
         class iterator(object):
-            def __init__(self, dbnodes):
+            def __init__(self, dbnodes, batch_size):
                 self._dbnodes = dbnodes
-                self._iter = dbnodes.__iter__()
+                self._batch_size = batch_size
                 self.generator = self._genfunction()
 
             def _genfunction(self):
-                for n in self._iter:
-                    yield n.get_aiida_class()
+                # Load the nodes in batches, paginating on the id, such that
+                # the memory used does not depend on the size of the group
+                last_id = None
+                while True:
+                    batch = self._dbnodes.order_by(DbNode.id)
+                    if last_id is not None:
+                        batch = batch.filter(DbNode.id > last_id)
+                    batch = batch.limit(self._batch_size).all()
+                    for n in batch:
+                        yield n.get_aiida_class()
+                    if len(batch) < self._batch_size:
+                        break
+                    last_id = batch[-1].id
 
             def __iter__(self):
                 return self
@@ -225,48 +194,35 @@ class Group(AbstractGroup):
             def next(self):
                 return next(self.generator)
 
-        return iterator(self._dbgroup.dbnodes)
+        return iterator(self._dbgroup.dbnodes, self._NODES_BATCH_SIZE)
 
     def remove_nodes(self, nodes):
         if not self.is_stored:
             raise ModificationNotAllowed("Cannot remove nodes from a group "
                                          "before storing")
-
         from aiida.orm.implementation.sqlalchemy.node import Node
-        # First convert to a list
-        if isinstance(nodes, (Node, DbNode)):
-            nodes = [nodes]
-
-        if isinstance(nodes, basestring) or not isinstance(
-                nodes, collections.Iterable):
-            raise TypeError("Invalid type passed as the 'nodes' parameter to "
-                            "remove_nodes, can only be a Node, DbNode, or a "
-                            "list of such objects, it is instead {}".format(str(type(nodes))))
-
-        list_nodes = []
-        # Have to save dbndoes here ONCE, otherwise it will be reloaded from
-        # the database each time we access it through _dbgroup.dbnodes
-        dbnodes = self._dbgroup.dbnodes
-        for node in nodes:
-            if not isinstance(node, (Node, DbNode)):
-                raise TypeError("Invalid type of one of the elements passed "
-                                "to add_nodes, it should be either a Node or "
-                                "a DbNode, it is instead {}".format(
-                    str(type(node))))
-            if node.id is None:
-                raise ValueError("At least one of the provided nodes is "
-                                 "unstored, stopping...")
-            if isinstance(node, Node):
-                node = node.dbnode
-            # If we don't check first, SqlA might issue a DELETE statement for
-            # an unexisting key, resulting in an error
-            if node in dbnodes:
-                list_nodes.append(node)
-
-        for node in list_nodes:
-            dbnodes.remove(node)
-
-        sa.get_scoped_session().commit()
+
+        self._execute_statements(self._get_remove_nodes_statements(
+            nodes, (Node, DbNode), DbNode.__table__, table_groups_nodes))
+        self._notify_membership_change()
+
+    @staticmethod
+    def _execute_statements(statements):
+        """
+        Execute the given statements in a single transaction
+        """
+        from aiida.backends.sqlalchemy import get_scoped_session
+
+        with utils.disable_expire_on_commit(get_scoped_session()) as session:
+            try:
+                # Statements are not autoflushed: make the pending nodes visible to them
+                session.flush()
+                for statement in statements:
+                    session.execute(statement)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
 
     @classmethod
     def query(cls, name=None, type_string="", pk=None, uuid=None, nodes=None,
@@ -339,8 +295,10 @@ class Group(AbstractGroup):
         session = sa.get_scoped_session()
 
         if self.pk is not None:
+            pk = self.pk
             session.delete(self._dbgroup)
             session.commit()
+            self._notify_membership_change(pk)
 
             new_group = copy(self._dbgroup)
             make_transient(new_group)
@@ -348,6 +348,8 @@ class Node(AbstractNode):
         :param value: its value
         """
         try:
+            if key in self._column_attributes:
+                setattr(self._dbnode, key, value)
             self._dbnode.set_attr(key, value)
             self._increment_version_number_db()
         except:
@@ -356,8 +358,23 @@ class Node(AbstractNode):
             session.rollback()
             raise
 
+    def _set_db_attrs(self, attributes, reset=False):
+        try:
+            for key in self._column_attributes:
+                if reset or key in attributes:
+                    setattr(self._dbnode, key, attributes.get(key, None))
+            self._dbnode.set_attrs(attributes, reset=reset)
+            self._increment_version_number_db()
+        except:
+            from aiida.backends.sqlalchemy import get_scoped_session
+            session = get_scoped_session()
+            session.rollback()
+            raise
+
     def _del_db_attr(self, key):
         try:
+            if key in self._column_attributes:
+                setattr(self._dbnode, key, None)
             self._dbnode.del_attr(key)
             self._increment_version_number_db()
         except:
@@ -399,7 +416,7 @@ class Node(AbstractNode):
         try:
             return get_attr(self._extras(), key)
         except (KeyError, AttributeError):
-            raise AttributeError("DbExtra {} does not exist".format(key))
+            raise AttributeError("Extra {} does not exist".format(key))
 
     def _del_db_extra(self, key):
         try:
@@ -676,6 +693,8 @@ class Node(AbstractNode):
             # the version for each add.
             self._dbnode.attributes = self._attrs_cache
             flag_modified(self._dbnode, "attributes")
+            for key in self._column_attributes:
+                setattr(self._dbnode, key, self._attrs_cache.get(key, None))
             # This should not be used anymore: I delete it to
             # possibly free memory
             del self._attrs_cache
@@ -705,7 +724,8 @@ class Node(AbstractNode):
             self._get_temp_folder().replace_with_folder(self._repository_folder.abspath, move=True, overwrite=True)
             raise
 
-        self._dbnode.set_extra(_HASH_EXTRA_KEY, self.get_hash())
+        # Without transaction, the hash is committed together with the node by the caller
+        self._dbnode.set_extra(_HASH_EXTRA_KEY, self.get_hash(), commit=with_transaction)
         return self
 
     @property
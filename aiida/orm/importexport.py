@@ -273,6 +273,24 @@ def deserialize_attributes(attributes_data, conversion_data):
     return ret_data
 
 
+def get_column_attributes(node_type, attributes):
+    """
+    Return the values of the attributes of an imported node that are mirrored
+    in the columns of the node table (see Node._column_attributes).
+
+    :param node_type: the type string of the node
+    :param attributes: the attributes of the node
+    :return: a dictionary with the column names and their values
+    """
+    from aiida.orm.calculation.job import JobCalculation
+
+    if not node_type.startswith('calculation.'):
+        return {}
+
+    return {key: attributes.get(key, None)
+            for key in JobCalculation._column_attributes}
+
+
 def deserialize_field(k, v, fields_info, import_unique_ids_mappings,
                       foreign_ids_reverse_mappings):
     try:
@@ -616,6 +634,28 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
                         destdir.replace_with_folder(subfolder.abspath,
                                                     move=True, overwrite=True)
 
+                        # Set the attributes, that are stored together with the node
+                        import_entry_id = import_entry_ids[str(o.uuid)]
+                        try:
+                            attributes = data['node_attributes'][
+                                str(import_entry_id)]
+                            attributes_conversion = data[
+                                'node_attributes_conversion'][
+                                str(import_entry_id)]
+                        except KeyError:
+                            raise ValueError("Unable to find attribute info "
+                                             "for DbNode with UUID = {}".format(
+                                o.uuid))
+
+                        # Here I have to deserialize the attributes
+                        o.attributes = deserialize_attributes(
+                            attributes, attributes_conversion)
+
+                        # Fill the columns that mirror some of the attributes
+                        for k, v in get_column_attributes(
+                                o.type, attributes).iteritems():
+                            setattr(o, k, v)
+
                 # Store them all in once; however, the PK are not set in this way...
                 Model.objects.bulk_create(objects_to_create)
 
@@ -651,32 +691,6 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
                                                        import_entry_id,
                                                        new_pk)
 
-                # For DbNodes, we also have to store Attributes!
-                if model_name == NODE_ENTITY_NAME:
-                    if not silent:
-                        print "STORING NEW NODE ATTRIBUTES..."
-                    for unique_id, new_pk in just_saved.iteritems():
-                        import_entry_id = import_entry_ids[unique_id]
-                        # Get attributes from import file
-                        try:
-                            attributes = data['node_attributes'][
-                                str(import_entry_id)]
-                            attributes_conversion = data[
-                                'node_attributes_conversion'][
-                                str(import_entry_id)]
-                        except KeyError:
-                            raise ValueError("Unable to find attribute info "
-                                             "for DbNode with UUID = {}".format(
-                                unique_id))
-
-                        # Here I have to deserialize the attributes
-                        deserialized_attributes = deserialize_attributes(
-                            attributes, attributes_conversion)
-                        models.DbAttribute.reset_values_for_node(
-                            dbnode=new_pk,
-                            attributes=deserialized_attributes,
-                            with_transaction=False)
-
             if not silent:
                 print "STORING NODE LINKS..."
             ## TODO: check that we are not creating input links of an already
@@ -792,8 +806,7 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
 
                 # Add all the nodes to the new group
                 # TODO: decide if we want to return the group name
-                group.add_nodes(models.DbNode.objects.filter(
-                    pk__in=pks_for_group))
+                group.add_nodes(pks_for_group)
 
                 if not silent:
                     print "IMPORTED NODES GROUPED IN IMPORT GROUP NAMED '{}'".format(group.name)
@@ -1219,6 +1232,11 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                             for k, v in deserialized_attributes.items():
                                 o.attributes[k] = v
 
+                        # Fill the columns that mirror some of the attributes
+                        for k, v in get_column_attributes(
+                                o.type, deserialized_attributes).iteritems():
+                            setattr(o, k, v)
+
                 # Store them all in once; However, the PK
                 # are not set in this way...
                 if objects_to_create:
@@ -1349,10 +1367,7 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                 group = qb_group.first()[0]
                 nodes_ids_to_add = [dbnode_reverse_mappings[node_uuid]
                                     for node_uuid in groupnodes]
-                qb_nodes = QueryBuilder().append(
-                    Node, filters={'id': {'in': nodes_ids_to_add}})
-                nodes_to_add = [n[0] for n in qb_nodes.all()]
-                group.add_nodes(nodes_to_add)
+                group.add_nodes(nodes_ids_to_add)
 
             ######################################################
             # Put everything in a specific group
@@ -1391,9 +1406,9 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
 
                 # Add all the nodes to the new group
                 # TODO: decide if we want to return the group name
-                from aiida.backends.sqlalchemy.models.node import DbNode
-                group.add_nodes(session.query(DbNode).filter(
-                    DbNode.id.in_(pks_for_group)).distinct().all())
+                # Flush, such that the group gets its pk
+                session.flush()
+                group.add_nodes(pks_for_group)
 
                 # group.add_nodes(models.DbNode.objects.filter(
                 #     pk__in=pks_for_group))
@@ -1802,7 +1817,7 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
             fill_in_query(partial_query, entity_name, ref_model_name,
                           [entity_name], entity_separator)
 
-        for temp_d in partial_query.iterdict():
+        for temp_d in partial_query.iterdict(stream=True):
             for k in temp_d.keys():
                 # Get current entity
                 current_entity = k.split(entity_separator)[-1]
@@ -1853,7 +1868,7 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
         all_nodes_query = QueryBuilder()
         all_nodes_query.append(Node, filters={"id": {"in": all_nodes_pk}},
                                project=["*"])
-        for res in all_nodes_query.iterall():
+        for res in all_nodes_query.iterall(stream=True):
             n = res[0]
             (node_attributes[str(n.pk)],
              node_attributes_conversion[str(n.pk)]) = serialize_dict(
@@ -1875,7 +1890,7 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
                         edge_filters={'type': {'in': (LinkType.CREATE.value, LinkType.INPUT.value)}},
                         edge_project=['label', 'type'], output_of='input')
 
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
+        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall(stream=True):
             links_uuid.append({
                 'input': str(input_uuid),
                 'output': str(output_uuid),
@@ -1895,7 +1910,7 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
                                  project=['uuid'], tag='group')
             group_uuid_qb.append(entity_names_to_entities[NODE_ENTITY_NAME],
                                  project=['uuid'], member_of='group')
-            for res in group_uuid_qb.iterall():
+            for res in group_uuid_qb.iterall(stream=True):
                 if groups_uuid.has_key(str(res[0])):
                     groups_uuid[str(res[0])].append(str(res[1]))
                 else:
@@ -188,6 +188,27 @@ class Sealable(object):
 
         super(Sealable, self)._set_attr(key, value, stored_check=False, **kwargs)
 
+    @override
+    def _set_attrs(self, attributes, **kwargs):
+        """
+        Set many attributes at once
+
+        :param attributes: a dictionary with the attributes
+        :raise ModificationNotAllowed: if the node is already sealed or if the node is already stored
+            and one of the attributes that are set (or deleted, with reset) is not updatable
+        """
+        if self.is_sealed:
+            raise ModificationNotAllowed('Cannot change the attributes of a sealed node')
+
+        if self.is_stored:
+            keys = set(attributes)
+            if kwargs.get('reset', False):
+                keys.update(self.attrs())
+            if any(key not in self._updatable_attributes for key in keys):
+                raise ModificationNotAllowed('Cannot change the immutable attributes of a stored node')
+
+        super(Sealable, self)._set_attrs(attributes, stored_check=False, **kwargs)
+
     @override
     def _del_attr(self, key):
         """
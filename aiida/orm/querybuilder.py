@@ -38,6 +38,66 @@ from aiida.common.exceptions import InputValidationError, ConfigurationError
 from aiida.backends.utils import _get_column
 from aiida.common.links import LinkType
 
+# The cache of compiled SQL statements, shared by all QueryBuilder instances
+# of this process. Created on first use, see get_compiled_query_cache
+_COMPILED_QUERY_CACHE = None
+
+
+def get_compiled_query_cache():
+    """
+    Return the LRU cache in which the QueryBuilder stores the SQL statements it compiled,
+    keyed on the shape of the queryhelp (see :meth:`QueryBuilder.get_query_shape`).
+    Its size is set by the ``querybuilder.compiled_cache_size`` property.
+
+    :returns: an instance of :class:`aiida.common.utils.LRUCache`
+    """
+    global _COMPILED_QUERY_CACHE
+    if _COMPILED_QUERY_CACHE is None:
+        from aiida.common.setup import get_property
+        from aiida.common.utils import LRUCache
+        _COMPILED_QUERY_CACHE = LRUCache(maxsize=get_property('querybuilder.compiled_cache_size'))
+    return _COMPILED_QUERY_CACHE
+
+
+def _get_bindparams(statement):
+    """
+    :returns: the bound parameters of a statement, without duplicates and in the
+        (deterministic) order in which the statement is traversed
+    """
+    from sqlalchemy.sql import visitors
+    from sqlalchemy.sql.elements import BindParameter
+
+    seen = set()
+    bindparams = []
+    for element in visitors.iterate(statement, {}):
+        if isinstance(element, BindParameter) and id(element) not in seen:
+            seen.add(id(element))
+            bindparams.append(element)
+    return bindparams
+
+
+class _CompiledQuery(object):
+    """
+    Executes a SQL statement that was compiled for an earlier query of the same shape,
+    with the parameter values of the current query.
+    Provides the part of the interface of *sqlalchemy.orm.Query* that the backend
+    implementations use to fetch the rows.
+    """
+
+    def __init__(self, session, compiled, params):
+        self._session = session
+        self._compiled = compiled
+        self._params = params
+
+    def yield_per(self, batch_size):
+        """
+        Execute the statement and return the rows.
+
+        :param int batch_size: ignored, kept for compatibility with *sqlalchemy.orm.Query*
+        """
+        self._session._autoflush()
+        return self._session.connection().execute(self._compiled, self._params)
+
 
 
 def get_querybuilder_classifiers_from_cls(cls, obj):
@@ -146,6 +206,63 @@ def get_querybuilder_classifiers_from_type(ormclasstype, obj):
 
 
 
+class _StreamedQuery(object):
+    """
+    Streams the rows of a query with a named (server-side) cursor, so that the memory used
+    does not grow with the number of rows. The cursor lives on a separate connection, in a
+    read-only transaction that sees a snapshot of the database, so that commits done in the
+    meantime by the session of this process neither close the cursor nor change the results.
+    Changes that are not committed yet are therefore not seen.
+
+    ORM instances are merged into the session of the query, without loading them again.
+    Provides the part of the interface of *sqlalchemy.orm.Query* that the backend
+    implementations use to fetch the rows.
+    """
+
+    def __init__(self, query):
+        self._query = query
+
+    def yield_per(self, batch_size):
+        """
+        :param int batch_size: the number of rows fetched from the server at a time
+        :returns: a generator over the rows
+        """
+        return self._iter_rows(batch_size or 100)
+
+    def _iter_rows(self, batch_size):
+        from sqlalchemy import inspect as sa_inspect
+        from sqlalchemy.orm import Session
+
+        session = self._query.session
+        connection = session.get_bind().connect()
+        try:
+            is_postgres = connection.dialect.name == 'postgresql'
+            if is_postgres:
+                connection = connection.execution_options(isolation_level='REPEATABLE READ')
+            transaction = connection.begin()
+            if is_postgres:
+                connection.execute('SET TRANSACTION READ ONLY')
+            stream_session = Session(bind=connection, autoflush=False)
+            query = self._query.with_session(stream_session).execution_options(
+                stream_results=True).yield_per(batch_size)
+
+            def merge(item):
+                if sa_inspect(item, raiseerr=False) is None:
+                    return item
+                merged = session.merge(item, load=False)
+                stream_session.expunge(item)
+                return merged
+
+            for row in query:
+                if isinstance(row, tuple):
+                    yield tuple(merge(item) for item in row)
+                else:
+                    yield merge(row)
+            transaction.rollback()
+        finally:
+            connection.close()
+
+
 class QueryBuilder(object):
     """
     The class to query the AiiDA database. 
@@ -1237,7 +1354,9 @@ class QueryBuilder(object):
         :returns: an instance of *sqlalchemy.sql.elements.BinaryExpression*.
         """
         expressions = []
-        for path_spec, filter_operation_dict in filter_spec.items():
+        # Sorting makes the order of the expressions, and hence of the bound parameters,
+        # independent of the insertion order of the filters (see _get_compiled_query)
+        for path_spec, filter_operation_dict in sorted(filter_spec.items()):
             if path_spec in ('and', 'or', '~or', '~and', '!and', '!or'):
                 subexpressions = [
                     self._build_filters(alias, sub_filter_spec)
@@ -1279,7 +1398,7 @@ class QueryBuilder(object):
                         )
                     )
                     for operator, value
-                    in filter_operation_dict.items()
+                    in sorted(filter_operation_dict.items())
                 ]
         return and_(*expressions)
 
@@ -1816,6 +1935,119 @@ class QueryBuilder(object):
 
         # ~ return
 
+    @classmethod
+    def _get_filter_shape(cls, filter_spec):
+        """
+        Recursively replaces the values of a filter specification by the names of their types.
+        """
+        if isinstance(filter_spec, dict):
+            return {key: cls._get_filter_shape(val) for key, val in filter_spec.items()}
+        elif isinstance(filter_spec, (list, tuple)):
+            return [cls._get_filter_shape(val) for val in filter_spec]
+        return type(filter_spec).__name__
+
+    def get_query_shape(self):
+        """
+        Returns the queryhelp (see :meth:`.get_json_compatible_queryhelp`), where the values
+        in the filters are replaced by the names of their types.
+        Two queries with the same shape result in the same SQL statement,
+        with different values for the bound parameters, e.g.::
+
+            qb1 = QueryBuilder().append(Node, filters={'id': 1}, project='uuid')
+            qb2 = QueryBuilder().append(Node, filters={'id': 2}, project='uuid')
+            qb1.get_query_shape() == qb2.get_query_shape()  # True
+
+        :returns: the queryhelp with the filter values replaced by their type names
+        """
+        queryhelp = self.get_json_compatible_queryhelp()
+        queryhelp['filters'] = self._get_filter_shape(queryhelp['filters'])
+        return queryhelp
+
+    def _get_compiled_query(self, query):
+        """
+        Reuses the SQL statement compiled for an earlier query of the same shape, if there is one in the
+        cache returned by :func:`get_compiled_query_cache`, otherwise compiles the statement and caches it.
+        Only queries that project columns or attributes are executed like this: ORM instances
+        are created by SQLAlchemy from its own compilation of the statement.
+
+        :param query: the instance of sqlalchemy.orm.Query returned by :meth:`.get_query`
+
+        :returns: an object to pass to the backend implementation in place of **query**,
+            or **query** itself if it cannot be executed with a cached statement.
+        """
+        from aiida.common.hashing import make_hash
+
+        cache = get_compiled_query_cache()
+        if (
+                cache.maxsize <= 0 or
+                self._injected or
+                query is not getattr(self, '_cacheable_query', None) or
+                query._params or
+                '*' in self._attrkeys_as_in_sql_result.values()
+        ):
+            return query
+
+        if self._query_shape_hash is None:
+            self._query_shape_hash = make_hash(self.get_query_shape())
+
+        statement = query.statement
+        bindparams = _get_bindparams(statement)
+        signature = tuple((getattr(bp, '_orig_key', None), type(bp.type)) for bp in bindparams)
+        dialect = query.session.connection().dialect
+        cache_key = (dialect.name, self._query_shape_hash)
+
+        cached = cache.get(cache_key)
+        if cached is None:
+            compiled = statement.compile(dialect=dialect)
+            names = [compiled.bind_names.get(bp) for bp in bindparams]
+            # Parameters that are compiled but not traversed can only be the limit and the offset,
+            # which are part of the shape. Everything else makes this shape impossible to cache.
+            known_ids = set(id(bp) for bp in bindparams)
+            known_ids.update(id(getattr(statement, attr, None)) for attr in ('_limit_clause', '_offset_clause'))
+            if None in names or any(id(bp) not in known_ids for bp in compiled.bind_names):
+                cached = (None, None, None)
+            else:
+                cached = (compiled, names, signature)
+            cache[cache_key] = cached
+
+        compiled, names, cached_signature = cached
+        if compiled is None or cached_signature != signature:
+            return query
+
+        params = {name: bp.effective_value for name, bp in zip(names, bindparams)}
+        # The same query, with the same values, is then executed without being built again
+        cache[(dialect.name, 'queryhelp', self._hash)] = (
+            compiled, params, self._attrkeys_as_in_sql_result, self.tag_to_projected_entity_dict)
+        return _CompiledQuery(query.session, compiled, params)
+
+    def _get_compiled_query_by_queryhelp(self):
+        """
+        Reuses the SQL statement and the parameters cached by :meth:`._get_compiled_query` for an earlier query with
+        the same queryhelp, filter values included, such that the query is neither built nor traversed again.
+
+        :returns: an object to pass to the backend implementation to fetch the rows, or None if there is none
+            in the cache
+        """
+        from aiida.common.hashing import make_hash
+
+        cache = get_compiled_query_cache()
+        # A query that was modified after it was built (e.g. by distinct) is not described by its queryhelp
+        if (
+                cache.maxsize <= 0 or
+                self._injected or
+                getattr(self, '_query', None) is not getattr(self, '_cacheable_query', None)
+        ):
+            return None
+
+        session = self._impl.get_session()
+        cache_key = (session.connection().dialect.name, 'queryhelp', make_hash(self.get_json_compatible_queryhelp()))
+        cached = cache.get(cache_key)
+        if cached is None:
+            return None
+
+        compiled, params, self._attrkeys_as_in_sql_result, self.tag_to_projected_entity_dict = cached
+        return _CompiledQuery(session, compiled, params)
+
     def _build_order(self, alias, entitytag, entityspec):
 
         column_name = entitytag.split('.')[0]
@@ -1894,7 +2126,7 @@ class QueryBuilder(object):
 
         ######################### FILTERS ##############################
 
-        for tag, filter_specs in self._filters.items():
+        for tag, filter_specs in sorted(self._filters.items()):
             try:
                 alias = self._tag_to_alias_map[tag]
             except KeyError:
@@ -1980,6 +2212,11 @@ class QueryBuilder(object):
                 "\nYou are projecting the same key\n"
                 "multiple times within the same node"
             )
+
+        # Only the query built here can be executed with a cached statement,
+        # not one that was modified afterwards (e.g. by distinct):
+        self._cacheable_query = self._query
+        self._query_shape_hash = None
         ######################### DONE #################################
 
         return self._query
@@ -2205,6 +2442,21 @@ class QueryBuilder(object):
             raise NotExistent("No result was found")
         return res[0]
 
+    def _get_executable_query(self, stream=False):
+        """
+        :param bool stream: whether the rows should be streamed from a server-side cursor
+        :returns: the object to pass to the backend implementation to fetch the rows
+        """
+        if not stream:
+            compiled_query = self._get_compiled_query_by_queryhelp()
+            if compiled_query is not None:
+                return compiled_query
+
+        query = self.get_query()
+        if stream:
+            return _StreamedQuery(query)
+        return self._get_compiled_query(query)
+
     def count(self):
         """
         Counts the number of rows returned by the backend.
@@ -2214,43 +2466,49 @@ class QueryBuilder(object):
         query = self.get_query()
         return self._impl.count(query)
 
-    def iterall(self, batch_size=100):
+    def iterall(self, batch_size=100, stream=False):
         """
         Same as :meth:`.all`, but returns a generator.
-        Be aware that this is only safe if no commit will take place during this
-        transaction. You might also want to read the SQLAlchemy documentation on
+        Be aware that, unless **stream** is True, this is only safe if no commit will take place
+        during this transaction. You might also want to read the SQLAlchemy documentation on
         http://docs.sqlalchemy.org/en/latest/orm/query.html#sqlalchemy.orm.query.Query.yield_per
 
 
         :param int batch_size:
             The size of the batches to ask the backend to batch results in subcollections.
             You can optimize the speed of the query by tuning this parameter.
+        :param bool stream:
+            If True, the rows are streamed from a server-side cursor on a separate connection,
+            which uses constant memory and is not affected by commits during the iteration.
+            Changes that were not committed before the iteration started are not seen.
 
         :returns: a generator of lists
         """
 
-        query = self.get_query()
+        query = self._get_executable_query(stream)
 
         for item in self._impl.iterall(query, batch_size, self._attrkeys_as_in_sql_result):
             yield item
         return
 
-    def iterdict(self, batch_size=100):
+    def iterdict(self, batch_size=100, stream=False):
         """
         Same as :meth:`.dict`, but returns a generator.
-        Be aware that this is only safe if no commit will take place during this
-        transaction. You might also want to read the SQLAlchemy documentation on
+        Be aware that, unless **stream** is True, this is only safe if no commit will take place
+        during this transaction. You might also want to read the SQLAlchemy documentation on
         http://docs.sqlalchemy.org/en/latest/orm/query.html#sqlalchemy.orm.query.Query.yield_per
 
 
         :param int batch_size:
             The size of the batches to ask the backend to batch results in subcollections.
             You can optimize the speed of the query by tuning this parameter.
+        :param bool stream:
+            If True, stream the rows from a server-side cursor, see :meth:`.iterall`.
 
         :returns: a generator of dictionaries
         """
 
-        query = self.get_query()
+        query = self._get_executable_query(stream)
         for item in self._impl.iterdict(query, batch_size, self.tag_to_projected_entity_dict):
             yield item
 
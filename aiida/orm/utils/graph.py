@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+In-memory snapshot of the provenance graph, to traverse it without querying the database for every node.
+
+The links are loaded with a single streaming query and stored in compressed sparse row (CSR) arrays: for every node,
+the positions of its outgoing (and incoming) links in an array of neighbour indices, with a parallel array of link
+type codes. Node pks are stored as 32 bit integers and link types as 8 bit codes, such that the link table of a
+whole database fits in memory. Breadth-first searches, ancestor and descendant closures, shortest paths and
+connected components are then computed level by level with numpy, without any further query.
+
+The snapshot is not updated when nodes or links are added to the database: simply build a new one.
+"""
+import array
+
+import numpy as np
+
+from aiida.common.links import LinkType
+
+__all__ = ['ProvenanceGraph', 'get_nodes', 'INCOMING', 'OUTGOING', 'BOTH']
+
+# The directions in which links can be followed
+INCOMING = 'incoming'
+OUTGOING = 'outgoing'
+BOTH = 'both'
+DIRECTIONS = (INCOMING, OUTGOING, BOTH)
+
+# The link types, in the order of the codes used to store them
+LINK_TYPES = tuple(LinkType)
+_LINK_TYPE_CODES = {link_type: code for code, link_type in enumerate(LINK_TYPES)}
+_LINK_TYPE_CODES.update({link_type.value: code for code, link_type in enumerate(LINK_TYPES)})
+
+
+def _get_link_type_code(link_type):
+    """
+    Return the code of a link type
+
+    :param link_type: a member of :class:`aiida.common.links.LinkType` or its value
+    :raises ValueError: if the link type is not valid
+    """
+    try:
+        return _LINK_TYPE_CODES[link_type]
+    except (KeyError, TypeError):
+        raise ValueError('invalid link type {}'.format(link_type))
+
+
+def _to_array(buffer_array, dtype):
+    """
+    Convert an :class:`array.array` to a numpy array without going through python objects
+    """
+    if not buffer_array:
+        return np.empty(0, dtype=dtype)
+    return np.frombuffer(buffer_array, dtype=dtype)
+
+
+def _build_csr(rows, columns, values, size):
+    """
+    Sort the (row, column, value) triplets by row and return the CSR arrays
+
+    :return: tuple with the row pointers, the columns and the values
+    """
+    order = np.argsort(rows, kind='mergesort')
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+    return indptr, columns[order], values[order]
+
+
+def get_nodes(pks, batch_size=10000):
+    """
+    Load the nodes with the given pks, with one query per batch of pks
+
+    :param pks: an iterable of node pks
+    :param batch_size: the number of pks to query for at once
+    :return: a dictionary mapping the pks to the nodes
+    """
+    from aiida.common.utils import grouper
+    from aiida.orm.node import Node
+    from aiida.orm.querybuilder import QueryBuilder
+
+    nodes = {}
+    for batch in grouper(batch_size, set(int(pk) for pk in pks)):
+        query = QueryBuilder().append(Node, filters={'id': {'in': list(batch)}})
+        for node, in query.iterall():
+            nodes[node.pk] = node
+    return nodes
+
+
+class ProvenanceGraph(object):
+    """
+    An immutable snapshot of the links between nodes, supporting fast traversals.
+
+    The traversal methods accept and return node pks; those returning several nodes return sorted numpy arrays.
+    Link types can be restricted with the ``link_types`` arguments, a list of members of
+    :class:`aiida.common.links.LinkType` (or of their values).
+    """
+
+    def __init__(self, inputs, outputs, link_types, pks=None):
+        """
+        Build the snapshot from the arrays describing the links
+
+        :param inputs: the pks of the input node of every link
+        :param outputs: the pks of the output node of every link
+        :param link_types: the code of the type of every link, its index in ``LINK_TYPES``
+        :param pks: the pks of additional nodes to include in the graph, even if they have no links
+        """
+        inputs = np.asarray(inputs, dtype=np.int32)
+        outputs = np.asarray(outputs, dtype=np.int32)
+        link_types = np.asarray(link_types, dtype=np.int8)
+
+        if not inputs.shape == outputs.shape == link_types.shape:
+            raise ValueError('the inputs, outputs and link types should have the same length')
+
+        all_pks = [inputs, outputs]
+        if pks is not None:
+            all_pks.append(np.fromiter(pks, dtype=np.int32))
+
+        self._pks = np.unique(np.concatenate(all_pks))
+        sources = np.searchsorted(self._pks, inputs)
+        targets = np.searchsorted(self._pks, outputs)
+
+        self._csr = {
+            OUTGOING: _build_csr(sources, targets.astype(np.int32), link_types, len(self._pks)),
+            INCOMING: _build_csr(targets, sources.astype(np.int32), link_types, len(self._pks)),
+        }
+
+    @classmethod
+    def from_links(cls, links, pks=None):
+        """
+        Build the snapshot from an iterable of links
+
+        :param links: an iterable of tuples (input pk, output pk, link type), where the link type is a member of
+            :class:`aiida.common.links.LinkType` or its value
+        :param pks: the pks of additional nodes to include in the graph, even if they have no links
+        :return: a :class:`ProvenanceGraph`
+        """
+        inputs = array.array('i')
+        outputs = array.array('i')
+        link_types = array.array('b')
+
+        for input_pk, output_pk, link_type in links:
+            inputs.append(input_pk)
+            outputs.append(output_pk)
+            link_types.append(_get_link_type_code(link_type))
+
+        return cls(_to_array(inputs, np.int32), _to_array(outputs, np.int32), _to_array(link_types, np.int8), pks)
+
+    @classmethod
+    def from_database(cls, link_types=None, pks=None, batch_size=10000):
+        """
+        Load the links from the database, with a single query whose results are streamed
+
+        :param link_types: only load the links of these types, by default all of them
+        :param pks: only load the links between these nodes, i.e. the subgraph they induce. By default the links
+            between all nodes are loaded.
+        :param batch_size: the number of links fetched from the database at once
+        :return: a :class:`ProvenanceGraph`
+        """
+        from aiida.orm.node import Node
+        from aiida.orm.querybuilder import QueryBuilder
+
+        if pks is not None:
+            pks = [int(pk) for pk in pks]
+
+        edge_filters = {}
+        if link_types is not None:
+            edge_filters['type'] = {'in': [LINK_TYPES[_get_link_type_code(link_type)].value
+                                           for link_type in link_types]}
+
+        query = QueryBuilder()
+        query.append(Node, tag='input', project='id', filters=cls._get_pk_filters(pks))
+        query.append(Node, output_of='input', project='id', filters=cls._get_pk_filters(pks),
+                     edge_filters=edge_filters, edge_project='type')
+
+        return cls.from_links(query.iterall(batch_size=batch_size, stream=True), pks)
+
+    @staticmethod
+    def _get_pk_filters(pks):
+        if pks is None:
+            return {}
+        return {'id': {'in': pks}}
+
+    def __len__(self):
+        return len(self._pks)
+
+    def __contains__(self, pk):
+        index = np.searchsorted(self._pks, pk)
+        return index < len(self._pks) and self._pks[index] == pk
+
+    @property
+    def pks(self):
+        """
+        The sorted array of the pks of the nodes in the graph
+        """
+        return self._pks
+
+    @property
+    def number_of_links(self):
+        """
+        The number of links in the graph
+        """
+        return len(self._csr[OUTGOING][1])
+
+    @property
+    def nbytes(self):
+        """
+        The memory used by the arrays of the snapshot, in bytes
+        """
+        return self._pks.nbytes + sum(values.nbytes for csr in self._csr.values() for values in csr)
+
+    def inputs(self, pk, link_types=None):
+        """
+        Return the pks of the inputs of a node, once per link, sorted
+
+        :param pk: the pk of the node
+        :param link_types: only follow the links of these types
+        :return: numpy array of pks
+        """
+        return self._get_neighbour_pks(pk, INCOMING, link_types)
+
+    def outputs(self, pk, link_types=None):
+        """
+        Return the pks of the outputs of a node, once per link, sorted
+
+        :param pk: the pk of the node
+        :param link_types: only follow the links of these types
+        :return: numpy array of pks
+        """
+        return self._get_neighbour_pks(pk, OUTGOING, link_types)
+
+    def bfs(self, pks, direction=OUTGOING, link_types=None, max_depth=None):
+        """
+        Breadth-first search from the given nodes
+
+        :param pks: the pks of the nodes to start from
+        :param direction: follow the links from input to output (OUTGOING), the other way round (INCOMING) or both
+        :param link_types: only follow the links of these types
+        :param max_depth: the maximum number of links to follow, by default until no new node is found
+        :return: a list of arrays of pks, where the i-th array contains the nodes at distance i from the given nodes.
+            The first array therefore contains the given nodes.
+        """
+        type_codes = self._get_type_codes(link_types)
+        frontier = np.unique(self._get_indices(pks))
+        visited = np.zeros(len(self._pks), dtype=bool)
+        visited[frontier] = True
+        levels = [frontier]
+
+        while frontier.size and (max_depth is None or len(levels) <= max_depth):
+            _, neighbours = self._get_links(frontier, direction, type_codes)
+            neighbours = np.unique(neighbours)
+            frontier = neighbours[~visited[neighbours]]
+            if not frontier.size:
+                break
+            visited[frontier] = True
+            levels.append(frontier)
+
+        return [self._pks[level] for level in levels]
+
+    def descendants(self, pks, link_types=None, max_depth=None):
+        """
+        Return the nodes that can be reached from the given ones following links from input to output
+
+        :param pks: the pks of the nodes to start from
+        :param link_types: only follow the links of these types
+        :param max_depth: the maximum number of links to follow, by default the whole closure is returned
+        :return: sorted numpy array of pks, which does not contain the given nodes
+        """
+        return self._get_closure(pks, OUTGOING, link_types, max_depth)
+
+    def ancestors(self, pks, link_types=None, max_depth=None):
+        """
+        Return the nodes from which the given ones can be reached following links from input to output
+
+        :param pks: the pks of the nodes to start from
+        :param link_types: only follow the links of these types
+        :param max_depth: the maximum number of links to follow, by default the whole closure is returned
+        :return: sorted numpy array of pks, which does not contain the given nodes
+        """
+        return self._get_closure(pks, INCOMING, link_types, max_depth)
+
+    def shortest_path(self, source, target, direction=OUTGOING, link_types=None):
+        """
+        Return a shortest path between two nodes
+
+        :param source: the pk of the node to start from
+        :param target: the pk of the node to reach
+        :param direction: follow the links from input to output (OUTGOING), the other way round (INCOMING) or both
+        :param link_types: only follow the links of these types
+        :return: the list of the pks of the nodes along the path, from source to target, or None if there is no path
+        """
+        type_codes = self._get_type_codes(link_types)
+        start, goal = self._get_indices([source, target])
+
+        parents = np.full(len(self._pks), -1, dtype=np.int64)
+        visited = np.zeros(len(self._pks), dtype=bool)
+        visited[start] = True
+        frontier = np.array([start])
+
+        while frontier.size and not visited[goal]:
+            origins, neighbours = self._get_links(frontier, direction, type_codes)
+            new = ~visited[neighbours]
+            frontier, first = np.unique(neighbours[new], return_index=True)
+            parents[frontier] = origins[new][first]
+            visited[frontier] = True
+
+        if not visited[goal]:
+            return None
+
+        path = [goal]
+        while path[-1] != start:
+            path.append(parents[path[-1]])
+
+        return [int(self._pks[index]) for index in reversed(path)]
+
+    def connected_components(self, link_types=None):
+        """
+        Return the connected components of the graph, ignoring the direction of the links
+
+        :param link_types: only consider the links of these types
+        :return: a list of sorted numpy arrays of pks, one per component, from the largest to the smallest component
+        """
+        indptr, indices, types = self._csr[OUTGOING]
+        sources = np.repeat(np.arange(len(self._pks)), np.diff(indptr))
+        targets = indices
+        type_codes = self._get_type_codes(link_types)
+        if type_codes is not None:
+            mask = np.in1d(types, type_codes)
+            sources, targets = sources[mask], targets[mask]
+
+        # Hook every node to the smallest root among its neighbours and compress the trees, until nothing changes
+        labels = np.arange(len(self._pks))
+        while True:
+            source_labels = labels[sources]
+            target_labels = labels[targets]
+            lower = np.minimum(source_labels, target_labels)
+            hooked = labels.copy()
+            np.minimum.at(hooked, source_labels, lower)
+            np.minimum.at(hooked, target_labels, lower)
+            while True:
+                compressed = hooked[hooked]
+                if np.array_equal(compressed, hooked):
+                    break
+                hooked = compressed
+            if np.array_equal(hooked, labels):
+                break
+            labels = hooked
+
+        order = np.argsort(labels, kind='mergesort')
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        components = [self._pks[component] for component in np.split(order, boundaries) if component.size]
+        components.sort(key=len, reverse=True)
+        return components
+
+    def component(self, pk, link_types=None):
+        """
+        Return the connected component of a node, ignoring the direction of the links
+
+        :param pk: the pk of the node
+        :param link_types: only consider the links of these types
+        :return: sorted numpy array of pks, including the given one
+        """
+        return np.sort(np.concatenate(self.bfs([pk], BOTH, link_types)))
+
+    def _get_indices(self, pks):
+        """
+        Return the indices of the given pks in the arrays of the snapshot
+
+        :raises ValueError: if one of the pks is not in the graph
+        """
+        pks = np.asarray(pks, dtype=np.int64).ravel()
+        indices = np.searchsorted(self._pks, pks)
+        if not len(self._pks):
+            missing = np.ones(len(pks), dtype=bool)
+        else:
+            missing = (indices >= len(self._pks)) | (self._pks[np.minimum(indices, len(self._pks) - 1)] != pks)
+        if missing.any():
+            raise ValueError('nodes {} are not in the graph'.format(pks[missing].tolist()))
+        return indices
+
+    @staticmethod
+    def _get_type_codes(link_types):
+        if link_types is None:
+            return None
+        return np.array([_get_link_type_code(link_type) for link_type in link_types], dtype=np.int8)
+
+    def _get_links(self, indices, direction, type_codes=None):
+        """
+        Return the links of the given nodes
+
+        :param indices: array of node indices
+        :param direction: one of INCOMING, OUTGOING or BOTH
+        :param type_codes: only return the links with these type codes
+        :return: tuple of arrays, with the indices of the given node and of its neighbour for every link
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError('invalid direction {}, should be one of {}'.format(direction, DIRECTIONS))
+
+        if direction == BOTH:
+            origins_in, neighbours_in = self._get_links(indices, INCOMING, type_codes)
+            origins_out, neighbours_out = self._get_links(indices, OUTGOING, type_codes)
+            return np.concatenate([origins_in, origins_out]), np.concatenate([neighbours_in, neighbours_out])
+
+        indptr, columns, types = self._csr[direction]
+        starts = indptr[indices]
+        lengths = indptr[indices + 1] - starts
+        ends = np.cumsum(lengths)
+
+        # The positions of the links of all the nodes, i.e. the concatenation of the ranges start:start + length
+        positions = np.arange(ends[-1] if ends.size else 0) + np.repeat(starts - ends + lengths, lengths)
+        origins = np.repeat(indices, lengths)
+        neighbours = columns[positions]
+
+        if type_codes is not None:
+            mask = np.in1d(types[positions], type_codes)
+            origins, neighbours = origins[mask], neighbours[mask]
+
+        return origins, neighbours
+
+    def _get_neighbour_pks(self, pk, direction, link_types):
+        _, neighbours = self._get_links(self._get_indices([pk]), direction, self._get_type_codes(link_types))
+        return np.sort(self._pks[neighbours])
+
+    def _get_closure(self, pks, direction, link_types, max_depth):
+        levels = self.bfs(pks, direction, link_types, max_depth)
+        return np.sort(np.concatenate(levels[1:])) if len(levels) > 1 else np.empty(0, dtype=np.int32)
@@ -28,6 +28,71 @@ def clean_remote(transport, path):
         pass
 
 
+def clean_remote_many(transport, paths, chunk_size=1000, callback=None):
+    """
+    Recursively remove many remote folders, with the given absolute paths, and all their contents. The paths are
+    removed in chunks with Transport.rmtree_many, which for remote transports needs only a few commands per chunk.
+    The transport channel should already be open.
+
+    :param transport: an open Transport channel
+    :param paths: a list of absolute paths on the remote made available through the transport
+    :param chunk_size: the number of paths removed at a time
+    :param callback: a callable that is called after each chunk with the list of paths of that chunk that were
+        removed; the paths that could not be removed are left out
+    :return: the list of paths that were removed
+    """
+    from aiida.common.utils import grouper
+
+    for path in paths:
+        if not isinstance(path, basestring):
+            raise ValueError('the path has to be a string type')
+
+        if not os.path.isabs(path):
+            raise ValueError('the path should be absolute')
+
+    if not transport.is_open:
+        raise ValueError('the transport should already be open')
+
+    cleaned = []
+
+    for chunk in grouper(chunk_size, paths):
+        failed = set(transport.rmtree_many(list(chunk)))
+        removed = [path for path in chunk if path not in failed]
+        cleaned.extend(removed)
+        if callback is not None:
+            callback(removed)
+
+    return cleaned
+
+
+def mark_remote_folders_cleaned(computer, paths, chunk_size=500):
+    """
+    Set the cleaned extra, in bulk, on all the RemoteData nodes of the given computer pointing to one of the paths.
+
+    :param computer: the computer on which the paths were cleaned
+    :param paths: a list of absolute remote paths that were cleaned
+    :param chunk_size: the number of paths looked up with a single query
+    :return: the number of RemoteData nodes that were marked
+    """
+    from aiida.backends.utils import set_extra_for_nodes
+    from aiida.common.utils import grouper
+    from aiida.orm.computer import Computer as OrmComputer
+    from aiida.orm.data.remote import RemoteData
+    from aiida.orm.querybuilder import QueryBuilder
+
+    count = 0
+
+    for chunk in grouper(chunk_size, paths):
+        qb = QueryBuilder()
+        qb.append(RemoteData, tag='remote', project=['id'], filters={'attributes.remote_path': {'in': list(chunk)}})
+        qb.append(OrmComputer, computer_of='remote', filters={'id': computer.pk})
+        pks = [pk for pk, in qb.iterall()]
+        set_extra_for_nodes(RemoteData.KEY_EXTRA_CLEANED, {pk: True for pk in pks})
+        count += len(pks)
+
+    return count
+
+
 def get_calculation_remote_paths(calculation_pks=None, past_days=None, older_than=None, computers=None, user=None):
     """
     Return a mapping of computer uuids to a list of remote paths, for a given set of calculations. The set of
@@ -54,6 +54,29 @@ class Scheduler(object):
     # The class to be used for the job resource.
     _job_resource_class = None
 
+    # Job arrays: plugins that set the 'can_submit_job_arrays' feature to True
+    # must define the environment variable that holds the index of the task
+    # being run, and the index of the first task of an array.
+    _array_task_id_variable = None
+    _array_task_id_start = 0
+
+    # The JobTemplate fields that end up in the scheduler header: calculations
+    # can only be grouped in the same array if all of them have equal values.
+    _array_compatible_fields = (
+        'shebang',
+        'submit_as_hold',
+        'rerunnable',
+        'email',
+        'email_on_started',
+        'email_on_terminated',
+        'queue_name',
+        'priority',
+        'max_memory_kb',
+        'max_wallclock_seconds',
+        'custom_scheduler_commands',
+        'import_sys_environment',
+    )
+
     def __init__(self):
         self._transport = None
 
@@ -177,6 +200,313 @@ class Scheduler(object):
 
         return "\n".join(script_lines)
 
+    def get_array_compatibility_key(self, job_tmpl):
+        """
+        Return a hashable key describing the scheduler header of a job template.
+
+        Job templates with the same key request the same resources and options
+        from the scheduler, and can therefore be run as tasks of the same job
+        array (see :py:meth:`get_submit_script_array`).
+
+        :param job_tmpl: a JobTemplate instance
+        :return: a tuple
+        """
+        if job_tmpl.job_resource is None:
+            resource = ()
+        else:
+            resource = tuple(sorted(job_tmpl.job_resource.iteritems()))
+
+        return tuple(job_tmpl[field] for field in self._array_compatible_fields) + (resource,)
+
+    def get_submit_script_array(self, job_tmpls, submit_script):
+        """
+        Return the submit script of a job array as a string.
+
+        Every task of the array changes directory to the ``working_directory`` of
+        one of the job templates and runs there, with bash, the submit script of
+        that job, that must have been already generated with
+        :py:meth:`get_submit_script` and copied to the working directory. The
+        scheduler header is taken from the first job template; all the others
+        must be compatible with it (see :py:meth:`get_array_compatibility_key`).
+
+        The output and error streams of each task are redirected to the
+        ``sched_output_path`` and ``sched_error_path`` of its job template, so that
+        the retrieved files are the same as for a job submitted on its own.
+
+        :param job_tmpls: a list of JobTemplate instances, one per task, with the
+            ``working_directory`` field set
+        :param submit_script: the name of the submit script of each job, relative
+            to its working directory
+        :raise FeatureNotAvailable: if the plugin does not support job arrays
+        """
+        from aiida.common.exceptions import InternalError
+
+        if not self._features.get('can_submit_job_arrays', False):
+            raise FeatureNotAvailable("Job arrays are not supported by this scheduler")
+
+        if not job_tmpls:
+            raise ValueError("At least one job template is needed to create a job array")
+
+        for job_tmpl in job_tmpls:
+            if not isinstance(job_tmpl, JobTemplate):
+                raise InternalError("job_tmpls should be a list of JobTemplate instances")
+            if not job_tmpl.working_directory:
+                raise ValueError("The working_directory must be set for all the tasks of a job array")
+
+        first_key = self.get_array_compatibility_key(job_tmpls[0])
+        if any(self.get_array_compatibility_key(job_tmpl) != first_key for job_tmpl in job_tmpls[1:]):
+            raise ValueError("All the tasks of a job array must request the same scheduler resources and options")
+
+        # The header of the array must not contain any task specific setting: the
+        # job name is set by the array header lines, the environment variables are
+        # exported by the submit script of each task, and the output and error
+        # streams are redirected task by task.
+        header_tmpl = job_tmpls[0].copy()
+        header_tmpl.job_name = None
+        header_tmpl.job_environment = None
+        header_tmpl.working_directory = None
+        header_tmpl.sched_output_path = None
+        header_tmpl.sched_error_path = None
+        header_tmpl.sched_join_files = False
+
+        empty_line = ""
+        script_lines = [header_tmpl.shebang if header_tmpl.shebang is not None else '#!/bin/bash']
+        # The array lines go first, since some plugins end the header with shell commands
+        script_lines.extend(self._get_array_header_lines('aiida-array', len(job_tmpls)))
+        script_lines.append(self._get_submit_script_header(header_tmpl))
+        script_lines.append(empty_line)
+
+        task_variable = '"${{{}}}"'.format(self._array_task_id_variable)
+        script_lines.append('case {} in'.format(task_variable))
+        for index, job_tmpl in enumerate(job_tmpls, start=self._array_task_id_start):
+            script_lines.append('    {})'.format(index))
+            script_lines.append('        {}'.format(self._get_array_task_line(job_tmpl, submit_script)))
+            script_lines.append('        ;;')
+        script_lines.append('    *)')
+        script_lines.append('        echo "Unknown array task index {}" >&2'.format(task_variable.strip('"')))
+        script_lines.append('        exit 1')
+        script_lines.append('        ;;')
+        script_lines.append('esac')
+        script_lines.append(empty_line)
+
+        return "\n".join(script_lines)
+
+    @staticmethod
+    def _get_task_run_line(job_tmpl, submit_script):
+        """
+        Return the line that runs, with bash, the submit script of a job that is
+        executed as a task of a job array or of a bundle, redirecting the output
+        and error streams to the files where the scheduler would have put them.
+
+        :param job_tmpl: the JobTemplate of the task
+        :param submit_script: the name of the submit script, relative to the working directory
+        """
+        redirections = []
+        if job_tmpl.sched_output_path:
+            redirections.append("> {}".format(escape_for_bash(job_tmpl.sched_output_path)))
+        if job_tmpl.sched_join_files:
+            redirections.append("2>&1")
+        elif job_tmpl.sched_error_path:
+            redirections.append("2> {}".format(escape_for_bash(job_tmpl.sched_error_path)))
+
+        return "bash {} {}".format(escape_for_bash(submit_script), " ".join(redirections)).rstrip()
+
+    def _get_array_task_line(self, job_tmpl, submit_script):
+        """
+        Return the line that runs the submit script of a single task of a job array.
+
+        :param job_tmpl: the JobTemplate of the task, with the working_directory set
+        :param submit_script: the name of the submit script, relative to the working directory
+        """
+        return "cd {} && {}".format(
+            escape_for_bash(job_tmpl.working_directory), self._get_task_run_line(job_tmpl, submit_script))
+
+    def get_bundle_max_concurrent(self, bundle_resource, job_tmpls):
+        """
+        Return how many of the jobs can run at the same time within the
+        allocation of a bundle, i.e. how many times the largest job fits in the
+        total number of MPI processes of the bundle.
+
+        :param bundle_resource: the JobResource of the bundle
+        :param job_tmpls: the list of JobTemplate instances of the jobs of the bundle
+        :raise ValueError: if one of the jobs does not fit in the bundle
+        """
+        bundle_mpiprocs = bundle_resource.get_tot_num_mpiprocs()
+        job_mpiprocs = max(job_tmpl.job_resource.get_tot_num_mpiprocs() for job_tmpl in job_tmpls)
+
+        if job_mpiprocs > bundle_mpiprocs:
+            raise ValueError("A job of the bundle requires {} MPI processes, but the bundle allocates only {}".format(
+                job_mpiprocs, bundle_mpiprocs))
+
+        return bundle_mpiprocs // job_mpiprocs
+
+    def _get_bundle_task_environment(self):
+        """
+        Return the environment variables set for each job of a bundle, such that the
+        jobs running at the same time do not use the same processors. By default, the
+        MPI processes are not bound to processors (by Open MPI and Intel MPI), which
+        would otherwise bind each job to the first processors of the allocation.
+
+        Plugins can override this to add the variables of their own job step launcher.
+
+        :return: a list of (name, value) tuples
+        """
+        # pylint: disable=no-self-use
+        return [('OMPI_MCA_hwloc_base_binding_policy', 'none'), ('I_MPI_PIN', '0')]
+
+    def get_submit_script_bundle(self, bundle_tmpl, job_tmpls, submit_script, status_filename, max_concurrent=None,
+                                 kill_filename=None):
+        """
+        Return the submit script of a bundle as a string: a single scheduler job
+        that runs many jobs inside its own allocation.
+
+        The header of the script is generated from ``bundle_tmpl``, that defines
+        the resources and options of the whole allocation. Each job of the bundle
+        changes directory to the ``working_directory`` of its job template and
+        runs there, with bash, its own submit script, that must have been already
+        generated with :py:meth:`get_submit_script` and copied to the working
+        directory. The run lines of each job are therefore those returned by
+        :py:meth:`_get_run_line`, together with the prepend and append texts.
+
+        The jobs are run in groups of ``max_concurrent`` jobs at the same time,
+        waiting for all the jobs of a group to finish before starting the next
+        one; with ``max_concurrent=1`` they run in sequence. The output and error
+        streams of each job are redirected to its ``sched_output_path`` and
+        ``sched_error_path``, and the variables of
+        :py:meth:`_get_bundle_task_environment` are set. In addition, each job writes
+        in its working directory a ``status_filename`` file with the lines
+        ``start_time=EPOCH``, ``pid=PID``, ``exit_status=CODE`` and ``end_time=EPOCH``.
+
+        Each job runs in its own process group. While it runs, the file
+        ``kill_filename`` is looked for in its working directory: once it exists,
+        the process group of the job is killed, without affecting the other jobs
+        of the bundle (a job that did not start yet is killed as soon as it starts).
+
+        :param bundle_tmpl: a JobTemplate instance for the whole allocation
+        :param job_tmpls: a list of JobTemplate instances, one per job, with the
+            ``working_directory`` field set
+        :param submit_script: the name of the submit script of each job, relative
+            to its working directory
+        :param status_filename: the name of the file in which each job records its
+            exit status and timings, relative to its working directory
+        :param max_concurrent: the maximum number of jobs to run at the same time.
+            If None, it is computed with :py:meth:`get_bundle_max_concurrent`.
+        :param kill_filename: the name of the file that requests the kill of a job,
+            relative to its working directory. If None, the jobs cannot be killed
+            one by one.
+        """
+        from aiida.common.exceptions import InternalError
+
+        if not job_tmpls:
+            raise ValueError("At least one job template is needed to create a bundle")
+
+        for job_tmpl in [bundle_tmpl] + list(job_tmpls):
+            if not isinstance(job_tmpl, JobTemplate):
+                raise InternalError("bundle_tmpl and job_tmpls should be JobTemplate instances")
+
+        if any(not job_tmpl.working_directory for job_tmpl in job_tmpls):
+            raise ValueError("The working_directory must be set for all the jobs of a bundle")
+
+        bundle_max_concurrent = self.get_bundle_max_concurrent(bundle_tmpl.job_resource, job_tmpls)
+        if max_concurrent is None:
+            max_concurrent = bundle_max_concurrent
+        elif max_concurrent < 1:
+            raise ValueError("max_concurrent must be a positive integer")
+
+        status_file = escape_for_bash(status_filename)
+        empty_line = ""
+
+        script_lines = [bundle_tmpl.shebang if bundle_tmpl.shebang is not None else '#!/bin/bash']
+        script_lines.append(self._get_submit_script_header(bundle_tmpl))
+        script_lines.append(empty_line)
+
+        for index, job_tmpl in enumerate(job_tmpls):
+            script_lines.append('(')
+            script_lines.append('    cd {} || exit 1'.format(escape_for_bash(job_tmpl.working_directory)))
+            for name, value in self._get_bundle_task_environment():
+                script_lines.append('    export {}={}'.format(name, escape_for_bash(value)))
+            script_lines.append('    echo "start_time=$(date +%s)" > {}'.format(status_file))
+            # With job control, the job runs in its own process group, that can be killed as a whole
+            script_lines.append('    set -m')
+            script_lines.append('    {} &'.format(self._get_task_run_line(job_tmpl, submit_script)))
+            script_lines.append('    pid=$!')
+            script_lines.append('    set +m')
+            script_lines.append('    echo "pid=$pid" >> {}'.format(status_file))
+            if kill_filename is not None:
+                script_lines.append('    while kill -0 $pid 2>/dev/null; do')
+                script_lines.append('        if [ -e {} ]; then kill -TERM -- -$pid 2>/dev/null; fi'.format(
+                    escape_for_bash(kill_filename)))
+                script_lines.append('        sleep 5')
+                script_lines.append('    done')
+            script_lines.append('    wait $pid')
+            script_lines.append('    echo "exit_status=$?" >> {}'.format(status_file))
+            script_lines.append('    echo "end_time=$(date +%s)" >> {}'.format(status_file))
+            script_lines.append(') &')
+            if (index + 1) % max_concurrent == 0 or index == len(job_tmpls) - 1:
+                script_lines.append('wait')
+                script_lines.append(empty_line)
+
+        footer = self._get_submit_script_footer(bundle_tmpl)
+        if footer:
+            script_lines.append(footer)
+            script_lines.append(empty_line)
+
+        return "\n".join(script_lines)
+
+    def _get_array_header_lines(self, job_name, num_tasks):
+        """
+        Return the list of scheduler header lines that turn a job into an array
+        of ``num_tasks`` tasks called ``job_name``.
+
+        To be implemented by the plugins that support job arrays.
+        """
+        # pylint: disable=no-self-use, unused-argument
+        raise FeatureNotAvailable("Job arrays are not supported by this scheduler")
+
+    def _get_array_task_job_id(self, array_job_id, task_index):
+        """
+        Return the job id of a single task of a job array, in the same format
+        used by the plugin for the job ids returned by :py:meth:`getJobs`.
+
+        To be implemented by the plugins that support job arrays.
+
+        :param array_job_id: the job id returned when submitting the array
+        :param task_index: the index of the task
+        """
+        # pylint: disable=no-self-use, unused-argument
+        raise FeatureNotAvailable("Job arrays are not supported by this scheduler")
+
+    @staticmethod
+    def _parse_array_task_range(range_string):
+        """
+        Return the list of task indices contained in a range string of a job array.
+
+        Ranges are comma separated and can be either single indices or intervals
+        with an optional step, e.g. '1-7:2,10' or '[0-3,5]'. A trailing '%N' (limit
+        on the number of concurrent tasks used by some schedulers) is ignored.
+
+        :param range_string: the range string, as printed by the scheduler
+        :return: a sorted list of integers
+        """
+        indices = set()
+        range_string = range_string.strip().strip('[]').split('%')[0]
+
+        for interval in range_string.split(','):
+            interval = interval.strip()
+            if not interval:
+                continue
+            bounds, _, step = interval.partition(':')
+            start, _, end = bounds.partition('-')
+            try:
+                start = int(start)
+                end = int(end) if end else start
+                step = int(step) if step else 1
+            except ValueError:
+                raise SchedulerParsingError("Invalid job array range '{}'".format(range_string))
+            indices.update(range(start, end + 1, step))
+
+        return sorted(indices)
+
     @abstractmethod
     def _get_submit_script_header(self, job_tmpl):
         """
@@ -408,6 +738,21 @@ stderr:
             self._get_submit_command(escape_for_bash(submit_script)))
         return self._parse_submit_output(retval, stdout, stderr)
 
+    def submit_array_from_script(self, working_directory, submit_script, num_tasks):
+        """
+        Goes in the working directory and submits the submit_script of a job
+        array, as generated by :py:meth:`get_submit_script_array`.
+
+        Return a list with the JobIDs of the single tasks of the array, in the
+        same order as the job templates used to generate the script, in a valid
+        format to be used for querying.
+
+        Typically, this function does not need to be modified by the plugins.
+        """
+        array_job_id = self.submit_from_script(working_directory, submit_script)
+        start = self._array_task_id_start
+        return [self._get_array_task_job_id(array_job_id, index) for index in range(start, start + num_tasks)]
+
     def kill(self, jobid):
         """
         Kill a remote job, and try to parse the output message of the scheduler
@@ -12,6 +12,8 @@ Plugin for LSF.
 This has been tested on the CERN lxplus cluster (LSF 9.1.3)
 """
 from __future__ import division
+import re
+
 import aiida.scheduler
 from aiida.common.utils import escape_for_bash
 from aiida.scheduler import SchedulerError, SchedulerParsingError
@@ -84,6 +86,9 @@ _MAP_STATUS_LSF = {
 # Separator between fields in the output of bjobs
 _FIELD_SEPARATOR = "|"
 
+# The name of the elements of a job array, as printed by bjobs, ends with '[INDEX]'
+_ARRAY_ELEMENT_REGEXP = re.compile(r'^.*\[(?P<index>\d+)\]$')
+
 
 class LsfJobResource(JobResource):
     """
@@ -163,11 +168,16 @@ class LsfScheduler(aiida.scheduler.Scheduler):
     # Query only by list of jobs and not by user
     _features = {
         'can_query_by_user': False,
+        'can_submit_job_arrays': True,
     }
 
     # The class to be used for the job resource.
     _job_resource_class = LsfJobResource
 
+    # Array elements are numbered from one
+    _array_task_id_variable = 'LSB_JOBINDEX'
+    _array_task_id_start = 1
+
     # Unavailable field: substate
     # Note! If you change the fields or fields length, update accordingly
     # also the parsing function!
@@ -270,7 +280,8 @@ class LsfScheduler(aiida.scheduler.Scheduler):
                 if not isinstance(jobs, (tuple, list)):
                     raise TypeError("If provided, the 'jobs' variable must be a string or " "a list of strings")
                 joblist = jobs
-            command.append(' '.join(joblist))
+            # The ids of array elements, 'JOBID[INDEX]', must be escaped
+            command.append(' '.join(escape_for_bash(job) for job in joblist))
 
         comm = ' '.join(command)
         self.logger.debug("bjobs command: {}".format(comm))
@@ -465,6 +476,21 @@ then
 fi
 """
 
+    def _get_array_header_lines(self, job_name, num_tasks):
+        """
+        Return the header lines that turn the job into an array of num_tasks elements.
+        In LSF the range of the array is part of the job name.
+        """
+        return ['#BSUB -J "{}[{}-{}]"'.format(job_name, self._array_task_id_start,
+                                              self._array_task_id_start + num_tasks - 1)]
+
+    def _get_array_task_job_id(self, array_job_id, task_index):
+        """
+        Return the job id of an element of a job array, in the 'JOBID[INDEX]'
+        format used by bjobs and by _parse_joblist_output.
+        """
+        return '{}[{}]'.format(array_job_id, task_index)
+
     def _get_submit_command(self, submit_script):
         """
         Return the string to execute to submit a given script.
@@ -616,6 +642,12 @@ fi
 
             this_job.title = job_name
 
+            # bjobs prints the same job id for all the elements of a job array,
+            # that are distinguished by the '[INDEX]' suffix of the job name
+            array_match = _ARRAY_ELEMENT_REGEXP.match(job_name)
+            if array_match:
+                this_job.job_id = '{}[{}]'.format(this_job.job_id, array_match.group('index'))
+
             # Everything goes here anyway for debugging purposes
             this_job.raw_data = job
 
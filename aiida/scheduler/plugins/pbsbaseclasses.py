@@ -149,13 +149,16 @@ class PbsBaseClass(Scheduler):
         """
         The command to report full information on existing jobs.
 
-        TODO: in the case of job arrays, decide what to do (i.e., if we want
-              to pass the -t options to list each subjob).
+        If the plugin can submit job arrays, the subjobs of the arrays are
+        listed one by one (option -t), so that each of them gets its own JobInfo.
         """
         from aiida.common.exceptions import FeatureNotAvailable
 
         command = ['qstat', '-f']
 
+        if self._features.get('can_submit_job_arrays', False):
+            command.append('-t')
+
         if jobs and user:
             raise FeatureNotAvailable("Cannot query by user and job(s) in PBS")
 
@@ -714,7 +717,7 @@ class PbsBaseClass(Scheduler):
         """
         Return the command to kill the job with specified jobid.
         """
-        submit_command = 'qdel {}'.format(jobid)
+        submit_command = 'qdel {}'.format(escape_for_bash(jobid))
 
         _LOGGER.info("killing job {}".format(jobid))
 
@@ -50,6 +50,33 @@ class PbsproScheduler(PbsBaseClass):
     ## for the time being, but I can redefine it if needed.
     # _map_status = _map_status_pbs_common
 
+    _features = {
+        'can_query_by_user': False,
+        'can_submit_job_arrays': True,
+    }
+
+    # Subjobs of an array are numbered from zero
+    _array_task_id_variable = 'PBS_ARRAY_INDEX'
+    _array_task_id_start = 0
+
+    def _get_array_header_lines(self, job_name, num_tasks):
+        """
+        Return the header lines that turn the job into an array of num_tasks subjobs.
+
+        Note: PBSPro does not accept arrays with a single subjob.
+        """
+        return [
+            "#PBS -N {}".format(job_name),
+            "#PBS -J {}-{}".format(self._array_task_id_start, self._array_task_id_start + num_tasks - 1),
+        ]
+
+    def _get_array_task_job_id(self, array_job_id, task_index):
+        """
+        Return the job id of a subjob: qsub returns 'ID[].SERVER' for an array,
+        and the subjobs are listed by qstat as 'ID[INDEX].SERVER'.
+        """
+        return array_job_id.replace('[]', '[{}]'.format(task_index), 1)
+
     def _get_resource_lines(self, num_machines, num_mpiprocs_per_machine, num_cores_per_machine, max_memory_kb,
                             max_wallclock_seconds):
         """
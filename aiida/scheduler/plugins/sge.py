@@ -100,11 +100,16 @@ class SgeScheduler(aiida.scheduler.Scheduler):
     # user, but not by job id
     _features = {
         'can_query_by_user': True,
+        'can_submit_job_arrays': True,
     }
 
     # The class to be used for the job resource.
     _job_resource_class = SgeJobResource
 
+    # Array tasks are numbered from one
+    _array_task_id_variable = 'SGE_TASK_ID'
+    _array_task_id_start = 1
+
     def _get_joblist_command(self, jobs=None, user=None):
         """
         The command to report full information on existing jobs.
@@ -277,6 +282,23 @@ class SgeScheduler(aiida.scheduler.Scheduler):
 
         return "\n".join(lines)
 
+    def _get_array_header_lines(self, job_name, num_tasks):
+        """
+        Return the header lines that turn the job into an array of num_tasks tasks.
+        """
+        return [
+            '#$ -N {}'.format(job_name),
+            '#$ -t {}-{}'.format(self._array_task_id_start, self._array_task_id_start + num_tasks - 1),
+        ]
+
+    def _get_array_task_job_id(self, array_job_id, task_index):
+        """
+        Return the job id of a task of a job array, in the 'JOBID.TASKID' format
+        used by _parse_joblist_output. For arrays, 'qsub -terse' returns a string
+        like 'JOBID.1-4:1'.
+        """
+        return '{}.{}'.format(array_job_id.split('.', 1)[0], task_index)
+
     def _get_submit_command(self, submit_script):
         """
         Return the string to execute to submit a given script.
@@ -438,7 +460,20 @@ class SgeScheduler(aiida.scheduler.Scheduler):
                 except IndexError:
                     self.logger.warning("No 'slots' field for job " "id {}".format(this_job.job_id))
 
-            joblist.append(this_job)
+            # For job arrays, the 'tasks' field contains either the index of a
+            # running task, or the range of the pending ones: I return one job
+            # per task, with a job id 'JOBID.TASKID'
+            try:
+                job_element = job.getElementsByTagName('tasks').pop(0)
+                element_child = job_element.childNodes.pop(0)
+                tasks_string = str(element_child.data).strip()
+            except IndexError:
+                joblist.append(this_job)
+            else:
+                for task_index in self._parse_array_task_range(tasks_string):
+                    task_job = this_job.copy()
+                    task_job.job_id = '{}.{}'.format(this_job.job_id, task_index)
+                    joblist.append(task_job)
         # self.logger.debug("joblist final: {}".format(joblist))
         return joblist
 
@@ -155,11 +155,16 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
     # Query only by list of jobs and not by user
     _features = {
         'can_query_by_user': False,
+        'can_submit_job_arrays': True,
     }
 
     # The class to be used for the job resource.
     _job_resource_class = SlurmJobResource
 
+    # Array tasks are numbered from zero
+    _array_task_id_variable = 'SLURM_ARRAY_TASK_ID'
+    _array_task_id_start = 0
+
     # Fields to query or to parse
     # Unavailable fields: substate, cputime
     fields = [
@@ -192,8 +197,10 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
 
         # I add the environment variable SLURM_TIME_FORMAT in front to be
         # sure to get the times in 'standard' format
+        # With --array, each task of a job array is printed on its own line
+        # with a job id 'ARRAYID_TASKID', also when pending
         command = [
-            "SLURM_TIME_FORMAT='standard'", "squeue", "--noheader", "-o '{}'".format(
+            "SLURM_TIME_FORMAT='standard'", "squeue", "--noheader", "--array", "-o '{}'".format(
                 _FIELD_SEPARATOR.join(_[0] for _ in self.fields))
         ]
 
@@ -389,6 +396,29 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
 
         return "\n".join(lines)
 
+    def _get_bundle_task_environment(self):
+        """
+        Return the environment variables set for each job of a bundle: the job steps
+        started by srun get their own processors of the allocation, or wait for them.
+        """
+        return super(SlurmScheduler, self)._get_bundle_task_environment() + [('SLURM_EXCLUSIVE', '1')]
+
+    def _get_array_header_lines(self, job_name, num_tasks):
+        """
+        Return the header lines that turn the job into an array of num_tasks tasks.
+        """
+        return [
+            '#SBATCH --job-name="{}"'.format(job_name),
+            '#SBATCH --array={}-{}'.format(self._array_task_id_start, self._array_task_id_start + num_tasks - 1),
+        ]
+
+    def _get_array_task_job_id(self, array_job_id, task_index):
+        """
+        Return the job id of a task of a job array, in the 'ARRAYID_TASKID'
+        format printed by squeue.
+        """
+        return '{}_{}'.format(array_job_id, task_index)
+
     def _get_submit_command(self, submit_script):
         """
         Return the string to execute to submit a given script.
@@ -22,6 +22,8 @@ BJOBS_STDOUT_TO_TEST = "764213236|EXIT|TERM_RUNLIMIT: job killed after reaching
                        "764255172|RUN|-|b68ac74822|inewton|1|-|b68ac74822|test|Feb  2 07:48 L|Feb  2 07:47|15.00% L|Feb  2 07:47|test\n" \
                        "764245175|RUN|-|b68ac74822|dbowie|1|-|b68ac74822|test|Jan  1 05:07|Dec  31 23:48 L|25.00%|Dec  31 23:40|test\n" \
                        "764399747|DONE|-|p05496706j68144|inewton|1|-|p05496706j68144|test|Feb  2 14:56 L|Feb  2 14:54|38.33% L|Feb  2 14:54|test"
+BJOBS_ARRAY_STDOUT_TO_TEST = "764300001|RUN|-|b681e480bd|inewton|1|-|b681e480bd|test|Feb  2 08:46|Feb  2 08:45|10.00%|Feb  2 08:44|aiida-array[1]\n" \
+                             "764300001|PEND|-|-|inewton|-|-|-|test|-|-|-|Feb  2 08:44|aiida-array[2]"
 BJOBS_STDERR_TO_TEST = "Job <864220165> is not found"
 
 SUBMIT_STDOUT_TO_TEST = "Job <764254593> is submitted to queue <test>."
@@ -109,6 +111,22 @@ class TestParserBjobs(unittest.TestCase):
         # Important to enable again logs!
         logging.disable(logging.NOTSET)
 
+    def test_parse_array_joblist_output(self):
+        """
+        Test that the elements of a job array are parsed with their own job id
+        """
+        scheduler = LsfScheduler()
+
+        # Disable logs, the time fields of pending jobs cannot be parsed
+        logging.disable(logging.ERROR)
+        job_list = scheduler._parse_joblist_output(0, BJOBS_ARRAY_STDOUT_TO_TEST, '')
+        logging.disable(logging.NOTSET)
+        jobs = {j.job_id: j for j in job_list}
+
+        self.assertEquals(set(jobs), set(scheduler._get_array_task_job_id('764300001', i) for i in [1, 2]))
+        self.assertEquals(jobs['764300001[1]'].job_state, JOB_STATES.RUNNING)
+        self.assertEquals(jobs['764300001[2]'].job_state, JOB_STATES.QUEUED)
+
 
 class TestSubmitScript(unittest.TestCase):
 
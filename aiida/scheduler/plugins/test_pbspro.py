@@ -752,6 +752,74 @@ Unable to copy file 543984.E
 """
 
 
+text_qstat_f_array_to_test = """Job Id: 68351[1].mycluster
+    Job_Name = aiida-array
+    Job_Owner = user1@mycluster
+    job_state = R
+    queue = workq
+    server = mycluster
+    Checkpoint = u
+    ctime = Mon Apr  7 13:16:12 2014
+    Error_Path = mycluster:/scratch/user1/slurm.err
+    exec_host = b141/0
+    exec_vnode = (b141:ncpus=1)
+    Hold_Types = n
+    Join_Path = n
+    Keep_Files = n
+    Mail_Points = a
+    mtime = Mon Apr  7 13:16:12 2014
+    Output_Path = mycluster:/scratch/user1/slurm.out
+    Priority = 0
+    qtime = Mon Apr  7 13:16:12 2014
+    Rerunable = False
+    Resource_List.ncpus = 1
+    Resource_List.nodect = 1
+    Resource_List.place = pack
+    Resource_List.select = 1:ncpus=1
+    Resource_List.walltime = 00:10:00
+    stime = Mon Apr  7 13:16:12 2014
+    session_id = 6493
+    substate = 42
+    Variable_List = PBS_O_HOME=/home/user1,PBS_ARRAY_INDEX=1
+    euser = user1
+    egroup = group1
+    array_id = 68351[].mycluster
+    array_index = 1
+    run_count = 1
+
+Job Id: 68351[2].mycluster
+    Job_Name = aiida-array
+    Job_Owner = user1@mycluster
+    job_state = Q
+    queue = workq
+    server = mycluster
+    Checkpoint = u
+    ctime = Mon Apr  7 13:16:12 2014
+    Error_Path = mycluster:/scratch/user1/slurm.err
+    Hold_Types = n
+    Join_Path = n
+    Keep_Files = n
+    Mail_Points = a
+    mtime = Mon Apr  7 13:16:12 2014
+    Output_Path = mycluster:/scratch/user1/slurm.out
+    Priority = 0
+    qtime = Mon Apr  7 13:16:12 2014
+    Rerunable = False
+    Resource_List.ncpus = 1
+    Resource_List.nodect = 1
+    Resource_List.place = pack
+    Resource_List.select = 1:ncpus=1
+    Resource_List.walltime = 00:10:00
+    substate = 10
+    Variable_List = PBS_O_HOME=/home/user1,PBS_ARRAY_INDEX=2
+    euser = user1
+    egroup = group1
+    array_id = 68351[].mycluster
+    array_index = 2
+
+"""
+
+
 class TestParserQstat(unittest.TestCase):
     """
     Tests to verify if teh function _parse_joblist_output behave correctly
@@ -896,6 +964,37 @@ class TestParserQstat(unittest.TestCase):
 #            job_list = s._parse_joblist_output(retval, stdout, stderr)
 #            #            print s._logger._log, dir(s._logger._log),'!!!!'
 
+    def test_parse_array_joblist_output(self):
+        """
+        Test that the subjobs of a job array are parsed with their own job id
+        """
+        scheduler = PbsproScheduler()
+
+        job_list = scheduler._parse_joblist_output(0, text_qstat_f_array_to_test, '')
+        jobs = {j.job_id: j for j in job_list}
+
+        self.assertEquals(scheduler._get_array_task_job_id('68351[].mycluster', 1), '68351[1].mycluster')
+        self.assertEquals(set(jobs), set(['68351[1].mycluster', '68351[2].mycluster']))
+        self.assertEquals(jobs['68351[1].mycluster'].job_state, JOB_STATES.RUNNING)
+        self.assertEquals(jobs['68351[2].mycluster'].job_state, JOB_STATES.QUEUED)
+
+    def test_joblist_command_lists_subjobs(self):
+        """
+        Test that qstat lists the subjobs of the job arrays
+        """
+        scheduler = PbsproScheduler()
+
+        self.assertEquals(scheduler._get_joblist_command(jobs=['68351[1].mycluster']),
+                          "qstat -f -t '68351[1].mycluster'")
+
+    def test_kill_command_subjob(self):
+        """
+        Test that the job id of a subjob is escaped in the kill command, as the brackets are glob characters
+        """
+        scheduler = PbsproScheduler()
+
+        self.assertEquals(scheduler._get_kill_command('68351[1].mycluster'), "qdel '68351[1].mycluster'")
+
 
 class TestSubmitScript(unittest.TestCase):
 
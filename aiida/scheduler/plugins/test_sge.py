@@ -98,6 +98,34 @@ text_qstat_ext_urg_xml_test = """<?xml version='1.0'?>
   </job_info>
 </job_info>"""
 
+text_qstat_ext_urg_xml_array_test = """<?xml version='1.0'?>
+<job_info  xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+  <queue_info>
+    <job_list state="running">
+      <JB_job_number>1213001</JB_job_number>
+      <JB_name>aiida-array</JB_name>
+      <JB_owner>dorigm7s</JB_owner>
+      <state>r</state>
+      <JAT_start_time>2013-06-18T12:08:23</JAT_start_time>
+      <queue_name>serial.q@node080</queue_name>
+      <slots>1</slots>
+      <tasks>2</tasks>
+    </job_list>
+  </queue_info>
+  <job_info>
+    <job_list state="pending">
+      <JB_job_number>1213001</JB_job_number>
+      <JB_name>aiida-array</JB_name>
+      <JB_owner>dorigm7s</JB_owner>
+      <state>qw</state>
+      <JB_submission_time>2013-06-18T12:00:57</JB_submission_time>
+      <queue_name></queue_name>
+      <slots>1</slots>
+      <tasks>3-5:1</tasks>
+    </job_list>
+  </job_info>
+</job_info>"""
+
 text_qstat_ext_urg_xml_test_raise = """<?xml version='1.0'?>
             <job_info  xmlns:xsd="http://www.w3.org/2001/XMLSchema">
           <queue_info>
@@ -293,6 +321,21 @@ class TestCommand(unittest.TestCase):
             sge._parse_joblist_output(retval, stdout, stderr)
         logging.disable(logging.NOTSET)
 
+    def test_parse_array_joblist_output(self):
+        sge = SgeScheduler()
+
+        job_list = sge._parse_joblist_output(0, text_qstat_ext_urg_xml_array_test, '')
+        jobs = {j.job_id: j for j in job_list}
+
+        # One job per task, both for the running task and for the pending range
+        self.assertEquals(set(jobs), set(['1213001.2', '1213001.3', '1213001.4', '1213001.5']))
+        self.assertEquals(jobs['1213001.2'].job_state, JOB_STATES.RUNNING)
+        self.assertEquals(jobs['1213001.4'].job_state, JOB_STATES.QUEUED)
+
+        # Job ids of the tasks from the output of 'qsub -terse'
+        self.assertEquals(sge._get_array_task_job_id('1213001.1-4:1', 3), '1213001.3')
+        self.assertEquals(sge._parse_array_task_range('1-7:2,10'), [1, 3, 5, 7, 10])
+
     def test_submit_script(self):
         from aiida.scheduler.datastructures import JobTemplate
 
@@ -24,6 +24,12 @@ TEXT_SQUEUE_TO_TEST = """862540^^^PD^^^Dependency^^^n/a^^^user1^^^20^^^640^^^(De
 863553^^^R^^^None^^^rosa1^^^user5^^^1^^^32^^^nid00471^^^normal^^^30:00^^^29:29^^^2013-05-23T11:44:11^^^bash^^^2013-05-23T10:42:11
 """
 
+TEXT_SQUEUE_ARRAY_TO_TEST = """870001_0^^^R^^^None^^^rosa10^^^user1^^^1^^^1^^^nid00012^^^normal^^^10:00^^^1:10^^^2013-05-23T11:41:30^^^aiida-array^^^2013-05-23T11:40:21
+870001_1^^^R^^^None^^^rosa10^^^user1^^^1^^^1^^^nid00013^^^normal^^^10:00^^^1:10^^^2013-05-23T11:41:30^^^aiida-array^^^2013-05-23T11:40:21
+870001_2^^^PD^^^Resources^^^n/a^^^user1^^^1^^^1^^^(Resources)^^^normal^^^10:00^^^0:00^^^N/A^^^aiida-array^^^2013-05-23T11:40:21
+870001_3^^^PD^^^Resources^^^n/a^^^user1^^^1^^^1^^^(Resources)^^^normal^^^10:00^^^0:00^^^N/A^^^aiida-array^^^2013-05-23T11:40:21
+"""
+
 
 class TestParserSqueue(unittest.TestCase):
     """
@@ -93,6 +99,19 @@ class TestParserSqueue(unittest.TestCase):
         #                self.assertTrue( j.num_machines==num_machines )
         #                self.assertTrue( j.num_mpiprocs==num_mpiprocs )
 
+    def test_parse_array_joblist_output(self):
+        """
+        Test that each task of a job array is parsed as a separate job
+        """
+        scheduler = SlurmScheduler()
+
+        job_list = scheduler._parse_joblist_output(0, TEXT_SQUEUE_ARRAY_TO_TEST, '')
+        jobs = {j.job_id: j for j in job_list}
+
+        self.assertEquals(set(jobs), set(scheduler._get_array_task_job_id('870001', i) for i in range(4)))
+        self.assertEquals(jobs['870001_1'].job_state, JOB_STATES.RUNNING)
+        self.assertEquals(jobs['870001_3'].job_state, JOB_STATES.QUEUED)
+
 
 class TestTimes(unittest.TestCase):
 
@@ -175,6 +194,105 @@ class TestSubmitScript(unittest.TestCase):
         self.assertTrue("'mpirun' '-np' '23' 'pw.x' '-npool' '1'" + \
                         " < 'aiida.in'" in submit_script_text)
 
+    def test_submit_script_array(self):
+        """
+        Test the creation of the submission script of a job array.
+        """
+        from aiida.scheduler.datastructures import JobTemplate
+        from aiida.common.datastructures import CodeInfo, code_run_modes
+
+        scheduler = SlurmScheduler()
+
+        job_tmpls = []
+        for index in range(3):
+            job_tmpl = JobTemplate()
+            job_tmpl.shebang = '#!/bin/bash'
+            job_tmpl.job_name = 'aiida-{}'.format(index)
+            job_tmpl.working_directory = '/scratch/aiida/calc{}'.format(index)
+            job_tmpl.sched_output_path = '_scheduler-stdout.txt'
+            job_tmpl.sched_error_path = '_scheduler-stderr.txt'
+            job_tmpl.job_resource = scheduler.create_job_resource(num_machines=1, num_mpiprocs_per_machine=1)
+            job_tmpl.max_wallclock_seconds = 600
+            job_tmpl.job_environment = {'INDEX': str(index)}
+            code_info = CodeInfo()
+            code_info.cmdline_params = ["pw.x"]
+            job_tmpl.codes_info = [code_info]
+            job_tmpl.codes_run_mode = code_run_modes.SERIAL
+            job_tmpls.append(job_tmpl)
+
+        submit_script_text = scheduler.get_submit_script_array(job_tmpls, '_aiidasubmit.sh')
+
+        self.assertTrue(submit_script_text.startswith('#!/bin/bash'))
+        self.assertTrue('#SBATCH --array=0-2' in submit_script_text)
+        self.assertTrue('#SBATCH --time=00:10:00' in submit_script_text)
+        self.assertTrue('#SBATCH --nodes=1' in submit_script_text)
+        self.assertTrue('case "${SLURM_ARRAY_TASK_ID}" in' in submit_script_text)
+        self.assertTrue("cd '/scratch/aiida/calc2' && bash '_aiidasubmit.sh' > '_scheduler-stdout.txt' "
+                        "2> '_scheduler-stderr.txt'" in submit_script_text)
+        # Task specific settings must not end up in the header of the array
+        self.assertFalse('--output' in submit_script_text)
+        self.assertFalse('export INDEX' in submit_script_text)
+        self.assertFalse('aiida-1' in submit_script_text)
+
+        # Templates with different resources cannot be grouped in the same array
+        job_tmpls[1].max_wallclock_seconds = 1200
+        with self.assertRaises(ValueError):
+            scheduler.get_submit_script_array(job_tmpls, '_aiidasubmit.sh')
+
+    def test_submit_script_bundle(self):
+        """
+        Test the creation of the submission script of a bundle of jobs.
+        """
+        from aiida.scheduler.datastructures import JobTemplate
+        from aiida.common.datastructures import CodeInfo, code_run_modes
+
+        scheduler = SlurmScheduler()
+
+        job_tmpls = []
+        for index in range(5):
+            job_tmpl = JobTemplate()
+            job_tmpl.working_directory = '/scratch/aiida/calc{}'.format(index)
+            job_tmpl.sched_output_path = '_scheduler-stdout.txt'
+            job_tmpl.sched_join_files = True
+            job_tmpl.job_resource = scheduler.create_job_resource(num_machines=1, num_mpiprocs_per_machine=4)
+            code_info = CodeInfo()
+            code_info.cmdline_params = ["pw.x"]
+            job_tmpl.codes_info = [code_info]
+            job_tmpl.codes_run_mode = code_run_modes.SERIAL
+            job_tmpls.append(job_tmpl)
+
+        bundle_tmpl = JobTemplate()
+        bundle_tmpl.job_name = 'aiida-bundle'
+        bundle_tmpl.job_resource = scheduler.create_job_resource(num_machines=1, num_mpiprocs_per_machine=8)
+        bundle_tmpl.max_wallclock_seconds = 3600
+
+        self.assertEquals(scheduler.get_bundle_max_concurrent(bundle_tmpl.job_resource, job_tmpls), 2)
+
+        submit_script_text = scheduler.get_submit_script_bundle(bundle_tmpl, job_tmpls, '_aiidasubmit.sh',
+                                                                '_status.txt', kill_filename='_kill')
+
+        self.assertTrue('#SBATCH --ntasks-per-node=8' in submit_script_text)
+        self.assertTrue('#SBATCH --time=01:00:00' in submit_script_text)
+        self.assertTrue("cd '/scratch/aiida/calc4' || exit 1" in submit_script_text)
+        self.assertTrue("bash '_aiidasubmit.sh' > '_scheduler-stdout.txt' 2>&1 &" in submit_script_text)
+        self.assertTrue('echo "exit_status=$?" >> \'_status.txt\'' in submit_script_text)
+        # The job steps of the jobs running at the same time do not share processors
+        self.assertEquals(submit_script_text.count("export SLURM_EXCLUSIVE='1'"), 5)
+        # Each job is killed alone when its kill file is created
+        self.assertEquals(submit_script_text.count("if [ -e '_kill' ]; then kill -TERM -- -$pid"), 5)
+        # Five jobs, two at a time: three groups
+        self.assertEquals(submit_script_text.count('\nwait\n'), 3)
+
+        # With max_concurrent=1 the jobs run in sequence
+        submit_script_text = scheduler.get_submit_script_bundle(bundle_tmpl, job_tmpls, '_aiidasubmit.sh',
+                                                                '_status.txt', max_concurrent=1)
+        self.assertEquals(submit_script_text.count('\nwait\n'), 5)
+
+        # A job larger than the bundle cannot be run
+        bundle_tmpl.job_resource = scheduler.create_job_resource(num_machines=1, num_mpiprocs_per_machine=2)
+        with self.assertRaises(ValueError):
+            scheduler.get_submit_script_bundle(bundle_tmpl, job_tmpls, '_aiidasubmit.sh', '_status.txt')
+
     def test_submit_script_bad_shebang(self):
         from aiida.scheduler.datastructures import JobTemplate
         from aiida.common.datastructures import CodeInfo, code_run_modes
@@ -7,11 +7,56 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+import copy
+
 import numpy
 
+from aiida.common.utils import LRUCache
+
 _default_epsilon_length = 1e-5
 _default_epsilon_angle = 1e-5
 
+# Cells that are equal up to this number of decimals (in Angstrom) share the cached analysis
+_CELL_KEY_DECIMALS = 10
+
+# The analyses of the most recently used cells: the reciprocal cells, the results of analyze_cell
+# and of find_bravais_info, which are recomputed identically for every kpoint path or mesh of a cell
+_cell_analysis_cache = LRUCache(maxsize=256)
+
+
+def clear_cell_analysis_cache():
+    """
+    Empty the cache of the analyses of the cells.
+    """
+    _cell_analysis_cache.clear()
+
+
+def _get_cell_key(cell, pbc=None):
+    """
+    Return the hashable key of a cell and of its periodic boundary conditions in the cache of the analyses.
+
+    :param cell: 3x3 array representing the cell lattice vectors
+    :param pbc: 3 booleans, by default all True
+    """
+    if pbc is None:
+        pbc = [True, True, True]
+    rounded_cell = numpy.round(numpy.array(cell, dtype=float), _CELL_KEY_DECIMALS)
+    return tuple(rounded_cell.ravel().tolist()), tuple(bool(i) for i in pbc)
+
+
+def _get_crystal_matrix(reciprocal_cell):
+    """
+    Return the matrix that changes cartesian coordinates to crystal coordinates of the reciprocal cell,
+    i.e. the inverse of the transposed reciprocal cell, computed once for every reciprocal cell.
+    """
+    key = ('crystal_matrix',) + _get_cell_key(reciprocal_cell)
+    matrix = _cell_analysis_cache.get(key)
+    if matrix is None:
+        matrix = numpy.linalg.inv(numpy.transpose(numpy.array(reciprocal_cell)))
+        matrix.flags.writeable = False
+        _cell_analysis_cache[key] = matrix
+    return matrix
+
 
 def change_reference(reciprocal_cell, kpoints, to_cartesian=True):
     """
@@ -24,11 +69,10 @@ def change_reference(reciprocal_cell, kpoints, to_cartesian=True):
     if not isinstance(kpoints, numpy.ndarray):
         raise ValueError('kpoints must be a numpy.array')
 
-    transposed_cell = numpy.transpose(numpy.array(reciprocal_cell))
     if to_cartesian:
-        matrix = transposed_cell
+        matrix = numpy.transpose(numpy.array(reciprocal_cell))
     else:
-        matrix = numpy.linalg.inv(transposed_cell)
+        matrix = _get_crystal_matrix(reciprocal_cell)
 
     # note: kpoints is a list Nx3, matrix is 3x3.
     # hence, first transpose kpoints, then multiply, finally transpose it back
@@ -41,19 +85,37 @@ def analyze_cell(cell=None, pbc=None):
     set as well, although they are not stored in the DB.
     :note: units are Angstrom for the cell parameters, 1/Angstrom for the
     reciprocal cell parameters.
+    :note: the analysis is cached for the cell and the pbc: the returned
+    arrays are copies that the caller is free to modify.
     """
     if pbc is None:
         pbc = [True, True, True]
 
-    dimension = sum(pbc)
-
     if cell is None:
         return {
             'reciprocal_cell': None,
-            'dimension': dimension,
+            'dimension': sum(pbc),
             'pbc': pbc
         }
 
+    key = ('analysis',) + _get_cell_key(cell, pbc)
+    analysis = _cell_analysis_cache.get(key)
+    if analysis is None:
+        analysis = _analyze_cell(cell, pbc)
+        _cell_analysis_cache[key] = analysis
+
+    result = {name: numpy.copy(value) if isinstance(value, numpy.ndarray) else value
+              for name, value in analysis.iteritems()}
+    result['pbc'] = pbc
+    return result
+
+
+def _analyze_cell(cell, pbc):
+    """
+    Compute the analysis of a cell returned by analyze_cell, without caching it.
+    """
+    dimension = sum(pbc)
+
     the_cell = numpy.array(cell)
     reciprocal_cell = 2. * numpy.pi * numpy.linalg.inv(the_cell).transpose()
     a1 = numpy.array(the_cell[0, :])  # units = Angstrom
@@ -360,34 +422,41 @@ def get_explicit_kpoints_path(value=None, cell=None, pbc=None, kpoint_distance=N
     else:
         raise ValueError("Input format not recognized")
 
-    explicit_kpoints = [tuple(point_coordinates[path[0][0]])]
+    first_point = tuple(point_coordinates[path[0][0]])
+
+    # sample all the segments at once, with the same arithmetic as numpy.linspace:
+    # the point j of a segment of n points is ini + j * (end - ini) / (n - 1), and the last one is end
+    num_points = numpy.array(num_points, dtype=int)
+    ini_coords = numpy.array([point_coordinates[i[0]] for i in path], dtype=float)
+    end_coords = numpy.array([point_coordinates[i[1]] for i in path], dtype=float)
+    steps = (end_coords - ini_coords) / numpy.maximum(num_points - 1, 1)[:, numpy.newaxis]
+    piece_ends = numpy.cumsum(num_points)
+    piece_starts = piece_ends - num_points
+    pieces = numpy.repeat(numpy.arange(len(path)), num_points)
+    counts = numpy.arange(piece_ends[-1]) - piece_starts[pieces]
+    path_points = counts[:, numpy.newaxis] * steps[pieces] + ini_coords[pieces]
+    has_end = num_points > 1
+    path_points[piece_ends[has_end] - 1] = end_coords[has_end]
+
+    # the first row is the first point of the path
+    points = numpy.concatenate([numpy.array([first_point], dtype=float), path_points])
+    piece_starts += 1
+    piece_ends += 1
+
+    # avoid duplicates: a point equal to the previous one is dropped
+    is_new = numpy.ones(len(points), dtype=bool)
+    is_new[1:] = numpy.any(points[1:] != points[:-1], axis=1)
+    indices = numpy.cumsum(is_new) - 1
+
+    explicit_kpoints = [first_point] + [tuple(point) for point in points[1:][is_new[1:]]]
     labels = [(0, path[0][0])]
 
-    for count_piece, i in enumerate(path):
-        ini_label = i[0]
-        end_label = i[1]
-        ini_coord = point_coordinates[ini_label]
-        end_coord = point_coordinates[end_label]
-
-        path_piece = zip(numpy.linspace(ini_coord[0], end_coord[0],
-                                        num_points[count_piece]),
-                         numpy.linspace(ini_coord[1], end_coord[1],
-                                        num_points[count_piece]),
-                         numpy.linspace(ini_coord[2], end_coord[2],
-                                        num_points[count_piece]),
-                         )
-
-        for count, j in enumerate(path_piece):
-            if all(numpy.array(explicit_kpoints[-1]) == j):
-                continue  # avoid duplcates
-            else:
-                explicit_kpoints.append(j)
-
-            # add labels for the first and last point
-            if count == 0:
-                labels.append((len(explicit_kpoints) - 1, ini_label))
-            if count == len(path_piece) - 1:
-                labels.append((len(explicit_kpoints) - 1, end_label))
+    # add labels for the first and last point of each segment, if they were not dropped
+    for piece_start, piece_end, (ini_label, end_label) in zip(piece_starts, piece_ends, path):
+        if is_new[piece_start]:
+            labels.append((int(indices[piece_start]), ini_label))
+        if is_new[piece_end - 1]:
+            labels.append((int(indices[piece_end - 1]), end_label))
 
     # I still have some duplicates in the labels: eliminate them
     sorted(set(labels), key=lambda x: x[0])
@@ -398,6 +467,30 @@ def get_explicit_kpoints_path(value=None, cell=None, pbc=None, kpoint_distance=N
 def find_bravais_info(cell, pbc, epsilon_length=_default_epsilon_length,
                        epsilon_angle=_default_epsilon_angle):
     """
+    Finds the Bravais lattice of the cell passed in input to the Kpoint class.
+    The result is cached for the cell, the pbc and the thresholds, see
+    _find_bravais_info for the details.
+
+    :return: a dictionary, with keys short_name, extended_name, index
+            (index of the Bravais lattice), and sometimes variation (name of
+            the variation of the Bravais lattice) and extra (a dictionary
+            with extra parameters used by the get_kpoints_path method)
+    """
+    if cell is None:
+        return None
+
+    key = ('bravais_info',) + _get_cell_key(cell, pbc) + (epsilon_length, epsilon_angle)
+    bravais_info = _cell_analysis_cache.get(key)
+    if bravais_info is None:
+        bravais_info = _find_bravais_info(cell, pbc, epsilon_length=epsilon_length, epsilon_angle=epsilon_angle)
+        _cell_analysis_cache[key] = bravais_info
+
+    return copy.deepcopy(bravais_info)
+
+
+def _find_bravais_info(cell, pbc, epsilon_length=_default_epsilon_length,
+                       epsilon_angle=_default_epsilon_angle):
+    """
     Finds the Bravais lattice of the cell passed in input to the Kpoint class
     :note: We assume that the cell given by the cell property is the
     primitive unit cell.
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Batch conversion of many structures, in parallel.
+
+The source nodes are read from the database in batches, projecting only what the conversion needs (the attributes
+of a StructureData, the path of the file of a CifData) without loading the nodes. The conversions run in a pool of
+worker processes, and the nodes resulting from a batch are stored in a single transaction. Every result node is
+created by an InlineCalculation, whose inputs are the source node and the parameters of the conversion, and which is
+stored in the same transaction: the provenance of the result is in the graph. A batch conversion that was interrupted
+is resumed by running it again, as the source nodes that are already the input of such a calculation are skipped.
+"""
+import collections
+import time
+
+CIF_TO_STRUCTURE = 'cif_to_structure'
+STRUCTURE_TO_SYMMETRY = 'structure_to_symmetry'
+CONVERSIONS = (CIF_TO_STRUCTURE, STRUCTURE_TO_SYMMETRY)
+
+# The attribute of the InlineCalculation with the name of the conversion
+CONVERSION_ATTRIBUTE = 'batch_conversion'
+
+# The labels of the links from the source node to the InlineCalculation and from it to the result node
+LINK_LABELS = {
+    CIF_TO_STRUCTURE: ('cif', 'structure'),
+    STRUCTURE_TO_SYMMETRY: ('structure', 'symmetry'),
+}
+PARAMETERS_LINK_LABEL = 'parameters'
+
+# The result of the conversion of a source node: the pk of the new node, or of the node of a previous
+# conversion, whether it was created, and the error message if the source node could not be converted
+ConvertedNode = collections.namedtuple('ConvertedNode', ['source_pk', 'pk', 'created', 'error'])
+
+# The subset of the interface of StructureData needed by structure_to_spglib_tuple
+_SpglibStructure = collections.namedtuple('_SpglibStructure', ['cell', 'sites', 'kinds'])
+
+
+def _get_source_class(conversion):
+    if conversion == CIF_TO_STRUCTURE:
+        from aiida.orm.data.cif import CifData
+        return CifData
+    elif conversion == STRUCTURE_TO_SYMMETRY:
+        from aiida.orm.data.structure import StructureData
+        return StructureData
+    raise ValueError('invalid conversion {}, should be one of {}'.format(conversion, CONVERSIONS))
+
+
+def _format_error(exception):
+    return '{}: {}'.format(type(exception).__name__, exception)
+
+
+def get_symmetry_dataset(cell, pbc, sites, kinds, symprec=1e-5):
+    """
+    Find the symmetry of a structure with spglib. Sites of different kinds are never equivalent,
+    even if they are of the same element.
+
+    :param cell: the cell, as stored in the attributes of a StructureData
+    :param pbc: the three periodic boundary conditions
+    :param sites: the raw sites, as stored in the attributes of a StructureData
+    :param kinds: the raw kinds, as stored in the attributes of a StructureData
+    :param float symprec: the tolerance on the positions, in angstrom
+    :return: a dictionary with the space group number, the international and Hall symbols, the Hall number,
+        the point group, the Wyckoff letters and the equivalent atoms of the sites, and the tolerance
+
+    .. note:: requires spglib module.
+    """
+    import spglib
+    from aiida.orm.data.structure import Kind, Site
+    from aiida.tools.data.structure import structure_to_spglib_tuple
+
+    if not all(pbc):
+        raise ValueError('the symmetry can only be found for a structure periodic in the three directions')
+
+    structure = _SpglibStructure(cell, [Site(raw=site) for site in sites], [Kind(raw=kind) for kind in kinds])
+    spglib_tuple, _, _ = structure_to_spglib_tuple(structure)
+    dataset = spglib.get_symmetry_dataset(spglib_tuple, symprec=symprec)
+    if dataset is None:
+        raise ValueError('spglib could not find the symmetry: {}'.format(spglib.get_error_message()))
+
+    return {
+        'spacegroup_number': int(dataset['number']),
+        'international_symbol': str(dataset['international']),
+        'hall_symbol': str(dataset['hall']),
+        'hall_number': int(dataset['hall_number']),
+        'pointgroup': str(dataset['pointgroup']),
+        'wyckoffs': [str(letter) for letter in dataset['wyckoffs']],
+        'equivalent_atoms': [int(index) for index in dataset['equivalent_atoms']],
+        'symprec': symprec,
+    }
+
+
+def convert(args):
+    """
+    Convert the data of a source node. This is the task run by the worker processes, hence the single argument.
+
+    :param args: a tuple with the conversion, the pk of the source node, its data (the path of the file
+        for CIF_TO_STRUCTURE, the attributes for STRUCTURE_TO_SYMMETRY) and the keyword arguments of the conversion
+    :return: a tuple with the pk of the source node, the converted data (a pymatgen Structure or ASE Atoms,
+        or the symmetry dataset) and the error message, if it could not be converted
+    """
+    conversion, source_pk, data, kwargs = args
+    kwargs = dict(kwargs)
+
+    try:
+        if conversion == CIF_TO_STRUCTURE:
+            if kwargs.pop('converter', 'pymatgen') == 'pymatgen':
+                from aiida.orm.data.cif import get_pymatgen_structure_from_file
+                result = get_pymatgen_structure_from_file(data, **kwargs)
+            else:
+                from aiida.orm.data.cif import CifData
+                kwargs.pop('occupancy_tolerance', None)
+                kwargs.pop('site_tolerance', None)
+                with open(data) as handle:
+                    result = CifData.read_cif(handle, **kwargs)
+        else:
+            result = get_symmetry_dataset(*data, **kwargs)
+    except Exception as exception:  # pylint: disable=broad-except
+        # Any error of the conversion only concerns this node, which is reported
+        return source_pk, None, _format_error(exception)
+
+    return source_pk, result, None
+
+
+def get_source_data(conversion, source_pks):
+    """
+    Read from the database what the conversion needs of the source nodes, with a single query.
+
+    :param conversion: CIF_TO_STRUCTURE or STRUCTURE_TO_SYMMETRY
+    :param source_pks: a list of pks
+    :return: a dictionary mapping the pks of the nodes that were found to a tuple with their UUID and their data
+    """
+    import os
+    from aiida.common.folders import RepositoryFolder
+    from aiida.orm.querybuilder import QueryBuilder
+
+    source_class = _get_source_class(conversion)
+    if conversion == CIF_TO_STRUCTURE:
+        project = ['id', 'uuid', 'attributes.filename']
+    else:
+        project = ['id', 'uuid', 'attributes.cell', 'attributes.pbc1', 'attributes.pbc2', 'attributes.pbc3',
+                   'attributes.sites', 'attributes.kinds']
+
+    source_data = {}
+    if not source_pks:
+        return source_data
+
+    builder = QueryBuilder()
+    builder.append(source_class, filters={'id': {'in': list(source_pks)}}, project=project)
+    for row in builder.iterall():
+        pk, uuid = row[:2]
+        if conversion == CIF_TO_STRUCTURE:
+            folder = RepositoryFolder(section='node', uuid=uuid, subfolder=source_class._path_subfolder_name)  # pylint: disable=protected-access
+            data = os.path.join(folder.abspath, row[2])
+        else:
+            cell, pbc1, pbc2, pbc3, sites, kinds = row[2:]
+            data = (cell, (pbc1, pbc2, pbc3), sites, kinds)
+        source_data[pk] = (uuid, data)
+    return source_data
+
+
+def get_converted_pks(conversion, source_pks):
+    """
+    Find the nodes resulting from a previous conversion of the given source nodes, with a single query following
+    the links from the source nodes.
+
+    :param conversion: CIF_TO_STRUCTURE or STRUCTURE_TO_SYMMETRY
+    :param source_pks: a list of pks of source nodes
+    :return: a dictionary mapping the pks of the source nodes that were converted to the pk of the oldest result
+    """
+    from aiida.common.links import LinkType
+    from aiida.orm.calculation.inline import InlineCalculation
+    from aiida.orm.data import Data
+    from aiida.orm.querybuilder import QueryBuilder
+
+    pks = {}
+    if not source_pks:
+        return pks
+
+    input_label, output_label = LINK_LABELS[conversion]
+    builder = QueryBuilder()
+    builder.append(_get_source_class(conversion), filters={'id': {'in': list(source_pks)}}, project='id', tag='source')
+    builder.append(InlineCalculation, output_of='source', tag='calculation',
+                   filters={'attributes.{}'.format(CONVERSION_ATTRIBUTE): conversion},
+                   edge_filters={'type': LinkType.INPUT.value, 'label': input_label})
+    builder.append(Data, output_of='calculation', project='id',
+                   edge_filters={'type': LinkType.CREATE.value, 'label': output_label})
+    for source_pk, pk in builder.iterall():
+        if source_pk not in pks or pk < pks[source_pk]:
+            pks[source_pk] = pk
+    return pks
+
+
+def _load_nodes(node_class, pks):
+    """
+    Load the nodes with the given pks, with a single query.
+
+    :return: a dictionary mapping the pks to the nodes
+    """
+    from aiida.orm.querybuilder import QueryBuilder
+
+    builder = QueryBuilder()
+    builder.append(node_class, filters={'id': {'in': list(pks)}})
+    return {node.pk: node for node, in builder.iterall()}
+
+
+def _create_node(conversion, result, converter):
+    """
+    Create the unstored result node from the data converted by a worker.
+    """
+    if conversion == CIF_TO_STRUCTURE:
+        from aiida.orm.data.structure import StructureData
+        if converter == 'pymatgen':
+            return StructureData(pymatgen_structure=result)
+        return StructureData(ase=result)
+
+    from aiida.orm.data.parameter import ParameterData
+    return ParameterData(dict=result)
+
+
+def _create_calculation(conversion, source_node, parameters, node):
+    """
+    Create the unstored InlineCalculation recording the conversion of the source node into the unstored result node.
+    The source file of the conversion is not copied in the repository of every calculation, only its function name
+    and namespace are recorded.
+    """
+    from plumpy import ProcessState
+    from aiida.common.links import LinkType
+    from aiida.orm.calculation.inline import InlineCalculation
+
+    input_label, output_label = LINK_LABELS[conversion]
+    calculation = InlineCalculation()
+    calculation._set_function_name(convert.__name__)  # pylint: disable=protected-access
+    calculation._set_function_namespace(__name__)  # pylint: disable=protected-access
+    calculation._set_attr(CONVERSION_ATTRIBUTE, conversion)  # pylint: disable=protected-access
+    calculation._set_process_state(ProcessState.FINISHED)  # pylint: disable=protected-access
+    calculation._set_exit_status(0)  # pylint: disable=protected-access
+    calculation.add_link_from(source_node, label=input_label, link_type=LinkType.INPUT)
+    calculation.add_link_from(parameters, label=PARAMETERS_LINK_LABEL, link_type=LinkType.INPUT)
+    node.add_link_from(calculation, label=output_label, link_type=LinkType.CREATE)
+    calculation.seal()
+    return calculation
+
+
+def convert_batch(conversion, source_pks, pool=None, group=None, **kwargs):
+    """
+    Convert a batch of source nodes: read their data, skip those that were already converted, convert the others
+    (in the worker processes of the pool, if given) and store the result nodes in a single transaction.
+
+    :param conversion: CIF_TO_STRUCTURE or STRUCTURE_TO_SYMMETRY
+    :param source_pks: a list of pks of source nodes
+    :param pool: if given, the multiprocessing pool running the conversions
+    :param group: if given, the stored group to which the result nodes (new or previous) are added
+    :param kwargs: the keyword arguments of the conversion
+    :return: a list of ConvertedNode, in the same order
+    """
+    from aiida.backends.utils import store_nodes
+    from aiida.orm.data.parameter import ParameterData
+
+    source_data = get_source_data(conversion, source_pks)
+    converted_pks = get_converted_pks(conversion, source_data.keys())
+
+    tasks = []
+    for pk in collections.OrderedDict.fromkeys(source_pks):
+        if pk in source_data and pk not in converted_pks:
+            tasks.append((conversion, pk, source_data[pk][1], kwargs))
+
+    if pool is None:
+        converted = [convert(task) for task in tasks]
+    else:
+        converted = pool.map(convert, tasks)
+
+    errors = {}
+    new_nodes = collections.OrderedDict()
+    for pk, result, error in converted:
+        if error is not None:
+            errors[pk] = error
+            continue
+        try:
+            new_nodes[pk] = _create_node(conversion, result, kwargs.get('converter', 'pymatgen'))
+        except Exception as exception:  # pylint: disable=broad-except
+            errors[pk] = _format_error(exception)
+
+    created = set()
+    if new_nodes:
+        try:
+            # The parameters, then the calculations, are stored before the result nodes, which are linked to them
+            parameters = ParameterData(dict=kwargs)
+            source_nodes = _load_nodes(_get_source_class(conversion), new_nodes.keys())
+            calculations = [_create_calculation(conversion, source_nodes[pk], parameters, node)
+                            for pk, node in new_nodes.iteritems()]
+            pks = store_nodes([parameters] + calculations + new_nodes.values())
+            converted_pks.update(zip(new_nodes.keys(), pks[1 + len(calculations):]))
+            created.update(new_nodes)
+        except Exception as exception:  # pylint: disable=broad-except
+            # Nothing of the batch was stored
+            for pk in new_nodes:
+                errors[pk] = 'the batch could not be stored: {}'.format(_format_error(exception))
+
+    results = []
+    for pk in source_pks:
+        error = errors.get(pk)
+        if pk not in source_data:
+            error = 'no {} with this pk was found'.format(_get_source_class(conversion).__name__)
+        if error is not None:
+            results.append(ConvertedNode(pk, None, False, error))
+        else:
+            results.append(ConvertedNode(pk, converted_pks[pk], pk in created, None))
+            # A source node given twice is converted only once
+            created.discard(pk)
+
+    if group is not None:
+        group.add_nodes(set(result.pk for result in results if result.pk is not None))
+
+    return results
+
+
+def _get_pks(nodes):
+    """
+    Return the list of pks of nodes given either as a list of pks or as a QueryBuilder.
+    """
+    from aiida.orm.node import Node
+    from aiida.orm.querybuilder import QueryBuilder
+
+    if not isinstance(nodes, QueryBuilder):
+        return list(nodes)
+    return [row[0].pk if isinstance(row[0], Node) else row[0] for row in nodes.iterall()]
+
+
+def convert_nodes(conversion, nodes, group=None, num_workers=1, batch_size=1000, progress=None, **kwargs):
+    """
+    Convert many nodes, in parallel, creating a new node for every source node that was not converted yet.
+
+    For CIF_TO_STRUCTURE, the CifData nodes are converted to StructureData nodes. The keyword arguments are those
+    of :py:meth:`aiida.orm.data.cif.CifData._get_aiida_structure`: ``converter`` ('pymatgen', the default, or
+    'ase'), ``primitive_cell``, ``occupancy_tolerance`` and ``site_tolerance``.
+
+    For STRUCTURE_TO_SYMMETRY, the symmetry of the StructureData nodes is found with spglib and stored in
+    ParameterData nodes, see :py:func:`get_symmetry_dataset`. The keyword argument is ``symprec``.
+
+    :param conversion: CIF_TO_STRUCTURE or STRUCTURE_TO_SYMMETRY
+    :param nodes: a list of pks, or a QueryBuilder whose first projection is the source nodes or their pks
+        (projecting the pks, with ``project='id'``, avoids loading the nodes)
+    :param group: if given, the stored group to which the result nodes (new or previous) are added
+    :param int num_workers: the number of worker processes; with 1, all the nodes are converted in this process
+    :param int batch_size: the number of nodes read, converted and stored at a time
+    :param progress: a callable that is called after each batch with the list of ConvertedNode of the batch,
+        the number of nodes processed so far and the elapsed time in seconds
+    :param kwargs: the keyword arguments of the conversion
+    :return: a list of ConvertedNode, in the order of the nodes
+    """
+    from multiprocessing import Pool
+    from aiida.backends.utils import close_connections
+    from aiida.common.utils import grouper
+
+    _get_source_class(conversion)
+    source_pks = _get_pks(nodes)
+    results = []
+    start = time.time()
+
+    pool = None
+    if num_workers > 1:
+        # The workers do not use the database, but must not inherit the connections of this process
+        close_connections()
+        pool = Pool(num_workers)
+
+    try:
+        for batch in grouper(batch_size, source_pks):
+            batch_results = convert_batch(conversion, list(batch), pool=pool, group=group, **kwargs)
+            results.extend(batch_results)
+            if progress is not None:
+                progress(batch_results, len(results), time.time() - start)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return results
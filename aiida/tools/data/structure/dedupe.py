@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Find the duplicates among all the structures of the database.
+
+The fingerprints of the structures (see :py:func:`aiida.orm.data.structure.get_structure_fingerprint`)
+are stored in their extras when they are stored; the structures stored before are fingerprinted first,
+in batches. Only the structures with the same composition and a similar volume per site, that is with
+the same or a neighbouring fingerprint, are then compared with each other, reading their attributes
+with one query per batch.
+"""
+import collections
+import itertools
+import time
+
+
+def _get_fingerprints():
+    """
+    :return: a dictionary mapping the pks of all the structures to their stored fingerprints, which is None
+        for the structures that were stored before the fingerprints (or have none)
+    """
+    from aiida.orm.data.structure import StructureData, FINGERPRINT_EXTRA_KEY
+    from aiida.orm.querybuilder import QueryBuilder
+
+    builder = QueryBuilder()
+    builder.append(StructureData, project=['id', 'extras.{}'.format(FINGERPRINT_EXTRA_KEY)])
+    return dict(builder.iterall(batch_size=10000, stream=True))
+
+
+def _iter_attributes(pks, batch_size):
+    """
+    Yield the pk, cell, periodic boundary conditions, sites and kinds of the structures, with one query per batch.
+    """
+    from aiida.common.utils import grouper
+    from aiida.orm.data.structure import StructureData
+    from aiida.orm.querybuilder import QueryBuilder
+
+    for batch in grouper(batch_size, pks):
+        builder = QueryBuilder()
+        builder.append(StructureData, filters={'id': {'in': list(batch)}}, project=[
+            'id', 'attributes.cell', 'attributes.pbc1', 'attributes.pbc2', 'attributes.pbc3', 'attributes.sites',
+            'attributes.kinds'
+        ])
+        for pk, cell, pbc1, pbc2, pbc3, sites, kinds in builder.all():
+            yield pk, cell, (pbc1, pbc2, pbc3), sites, kinds
+
+
+def set_fingerprints(pks, batch_size=1000):
+    """
+    Compute and store the fingerprints of structures, with one bulk update per batch.
+
+    :param pks: the pks of the structures
+    :param int batch_size: the number of structures read and updated at a time
+    :return: a dictionary mapping the pks to the fingerprints, which are None (and are not stored)
+        for the structures that are not periodic in three dimensions or have no sites
+    """
+    from aiida.backends.utils import set_extra_for_nodes
+    from aiida.common.utils import grouper
+    from aiida.orm.data.structure import get_structure_fingerprint, FINGERPRINT_EXTRA_KEY
+
+    fingerprints = {}
+    for batch in grouper(batch_size, _iter_attributes(pks, batch_size)):
+        batch_fingerprints = {pk: get_structure_fingerprint(cell, pbc, sites, kinds)
+                              for pk, cell, pbc, sites, kinds in batch}
+        fingerprints.update(batch_fingerprints)
+        set_extra_for_nodes(FINGERPRINT_EXTRA_KEY, {pk: fingerprint for pk, fingerprint in
+                                                    batch_fingerprints.iteritems() if fingerprint is not None})
+    return fingerprints
+
+
+def _find_duplicates_of_composition(pks, volume_ranges, data, **tolerances):
+    """
+    Find the equivalent structures among structures of the same composition, comparing each structure
+    in the order of the pks with the first structure of each set found so far in a neighbouring volume range.
+
+    :return: a list of the sets of equivalent structures, as lists of pks
+    """
+    from aiida.orm.data.structure import are_equivalent_structures
+
+    first_pks = collections.defaultdict(list)
+    duplicates = collections.OrderedDict()
+    for pk in sorted(pks):
+        volume_range = volume_ranges[pk]
+        neighbours = itertools.chain(*[first_pks[volume_range + offset] for offset in (-1, 0, 1)])
+        for first_pk in neighbours:
+            if are_equivalent_structures(data[first_pk], data[pk], **tolerances):
+                duplicates[first_pk].append(pk)
+                break
+        else:
+            first_pks[volume_range].append(pk)
+            duplicates[pk] = [pk]
+
+    return [equivalent_pks for equivalent_pks in duplicates.itervalues() if len(equivalent_pks) > 1]
+
+
+def _group_in_batches(groups, batch_size):
+    """
+    Yield lists of consecutive groups of pks with at least batch_size pks in total (except the last one).
+    """
+    batch = []
+    for group in groups:
+        batch.append(group)
+        if sum(len(pks) for pks in batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def find_duplicates(length_tolerance=None, angle_tolerance=None, batch_size=1000, progress=None):
+    """
+    Find the sets of equivalent structures among all the structures, see
+    :py:func:`aiida.orm.data.structure.are_equivalent_structures`.
+    The structures without a fingerprint are fingerprinted first.
+
+    :param float length_tolerance: the tolerance on the lengths of the cell vectors and on the
+        positions of the sites, in angstrom
+    :param float angle_tolerance: the tolerance on the angles of the cell, in degrees
+    :param int batch_size: the number of structures read (and fingerprinted) at a time
+    :param progress: a callable that is called after the fingerprinting and after each batch of compared
+        structures with the number of structures processed so far, the total number and the elapsed time in seconds
+    :return: a list of the sets of equivalent structures, as lists of pks sorted from the oldest
+    """
+    from aiida.orm.data.structure import get_equivalence_data, get_neighbour_fingerprints
+
+    tolerances = {}
+    if length_tolerance is not None:
+        tolerances['length_tolerance'] = length_tolerance
+    if angle_tolerance is not None:
+        tolerances['angle_tolerance'] = angle_tolerance
+
+    start = time.time()
+    fingerprints = _get_fingerprints()
+    fingerprints.update(set_fingerprints([pk for pk, fingerprint in fingerprints.iteritems() if fingerprint is None],
+                                         batch_size=batch_size))
+    if progress is not None:
+        progress(0, len(fingerprints), time.time() - start)
+
+    pks_by_fingerprint = collections.defaultdict(list)
+    for pk, fingerprint in fingerprints.iteritems():
+        if fingerprint is not None:
+            pks_by_fingerprint[fingerprint].append(pk)
+
+    # Only the structures with a neighbouring fingerprint of another structure need to be compared
+    compositions = collections.defaultdict(list)
+    volume_ranges = {}
+    for fingerprint, pks in pks_by_fingerprint.iteritems():
+        if sum(len(pks_by_fingerprint.get(other, [])) for other in get_neighbour_fingerprints(fingerprint)) > 1:
+            composition, volume_range = fingerprint.rsplit(':', 1)
+            compositions[composition].extend(pks)
+            volume_ranges.update((pk, int(volume_range)) for pk in pks)
+
+    duplicates = []
+    nprocessed = len(fingerprints) - len(volume_ranges)
+    # The structures of the same composition are compared with each other, hence read in the same batch
+    for batch in _group_in_batches(sorted(compositions.itervalues()), batch_size):
+        data = {pk: get_equivalence_data(cell, pbc, sites, kinds) for pk, cell, pbc, sites, kinds in
+                _iter_attributes(list(itertools.chain(*batch)), batch_size)}
+        for pks in batch:
+            duplicates.extend(_find_duplicates_of_composition(pks, volume_ranges, data, **tolerances))
+            nprocessed += len(pks)
+        if progress is not None:
+            progress(nprocessed, len(fingerprints), time.time() - start)
+
+    return sorted(duplicates)
@@ -26,9 +26,50 @@ import subprocess
 import StringIO
 import glob
 
+import click
+
 from aiida.transport import cli as transport_cli
 from aiida.transport.transport import Transport, TransportInternalError
 
+# Ways in which the local transport can copy the content of files:
+# - 'copy': plain copy of the data
+# - 'reflink': copy-on-write clone, sharing the data blocks until either file is modified (e.g. on Btrfs or XFS)
+# - 'hardlink': new directory entry for the same file, the data is shared also when it is modified
+LINK_MODES = ('copy', 'reflink', 'hardlink')
+
+# Linux ioctl request cloning the content of a file into another one
+_FICLONE = 0x40049409
+
+
+def reflink_file(source, destination):
+    """
+    Clone the content of the source file into the destination file (copy-on-write).
+
+    :param source: path of the source file
+    :param destination: path of the destination file, created or overwritten
+    :raise IOError: if the file cannot be cloned, e.g. because the filesystem does not support it or
+        source and destination are on different filesystems
+    """
+    import fcntl
+
+    with open(source, 'rb') as source_handle, open(destination, 'wb') as destination_handle:
+        fcntl.ioctl(destination_handle.fileno(), _FICLONE, source_handle.fileno())
+
+
+def hardlink_file(source, destination):
+    """
+    Create a hard link to the source file at the destination, replacing an existing destination file.
+    If the source is a symbolic link, the link is to the file it points to, as its copy would be.
+
+    :param source: path of the source file
+    :param destination: path of the destination file
+    :raise OSError: if the link cannot be created, e.g. because source and destination are on different filesystems
+    """
+    if os.path.lexists(destination):
+        os.remove(destination)
+    # os.link does not follow symbolic links on Linux
+    os.link(os.path.realpath(source), destination)
+
 
 # refactor or raise the limit: issue #1784
 # pylint: disable=too-many-public-methods
@@ -41,14 +82,26 @@ class LocalTransport(Transport):
     with a ``prepend_text``. For example, the AiiDA daemon sets a ``PYTHONPATH``, so you might want to add
     ``unset PYTHONPATH`` if you plan on running calculations that use Python.
     """
-    # There are no valid parameters for the local transport
-    _valid_auth_options = []
+    _valid_auth_options = [
+        ('link_mode', {
+            'type': click.Choice(LINK_MODES),
+            'prompt': 'File copy mode',
+            'help': "how files are copied when the source and the destination are on the same filesystem: "
+                    "'copy' (plain copy), 'reflink' (copy-on-write clone) or 'hardlink'. Files that cannot be linked "
+                    "or cloned are copied. With hard links, the files are shared with the repository and with the "
+                    "working directories they are copied from: only use them for codes that do not modify their "
+                    "input files in place.",
+            'non_interactive_default': True
+        }),
+    ]
 
     # There is no real limit on how fast you can connect to localhost
     # you should not be banned (as instead it is the case in SSH).
     # So I set the (default) limit to zero.
     _DEFAULT_SAFE_OPEN_INTERVAL = 0.
 
+    _DEFAULT_LINK_MODE = 'copy'
+
     def __init__(self, **kwargs):
         super(LocalTransport, self).__init__()
 
@@ -62,6 +115,10 @@ class LocalTransport(Transport):
         if self._machine and self._machine != 'localhost':
             self.logger.debug('machine was passed, but it is not localhost')
         self._safe_open_interval = kwargs.pop('safe_interval', self._DEFAULT_SAFE_OPEN_INTERVAL)
+        self._link_mode = kwargs.pop('link_mode', self._DEFAULT_LINK_MODE)
+        if self._link_mode not in LINK_MODES:
+            raise ValueError("Invalid link_mode '{}' for LocalTransport, valid values are: {}".format(
+                self._link_mode, ', '.join(LINK_MODES)))
         if kwargs:
             raise ValueError("Input parameters to LocalTransport" " are not recognized")
 
@@ -338,7 +395,7 @@ class LocalTransport(Transport):
         if os.path.exists(the_destination) and not overwrite:
             raise OSError('Destination already exists: not overwriting it')
 
-        shutil.copyfile(localpath, the_destination)
+        self._copy_file(localpath, the_destination)
 
     def puttree(self, localpath, remotepath, *args, **kwargs):
         """
@@ -379,7 +436,7 @@ class LocalTransport(Transport):
 
         the_destination = os.path.join(self.curdir, remotepath)
 
-        shutil.copytree(localpath, the_destination, symlinks=not dereference)
+        self._copy_tree(localpath, the_destination, symlinks=not dereference)
 
     def rmtree(self, path):
         """
@@ -496,7 +553,7 @@ class LocalTransport(Transport):
         if os.path.exists(localpath) and not overwrite:
             raise OSError('Destination already exists: not overwriting it')
 
-        shutil.copyfile(the_source, localpath)
+        self._copy_file(the_source, localpath)
 
     def gettree(self, remotepath, localpath, *args, **kwargs):
         """
@@ -534,7 +591,7 @@ class LocalTransport(Transport):
             localpath = os.path.join(localpath, os.path.split(remotepath)[1])
 
         the_source = os.path.join(self.curdir, remotepath)
-        shutil.copytree(the_source, localpath, symlinks=not dereference)
+        self._copy_tree(the_source, localpath, symlinks=not dereference)
 
     # please refactor: issue #1780 on github
     # pylint: disable=too-many-branches
@@ -582,8 +639,8 @@ class LocalTransport(Transport):
                 # If s is an absolute path, then the_s = s
                 the_s = os.path.join(self.curdir, source)
                 if self.isfile(source):
-                    # With shutil, use the full path (the_s)
-                    shutil.copy(the_s, the_destination)
+                    # With _copy, use the full path (the_s)
+                    self._copy(the_s, the_destination)
                 else:
                     # With self.copytree, the (possible) relative path is OK
                     self.copytree(source, remotedestination, dereference)
@@ -592,8 +649,8 @@ class LocalTransport(Transport):
             # If s is an absolute path, then the_source = remotesource
             the_source = os.path.join(self.curdir, remotesource)
             if self.isfile(remotesource):
-                # With shutil, use the full path (the_source)
-                shutil.copy(the_source, the_destination)
+                # With _copy, use the full path (the_source)
+                self._copy(the_source, the_destination)
             else:
                 # With self.copytree, the (possible) relative path is OK
                 self.copytree(remotesource, remotedestination, dereference)
@@ -618,7 +675,7 @@ class LocalTransport(Transport):
         if not os.path.exists(the_source):
             raise OSError("Source not found")
 
-        shutil.copyfile(the_source, the_destination)
+        self._copy_file(the_source, the_destination)
 
     def copytree(self, remotesource, remotedestination, *args, **kwargs):
         """
@@ -646,7 +703,62 @@ class LocalTransport(Transport):
         if self.isdir(remotedestination):
             the_destination = os.path.join(the_destination, os.path.split(remotesource)[1])
 
-        shutil.copytree(the_source, the_destination, symlinks=not dereference)
+        self._copy_tree(the_source, the_destination, symlinks=not dereference)
+
+    def _copy_file(self, source, destination):
+        """
+        Copy the content of the source file to the destination file, as shutil.copyfile, linking or cloning it
+        according to the link mode of the transport. If this is not possible, the file is copied.
+
+        :param source: absolute path of the source file
+        :param destination: absolute path of the destination file
+        """
+        if self._link_mode != 'copy' and not (os.path.exists(destination) and os.path.samefile(source, destination)):
+            try:
+                if self._link_mode == 'hardlink':
+                    hardlink_file(source, destination)
+                else:
+                    reflink_file(source, destination)
+                return
+            except (IOError, OSError) as exception:
+                self.logger.debug("Unable to {} '{}' to '{}', copying it instead: {}".format(
+                    self._link_mode, source, destination, exception))
+
+        shutil.copyfile(source, destination)
+
+    def _copy(self, source, destination):
+        """
+        Copy a file as shutil.copy, i.e. also in a destination folder and with its permissions, with _copy_file.
+        """
+        if os.path.isdir(destination):
+            destination = os.path.join(destination, os.path.basename(source))
+        self._copy_file(source, destination)
+        shutil.copymode(source, destination)
+
+    def _copy_tree(self, source, destination, symlinks=False):
+        """
+        Copy a folder recursively as shutil.copytree, copying the files with _copy_file.
+
+        :param source: absolute path of the source folder
+        :param destination: absolute path of the destination folder, which must not exist
+        :param symlinks: if True, symbolic links are copied as such, otherwise the content they point to is copied
+        """
+        if self._link_mode == 'copy':
+            shutil.copytree(source, destination, symlinks=symlinks)
+            return
+
+        os.makedirs(destination)
+        for name in os.listdir(source):
+            source_name = os.path.join(source, name)
+            destination_name = os.path.join(destination, name)
+            if symlinks and os.path.islink(source_name):
+                os.symlink(os.readlink(source_name), destination_name)
+            elif os.path.isdir(source_name):
+                self._copy_tree(source_name, destination_name, symlinks)
+            else:
+                self._copy_file(source_name, destination_name)
+                shutil.copystat(source_name, destination_name)
+        shutil.copystat(source, destination)
 
     def get_attribute(self, path):
         """
@@ -870,5 +982,9 @@ class LocalTransport(Transport):
     def _get_safe_interval_suggestion_string(cls, computer):
         return cls._DEFAULT_SAFE_OPEN_INTERVAL
 
+    @classmethod
+    def _get_link_mode_suggestion_string(cls, computer):  # pylint: disable=unused-argument
+        return cls._DEFAULT_LINK_MODE
+
 
 CONFIGURE_LOCAL_CMD = transport_cli.create_configure_cmd('local')
@@ -57,6 +57,11 @@ class SshTransport(aiida.transport.Transport):
     """
     Support connection, command execution and data transfer to remote computers via SSH+SFTP.
     """
+    # Maximum length of the commands generated by rmtree_many, copy_many and symlink_many. The whole command is passed
+    # (escaped once more) as a single argument to 'bash -c', and on Linux a single argument
+    # cannot be longer than 128 KiB (MAX_ARG_STRLEN), so we stay well below this limit
+    _MAX_COMMAND_LENGTH = 65536
+
     # Valid keywords accepted by the connect method of paramiko.SSHClient
     # I disable 'password' and 'pkey' to avoid these data to get logged in the
     # aiida log file.
@@ -693,6 +698,64 @@ class SshTransport(aiida.transport.Transport):
                               "stderr: '{}'".format(retval, stdout, stderr))
             raise IOError("Error while executing rm. Exit code: {}".format(retval))
 
+    def rmtree_many(self, paths):
+        """
+        Remove files or directories at the given paths, recursively, with as
+        few 'rm -r -f' commands as possible. The paths are split over several
+        commands such that each command stays below _MAX_COMMAND_LENGTH
+        characters, well within the argument length limit of the remote shell.
+        If a command fails, its paths are removed again one at a time, to find
+        those that cannot be removed.
+
+        :param paths: a list of remote paths to delete
+        :return: the list of the paths whose removal failed; the others were removed
+        """
+        rm_command = 'rm -r -f'
+
+        escaped_paths = {}
+        for path in paths:
+            if not path:
+                raise ValueError('Input to rmtree_many() must be a list of non empty strings. '
+                                 'Found instead %s as path' % path)
+            escaped_paths[path] = escape_for_bash(path)
+
+        commands = []
+        arguments = []
+        length = len(rm_command)
+        for path in paths:
+            escaped_path = escaped_paths[path]
+            if arguments and length + len(escaped_path) + 1 > self._MAX_COMMAND_LENGTH:
+                commands.append(arguments)
+                arguments = []
+                length = len(rm_command)
+            arguments.append(path)
+            length += len(escaped_path) + 1
+        if arguments:
+            commands.append(arguments)
+
+        failed = []
+        for arguments in commands:
+            command = '{} {}'.format(rm_command, ' '.join(escaped_paths[path] for path in arguments))
+            retval, stdout, stderr = self.exec_command_wait(command)
+
+            if retval == 0:
+                if stderr.strip():
+                    self.logger.warning("There was nonempty stderr in the rm " "command: {}".format(stderr))
+                continue
+
+            self.logger.error("Problem executing rm. Exit code: {}, stdout: '{}', "
+                              "stderr: '{}'".format(retval, stdout, stderr))
+            if len(arguments) == 1:
+                failed.extend(arguments)
+                continue
+            # Find the paths that cannot be removed
+            for path in arguments:
+                retval, stdout, stderr = self.exec_command_wait('{} {}'.format(rm_command, escaped_paths[path]))
+                if retval != 0:
+                    failed.append(path)
+
+        return failed
+
     def rmdir(self, path):
         """
         Remove the folder named 'path' if empty.
@@ -1176,6 +1239,64 @@ class SshTransport(aiida.transport.Transport):
                           "stdout: '{}', stderr: '{}', "
                           "command: '{}'".format(retval, stdout, stderr, command))
 
+    def _exec_chained_commands(self, commands, name):
+        """
+        Execute the given commands chained with '&&', with as few executions as
+        possible, each one staying below _MAX_COMMAND_LENGTH characters.
+
+        :param commands: a list of commands
+        :param name: the name of the executable, for the error messages
+        :raise IOError: if any of the commands failed; the following ones are not executed
+        """
+        chains = []
+        chain = []
+        length = 0
+        for command in commands:
+            if chain and length + len(command) + 4 > self._MAX_COMMAND_LENGTH:
+                chains.append(chain)
+                chain = []
+                length = 0
+            chain.append(command)
+            length += len(command) + 4
+        if chain:
+            chains.append(chain)
+
+        for chain in chains:
+            command = ' && '.join(chain)
+            retval, stdout, stderr = self.exec_command_wait(command)
+
+            if retval == 0:
+                if stderr.strip():
+                    self.logger.warning("There was nonempty stderr in the {} " "command: {}".format(name, stderr))
+            else:
+                self.logger.error("Problem executing {}. Exit code: {}, stdout: '{}', "
+                                  "stderr: '{}', command: '{}'".format(name, retval, stdout, stderr, command))
+                raise IOError("Error while executing {}. Exit code: {}, "
+                              "stdout: '{}', stderr: '{}', "
+                              "command: '{}'".format(name, retval, stdout, stderr, command))
+
+    def copy_many(self, sources_destinations):
+        """
+        Copy each of the given sources to its destination, with as few remote
+        commands as possible. The sources containing patterns are copied with copy.
+
+        :param sources_destinations: a list of (source, destination) tuples
+        :raise IOError: if any of the copies failed
+        """
+        commands = []
+        for source, destination in sources_destinations:
+            if not source or not destination:
+                raise ValueError('Input to copy_many() must be a list of pairs of non empty strings. '
+                                 'Found instead {} -> {}'.format(source, destination))
+            if self.has_magic(source) or self.has_magic(destination):
+                self._exec_chained_commands(commands, 'cp')
+                commands = []
+                self.copy(source, destination)
+            else:
+                commands.append('cp -r -f {} {}'.format(escape_for_bash(source), escape_for_bash(destination)))
+
+        self._exec_chained_commands(commands, 'cp')
+
     def _local_listdir(self, path, pattern=None):
         """
         Acts on the local folder, for the rest, same as listdir
@@ -1412,6 +1533,27 @@ class SshTransport(aiida.transport.Transport):
         else:
             self.sftp.symlink(s, d)
 
+    def symlink_many(self, sources_destinations):
+        """
+        Create a symbolic link to each of the given sources at its destination,
+        with as few remote commands as possible. The sources containing patterns
+        are linked with symlink.
+
+        :param sources_destinations: a list of (source, destination) tuples
+        :raise IOError: if the creation of any of the links failed
+        """
+        commands = []
+        for source, destination in sources_destinations:
+            if self.has_magic(source):
+                self._exec_chained_commands(commands, 'ln')
+                commands = []
+                self.symlink(source, destination)
+            else:
+                commands.append('ln -s {} {}'.format(
+                    escape_for_bash(os.path.normpath(source)), escape_for_bash(os.path.normpath(destination))))
+
+        self._exec_chained_commands(commands, 'ln')
+
     def path_exists(self, path):
         """
         Check if path exists
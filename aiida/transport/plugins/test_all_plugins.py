@@ -229,6 +229,95 @@ class TestDirectoryManipulation(unittest.TestCase):
             t.chdir('..')
             t.rmdir(directory)
 
+    @run_for_all_plugins
+    def test_rmtree_many(self, custom_transport):
+        """
+        Verify the functioning of rmtree_many command
+        """
+        # Imports required later
+        import random
+        import string
+        import os
+
+        with custom_transport as t:
+            location = t.normalize(os.path.join('/', 'tmp'))
+            directory = 'temp_dir_test'
+            t.chdir(location)
+
+            while t.isdir(directory):
+                # I append a random letter/number until it is unique
+                directory += random.choice(string.ascii_uppercase + string.digits)
+            t.mkdir(directory)
+            t.chdir(directory)
+
+            # Force the removal to be split over several commands, where this applies
+            t._MAX_COMMAND_LENGTH = 64
+
+            folders = [os.path.join(t.getcwd(), 'folder {}'.format(i), 'sub') for i in range(10)]
+            for folder in folders:
+                t.makedirs(folder)
+            local_file_name = os.path.join(t.getcwd(), 'file.txt')
+            with open(local_file_name, 'w') as f:
+                f.write('Viva Verdi\n')
+
+            # Non-existing paths are ignored
+            paths = [os.path.dirname(folder) for folder in folders] + [local_file_name, 'non_existing']
+            self.assertEquals(t.rmtree_many(paths), [])
+            self.assertEquals(t.listdir(), [])
+
+            t.chdir('..')
+            t.rmdir(directory)
+
+    @run_for_all_plugins
+    def test_copy_symlink_many(self, custom_transport):
+        """
+        Verify the functioning of the copy_many and symlink_many commands
+        """
+        # Imports required later
+        import random
+        import string
+        import os
+
+        with custom_transport as t:
+            location = t.normalize(os.path.join('/', 'tmp'))
+            directory = 'temp_dir_test'
+            t.chdir(location)
+
+            while t.isdir(directory):
+                # I append a random letter/number until it is unique
+                directory += random.choice(string.ascii_uppercase + string.digits)
+            t.mkdir(directory)
+            t.chdir(directory)
+
+            # Force the operations to be split over several commands, where this applies
+            t._MAX_COMMAND_LENGTH = 64
+
+            t.makedirs(os.path.join('source', 'sub'))
+            for i in range(5):
+                with open(os.path.join(t.getcwd(), 'source', 'file {}.txt'.format(i)), 'w') as f:
+                    f.write('Viva Verdi {}\n'.format(i))
+
+            t.mkdir('copies')
+            t.copy_many([(os.path.join(t.getcwd(), 'source', 'file {}.txt'.format(i)), 'copies/copy {}.txt'.format(i))
+                         for i in range(5)] + [(os.path.join(t.getcwd(), 'source', 'sub'), 'copies/sub')])
+            self.assertEquals(sorted(t.listdir('copies')),
+                              ['copy {}.txt'.format(i) for i in range(5)] + ['sub'])
+            self.assertTrue(t.isdir('copies/sub'))
+
+            t.mkdir('links')
+            t.symlink_many([(os.path.join(t.getcwd(), 'source', 'file {}.txt'.format(i)), 'links/link {}.txt'.format(i))
+                            for i in range(5)])
+            self.assertEquals(sorted(t.listdir('links')), ['link {}.txt'.format(i) for i in range(5)])
+            with open(os.path.join(t.getcwd(), 'links', 'link 3.txt')) as f:
+                self.assertEquals(f.read(), 'Viva Verdi 3\n')
+
+            # The copy of a non-existing source fails
+            with self.assertRaises((IOError, OSError)):
+                t.copy_many([('non_existing', 'copies/other')])
+
+            t.chdir('..')
+            t.rmtree(directory)
+
     @run_for_all_plugins
     def test_listdir(self, custom_transport):
         """
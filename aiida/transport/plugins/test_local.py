@@ -7,6 +7,7 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+import os
 import unittest
 
 from aiida.transport.plugins.local import *
@@ -49,5 +50,117 @@ class TestBasicConnection(unittest.TestCase):
             pass
 
 
+class TestLinkMode(unittest.TestCase):
+    """
+    Test the copies of files as hard links and copy-on-write clones.
+    """
+
+    def setUp(self):
+        import tempfile
+
+        self.folder = tempfile.mkdtemp()
+        self.source = os.path.join(self.folder, 'source')
+        os.mkdir(self.source)
+        with open(os.path.join(self.source, 'file.txt'), 'w') as handle:
+            handle.write('Viva Verdi\n')
+        os.mkdir(os.path.join(self.source, 'sub'))
+        with open(os.path.join(self.source, 'sub', 'other.txt'), 'w') as handle:
+            handle.write('Viva Verdi again\n')
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.folder)
+
+    def test_invalid_link_mode(self):
+        with self.assertRaises(ValueError):
+            LocalTransport(link_mode='symlink')
+
+    def test_hardlink(self):
+        source_file = os.path.join(self.source, 'file.txt')
+        with LocalTransport(link_mode='hardlink') as t:
+            t.chdir(self.folder)
+            t.put(source_file, 'put.txt')
+            t.get('put.txt', os.path.join(self.folder, 'got.txt'))
+            t.copy('source', 'copied')
+            # An existing file is replaced
+            t.copyfile('source/sub/other.txt', 'put.txt')
+
+        self.assertEquals(os.stat(source_file).st_nlink, 3)
+        self.assertTrue(os.path.samefile(source_file, os.path.join(self.folder, 'got.txt')))
+        self.assertTrue(os.path.samefile(source_file, os.path.join(self.folder, 'copied', 'file.txt')))
+        self.assertTrue(os.path.samefile(os.path.join(self.source, 'sub', 'other.txt'),
+                                         os.path.join(self.folder, 'put.txt')))
+
+    def test_hardlink_symlink(self):
+        """
+        A symbolic link is linked to the file it points to, unless the symbolic links are copied as such
+        """
+        source_file = os.path.join(self.source, 'file.txt')
+        os.symlink('file.txt', os.path.join(self.source, 'link.txt'))
+        with LocalTransport(link_mode='hardlink') as t:
+            t.chdir(self.folder)
+            t.copyfile('source/link.txt', 'copied.txt')
+            t.copytree('source', 'dereferenced', dereference=True)
+            t.copytree('source', 'symlinks')
+
+        for path in ['copied.txt', os.path.join('dereferenced', 'link.txt')]:
+            self.assertFalse(os.path.islink(os.path.join(self.folder, path)))
+            self.assertTrue(os.path.samefile(source_file, os.path.join(self.folder, path)))
+        self.assertEquals(os.readlink(os.path.join(self.folder, 'symlinks', 'link.txt')), 'file.txt')
+
+    def test_reflink(self):
+        # Clones are only possible on some filesystems: otherwise the files are copied
+        with LocalTransport(link_mode='reflink') as t:
+            t.chdir(self.folder)
+            t.copytree('source', 'copied')
+            t.copy('source/file.txt', 'copied/sub')
+
+        source_file = os.path.join(self.source, 'file.txt')
+        for path in [os.path.join('copied', 'file.txt'), os.path.join('copied', 'sub', 'file.txt')]:
+            copied = os.path.join(self.folder, path)
+            self.assertFalse(os.path.samefile(source_file, copied))
+            with open(copied) as handle:
+                self.assertEquals(handle.read(), 'Viva Verdi\n')
+        with open(os.path.join(self.folder, 'copied', 'sub', 'other.txt')) as handle:
+            self.assertEquals(handle.read(), 'Viva Verdi again\n')
+
+
+class TestRmtreeMany(unittest.TestCase):
+    """
+    Test that the paths that cannot be removed are reported one by one.
+    """
+
+    def test_failed_paths(self):
+        import mock
+        import shutil
+        import tempfile
+        from aiida.orm.utils.remote import clean_remote_many
+
+        folder = tempfile.mkdtemp()
+        try:
+            paths = [os.path.join(folder, str(index)) for index in range(4)]
+            for path in paths:
+                os.mkdir(path)
+
+            original_rmtree = LocalTransport.rmtree
+
+            def rmtree(transport, path):
+                if path == paths[1]:
+                    raise IOError('Permission denied')
+                original_rmtree(transport, path)
+
+            with mock.patch.object(LocalTransport, 'rmtree', rmtree):
+                with LocalTransport() as t:
+                    self.assertEquals(t.rmtree_many(paths[:2]), [paths[1]])
+                    cleaned = []
+                    self.assertEquals(clean_remote_many(t, paths[1:], chunk_size=2, callback=cleaned.append),
+                                      paths[2:])
+
+            self.assertEquals(cleaned, [[paths[2]], [paths[3]]])
+            self.assertEquals(os.listdir(folder), ['1'])
+        finally:
+            shutil.rmtree(folder)
+
 if __name__ == '__main__':
     unittest.main()
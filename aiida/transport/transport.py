@@ -604,6 +604,48 @@ class Transport(object):
         """
         raise NotImplementedError
 
+    def rmtree_many(self, paths):
+        """
+        Remove recursively the content at each of the given paths.
+        Plugins can override this to remove many paths with few round-trips;
+        by default, rmtree is called on each path.
+
+        :param paths: a list of absolute paths to remove
+        :return: the list of the paths whose removal failed; the others were removed
+        """
+        failed = []
+        for path in paths:
+            try:
+                self.rmtree(path)
+            except (IOError, OSError) as exception:
+                self.logger.error("Could not remove '{}': {}".format(path, exception))
+                failed.append(path)
+        return failed
+
+    def copy_many(self, sources_destinations):
+        """
+        Copy each of the given sources to its destination, as copy does.
+        Plugins can override this to copy many paths with few round-trips;
+        by default, copy is called on each pair.
+
+        :param sources_destinations: a list of (source, destination) tuples
+        :raise IOError: if any of the copies failed
+        """
+        for source, destination in sources_destinations:
+            self.copy(source, destination)
+
+    def symlink_many(self, sources_destinations):
+        """
+        Create a symbolic link to each of the given sources at its destination,
+        as symlink does. Plugins can override this to create many links with few
+        round-trips; by default, symlink is called on each pair.
+
+        :param sources_destinations: a list of (source, destination) tuples
+        :raise IOError: if the creation of any of the links failed
+        """
+        for source, destination in sources_destinations:
+            self.symlink(source, destination)
+
     def gotocomputer_command(self, remotedir):
         """
         Return a string to be run using os.system in order to connect
@@ -56,7 +56,8 @@ def draw_children(node, node_label=None, show_pk=True, dist=2, follow_links_of_t
     return get_ascii_tree(node, node_label, show_pk, dist, follow_links_of_type, True)
 
 
-def get_ascii_tree(node, node_label=None, show_pk=True, max_depth=1, follow_links_of_type=None, descend=True):
+def get_ascii_tree(node, node_label=None, show_pk=True, max_depth=1, follow_links_of_type=None, descend=True,
+                   graph=None):
     """
     Get a string representing an ASCII tree for the given node.
 
@@ -73,18 +74,25 @@ def get_ascii_tree(node, node_label=None, show_pk=True, max_depth=1, follow_link
         :class:`aiida.common.links.LinkType`
     :param descend: if True will follow outputs, if False inputs
     :type descend: bool
+    :param graph: if given, the links are followed in this snapshot instead of querying the database for every node
+    :type graph: :class:`aiida.orm.utils.graph.ProvenanceGraph`
     :return: The string giving an ASCII representation of the tree from the node
     :rtype: str
     """
     tree_string = build_tree(
-        node, node_label, show_pk, max_depth, follow_links_of_type, descend
+        node, node_label, show_pk, max_depth, follow_links_of_type, descend, graph=graph
     )
     t = Tree('({});'.format(tree_string), format=1)
     return t.get_ascii(show_internal=True)
 
 
 def build_tree(node, node_label=None, show_pk=True, max_depth=1,
-               follow_links_of_type=None, descend=True, depth=0):
+               follow_links_of_type=None, descend=True, depth=0, graph=None):
+    if graph is not None:
+        return _build_tree_from_graph(
+            graph, node, node_label, show_pk, max_depth, follow_links_of_type, descend, depth
+        )
+
     out_values = []
 
     if depth < max_depth:
@@ -113,6 +121,45 @@ def build_tree(node, node_label=None, show_pk=True, max_depth=1,
     return ''.join(out_values)
 
 
+def _build_tree_from_graph(graph, node, node_label, show_pk, max_depth, follow_links_of_type, descend, depth):
+    """
+    Build the same tree as build_tree, following the links in a ProvenanceGraph snapshot.
+    All the nodes of the tree are loaded with a single query.
+    """
+    from aiida.orm.utils.graph import INCOMING, OUTGOING, get_nodes
+
+    if descend:
+        direction = OUTGOING
+        link_types = None if follow_links_of_type is None else [follow_links_of_type]
+    else:
+        direction = INCOMING
+        link_types = [LinkType.CREATE, LinkType.INPUT] if follow_links_of_type is None else [follow_links_of_type]
+
+    levels = graph.bfs([node.pk], direction, link_types, max(max_depth - depth, 0))
+    nodes = get_nodes(pk for level in levels[1:] for pk in level.tolist())
+    nodes[node.pk] = node
+
+    def get_relatives(pk):
+        if descend:
+            return graph.outputs(pk, link_types).tolist()
+        return graph.inputs(pk, link_types).tolist()
+
+    def build(pk, current_depth):
+        out_values = []
+
+        if current_depth < max_depth:
+            relatives = [build(child.pk, current_depth + 1)
+                         for child in sorted((nodes[child_pk] for child_pk in get_relatives(pk)), key=_ctime)]
+            if relatives:
+                out_values.append('({})'.format(', '.join(relatives)))
+
+        out_values.append(_generate_node_label(nodes[pk], node_label, show_pk))
+
+        return ''.join(out_values)
+
+    return build(node.pk, depth)
+
+
 def _generate_node_label(node, node_attr, show_pk):
     """
     Generate a label for the node.
@@ -186,19 +233,24 @@ def calc_info(calc_node):
     return s
 
 
-def format_call_graph(calc_node, info_fn=calc_info):
+def format_call_graph(calc_node, info_fn=calc_info, graph=None):
     """
     Print a tree like the POSIX tree command for the calculation call graph
 
     :param calc_node: The calculation node
     :param info_fn: An optional function that takes the node and returns a string
         of information to be displayed for each node.
+    :param graph: An optional :class:`aiida.orm.utils.graph.ProvenanceGraph` in which
+        to follow the call links, instead of querying the database for every calculation
     """
-    call_tree = build_call_graph(calc_node, info_fn=info_fn)
+    call_tree = build_call_graph(calc_node, info_fn=info_fn, graph=graph)
     return format_tree_descending(call_tree)
 
 
-def build_call_graph(calc_node, info_fn=calc_info):
+def build_call_graph(calc_node, info_fn=calc_info, graph=None):
+    if graph is not None:
+        return _build_call_graph_from_graph(graph, calc_node, info_fn)
+
     info_string = info_fn(calc_node)
     called = calc_node.called
     called.sort(key=lambda x: x.ctime)
@@ -208,6 +260,27 @@ def build_call_graph(calc_node, info_fn=calc_info):
         return info_string
 
 
+def _build_call_graph_from_graph(graph, calc_node, info_fn):
+    """
+    Build the same call graph as build_call_graph, following the call links in a ProvenanceGraph snapshot.
+    All the called calculations are loaded with a single query.
+    """
+    from aiida.orm.utils.graph import get_nodes
+
+    nodes = get_nodes(graph.descendants([calc_node.pk], [LinkType.CALL]).tolist())
+    nodes[calc_node.pk] = calc_node
+
+    def build(pk):
+        info_string = info_fn(nodes[pk])
+        called = sorted((nodes[child_pk] for child_pk in graph.outputs(pk, [LinkType.CALL]).tolist()), key=_ctime)
+        if called:
+            return info_string, [build(child.pk) for child in called]
+        else:
+            return info_string
+
+    return build(calc_node.pk)
+
+
 def format_tree_descending(tree, prefix=u"", pos=-1):
     text = []
 
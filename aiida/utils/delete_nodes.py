@@ -10,7 +10,7 @@
 
 
 def delete_nodes(pks, follow_calls=False, follow_returns=False, 
-                 dry_run=False, force=False, disable_checks=False, verbosity=0):
+                 dry_run=False, force=False, disable_checks=False, verbosity=0, graph=None):
     """
     Delete nodes by a list of pks
 
@@ -29,6 +29,10 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
     :param bool force: Do not ask for confirmation to delete nodes.
     :param int verbosity:
         The verbosity levels, 0 prints nothing, 1 prints just sums and total, 2 prints individual nodes.
+    :param graph:
+        An optional :class:`aiida.orm.utils.graph.ProvenanceGraph` snapshot, in which the nodes to delete are
+        searched instead of querying the database at every level. It should be up to date, since nodes that are
+        not in the snapshot would not be deleted.
     """
 
     from aiida.orm.querybuilder import QueryBuilder
@@ -65,12 +69,17 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
     # Operational set always includes the recently (in the last iteration added) nodes.
     operational_set = set().union(set(pks))  # Union to copy the set!
     pks_set_to_delete = set().union(set(pks))
+    if graph is not None:
+        # The whole closure is found in memory
+        pks_set_to_delete.update(graph.descendants(
+            [pk for pk in operational_set if pk in graph], link_types_to_follow).tolist())
+        operational_set = set()
     while operational_set:
         # new_pks_set are the the pks of all nodes that are connected to the operational node set
         # with the links specified.
         new_pks_set = set([i for i, in QueryBuilder().append(
             Node, filters={'id': {'in': operational_set}}).append(
-            Node, project='id', edge_filters=edge_filters).iterall()])
+            Node, project='id', edge_filters=edge_filters).iterall(stream=True)])
         # The operational set is only those pks that haven't been yet put into the pks_set_to_delete.
         operational_set = new_pks_set.difference(pks_set_to_delete)
 
@@ -86,7 +95,7 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
             qb = QueryBuilder().append(Node, filters={'id': {'in': pks_set_to_delete}},
                                        project=('uuid', 'id', 'type', 'label'))
             print "The nodes I {} delete:".format('would' if dry_run else 'will')
-            for uuid, pk, type_string, label in qb.iterall():
+            for uuid, pk, type_string, label in qb.iterall(stream=True):
                 try:
                     short_type_string = type_string.split('.')[-2]
                 except IndexError:
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Bulk import of large libraries of CIF and UPF files.
+
+The files are hashed and parsed by a pool of worker processes. The files are then handled in batches:
+the md5 checksums of a batch are looked up with a single query on the (indexed) md5 attribute, the nodes
+of the new files are stored in a single transaction, and the nodes of all the files of the batch are
+added to the group with a single statement. A file that cannot be read or parsed is reported and skipped.
+"""
+import collections
+import os
+import time
+
+CIF = 'cif'
+UPF = 'upf'
+FILE_TYPES = (CIF, UPF)
+
+# The result of the hashing and parsing of a file: the md5 is None if the file could not be read,
+# the attributes if it could not be parsed, in which case the error is the error message
+ParsedFile = collections.namedtuple('ParsedFile', ['filename', 'md5', 'attributes', 'error'])
+
+# The result of the import of a file: the pk of the new or existing node with the same md5, whether it was created,
+# and the error message if the file could not be imported
+ImportedFile = collections.namedtuple('ImportedFile', ['filename', 'pk', 'created', 'error'])
+
+
+def _get_data_class(file_type):
+    if file_type == CIF:
+        from aiida.orm.data.cif import CifData
+        return CifData
+    elif file_type == UPF:
+        from aiida.orm.data.upf import UpfData
+        return UpfData
+    raise ValueError('invalid file type {}, should be one of {}'.format(file_type, FILE_TYPES))
+
+
+def _format_error(exception):
+    return '{}: {}'.format(type(exception).__name__, exception)
+
+
+def parse_file(args):
+    """
+    Compute the md5 checksum of a file and parse the attributes of its node.
+    This is the task run by the worker processes, hence the single argument.
+
+    :param args: a tuple with the file type (CIF or UPF) and the absolute path of the file
+    :return: a ParsedFile
+    """
+    from aiida.common.utils import md5_file
+
+    file_type, filename = args
+
+    try:
+        md5 = md5_file(filename)
+    except (IOError, OSError) as exception:
+        return ParsedFile(filename, None, None, _format_error(exception))
+
+    try:
+        if file_type == CIF:
+            from aiida.orm.data.cif import read_cif_values, get_metadata_from_values
+            attributes = get_metadata_from_values(read_cif_values(filename))
+        else:
+            from aiida.orm.data.upf import parse_upf
+            attributes = {'element': str(parse_upf(filename)['element'])}
+    except Exception as exception:  # pylint: disable=broad-except
+        # Any error of the parsers only concerns this file, which is reported
+        return ParsedFile(filename, md5, None, _format_error(exception))
+
+    return ParsedFile(filename, md5, attributes, None)
+
+
+def parse_files(file_type, filenames, num_workers=1, chunksize=10):
+    """
+    Hash and parse files, in parallel.
+
+    :param file_type: CIF or UPF
+    :param filenames: an iterable of absolute paths
+    :param int num_workers: the number of worker processes; with 1, all the files are parsed in this process
+    :param int chunksize: the number of files given to a worker at a time
+    :return: an iterator over the ParsedFile of the files, in the same order
+    """
+    from multiprocessing import Pool
+    from aiida.backends.utils import close_connections
+
+    _get_data_class(file_type)
+    tasks = ((file_type, filename) for filename in filenames)
+
+    if num_workers <= 1:
+        for task in tasks:
+            yield parse_file(task)
+        return
+
+    # The workers do not use the database, but must not inherit the connections of this process
+    close_connections()
+    pool = Pool(num_workers)
+    try:
+        for parsed_file in pool.imap(parse_file, tasks, chunksize):
+            yield parsed_file
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def get_pks_by_md5(data_class, md5s, batch_size=1000):
+    """
+    Find the nodes with the given md5 checksums, with one query per batch of checksums.
+
+    :param data_class: the class of the nodes to look for
+    :param md5s: an iterable of md5 checksums
+    :param int batch_size: the number of checksums looked up by each query
+    :return: a dictionary mapping the md5 checksums that were found to the pk of the oldest node
+    """
+    from aiida.common.utils import grouper
+    from aiida.orm.querybuilder import QueryBuilder
+
+    pks = {}
+    for batch in grouper(batch_size, set(md5s)):
+        builder = QueryBuilder()
+        builder.append(data_class, filters={'attributes.md5': {'in': list(batch)}}, project=['attributes.md5', 'id'])
+        for md5, pk in builder.iterall():
+            if md5 not in pks or pk < pks[md5]:
+                pks[md5] = pk
+    return pks
+
+
+def create_node(data_class, parsed_file):
+    """
+    Create the unstored node of a file, setting the attributes parsed by the worker.
+
+    :param data_class: the class of the node
+    :param parsed_file: the ParsedFile of the file, which was parsed successfully
+    :return: the unstored node
+    """
+    from aiida.orm.data.cif import CifData
+
+    if issubclass(data_class, CifData):
+        # Setting the file does not parse it: the metadata attributes come from the worker
+        node = CifData()
+        node.set_file(parsed_file.filename)
+        for key, value in parsed_file.attributes.iteritems():
+            node._set_attr(key, value)  # pylint: disable=protected-access
+    else:
+        # The element and md5 come from the worker, the file is not parsed and hashed again
+        node = data_class()
+        node.set_file(parsed_file.filename, parsed_attributes=dict(parsed_file.attributes, md5=parsed_file.md5))
+    return node
+
+
+def import_batch(data_class, parsed_files, group=None):
+    """
+    Import a batch of hashed and parsed files: look up their md5 checksums, store the nodes
+    of the new files in a single transaction and add all the nodes to the group.
+
+    :param data_class: the class of the nodes
+    :param parsed_files: a list of ParsedFile
+    :param group: if given, the stored group to which the nodes are added
+    :return: a list of ImportedFile, in the same order
+    """
+    from aiida.backends.utils import store_nodes
+
+    pks = get_pks_by_md5(data_class, [parsed.md5 for parsed in parsed_files if parsed.error is None])
+    errors = {}
+    new_nodes = collections.OrderedDict()
+    creators = {}
+
+    for parsed in parsed_files:
+        if parsed.error is not None or parsed.md5 in pks or parsed.md5 in new_nodes:
+            continue
+        try:
+            new_nodes[parsed.md5] = create_node(data_class, parsed)
+            creators[parsed.md5] = parsed.filename
+        except Exception as exception:  # pylint: disable=broad-except
+            errors[parsed.filename] = _format_error(exception)
+
+    if new_nodes:
+        try:
+            pks.update(zip(new_nodes.keys(), store_nodes(new_nodes.values())))
+        except Exception as exception:  # pylint: disable=broad-except
+            # Nothing of the batch was stored
+            for filename in creators.itervalues():
+                errors[filename] = 'the batch could not be stored: {}'.format(_format_error(exception))
+            creators = {}
+
+    results = []
+    for parsed in parsed_files:
+        error = parsed.error or errors.get(parsed.filename)
+        if error is None and parsed.md5 not in pks:
+            error = 'the node of an identical file could not be created'
+        if error is not None:
+            results.append(ImportedFile(parsed.filename, None, False, error))
+        else:
+            results.append(ImportedFile(parsed.filename, pks[parsed.md5], creators.get(parsed.md5) == parsed.filename,
+                                        None))
+
+    if group is not None:
+        group.add_nodes(set(result.pk for result in results if result.pk is not None))
+
+    return results
+
+
+def import_files(file_type, filenames, group=None, num_workers=1, batch_size=1000, progress=None):
+    """
+    Import CIF or UPF files, creating a node for every file whose md5 checksum is not found in the database.
+
+    :param file_type: CIF or UPF
+    :param filenames: a list of absolute paths
+    :param group: if given, the stored group to which the nodes of all the files (new or existing) are added
+    :param int num_workers: the number of processes hashing and parsing the files
+    :param int batch_size: the number of files looked up, stored and added to the group at a time
+    :param progress: a callable that is called after each batch with the list of ImportedFile of the batch,
+        the number of files processed so far and the elapsed time in seconds
+    :return: a list of ImportedFile, in the order of the filenames
+    """
+    from aiida.common.utils import grouper
+
+    data_class = _get_data_class(file_type)
+    results = []
+    start = time.time()
+
+    parsed_files = parse_files(file_type, filenames, num_workers=num_workers)
+    for batch in grouper(batch_size, parsed_files):
+        batch_results = import_batch(data_class, list(batch), group)
+        results.extend(batch_results)
+        if progress is not None:
+            progress(batch_results, len(results), time.time() - start)
+
+    return results
+
+
+def find_files(paths, extension):
+    """
+    Return the files with a given extension (case-insensitive), looking recursively in the directories.
+
+    :param paths: a list of paths of files or directories
+    :param extension: the extension of the files, e.g. '.cif'
+    :return: a list of absolute paths, following symbolic links to files
+    """
+    filenames = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, files in os.walk(path):
+                filenames.extend(os.path.realpath(os.path.join(dirpath, filename)) for filename in sorted(files)
+                                 if filename.lower().endswith(extension))
+        else:
+            filenames.append(os.path.realpath(path))
+    return filenames
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Recompute the hashes of many nodes in parallel.
+
+The pks of the nodes are streamed in ascending order and divided in batches. Each batch is
+given to a worker process (with its own database connection), which computes the hashes of
+its nodes and stores them with a single bulk update. Batches are completed in order, so that
+the last pk of the last completed batch can be stored in a checkpoint file, from which an
+interrupted run can be resumed. The checkpoint file also records the selection of the nodes
+(their class and pks), and can only resume a run with the same selection.
+"""
+import hashlib
+import json
+import os
+import time
+
+
+def rehash_batch(pks):
+    """
+    Recompute and store the hashes of a batch of nodes.
+
+    :param pks: a list of node pks
+    :returns: a tuple with the largest pk of the batch and the number of rehashed nodes
+    """
+    from aiida.backends.utils import set_extra_for_nodes
+    from aiida.orm.implementation.general.node import _HASH_EXTRA_KEY
+    from aiida.orm.node import Node
+    from aiida.orm.querybuilder import QueryBuilder
+
+    builder = QueryBuilder().append(Node, filters={'id': {'in': list(pks)}})
+    hashes = {node.pk: node.get_hash() for node, in builder.iterall()}
+    set_extra_for_nodes(_HASH_EXTRA_KEY, hashes)
+    return max(pks), len(hashes)
+
+
+def get_selection(node_class, pks=None):
+    """
+    :param node_class: the class of the rehashed nodes
+    :param pks: the pks of the rehashed nodes, or None if all the nodes of the class are rehashed
+    :returns: a string identifying the selection of the rehashed nodes
+    """
+    selection = '{}.{}'.format(node_class.__module__, node_class.__name__)
+    if pks is not None:
+        selection += ' {}'.format(hashlib.sha256(json.dumps(sorted(set(pks)))).hexdigest())
+    return selection
+
+
+def read_checkpoint(filename, selection=None):
+    """
+    :param filename: the path of the checkpoint file
+    :param selection: if given, the selection of the nodes (see :py:func:`get_selection`) that the checkpoint
+        file must have been written for
+    :returns: the last pk stored in the checkpoint file, or None if the file does not exist
+    :raises ValueError: if the checkpoint file was written for another selection of the nodes
+    """
+    if not os.path.exists(filename):
+        return None
+    with open(filename) as handle:
+        content = json.load(handle)
+    if selection is not None and content.get('selection') != selection:
+        raise ValueError('the checkpoint file {} was written for another selection of nodes ({}), '
+                         'and cannot be used to rehash {}'.format(filename, content.get('selection'), selection))
+    return content['last_pk']
+
+
+def write_checkpoint(filename, last_pk, selection=None):
+    """
+    Atomically write the last processed pk to the checkpoint file.
+
+    :param filename: the path of the checkpoint file
+    :param last_pk: all the nodes with a pk up to this one were rehashed
+    :param selection: the selection of the rehashed nodes, see :py:func:`get_selection`
+    """
+    temp_filename = '{}.tmp'.format(filename)
+    with open(temp_filename, 'w') as handle:
+        json.dump({'last_pk': last_pk, 'selection': selection}, handle)
+    os.rename(temp_filename, filename)
+
+
+def _iter_results_in_order(pool, batches, max_pending):
+    """
+    Submit the batches to the pool, keeping at most max_pending of them in flight,
+    and yield the results in the order of the batches.
+    """
+    from collections import deque
+
+    pending = deque()
+    for batch in batches:
+        pending.append(pool.apply_async(rehash_batch, (batch,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def rehash_nodes(node_class, pks=None, num_workers=1, batch_size=1000, checkpoint=None, progress=None):
+    """
+    Recompute the hashes of the nodes of a given class, in parallel and in batches.
+
+    :param node_class: only nodes of this class (or subclasses) are rehashed
+    :param pks: if given, only the nodes with these pks are rehashed
+    :param int num_workers: the number of worker processes; with 1, all the work is done in this process
+    :param int batch_size: the number of nodes hashed and updated at a time by a worker
+    :param checkpoint: the path of a file where the last processed pk is stored after each batch,
+        together with the node class and pks. If the file exists, only the nodes with a larger pk are
+        rehashed; it must then have been written for the same node class and pks.
+    :param progress: a callable that is called after each batch with the number of nodes rehashed
+        so far and the elapsed time in seconds
+    :returns: the number of rehashed nodes
+    :raises ValueError: if the checkpoint file was written for another node class or other pks
+    """
+    from multiprocessing import Pool
+    from aiida.common.utils import grouper
+    from aiida.orm.querybuilder import QueryBuilder
+
+    filters = {}
+    if pks is not None:
+        filters['id'] = {'in': list(pks)}
+    selection = get_selection(node_class, pks)
+    if checkpoint is not None:
+        last_pk = read_checkpoint(checkpoint, selection)
+        if last_pk is not None:
+            filters.setdefault('and', []).append({'id': {'>': last_pk}})
+
+    builder = QueryBuilder()
+    builder.append(node_class, filters=filters, project='id', tag='node')
+    builder.order_by({'node': 'id'})
+
+    pool = None
+    if num_workers > 1:
+        from aiida.backends.utils import close_connections
+        # Fork before opening the stream of pks, so that no connection is shared with the workers
+        close_connections()
+        pool = Pool(num_workers)
+
+    count = 0
+    start = time.time()
+    try:
+        batches = grouper(batch_size, (pk for pk, in builder.iterall(batch_size=batch_size, stream=True)))
+        if pool is None:
+            results = (rehash_batch(batch) for batch in batches)
+        else:
+            results = _iter_results_in_order(pool, batches, max_pending=2 * num_workers)
+
+        for batch_last_pk, batch_count in results:
+            count += batch_count
+            if checkpoint is not None:
+                write_checkpoint(checkpoint, batch_last_pk, selection)
+            if progress is not None:
+                progress(count, time.time() - start)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return count
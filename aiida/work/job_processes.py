@@ -13,6 +13,7 @@ import shutil
 import sys
 import tempfile
 import traceback
+import weakref
 from tornado.gen import coroutine, Return
 
 import plumpy
@@ -41,6 +42,90 @@ KILL_COMMAND = 'kill'
 logger = logging.getLogger(__name__)
 
 
+def _call_with_node(func, pk, *args):
+    """
+    Load the node with the given pk, or the nodes of a list of pks, and call func with it and the other arguments.
+    Used in the threads of a TransportExecutor, where the node instances of the event loop thread cannot be used.
+    """
+    from aiida.orm import load_node
+    if isinstance(pk, list):
+        return func([load_node(node_pk) for node_pk in pk], *args)
+    return func(load_node(pk), *args)
+
+
+@coroutine
+def call_transport_task(transport_queue, authinfo, func, node, *args):
+    """
+    Call an execmanager function with a node and the other arguments. If the transport queue has an executor,
+    the call runs in the thread of the authinfo and the event loop is not blocked while it runs.
+
+    :param transport_queue: the TransportQueue that provided the transport
+    :param authinfo: the authinfo of the transport, whose thread is used
+    :param func: the execmanager function
+    :param node: the node that represents the job calculation, or a list of nodes
+    :raises: Return with the result of the function
+    """
+    executor = transport_queue.executor
+    if executor is None:
+        raise Return(func(node, *args))
+
+    pk = [each.pk for each in node] if isinstance(node, list) else node.pk
+    result = yield executor.submit(authinfo.id, _call_with_node, func, pk, *args)
+    raise Return(result)
+
+
+class SubmitBatch(object):
+    """
+    The job calculations of an authinfo that are waiting for the same transport to be submitted. The first
+    submit task that gets the transport submits all of them with execmanager.submit_calculations, such that
+    they can be grouped in job arrays or bundles, depending on the submit mode of the computer.
+    """
+
+    # pylint: disable=too-few-public-methods
+    _pending = weakref.WeakKeyDictionary()
+
+    def __init__(self):
+        self.nodes = []
+        self.future = None
+
+    @classmethod
+    def join(cls, transport_queue, authinfo, node):
+        """
+        Add a node to the batch of the authinfo that is still waiting for its transport, or to a new batch.
+
+        :param transport_queue: the TransportQueue from which the transport is requested
+        :param authinfo: the authinfo of the transport
+        :param node: the node that represents the job calculation
+        :return: the SubmitBatch
+        """
+        batches = cls._pending.setdefault(transport_queue, {})
+        batch = batches.setdefault(authinfo.id, cls())
+        batch.nodes.append(node)
+        return batch
+
+    def leave(self, node):
+        """ Remove a node from the batch, if it was not submitted yet """
+        if self.future is None and node in self.nodes:
+            self.nodes.remove(node)
+
+    def submit(self, transport_queue, authinfo, transport):
+        """
+        Submit the nodes of the batch, unless another task of the batch already did. No node can join the batch
+        afterwards.
+
+        :return: a future resolved when all the nodes are submitted
+        """
+        if self.future is None:
+            batches = self._pending.get(transport_queue, {})
+            if batches.get(authinfo.id) is self:
+                del batches[authinfo.id]
+            # The calculations that were killed while waiting for the transport are not submitted
+            nodes = [node for node in self.nodes if node.get_state() in [calc_states.TOSUBMIT, calc_states.SUBMITTING]]
+            self.future = call_transport_task(
+                transport_queue, authinfo, execmanager.submit_calculations, nodes, transport)
+        return self.future
+
+
 @coroutine
 def task_submit_job(node, transport_queue, cancel_flag):
     """
@@ -64,16 +149,27 @@ def task_submit_job(node, transport_queue, cancel_flag):
 
     @coroutine
     def do_submit():
+        # A previous attempt may have failed after the batch of this calculation was submitted
+        if node.get_job_id() is not None:
+            raise Return()
+
         with transport_queue.request_transport(authinfo) as request:
-            transport = yield request
+            # The calculations that wait for the same transport are submitted together
+            batch = SubmitBatch.join(transport_queue, authinfo, node)
+            try:
+                transport = yield request
 
-            # It may have taken time to get the transport, check if we've been cancelled
-            if cancel_flag.is_cancelled:
-                raise plumpy.CancelledError('task_submit_job for calculation<{}> cancelled'.format(node.pk))
+                # It may have taken time to get the transport, check if we've been cancelled
+                if cancel_flag.is_cancelled and batch.future is None:
+                    raise plumpy.CancelledError('task_submit_job for calculation<{}> cancelled'.format(node.pk))
+            except Exception:
+                batch.leave(node)
+                raise
 
             logger.info('submitting calculation<{}>'.format(node.pk))
             node._set_state(calc_states.SUBMITTING)
-            raise Return(execmanager.submit_calculation(node, transport))
+            result = yield batch.submit(transport_queue, authinfo, transport)
+            raise Return(result)
 
     try:
         result = yield exponential_backoff_retry(
@@ -121,7 +217,9 @@ def task_update_job(node, transport_queue, cancel_flag):
                 raise plumpy.CancelledError('task_update_job for calculation<{}> cancelled'.format(node.pk))
 
             logger.info('updating calculation<{}>'.format(node.pk))
-            raise Return(execmanager.update_calculation(node, transport))
+            result = yield call_transport_task(
+                transport_queue, authinfo, execmanager.update_calculation, node, transport)
+            raise Return(result)
 
     try:
         result = yield exponential_backoff_retry(
@@ -172,7 +270,10 @@ def task_retrieve_job(node, transport_queue, retrieved_temporary_folder, cancel_
             logger.info('retrieving calculation<{}>'.format(node.pk))
             node._set_state(calc_states.RETRIEVING)
 
-            raise Return(execmanager.retrieve_calculation(node, transport, retrieved_temporary_folder))
+            result = yield call_transport_task(
+                transport_queue, authinfo, execmanager.retrieve_calculation, node, transport,
+                retrieved_temporary_folder)
+            raise Return(result)
 
     try:
         result = yield exponential_backoff_retry(
@@ -225,7 +326,9 @@ def task_kill_job(node, transport_queue, cancel_flag):
 
             logger.info('killing calculation<{}>'.format(node.pk))
 
-            raise Return(execmanager.kill_calculation(node, transport))
+            result = yield call_transport_task(
+                transport_queue, authinfo, execmanager.kill_calculation, node, transport)
+            raise Return(result)
 
     try:
         result = yield exponential_backoff_retry(do_kill, initial_interval, max_attempts, logger=node.logger)
@@ -16,7 +16,7 @@ import yaml
 
 import plumpy
 from plumpy.rmq import RmqCommunicator, RmqConnector
-from plumpy.process_comms import PID_KEY
+from plumpy.process_comms import INTENT_KEY, PID_KEY
 from kiwipy import communications
 
 from aiida.utils.serialize import serialize_data, deserialize_data
@@ -28,7 +28,7 @@ from . import utils
 
 __all__ = [
     'new_control_panel', 'new_blocking_control_panel', 'BlockingProcessControlPanel', 'RemoteException', 'TimeoutError',
-    'DeliveryFailed', 'ProcessLauncher', 'ProcessControlPanel'
+    'DeliveryFailed', 'ProcessLauncher', 'ProcessControlPanel', 'WorkerIntent', 'DaemonWorkerAction'
 ]
 
 RemoteException = plumpy.RemoteException
@@ -47,6 +47,7 @@ _RMQ_HEARTBEAT_TIMEOUT = 600
 _LAUNCH_QUEUE = 'process.queue'
 _MESSAGE_EXCHANGE = 'messages'
 _TASK_EXCHANGE = 'tasks'
+_DAEMON_WORKER_IDENTIFIER = 'daemon.worker.{pid}'
 
 
 def get_rmq_url(heartbeat_timeout=None):
@@ -109,6 +110,42 @@ def get_launch_queue_name(prefix=None):
     return _LAUNCH_QUEUE
 
 
+def get_launch_queue_depth(prefix=None):
+    """
+    Return the number of tasks waiting in the launch queue, i.e. those not yet taken by any daemon worker
+
+    :param prefix: a string prefix for the RabbitMQ communication queues and exchanges
+    :returns: the number of ready messages in the launch queue, or 0 if the queue does not exist yet
+    """
+    import pika
+
+    if prefix is None:
+        prefix = get_rmq_prefix()
+
+    connection = pika.BlockingConnection(pika.URLParameters(get_rmq_url()))
+    try:
+        channel = connection.channel()
+        try:
+            result = channel.queue_declare(queue=get_launch_queue_name(prefix), passive=True)
+        except pika.exceptions.ChannelClosed:
+            # Passively declaring a queue that does not exist closes the channel
+            return 0
+        return result.method.message_count
+    finally:
+        if connection.is_open:
+            connection.close()
+
+
+def get_daemon_worker_identifier(pid):
+    """
+    Return the identifier with which the daemon worker with the given system pid receives RPC messages
+
+    :param pid: the system pid of the daemon worker process
+    :returns: the RPC identifier of the daemon worker
+    """
+    return _DAEMON_WORKER_IDENTIFIER.format(pid=pid)
+
+
 def get_message_exchange_name(prefix):
     """
     Return the message exchange name for a given prefix
@@ -230,14 +267,53 @@ class ExecuteProcessAction(plumpy.Action):
         self.set_result(proc.calc.pk)
 
 
+class WorkerIntent(object):
+    """The intents of the RPC messages that can be sent to a daemon worker."""
+
+    STATUS = 'status'
+    DRAIN = 'drain'
+    RESUME = 'resume'
+
+
+class DaemonWorkerAction(plumpy.ProcessAction):
+    """
+    An action to send an RPC message to a daemon worker, identified by its system pid.
+
+    The result is a dictionary with the number of processes that are active in the worker and whether it is draining.
+    """
+
+    def __init__(self, pid, intent):
+        super(DaemonWorkerAction, self).__init__(get_daemon_worker_identifier(pid), {INTENT_KEY: intent})
+
+
 class ProcessLauncher(plumpy.ProcessLauncher):
     """
     A sub class of plumpy.ProcessLauncher to launch a Process
 
     It overrides the _continue method to make sure the node corresponding to the task can be loaded and
-    that if it is already marked as terminated, it is not continued but the future is reconstructed and returned
+    that if it is already marked as terminated, it is not continued but the future is reconstructed and returned.
+    It also keeps track of the processes that it launched or continued which are not yet done.
     """
 
+    def __init__(self, *args, **kwargs):
+        super(ProcessLauncher, self).__init__(*args, **kwargs)
+        self._active_futures = set()
+
+    @property
+    def active_process_count(self):
+        """Return the number of processes launched or continued by this launcher that are not yet done."""
+        return len(self._active_futures)
+
+    def __call__(self, task):
+        result = super(ProcessLauncher, self).__call__(task)
+
+        # Depending on the task, the result is either the future of the process or its pid
+        if hasattr(result, 'add_done_callback') and not result.done():
+            self._active_futures.add(result)
+            result.add_done_callback(self._active_futures.discard)
+
+        return result
+
     def _continue(self, task):
         """
         Continue the task
@@ -324,6 +400,15 @@ class ProcessControlPanel(object):
     def request_status(self, pid):
         return self.execute_action(plumpy.StatusAction(pid))
 
+    def request_worker_status(self, pid):
+        return self.execute_action(DaemonWorkerAction(pid, WorkerIntent.STATUS))
+
+    def drain_worker(self, pid):
+        return self.execute_action(DaemonWorkerAction(pid, WorkerIntent.DRAIN))
+
+    def resume_worker(self, pid):
+        return self.execute_action(DaemonWorkerAction(pid, WorkerIntent.RESUME))
+
     def launch_process(self, process_class, init_args=None, init_kwargs=None):
         action = LaunchProcessAction(process_class, init_args, init_kwargs)
         action.execute(self._communicator)
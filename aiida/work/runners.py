@@ -82,10 +82,17 @@ class Runner(object):
                  rmq_submit=False,
                  enable_persistence=True,
                  persister=None):
+        from aiida.common.setup import get_property
+
         self._loop = loop if loop is not None else tornado.ioloop.IOLoop()
         self._poll_interval = poll_interval
         self._rmq_submit = rmq_submit
-        self._transport = transports.TransportQueue(self._loop)
+
+        if get_property('daemon.transport_task_threads'):
+            self._transport_executor = transports.TransportExecutor(self._loop)
+        else:
+            self._transport_executor = None
+        self._transport = transports.TransportQueue(self._loop, executor=self._transport_executor)
 
         if enable_persistence:
             self._persister = persister if persister is not None else persistence.AiiDAPersister()
@@ -156,6 +163,9 @@ class Runner(object):
         if self._rmq_connector is not None:
             self._rmq_connector.disconnect()
 
+        if self._transport_executor is not None:
+            self._transport_executor.shutdown(wait=False)
+
         self._closed = True
 
     def instantiate_process(self, process, *args, **inputs):
@@ -368,15 +378,63 @@ class DaemonRunner(Runner):
 
     def __init__(self, *args, **kwargs):
         kwargs['rmq_submit'] = True
+        self._task_receiver = None
+        self._draining = False
         super(DaemonRunner, self).__init__(*args, **kwargs)
 
+    @property
+    def is_draining(self):
+        """Return whether the runner stopped accepting new tasks, because it is about to be stopped."""
+        return self._draining
+
+    def drain(self):
+        """Stop accepting new tasks, while the processes that are already running are continued."""
+        if not self._draining:
+            self.communicator.remove_task_subscriber(self._task_receiver)
+            self._draining = True
+
+    def resume(self):
+        """Accept new tasks again after a call to drain."""
+        if self._draining:
+            self.communicator.add_task_subscriber(self._task_receiver)
+            self._draining = False
+
+    def get_worker_status(self):
+        """
+        :returns: a dictionary with the number of processes that are active in this runner and whether it is draining
+        """
+        return {'active_processes': self._task_receiver.active_process_count, 'draining': self._draining}
+
     def _setup_rmq(self, url, prefix=None, task_prefetch_count=None, testing_mode=False):
+        import os
+
         super(DaemonRunner, self)._setup_rmq(url, prefix, task_prefetch_count, testing_mode)
 
         # Create a context for loading new processes
         load_context = plumpy.LoadSaveContext(runner=self)
 
         # Listen for incoming launch requests
-        task_receiver = rmq.ProcessLauncher(
+        self._task_receiver = rmq.ProcessLauncher(
             loop=self.loop, persister=self.persister, load_context=load_context, loader=persistence.get_object_loader())
-        self.communicator.add_task_subscriber(task_receiver)
+        self.communicator.add_task_subscriber(self._task_receiver)
+
+        # Listen for the messages of the daemon autoscaler, addressed to this worker by its system pid
+        self.communicator.add_rpc_subscriber(self._on_worker_message, rmq.get_daemon_worker_identifier(os.getpid()))
+
+    def _on_worker_message(self, msg):
+        """
+        Handle an RPC message sent to this daemon worker
+
+        :param msg: the message, whose intent is one of those defined in :py:class:`aiida.work.rmq.WorkerIntent`
+        :returns: the status of the worker after handling the message
+        """
+        intent = msg[rmq.INTENT_KEY]
+
+        if intent == rmq.WorkerIntent.DRAIN:
+            self.drain()
+        elif intent == rmq.WorkerIntent.RESUME:
+            self.resume()
+        elif intent != rmq.WorkerIntent.STATUS:
+            raise RuntimeError('Unknown intent: {}'.format(intent))
+
+        return self.get_worker_status()
@@ -11,6 +11,8 @@
 from collections import namedtuple
 import contextlib
 import logging
+import threading
+import time
 import traceback
 import tornado.gen
 import tornado.concurrent
@@ -43,17 +45,25 @@ class TransportQueue(object):
     """
     AuthInfoEntry = namedtuple('AuthInfoEntry', ['authinfo', 'transport', 'callbacks', 'callback_handle'])
 
-    def __init__(self, loop=None):
+    def __init__(self, loop=None, executor=None):
         """
         :param loop: The event loop to use, will use tornado.ioloop.IOLoop.current() if not supplied
+        :param executor: An optional TransportExecutor, used by the transport tasks to run their
+            blocking work outside of the event loop
         """
         self._loop = loop if loop is not None else tornado.ioloop.IOLoop.current()
         self._transport_requests = {}
+        self._executor = executor
 
     def loop(self):
         """ Get the loop being used by this transport queue """
         return self._loop
 
+    @property
+    def executor(self):
+        """ The TransportExecutor of this queue, or None if tasks run in the event loop """
+        return self._executor
+
     @contextlib.contextmanager
     def request_transport(self, authinfo):
         """
@@ -117,3 +127,132 @@ class TransportQueue(object):
                     self._loop.remove_timeout(open_callback_handle)
 
                 del self._transport_requests[authinfo.id]
+
+
+def _release_thread_session():
+    """
+    Release the database session of the current thread, such that its connection goes back to the pool
+    and no transaction is left open between two tasks.
+    """
+    from aiida.backends import settings
+    from aiida.backends.profile import BACKEND_SQLA
+
+    if settings.BACKEND == BACKEND_SQLA:
+        from aiida.backends.sqlalchemy import get_scoped_session
+        session = get_scoped_session()
+        if session is not None:
+            session.close()
+
+
+class TransportExecutor(object):
+    """
+    Runs blocking work (file transfers, remote commands, database operations) of transport
+    tasks in a thread per key (e.g. the id of an authinfo), so that it does not block the
+    event loop. The tasks of a key run one after the other: the transports are not thread
+    safe (e.g. the working directory and the sftp channel of an SshTransport), and a
+    transport is shared by the tasks of the same authinfo.
+
+    Each worker thread uses its own database session (sessions and connections are
+    thread local), so the tasks should load the nodes they need by pk rather than use
+    instances from the loop thread. Results, and exceptions, are set on a future that is
+    resolved in the event loop.
+
+    For every key, the executor keeps the number of tasks, the time spent by tasks waiting
+    in the queue and the time spent running them, see :meth:`get_metrics`.
+    """
+
+    def __init__(self, loop=None):
+        """
+        :param loop: The event loop on which futures are resolved, will use tornado.ioloop.IOLoop.current()
+            if not supplied
+        """
+        self._loop = loop if loop is not None else tornado.ioloop.IOLoop.current()
+        self._pools = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self, key):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = ThreadPoolExecutor(max_workers=1)
+                self._metrics[key] = {
+                    'submitted': 0,
+                    'completed': 0,
+                    'wait_total': 0.,
+                    'wait_max': 0.,
+                    'duration_total': 0.,
+                    'duration_max': 0.,
+                }
+            return self._pools[key]
+
+    def _record(self, key, wait, duration):
+        with self._lock:
+            metrics = self._metrics[key]
+            metrics['completed'] += 1
+            metrics['wait_total'] += wait
+            metrics['wait_max'] = max(metrics['wait_max'], wait)
+            metrics['duration_total'] += duration
+            metrics['duration_max'] = max(metrics['duration_max'], duration)
+
+    def submit(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) in the thread of the given key, after the tasks already submitted for this key.
+
+        :param key: the key of the thread pool, e.g. the id of an authinfo
+        :returns: a tornado future, resolved in the event loop with the result of the call
+        """
+        pool = self._get_pool(key)
+        submit_time = time.time()
+
+        def run():
+            start_time = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _release_thread_session()
+                end_time = time.time()
+                self._record(key, start_time - submit_time, end_time - start_time)
+                _LOGGER.debug('transport task for %s waited %.3fs and ran for %.3fs',
+                              key, start_time - submit_time, end_time - start_time)
+
+        with self._lock:
+            self._metrics[key]['submitted'] += 1
+
+        future = tornado.concurrent.Future()
+
+        def copy(pool_future):
+            """ Copy the outcome of the pool future onto the tornado future, called in the event loop """
+            if pool_future.exception() is not None:
+                if hasattr(pool_future, 'exception_info'):
+                    # The Python 2 backport of concurrent.futures keeps the traceback
+                    exception, exc_traceback = pool_future.exception_info()
+                    future.set_exc_info((type(exception), exception, exc_traceback))
+                else:
+                    future.set_exception(pool_future.exception())
+            else:
+                future.set_result(pool_future.result())
+
+        self._loop.add_future(pool.submit(run), copy)
+        return future
+
+    def get_metrics(self):
+        """
+        :returns: a dictionary with, for each key, the number of submitted and completed tasks,
+            and the total and maximum time in seconds that tasks waited in the queue and ran
+        """
+        with self._lock:
+            return {key: dict(metrics) for key, metrics in self._metrics.items()}
+
+    def shutdown(self, wait=True):
+        """
+        Shut down all the threads.
+
+        :param wait: if True, wait for the running and queued tasks to complete
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools = {}
+        for pool in pools:
+            pool.shutdown(wait=wait)
@@ -50,7 +50,7 @@ install_requires = [
 
 extras_require = {
     ':python_version < "3.3"': ['mock'],
-    ':python_version < "3"': ['chainmap', 'pathlib2', 'singledispatch >= 3.4.0.3'],
+    ':python_version < "3"': ['chainmap', 'futures', 'pathlib2', 'singledispatch >= 3.4.0.3'],
     # Requirements for ssh transport with authentification through Kerberos token
     # N. B.: you need to install first libffi and MIT kerberos GSSAPI including header files.
     # E.g. for Ubuntu 14.04: sudo apt-get install libffi-dev libkrb5-dev